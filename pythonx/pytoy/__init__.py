@@ -9,8 +9,11 @@ def initialize_plugin():
     from pytoy import commands  # NOQA
 
     from pytoy.contexts.core import GlobalCoreContext 
+    from pytoy.shared.timertask import TimerTask
     context = GlobalCoreContext.get()
     context.llm_import_resolver.import_background()
+    # The timer fires when the editor waits for the input, so the preloading starts at idle.
+    TimerTask.execute_oneshot(context.module_preloader.notify_capacity, interval=100)
 
 
 def run(path=None):
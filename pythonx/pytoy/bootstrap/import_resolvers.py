@@ -1,70 +1,235 @@
+"""Import heavy libraries in the background to avoid blocking plugin startup and the first commands.
+
+* Tools declare the modules they will need by `declare_preload`, with the priority.
+* `ModulePreloader` imports them in the order of priority, after the editor becomes idle
+  (`notify_capacity`) or the moratorium passes.
+* `ensure_module` returns the module at the first use; it waits for the background import
+  if it is running, or imports the module synchronously.
+
+The durations of imports and the stalls at the first use are kept in `ImportLedger`.
+"""
+
+import importlib
 import threading
+import time
+from dataclasses import dataclass
+from types import ModuleType
+from typing import Callable, Literal, Sequence
 
+type ImportState = Literal["pending", "importing", "imported", "failed"]
 
-class LLMImportResolver:
-    """Import llm-related libraries in the background to avoid blocking plugin startup.
-    """
-    
-    def __init__(self, moratorium_time: float = 1.0) -> None:
-        self._moratorium_time = moratorium_time
-        self._import_done: threading.Event | None = None
-        self._lock = threading.Lock()
-        self._imported: bool = False
-        self._import_error: ImportError | None = None
 
-        self._moratorium_event = threading.Event()
+@dataclass
+class ImportRecord:
+    name: str
+    priority: int
+    order: int
+    state: ImportState = "pending"
+    loaded_by: Literal["background", "foreground"] | None = None
+    duration: float | None = None
+    stall: float | None = None  # The waiting time at the first `ensure`. `None` until it is used.
+    error: ImportError | None = None
 
+    def to_line(self) -> str:
+        duration = "-" if self.duration is None else f"{self.duration * 1000:.0f}ms"
+        stall = "unused" if self.stall is None else f"stall {self.stall * 1000:.0f}ms"
+        loaded_by = f" ({self.loaded_by})" if self.loaded_by else ""
+        error = f" {self.error}" if self.error else ""
+        return f"{self.name}: {self.state}{loaded_by}, import {duration}, {stall}, priority {self.priority}{error}"
 
-    def import_background(self) -> None:
-        with self._lock:
-            if self._import_done is not None:
-                return 
 
-            event = self._import_done = threading.Event()
+class ImportLedger:
+    def __init__(self) -> None:
+        self._records: dict[str, ImportRecord] = {}
 
-        def _inner():
-            self._moratorium_event.wait(self._moratorium_time)
-            try:
-                self._naive_import()
-            finally:
-                event.set()
+    def get(self, name: str) -> ImportRecord | None:
+        return self._records.get(name)
 
-        threading.Thread(
-            target=_inner,
-            daemon=True,
-        ).start()
+    def add(self, name: str, priority: int) -> ImportRecord:
+        record = ImportRecord(name=name, priority=priority, order=len(self._records))
+        self._records[name] = record
+        return record
 
-    def notify_capacity(self) -> None:
-        self._moratorium_event.set()
-        
-    def ensure_import(self) -> None:
-        with self._lock:
-            if self._imported:
-                return 
+    @property
+    def records(self) -> Sequence[ImportRecord]:
+        return sorted(self._records.values(), key=lambda record: (-record.priority, record.order))
+
+    @property
+    def total_stall(self) -> float:
+        return sum(record.stall or 0.0 for record in self._records.values())
+
+    def to_lines(self) -> list[str]:
+        lines = [record.to_line() for record in self.records]
+        lines.append(f"total stall at the first use: {self.total_stall * 1000:.0f}ms")
+        return lines
 
-            event = self._import_done
 
-        if event is not None:
-            event.wait()
+class ModulePreloader:
+    def __init__(
+        self, moratorium_time: float = 1.0, importer: Callable[[str], ModuleType] = importlib.import_module
+    ) -> None:
+        self._moratorium_time = moratorium_time
+        self._importer = importer
+        self._ledger = ImportLedger()
+        self._condition = threading.Condition()
+        self._done: dict[str, threading.Event] = {}
+        self._capacity_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def ledger(self) -> ImportLedger:
+        return self._ledger
+
+    def report(self) -> list[str]:
+        with self._condition:
+            return self._ledger.to_lines()
+
+    def declare(self, *names: str, priority: int = 0) -> None:
+        """Declare the modules to be preloaded. The higher `priority` is imported earlier."""
+        with self._condition:
+            for name in names:
+                record = self._ledger.get(name)
+                if record is None:
+                    self._ledger.add(name, priority)
+                    self._done[name] = threading.Event()
+                elif record.state == "pending":
+                    record.priority = max(record.priority, priority)
+            self._condition.notify_all()
+
+    def start(self) -> None:
+        with self._condition:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="pytoy-preloader", daemon=True)
+            self._thread.start()
+
+    def notify_capacity(self) -> None:
+        """Tell that the editor is idle, so the preloading can start before the moratorium."""
+        self._capacity_event.set()
+
+    def _run(self) -> None:
+        self._capacity_event.wait(self._moratorium_time)
+        while True:
+            with self._condition:
+                while (record := self._next_pending()) is None:
+                    self._condition.wait()
+                record.state = "importing"
+                record.loaded_by = "background"
+            self._import(record)
+
+    def _next_pending(self) -> ImportRecord | None:
+        return next((record for record in self._ledger.records if record.state == "pending"), None)
+
+    def _import(self, record: ImportRecord) -> None:
+        start = time.perf_counter()
+        try:
+            self._importer(record.name)
+        except ImportError as e:
+            error: ImportError | None = e
+        except Exception as e:
+            # Broken modules should not kill the preloader thread.
+            error = ImportError(f"Failed to import `{record.name}`: {e!r}")
+        else:
+            error = None
+        with self._condition:
+            record.duration = time.perf_counter() - start
+            record.state = "failed" if error else "imported"
+            record.error = error
+            self._done[record.name].set()
+
+    def ensure(self, name: str) -> ModuleType:
+        """Return the module, waiting for or performing its import. `ImportError` is raised on failure."""
+        start = time.perf_counter()
+        with self._condition:
+            record = self._ledger.get(name)
+            if record is None:
+                record = self._ledger.add(name, priority=0)
+                self._done[name] = threading.Event()
+            if record.state == "pending":
+                record.state = "importing"
+                record.loaded_by = "foreground"
+                run_here = True
+            else:
+                run_here = False
+            done = self._done[name]
+
+        if run_here:
+            self._import(record)
         else:
-            self._naive_import()
+            done.wait()
 
-        if self._import_error:
-            raise self._import_error
+        with self._condition:
+            if record.stall is None:
+                record.stall = time.perf_counter() - start
+            if record.error is not None:
+                raise record.error
+        return self._importer(name)
 
-    def _naive_import(self) -> None:
+    def wait(self, timeout: float | None = None) -> bool:
+        """Wait until every declared module is imported (or failed)."""
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        with self._condition:
+            events = list(self._done.values())
+        for event in events:
+            remaining = None if deadline is None else max(0.0, deadline - time.perf_counter())
+            if not event.wait(remaining):
+                return False
+        return True
+
+
+def _get_preloader() -> ModulePreloader:
+    from pytoy.contexts.core import GlobalCoreContext
+
+    return GlobalCoreContext.get().module_preloader
+
+
+def declare_preload(*names: str, priority: int = 0) -> None:
+    """Declare the heavy modules the tool will need, so that they are imported while the editor is idle."""
+    _get_preloader().declare(*names, priority=priority)
+
+
+def ensure_module(name: str) -> ModuleType:
+    """Return the module at the first use, recording the stall in the ledger."""
+    return _get_preloader().ensure(name)
+
+
+class LLMImportResolver:
+    """Import llm-related libraries in the background to avoid blocking plugin startup."""
+
+    MODULES: Sequence[str] = ("litellm", "pytoy_llm")
+
+    def __init__(self, moratorium_time: float = 1.0, preloader: ModulePreloader | None = None) -> None:
+        self._preloader = preloader or ModulePreloader(moratorium_time)
+        self._imported: bool = False
+        self._import_error: ImportError | None = None
+
+    def import_background(self) -> None:
+        self._preloader.declare(*self.MODULES)
+        self._preloader.start()
+
+    def notify_capacity(self) -> None:
+        self._preloader.notify_capacity()
+
+    def ensure_import(self) -> None:
+        if self._imported:
+            return
         try:
-            import litellm
-            from pytoy_llm import completion, run
-            self._imported = True
+            for name in self.MODULES:
+                self._preloader.ensure(name)
         except ImportError as e:
-            from pathlib import Path 
+            from pathlib import Path
+
             Path("_llm_import_error.txt").write_text(str(e))
             self._import_error = e
+            raise
+        self._imported = True
 
     @property
     def import_error(self) -> ImportError | None:
-        self.ensure_import()
+        try:
+            self.ensure_import()
+        except ImportError:
+            pass
         return self._import_error
 
 
@@ -3,9 +3,11 @@ from pathlib import Path
 from pytoy.shared.command import Argument, App, Option, RangeParam, Group
 from typing import Literal, Annotated
 from pytoy import TERM_STDERR, TERM_STDOUT
+from pytoy.bootstrap.import_resolvers import declare_preload
 
 
 app = App()
+declare_preload("pyte", "psutil", priority=20)
 
 
 @app.command("Console")
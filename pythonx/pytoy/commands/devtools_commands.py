@@ -124,8 +124,57 @@ def vim_reboot():
 @app.command(name="DebugInfo")
 def debug_info():
     import pytoy
+    from pytoy.contexts.core import GlobalCoreContext
 
     print(f"pytoy_location: `{pytoy.__file__}`")
+    print("imports:")
+    for line in GlobalCoreContext.get().module_preloader.report():
+        print(f"  {line}")
+
+    if get_backend_enum() == BackendEnum.VSCODE:
+        from pytoy.contexts.vscode import GlobalVSCodeContext
+
+        ctx = GlobalVSCodeContext.get()
+    else:
+        from pytoy.contexts.vim import GlobalVimContext
+
+        ctx = GlobalVimContext.get()
+    print("entities:")
+    print(f"  buffer kernels: {ctx.buffer_kernel_registry.stats.to_line()}")
+    print(f"  window kernels: {ctx.window_kernel_registry.stats.to_line()}")
+
+
+@app.command(name="NotificationHistory")
+def notification_history():
+    from pytoy.contexts.core import GlobalCoreContext
+
+    broker = GlobalCoreContext.get().notification_broker
+    history = broker.history
+    if not history:
+        print("No notifications.")
+    for record in history:
+        print(record.to_line())
+    if n_pending := broker.n_pending:
+        print(f"({n_pending} waiting for the rate limit)")
+
+
+@app.command(name="ThreadOutputLog")
+def thread_output_log():
+    """Toggle where the `print` of the threads goes: a log buffer or messages."""
+    from pytoy.shared.lib.backend import can_use_vim
+
+    if not can_use_vim():
+        print("The output of the threads is not captured in this backend.")
+        return
+    from pytoy.shared.timertask.vim.stdout_rescuer import StdoutProxy
+    from pytoy.shared.ui.pytoy_buffer import make_buffer
+
+    if StdoutProxy.get_log_buffer() is not None:
+        StdoutProxy.set_log_buffer(None)
+        print("The output of the threads is shown as messages.")
+        return
+    buffer = make_buffer("__pytoy_thread_output__", "vertical")
+    StdoutProxy.set_log_buffer(int(buffer.buffer_id))  # type: ignore[arg-type]
 
 
 DEBUG_TIMER_TASK_NAME = "TimerTaskManagerDebug"
@@ -2,16 +2,22 @@ from typing import Sequence, cast, Annotated, Literal, assert_never, ClassVar, T
 from pytoy.shared.ui.pytoy_window import PytoyWindow, WindowCreationParam
 from pytoy.shared.ui.pytoy_buffer import PytoyBuffer
 from pytoy.shared.command import App, Argument
+from pytoy.bootstrap.import_resolvers import declare_preload
 
 if TYPE_CHECKING:
     from pytoy.tools.llm.document.voyages.presentation import DocumentVoyageUI
 
 
 app = App()
+declare_preload("pydantic", priority=5)
+declare_preload("markitdown")
 
 
 @app.command("PytoyLLM")
 def pytoy_llm(kind: Annotated[Literal["config", "create-dataset", "review", "edit"] | None, Argument()] = None):
+    from pytoy.contexts.core import GlobalCoreContext
+
+    GlobalCoreContext.get().llm_import_resolver.ensure_import()
     from pytoy.tools.llm.pytoy_fairy import PytoyFairy
     from pytoy.tools.llm import ReferenceDatasetConstructor
     from pytoy_llm import get_configuration_path
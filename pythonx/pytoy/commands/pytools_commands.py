@@ -2,23 +2,31 @@
 
 from typing import Literal, Annotated
 from pytoy.shared.command import App, Argument
+from pytoy.bootstrap.import_resolvers import declare_preload
 
 
 app = App()
+declare_preload("parso", priority=10)
 
 
 @app.command("Pytest")
-def pytest_command(scope: Annotated[Literal["func", "file", "folder", "workspace"], Argument()] = "func"):
+def pytest_command(
+    scope: Annotated[Literal["func", "file", "folder", "workspace", "affected"], Argument()] = "func",
+    structured: bool = False,
+):
     from pytoy.tools.python.pytest_runner import PytestRunner
 
-    PytestRunner().run(scope=scope, cwd=None)
+    PytestRunner(structured=structured).run(scope=scope, cwd=None)
 
 
 @app.command(name="Mypy")
-def mypy_command(target: Annotated[Literal["workspace", "current", "rerun"] | str | None, Argument()] = None):
+def mypy_command(
+    target: Annotated[Literal["workspace", "current", "rerun"] | str | None, Argument()] = None,
+    daemon: bool = False,
+):
     from pytoy.tools.python.mypy_checker import MypyChecker
 
-    checker = MypyChecker()
+    checker = MypyChecker(daemon=daemon)
     match target:
         case "rerun":
             checker.rerun()
@@ -27,10 +35,10 @@ def mypy_command(target: Annotated[Literal["workspace", "current", "rerun"] | st
 
 
 @app.command(name="CSpell")
-def cspell_command():
+def cspell_command(target: Annotated[Literal["current", "workspace"] | str | None, Argument()] = None):
     from pytoy.tools.python.cspell_runner import CSpellRunner
 
-    CSpellRunner().run()
+    CSpellRunner().run(target)
 
 
 @app.command(name="RuffCheck")
@@ -7,7 +7,8 @@ from functools import cached_property
 if TYPE_CHECKING:
     from pytoy.job_execution.environment_manager import EnvironmentManager
     from pytoy.shared.timertask.thread_executor import ThreadExecutionManager
-    from pytoy.bootstrap.import_resolvers import LLMImportResolver
+    from pytoy.bootstrap.import_resolvers import LLMImportResolver, ModulePreloader
+    from pytoy.shared.ui.notifications.broker import NotificationBroker
 
     ...
     # from pytoy.job_execution.command_executor import CommandExecutionManager
@@ -37,8 +38,21 @@ class GlobalCoreContext:
         return ThreadExecutionManager()
 
     @cached_property
-    def llm_import_resolver(sefl) -> LLMImportResolver:
-        from pytoy.bootstrap.import_resolvers import LLMImportResolver
+    def notification_broker(self) -> NotificationBroker:
+        """Shared by `EphemeralNotification`, so that the rate limits apply to all the notifications."""
+        from pytoy.shared.ui.notifications import get_backend_notification
+        from pytoy.shared.ui.notifications.broker import NotificationBroker
+
+        return NotificationBroker(get_backend_notification())
+
+    @cached_property
+    def module_preloader(self) -> ModulePreloader:
+        from pytoy.bootstrap.import_resolvers import ModulePreloader
         moratorium_time = 1.0
-        return LLMImportResolver(moratorium_time)
+        return ModulePreloader(moratorium_time)
+
+    @cached_property
+    def llm_import_resolver(self) -> LLMImportResolver:
+        from pytoy.bootstrap.import_resolvers import LLMImportResolver
+        return LLMImportResolver(preloader=self.module_preloader)
 
@@ -9,10 +9,18 @@ from pytoy.contexts.core import GlobalCoreContext
 # Only for lazy loading to speed up.
 if TYPE_CHECKING:
     ...
+    from pathlib import Path
     from pytoy.job_execution.command_executor.manager import CommandExecutionManager
     from pytoy.job_execution.terminal_executor.manager import TerminalExecutionManager
     from pytoy.job_execution.terminal_runner.drivers import TerminalDriverManager
+    from pytoy.job_execution.terminal_runner.impls.utils.input_scheduler import (
+        InputScheduler,
+        MainLoopInputScheduler,
+    )
     from pytoy.tools.llm.kernel import FairyKernelManager
+    from pytoy.tools.python.mypy_daemon import MypyDaemonManager
+    from pytoy.tools.pytest.utils.import_graph import AffectedTestSelector
+    from pytoy.tools.markdown.index import MarkdownIndexRegistry
     # from pytoy.shared.ui.pytoy_window.impls.vscode.kernel import VSCodeWindowKernel
     # from pytoy.shared.autocmd.autocmd_manager import AutoCmdManager
 
@@ -44,12 +52,43 @@ class GlobalPytoyContext:
 
         return TerminalDriverManager()
 
+    @cached_property
+    def terminal_input_scheduler(self) -> InputScheduler:
+        """The input of all the terminal jobs, serviced by one thread."""
+        from pytoy.job_execution.terminal_runner.impls.utils.input_scheduler import InputScheduler
+
+        return InputScheduler()
+
+    @cached_property
+    def terminal_main_loop_input_scheduler(self) -> MainLoopInputScheduler:
+        """The input of the terminal jobs which must be sent in the main thread (Vim)."""
+        from pytoy.job_execution.terminal_runner.impls.utils.input_scheduler import MainLoopInputScheduler
+
+        return MainLoopInputScheduler()
+
     @cached_property
     def fairy_kernel_manager(self) -> FairyKernelManager:
         from pytoy.tools.llm.kernel import FairyKernelManager
 
         return FairyKernelManager()
 
+    @cached_property
+    def mypy_daemon_manager(self) -> MypyDaemonManager:
+        from pytoy.tools.python.mypy_daemon import MypyDaemonManager
+
+        return MypyDaemonManager(self.core_context.environment_manager)
+
+    @cached_property
+    def affected_test_selectors(self) -> dict[Path, AffectedTestSelector]:
+        """`AffectedTestSelector` per workspace, kept to reuse the import graph."""
+        return {}
+
+    @cached_property
+    def markdown_index_registry(self) -> MarkdownIndexRegistry:
+        from pytoy.tools.markdown.index import MarkdownIndexRegistry
+
+        return MarkdownIndexRegistry()
+
     @property
     def vim_context(self) -> GlobalVimContext:
         return GlobalVimContext.get()
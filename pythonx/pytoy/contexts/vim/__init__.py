@@ -7,7 +7,9 @@ from pytoy.shared.lib.entity import EntityRegistry
 # Only for lazy loading to speed up.
 if TYPE_CHECKING:
     from pytoy.shared.ui.pytoy_buffer.impls.vim.kernel import VimBufferKernel
+    from pytoy.shared.ui.pytoy_buffer.impls.vim.buffer_index import VimBufferIndex
     from pytoy.shared.ui.pytoy_window.impls.vim.kernel import VimWindowKernel
+    from pytoy.shared.ui.pytoy_window.impls.vim.topology import VimWindowTopology
     from pytoy.shared.lib.autocmd.autocmd_manager import AutoCmdManager
     from pytoy.shared.lib.keymap.keymap_manager import KeymapManager
 
@@ -30,6 +32,12 @@ class GlobalVimContext:
 
         return EntityRegistry(VimBufferKernel, factory=factory)
 
+    @cached_property
+    def buffer_index(self) -> VimBufferIndex:
+        from pytoy.shared.ui.pytoy_buffer.impls.vim.buffer_index import VimBufferIndex
+
+        return VimBufferIndex(ctx=self)
+
     @cached_property
     def window_kernel_registry(self) -> EntityRegistry[int, VimWindowKernel]:
         from pytoy.shared.ui.pytoy_window.impls.vim.kernel import VimWindowKernel
@@ -39,6 +47,12 @@ class GlobalVimContext:
 
         return EntityRegistry(VimWindowKernel, factory=factory)
 
+    @cached_property
+    def window_topology(self) -> VimWindowTopology:
+        from pytoy.shared.ui.pytoy_window.impls.vim.topology import VimWindowTopology
+
+        return VimWindowTopology(ctx=self)
+
     @cached_property
     def autocmd_manager(self) -> AutoCmdManager:
         from pytoy.shared.lib.autocmd.autocmd_manager import AutoCmdManager
@@ -49,4 +63,4 @@ class GlobalVimContext:
     def keymap_manager(self) -> KeymapManager:
         from pytoy.shared.lib.keymap.keymap_manager import KeymapManager
 
-        return KeymapManager()
+        return KeymapManager(autocmd_manager=self.autocmd_manager)
@@ -11,6 +11,8 @@ if TYPE_CHECKING:
     from pytoy.shared.ui.pytoy_window.impls.vscode.kernel import VSCodeWindowKernel
     from pytoy.shared.lib.autocmd.autocmd_manager import AutoCmdManager
     from pytoy.shared.lib.keymap.keymap_manager import KeymapManager
+    from pytoy.shared.ui.vscode.document_sync import DocumentSynchronizer
+    from pytoy.shared.ui.vscode.buffer_uri_index import BufferURIIndex
 
 
 class GlobalVSCodeContext:
@@ -50,7 +52,19 @@ class GlobalVSCodeContext:
     def keymap_manager(self) -> KeymapManager:
         from pytoy.shared.lib.keymap.keymap_manager import KeymapManager
 
-        return KeymapManager()
+        return KeymapManager(autocmd_manager=self.autocmd_manager)
+
+    @cached_property
+    def document_synchronizer(self) -> DocumentSynchronizer:
+        from pytoy.shared.ui.vscode.document_sync import DocumentSynchronizer
+
+        return DocumentSynchronizer()
+
+    @cached_property
+    def buffer_uri_index(self) -> BufferURIIndex:
+        from pytoy.shared.ui.vscode.buffer_uri_index import BufferURIIndex
+
+        return BufferURIIndex(ctx=self.vim_context)
 
     @property
     def vim_context(self) -> GlobalVimContext:
@@ -6,6 +6,7 @@ from pytoy.job_execution.command_executor.models import ExecutionEvents
 from pytoy.job_execution.command_executor.models import ExecutionRequest
 from pytoy.job_execution.command_executor.models import ExecutionHooks
 from pytoy.job_execution.command_executor.models import BufferRequest
+from pytoy.job_execution.command_executor.pipeline import CommandPipeline, PipelineStep, PipelineResult, StepReport
 
 
 __all__ = [
@@ -15,6 +16,10 @@ __all__ = [
     "ExecutionRequest",
     "BufferRequest",
     "CommandExecutor",
+    "CommandPipeline",
+    "PipelineStep",
+    "PipelineResult",
+    "StepReport",
 ]
 
 __all__ += []
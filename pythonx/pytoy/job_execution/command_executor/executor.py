@@ -13,6 +13,7 @@ from pytoy.job_execution.command_executor.models import (
     ExecutionWrapperType,
 )
 from pytoy.job_execution.command_runner import CommandRunner
+from pytoy.job_execution.environment_manager import EnvironmentManager
 from pytoy.job_execution.command_runner.models import OutputJobRequest, SpawnOption
 from pytoy.shared.ui.pytoy_buffer import PytoyBuffer
 
@@ -40,6 +41,10 @@ class CommandExecutor:
     def execution_manager(self) -> CommandExecutionManager:
         return self._execution_manager
 
+    @property
+    def environment_manager(self) -> EnvironmentManager:
+        return self._environment_manager
+
     @property
     def stdout(self) -> PytoyBuffer:
         return self._stdout
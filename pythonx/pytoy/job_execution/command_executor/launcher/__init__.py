@@ -1,12 +1,13 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from pathlib import Path
-from typing import Mapping, Any, Self
+from typing import Mapping, Any, Self, Sequence
 
 from pytoy.contexts.pytoy import GlobalPytoyContext
 from pytoy.job_execution.command_executor.executor import CommandExecutor, CommandExecution
 from pytoy.job_execution.command_executor.launcher.quickfix import QuickfixProfile  # NOQA
 from pytoy.job_execution.command_executor.launcher.quickfix import make_quickfix_hooks  # noqa
 from pytoy.job_execution.command_executor.manager import CommandExecutionManager
+from pytoy.job_execution.command_executor.pipeline import PIPELINE_META_KEY, CommandPipeline, PipelineStep
 from pytoy.job_execution.command_executor.models import (
     BufferRequest,
     ExecutionHooks,
@@ -83,6 +84,7 @@ class CommandLauncher:
         cwd: str | Path | None = None,
         meta: Mapping[str, Any] | None = None,
         init_buffer: bool = True,
+        env: Mapping[str, str] | None = None,
     ):
         meta = meta or {}
         kind = self.launch_profile.kind
@@ -97,11 +99,52 @@ class CommandLauncher:
 
         buffer_request = BufferRequest(stdout=stdout, stderr=stderr)
         execution_request = ExecutionRequest(
-            command=command, cwd=cwd, command_wrapper=self.launch_profile.command_wrapper, kind=kind, meta=meta
+            command=command,
+            cwd=cwd,
+            command_wrapper=self.launch_profile.command_wrapper,
+            env=env,
+            kind=kind,
+            meta=meta,
         )
         execution_hooks = profile.execution_hooks or self.default_execution_hooks
         self._send_request(buffer_request, execution_request, execution_hooks, init_buffer=init_buffer)
 
+    def run_pipeline(
+        self,
+        steps: Sequence[PipelineStep],
+        stdout: PytoyBuffer | BufferSource | str | Path,
+        stderr: PytoyBuffer | BufferSource | str | Path | None = None,
+        *,
+        cwd: str | Path | None = None,
+        meta: Mapping[str, Any] | None = None,
+        init_buffer: bool = True,
+    ) -> CommandPipeline:
+        """Run `steps` in order with the same environment and buffers.
+
+        Steps without `hooks` use the hooks of the profile.
+        """
+        kind = self.launch_profile.kind
+        if self.is_running:
+            raise ValueError(f"Already `{kind=}` is running.")
+
+        cwd = Path(cwd) if cwd else get_current_directory()
+        stdout = stdout.source if isinstance(stdout, PytoyBuffer) else BufferSource.from_any(stdout)
+        if stderr is not None:
+            stderr = stderr.source if isinstance(stderr, PytoyBuffer) else BufferSource.from_any(stderr)
+
+        execution_hooks = self.launch_profile.execution_hooks or self.default_execution_hooks
+        steps = [step if step.hooks else replace(step, hooks=execution_hooks) for step in steps]
+        pipeline = CommandPipeline(CommandExecutor(BufferRequest(stdout=stdout, stderr=stderr)))
+        pipeline.run(
+            steps,
+            cwd=cwd,
+            command_wrapper=self.launch_profile.command_wrapper,
+            kind=kind,
+            meta=meta,
+            init_buffer=init_buffer,
+        )
+        return pipeline
+
     @property
     def default_execution_hooks(self) -> ExecutionHooks:
         return get_default_hooks()
@@ -128,9 +171,17 @@ class CommandLauncher:
         if cwd is None:
             raise RuntimeError("Violation of `last_context`, `cwd` is None.")
 
+        # The last request of a pipeline is only one of the steps, which may be interrupted.
+        if (pipeline := last_context.meta.get(PIPELINE_META_KEY)) is not None:
+            meta = {key: value for key, value in last_context.meta.items() if key != PIPELINE_META_KEY}
+            self.run_pipeline(pipeline.steps, stdout, stderr, cwd=cwd, meta=meta, init_buffer=init_buffer)
+            return
+
         self._send_request(buffer_request, execution_request, execution_hooks, init_buffer=init_buffer)
 
     def stop(self):
+        if (context := self.last_context) and (pipeline := context.meta.get(PIPELINE_META_KEY)) is not None:
+            pipeline.terminate()
         query = ExecutionQuery(kind=self.launch_profile.kind)
         for execution in self.execution_manager.select(query):
             execution.runner.terminate()
@@ -0,0 +1,162 @@
+"""Run several commands one after another as asynchronous jobs.
+
+All the steps share one resolved execution environment and the output buffers.
+The next step starts from `on_finish` of the previous one, so the UI is never blocked.
+
+Example:
+    steps = [
+        PipelineStep("format", 'ruff format "src"'),
+        PipelineStep("check", 'ruff check "src"', hooks=quickfix_hooks),
+    ]
+    CommandPipeline(executor).run(steps, cwd=cwd)
+
+Each request carries the pipeline in its `meta` under `PIPELINE_META_KEY`,
+so that `stop` and `rerun` of `CommandLauncher` handle the whole pipeline, not only the running step.
+"""
+
+import time
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Any, Callable, Mapping, Sequence
+
+from pytoy.job_execution.command_executor.executor import CommandExecutor
+from pytoy.job_execution.command_executor.models import (
+    CommandExecution,
+    ExecutionHooks,
+    ExecutionKind,
+    ExecutionRequest,
+    ExecutionResult,
+    ExecutionWrapperType,
+)
+
+PIPELINE_META_KEY = "pipeline"
+
+
+@dataclass(frozen=True)
+class PipelineStep:
+    """`continue_on_failure`: if False, the rest of steps are skipped when this step fails."""
+
+    name: str
+    command: str | list[str]
+    hooks: ExecutionHooks | None = None
+    continue_on_failure: bool = False
+
+
+@dataclass(frozen=True)
+class StepReport:
+    """`status` is None if the step is skipped."""
+
+    name: str
+    status: int | None
+    elapsed: float
+
+    @property
+    def success(self) -> bool:
+        return self.status == 0
+
+    @property
+    def skipped(self) -> bool:
+        return self.status is None
+
+    def to_line(self) -> str:
+        if self.skipped:
+            return f"[{self.name}] skipped"
+        return f"[{self.name}] exit={self.status} ({self.elapsed:.2f}s)"
+
+
+@dataclass(frozen=True)
+class PipelineResult:
+    reports: Sequence[StepReport] = field(default_factory=tuple)
+
+    @property
+    def success(self) -> bool:
+        return all(report.success for report in self.reports)
+
+
+class CommandPipeline:
+    def __init__(
+        self,
+        executor: CommandExecutor,
+        *,
+        on_finish: Callable[[PipelineResult], None] | None = None,
+        report_steps: bool = True,
+    ):
+        self._executor = executor
+        self._on_finish = on_finish
+        self._report_steps = report_steps
+        self._reports: list[StepReport] = []
+        self._current: CommandExecution | None = None
+        self._steps: tuple[PipelineStep, ...] = ()
+        self._terminated = False
+
+    @property
+    def executor(self) -> CommandExecutor:
+        return self._executor
+
+    @property
+    def reports(self) -> Sequence[StepReport]:
+        return tuple(self._reports)
+
+    @property
+    def steps(self) -> Sequence[PipelineStep]:
+        """The steps of the latest `run`."""
+        return self._steps
+
+    @property
+    def current(self) -> CommandExecution | None:
+        """The execution of the running step."""
+        return self._current
+
+    def run(
+        self,
+        steps: Sequence[PipelineStep],
+        *,
+        cwd: str | Path,
+        command_wrapper: ExecutionWrapperType | None = "auto",
+        kind: ExecutionKind = "$default",
+        meta: Mapping[str, Any] | None = None,
+        init_buffer: bool = True,
+    ) -> None:
+        if not steps:
+            raise ValueError("`steps` must not be empty.")
+        self._reports = []
+        self._steps = tuple(steps)
+        self._terminated = False
+        # The environment is solved only once for all the steps.
+        if not callable(command_wrapper):
+            environment_manager = self._executor.environment_manager
+            command_wrapper = environment_manager.solve_preference(cwd, preference=command_wrapper).command_wrapper
+        meta = {**(meta or {}), PIPELINE_META_KEY: self}
+        base = ExecutionRequest(command="", cwd=cwd, command_wrapper=command_wrapper, kind=kind, meta=meta)
+        self._run_step(list(steps), 0, base, init_buffer=init_buffer)
+
+    def _run_step(self, steps: list[PipelineStep], index: int, base: ExecutionRequest, *, init_buffer: bool) -> None:
+        step = steps[index]
+        started = time.perf_counter()
+
+        def _on_finish(result: ExecutionResult) -> None:
+            self._current = None
+            report = StepReport(step.name, result.status, time.perf_counter() - started)
+            self._add_report(report)
+            if index + 1 < len(steps) and not self._terminated and (report.success or step.continue_on_failure):
+                self._run_step(steps, index + 1, base, init_buffer=False)
+                return
+            for skipped in steps[index + 1 :]:
+                self._add_report(StepReport(skipped.name, None, 0.0))
+            if self._on_finish:
+                self._on_finish(PipelineResult(tuple(self._reports)))
+
+        hooks = ExecutionHooks.merge(step.hooks or ExecutionHooks(), ExecutionHooks(on_finish=_on_finish))
+        request = replace(base, command=step.command)
+        self._current = self._executor.execute(request, hooks, init_buffer=init_buffer)
+
+    def _add_report(self, report: StepReport) -> None:
+        self._reports.append(report)
+        if self._report_steps:
+            self._executor.stdout.append(report.to_line())
+
+    def terminate(self) -> None:
+        """Terminate the running step, and the rest of steps are skipped even with `continue_on_failure`."""
+        self._terminated = True
+        if self._current:
+            self._current.runner.terminate()
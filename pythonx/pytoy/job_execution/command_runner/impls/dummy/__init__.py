@@ -9,6 +9,7 @@ from pytoy.job_execution.command_runner.models import (
 )
 from pytoy.job_execution.command_runner.impls.core import OutputJobCore
 from pathlib import Path
+import os
 import threading
 import subprocess
 from pytoy.job_execution.process_utils import find_children_pids
@@ -27,6 +28,7 @@ class OutputJobDummy(OutputJobProtocol):
             stderr=subprocess.PIPE,
             text=True,
             cwd=self._cwd,
+            env={**os.environ, **spawn_option.env} if spawn_option.env else None,
         )
         self._lock = threading.Lock()
 
@@ -1,5 +1,7 @@
 def force_kill(pid: int, timeout: float = 1.0):
-    import psutil
+    from pytoy.bootstrap.import_resolvers import ensure_module
+
+    psutil = ensure_module("psutil")
 
     try:
         proc = psutil.Process(pid)
@@ -38,7 +40,9 @@ def force_kill(pid: int, timeout: float = 1.0):
 # `import psutil` may take time.
 def find_children_pids(parent_pid: int) -> list[int]:
     """Return the list of children process."""
-    import psutil
+    from pytoy.bootstrap.import_resolvers import ensure_module
+
+    psutil = ensure_module("psutil")
 
     try:
         parent = psutil.Process(parent_pid)
@@ -9,9 +9,12 @@ from pytoy.job_execution.terminal_runner.models import (
     SpawnOption,
     JobEvents,
     Snapshot,
+    ScreenDelta,
+    ScreenDeltaSourceProtocol,
     JobID,
 )
 from pytoy.shared.lib.backend import get_backend_enum, BackendEnum
+from pytoy.shared.lib.text import CursorPosition, LineRange
 from pytoy.shared.ui import PytoyBuffer
 from pytoy.shared.ui.pytoy_buffer import make_buffer, make_duo_buffers, BufferSource
 
@@ -39,6 +42,68 @@ def make_terminal_job(job_request: TerminalJobRequest, spawn_option: SpawnOption
         return TerminalJobDummy(job_request, spawn_option)
 
 
+class _ScreenMirror:
+    """The rows of the screen shown in the buffer, updated by `ScreenDelta`.
+
+    * The rows are right-stripped, and the trailing empty rows are not shown, as `VirtualTTY.snapshot`.
+    * Only the changed rows are replaced. The whole buffer is replaced when the screen is resized
+      or scrolled (pyte marks all the rows), or when the buffer is empty.
+    """
+
+    def __init__(self) -> None:
+        self._rows: list[str] | None = None
+
+    @property
+    def n_visible(self) -> int:
+        rows = self._rows or []
+        n = len(rows)
+        while n and not rows[n - 1]:
+            n -= 1
+        return n
+
+    def apply(self, buffer: PytoyBuffer, delta: ScreenDelta, snapshot_getter: Callable[[], Snapshot]) -> None:
+        old_rows, old_n = self._rows, self.n_visible
+        full = old_rows is None or len(old_rows) != delta.lines or len(delta.rows) == delta.lines
+        if old_rows is None or len(old_rows) != delta.lines:
+            # Resized: the rows not in `delta` are taken from the snapshot.
+            lines = [] if len(delta.rows) == delta.lines else snapshot_getter().content.split("\n")[: delta.lines]
+            rows = [line.rstrip() for line in lines] + [""] * (delta.lines - len(lines))
+        else:
+            rows = list(old_rows)
+        changed = []
+        for y, row in delta.rows.items():
+            if y < len(rows) and rows[y] != (row := row.rstrip()):
+                rows[y] = row
+                changed.append(y)
+        self._rows = rows
+        new_n = self.n_visible
+
+        operator = buffer.range_operator
+        if full or old_n == 0 or new_n == 0:
+            operator.replace_text(operator.entire_character_range, "\n".join(rows[:new_n]))
+            return
+        common = min(old_n, new_n)
+        with operator.transaction() as transaction:
+            for start, end in _runs(sorted(y for y in changed if y < common)):
+                transaction.replace_lines(LineRange(start, end), rows[start:end])
+            if old_n != new_n:
+                transaction.replace_lines(LineRange(common, old_n), rows[common:new_n])
+
+    def clamp(self, cursor: CursorPosition) -> CursorPosition:
+        return CursorPosition(max(0, min(cursor.line, self.n_visible - 1)), max(0, cursor.col))
+
+
+def _runs(indices: list[int]) -> list[tuple[int, int]]:
+    """Consecutive runs of sorted `indices`, as (start, end)."""
+    runs: list[tuple[int, int]] = []
+    for index in indices:
+        if runs and runs[-1][1] == index:
+            runs[-1] = (runs[-1][0], index + 1)
+        else:
+            runs.append((index, index + 1))
+    return runs
+
+
 class TerminalJobRunner:
     @classmethod
     def solve_buffer(cls, arg: str | Path | BufferSource | PytoyBuffer) -> PytoyBuffer:
@@ -65,6 +130,7 @@ class TerminalJobRunner:
         self._terminal_job_factory = terminal_job_factory
         self._terminal_job: TerminalJobProtocol | None = None
         self._job_disposables: list[Any] = []
+        self._mirror = _ScreenMirror()
 
     @property
     def buffer(self) -> PytoyBuffer:
@@ -105,6 +171,7 @@ class TerminalJobRunner:
         spawn_option = spawn_option or SpawnOption()
 
         self._terminal_job = self._terminal_job_factory(request, spawn_option)
+        self._mirror = _ScreenMirror()
 
         self._job_disposables = []
         self._job_disposables += self._wire_events(request, self._terminal_job.events)
@@ -119,13 +186,22 @@ class TerminalJobRunner:
             self._terminal_job.interrupt()
 
     def _on_terminal_update(self, bufnr: int):
-        if not self._terminal_job:
+        job = self._terminal_job
+        if not job:
             return
-        snapshot = self._terminal_job.snapshot
-        cr = self.buffer.range_operator.entire_character_range
-        self.buffer.replace_text(cr, snapshot.content)
+        if isinstance(job, ScreenDeltaSourceProtocol):
+            delta = job.take_delta()
+            if delta.is_empty:
+                return
+            self._mirror.apply(self.buffer, delta, lambda: job.snapshot)
+            cursor = self._mirror.clamp(delta.cursor)
+        else:
+            snapshot = job.snapshot
+            cr = self.buffer.range_operator.entire_character_range
+            self.buffer.replace_text(cr, snapshot.content)
+            cursor = snapshot.cursor
         if window := self.buffer.window:
-            window.move_cursor(snapshot.cursor)
+            window.move_cursor(cursor)
 
         # Here we could perform logic like auto-scrolling
         # or notifying the GlobalContext about state changes.
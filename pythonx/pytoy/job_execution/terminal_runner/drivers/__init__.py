@@ -2,8 +2,8 @@ from pytoy.job_execution.terminal_runner.models import (
     TerminalDriverProtocol,
     Snapshot,
     InputOperation,
-    WaitOperation,
     WaitUntilOperation,
+    WaitOutputOperation,
 )
 from pytoy.job_execution.terminal_runner.models import LineStr, RawStr, InterruptionCode
 
@@ -11,6 +11,7 @@ from pytoy.job_execution.process_utils import force_kill
 from pytoy.contexts.pytoy import GlobalPytoyContext
 
 
+import re
 from typing import Sequence
 
 DEFAULT_SHELL_DRIVER_NAME = "shell"
@@ -162,12 +163,29 @@ class ShellDriver(TerminalDriverProtocol):
         return self._impl.interrupt(pid, children_pids)
 
 
+def _last_line(content: str) -> str:
+    """Return the last non-empty line, without splitting the entire `content`."""
+    content = content.rstrip("\r\n ")
+    return content[content.rfind("\n") + 1 :].strip("\r ")
+
+
 @driver_manager.register("ipython")
 class IPythonDriver(TerminalDriverProtocol):
+    # OSC 133;D (`command finished` of the shell integrations), printed after every cell by `post_run_cell`.
+    # It is not displayed by the terminals, but it is found in the raw output.
+    READY_MARKER = "\x1b]133;D\x07"
+    # Installed by `-c` of the command line, so that it is not echoed as an input cell.
+    # `chr` avoids the backslashes, which the quoting of the command line may consume.
+    READY_HOOK = (
+        "get_ipython().events.register('post_run_cell', "
+        "lambda *_: print(chr(27) + ']133;D' + chr(7), end='', flush=True))"
+    )
+    # Printed by `%cpaste` (without `-q`), just before it starts reading the lines.
+    PASTE_BANNER = "Pasting code; enter"
+
     def __init__(self, command: str = "ipython --colors=NoColor", kind: str = "ipython"):
         self._command = command
         self._kind = kind
-        import re
 
         self._in_pattern = re.compile(r"In \[(\d+)\]:")
 
@@ -179,48 +197,40 @@ class IPythonDriver(TerminalDriverProtocol):
 
     @property
     def command(self) -> str:
-        return self._command
+        # `-i` keeps IPython interactive after `-c`.
+        return f'{self._command} -i -c "{self.READY_HOOK}"'
 
     @property
     def eol(self) -> str | None:
         return None
 
     def is_busy(self, children_pids: list[int], snapshot: Snapshot) -> bool:
-        # 最終行付近にプロンプト In [x]: がなければ busy とみなす
-        lines = [line.strip() for line in snapshot.content.split("\n") if line.strip()]
-        if not lines:
-            return True
-        last_line = lines[-1]
-        is_ready = bool(self._in_pattern.match(last_line))
-        return not is_ready
+        # 最終行にプロンプト In [x]: がなければ busy とみなす
+        return not self._in_pattern.match(_last_line(snapshot.content))
 
     def make_operations(self, input_str: str) -> Sequence[InputOperation]:
         result: list[InputOperation] = []
+        ready = WaitOutputOperation(re.escape(self.READY_MARKER), timeout=3.0)
 
         def _is_prepared(snapshot: Snapshot) -> bool:
-            content = snapshot.content
-            lines = [line.strip("\r ") for line in content.split("\n") if line]
-            lines = [line for line in lines if line]
-            if not lines:
-                return False
-            last_line = lines[-1]
-            return bool(self._in_pattern.match(last_line))
+            return bool(self._in_pattern.match(_last_line(snapshot.content)))
 
         if self._is_first:
-            # [Weak guess]: It seems a little bit wait is required after the dislay.
-            result += [WaitUntilOperation(_is_prepared, timeout=3.0), WaitOperation(0.5)]
+            result.append(WaitUntilOperation(_is_prepared, timeout=3.0))
             self._is_first = False
+        else:
+            # The marker of `READY_HOOK` tells that the previous cell has finished, instead of a fixed wait.
+            result.append(ready)
 
         # Empty CRLF is uncecessary....
         body = input_str.replace("\r\n", "\n").replace("\n", "\r").strip("\r")
 
         result += [
             RawStr(
-                "%cpaste -q\n"
-            ),  # LineStr("%cpaste -q") # This is not good, since `\r` seems to be recognized as the other meaning.
-            WaitOperation(0.5),
+                "%cpaste\n"
+            ),  # LineStr("%cpaste") # This is not good, since `\r` seems to be recognized as the other meaning.
+            WaitOutputOperation(re.escape(self.PASTE_BANNER), timeout=3.0),
             RawStr(body),
-            WaitOperation(0.5),
             RawStr("\r--\r"),
         ]
         return result
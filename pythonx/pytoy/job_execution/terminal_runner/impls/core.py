@@ -21,6 +21,7 @@ from pytoy.job_execution.terminal_runner.models import (
 from typing import Any, Callable
 from pytoy.shared.lib.events import EventEmitter
 from pytoy.job_execution.process_utils import find_children_pids
+from pytoy.job_execution.terminal_runner.impls.utils.output_signals import OutputSignals
 
 
 class TerminalJobCore:
@@ -34,6 +35,8 @@ class TerminalJobCore:
         self.spawn_option = spawn_option
         self.update_emitter = EventEmitter[int]()
         self.exit_emitter = EventEmitter[Any]()
+        # 実装クラスは出力 (生のバイト列をデコードしたもの) を `feed` する
+        self.output_signals = OutputSignals()
 
         # 外部に公開するイベントインターフェース
         self._events = JobEvents(on_update=self.update_emitter.event, on_job_exit=self.exit_emitter.event)
@@ -61,29 +64,16 @@ class TerminalJobCore:
         return self._events
 
     @staticmethod
-    def deal_operation(op: InputOperation, enter_eol: str, snapshot_getter: Callable[[], Snapshot]) -> str | None:
-        """This function is allowed if non-main method called this.
-        Return str is expected to send to the backend.
-        """
-        import time
-
+    def to_payload(op: InputOperation, enter_eol: str) -> str | None:
+        """Return the str to send for `op`, or `None` if `op` is a wait."""
         if isinstance(op, RawStr):
             # Protocol: Send the str as is.
-            payload = op
+            return op
         elif isinstance(op, LineStr) or isinstance(op, str):
             # Protocol: Append the appropriate `CR`.
             # Fallback of `LineStr`, however, `LineStr` is more preferrable.
-            # Protocol: Append the appropriate `CR`.
-            payload = op.rstrip("\r\n") + enter_eol
-        elif isinstance(op, WaitOperation):
-            payload = None
-            time.sleep(op.time)
-        elif isinstance(op, WaitUntilOperation):
-            payload = None
-            op.wait_until(snapshot_getter)
-        else:
-            raise RuntimeError("Implementation Error of driver.")
-        return payload
+            return op.rstrip("\r\n") + enter_eol
+        return None
 
     @staticmethod
     def kill_processes(pids: list[int]) -> None:
@@ -3,15 +3,13 @@ from __future__ import annotations
 from pathlib import Path
 from pytoy.job_execution.terminal_runner.impls.utils.pty_console import PtyConsole
 
-
-from threading import Thread
-
 from pyte import Screen, Stream
 from pytoy.job_execution.terminal_runner.models import (
     TerminalJobProtocol,
     TerminalJobRequest,
     SpawnOption,
     Snapshot,
+    ScreenDelta,
     JobEvents,
     JobID,
 )
@@ -45,7 +43,8 @@ class TerminalJobDummy(TerminalJobProtocol):
             self._update_scheduled = False
             self._core.update_emitter.fire(self.pid)
 
-        TimerTask.execute_oneshot(lambda: _fire())
+        # The output is already coalesced by `VirtualTTY` (`PtyPump`).
+        TimerTask.execute_oneshot(lambda: _fire(), interval=0)
 
     def __init__(self, request: TerminalJobRequest, spawn_option: SpawnOption | None = None):
         self._request = request
@@ -68,28 +67,32 @@ class TerminalJobDummy(TerminalJobProtocol):
         # Note: Curretly, `self._on_exit` is not used.
         self._on_exit = FunctionRegistry.register(self._on_tty_exit, prefix="CommonTTYExit")
 
-        self._tty = VirtualTTY(cmd, cwd=cwd, env=env, lines=lines, cols=cols, on_output=self._schedule_update)
+        self._tty = VirtualTTY(
+            cmd,
+            cwd=cwd,
+            env=env,
+            lines=lines,
+            cols=cols,
+            on_output=self._schedule_update,
+            on_data=self._core.output_signals.feed,
+        )
+
+        from pytoy.contexts.pytoy import GlobalPytoyContext
+
+        # snapshot_getter は pyte (メモリ) を見るだけなのでスレッドから呼んでも安全
+        self._input = GlobalPytoyContext.get().terminal_input_scheduler.open(
+            self._tty.send,
+            enter_eol=self._driver.eol or TerminalJobCore.get_default_eol(),
+            snapshot_getter=lambda: self.snapshot,
+            signals=self._core.output_signals,
+        )
 
     def _inner(self):
         self._on_out()
 
     def send(self, input: str) -> None:
-        def _send_thread():
-            try:
-                ops = self._driver.make_operations(input)
-                enter_eol = self._driver.eol or TerminalJobCore.get_default_eol()
-
-                # snapshot_getter は pyte (メモリ) を見るだけなのでスレッドから呼んでも安全
-                snapshot_getter = lambda: self.snapshot
-                for op in ops:
-                    payload = TerminalJobCore.deal_operation(op, enter_eol, snapshot_getter)
-                    if payload:
-                        self._tty.send(payload)
-            except Exception:
-                pass
-
-        # send 専用のスレッドを開始
-        Thread(target=_send_thread, daemon=True).start()
+        # 入力は共有の `InputScheduler` のスレッドが順に処理する
+        self._input.submit(self._driver.make_operations(input))
 
     def interrupt(self) -> None:
         self._tty.interrupt()
@@ -99,13 +102,17 @@ class TerminalJobDummy(TerminalJobProtocol):
 
     def dispose(self) -> None:
         self.terminate()
-        # Cleanup input thread
+        self._input.close()
         self._core.dispose()
 
     @property
     def snapshot(self) -> Snapshot:
         return self._tty.snapshot
 
+    def take_delta(self) -> ScreenDelta:
+        """Return the rows changed since the previous call."""
+        return self._tty.take_delta()
+
     @property
     def job_id(self) -> JobID:
         return self.pid
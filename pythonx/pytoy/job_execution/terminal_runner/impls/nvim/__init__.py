@@ -2,70 +2,22 @@ from __future__ import annotations
 import vim
 import time
 from pathlib import Path
-from queue import Queue, Empty
-from threading import Thread
-from typing import Any, Sequence, Callable
 
-from pyte import Screen, Stream
 from pytoy.job_execution.terminal_runner.models import (
     TerminalJobProtocol,
     TerminalJobRequest,
-    TerminalDriverProtocol,
     SpawnOption,
     ConsoleSnapshot,
     Snapshot,
-    WaitOperation,
-    RawStr,
-    LineStr,
-    InputOperation,
+    ScreenDelta,
     JobEvents,
     JobID,
 )
 from pytoy.job_execution.terminal_runner.impls.core import TerminalJobCore
-from pytoy.shared.lib.text import CursorPosition
 from pytoy.shared.lib.function import FunctionRegistry
 from pytoy.job_execution.process_utils import find_children_pids
 from pytoy.job_execution.terminal_runner.impls.utils import send_ctrl_c
-
-
-class _InputSolverTask:
-    def __init__(self, job_id: int, driver: TerminalDriverProtocol, snapshot_getter: Callable):
-        self.job_id = job_id
-        self.driver = driver
-        self.snapshot_getter = snapshot_getter
-        self.enter_eol = self.driver.eol or TerminalJobCore.get_default_eol()
-        self.queue: Queue[InputOperation | None] = Queue()
-        self.alive = True
-
-    def send(self, input: str) -> None:
-        ops = self.driver.make_operations(input)
-        self._send_operations(ops)
-
-    def _send_operations(self, ops: Sequence[InputOperation]):
-        for op in ops:
-            self.queue.put(op)
-
-    def loop(self) -> None:
-        """Background thread loop for input processing"""
-        while self.alive:
-            try:
-                op = self.queue.get(timeout=1.0)
-            except Empty:
-                continue
-
-            if op is None:  # Exit signal
-                break
-
-            try:
-                payload = TerminalJobCore.deal_operation(op, self.enter_eol, self.snapshot_getter)
-                if payload is not None:
-                    vim.session.threadsafe_call(  # type: ignore
-                        lambda: vim.call("chansend", self.job_id, str(payload))
-                    )
-            except Exception:
-                pass
-            finally:
-                self.queue.task_done()
+from pytoy.job_execution.terminal_runner.impls.utils.screen_tracker import ScreenTracker
 
 
 class TerminalJobNvim(TerminalJobProtocol):
@@ -77,8 +29,7 @@ class TerminalJobNvim(TerminalJobProtocol):
 
         cols = self._request.console.cols or 80
         rows = self._request.console.lines or 96
-        self._screen = Screen(cols, rows)
-        self._stream = Stream(self._screen)
+        self._tracker = ScreenTracker(rows, cols)
 
         # Emitters
 
@@ -94,8 +45,8 @@ class TerminalJobNvim(TerminalJobProtocol):
         # 2. Options for jobstart
         options = {
             "pty": True,
-            "width": self._screen.columns,
-            "height": self._screen.lines,
+            "width": self._tracker.cols,
+            "height": self._tracker.lines,
             "on_stdout": self._on_out.impl_name,
             "on_stderr": self._on_out.impl_name,
             "on_exit": self._on_exit.impl_name,
@@ -112,23 +63,29 @@ class TerminalJobNvim(TerminalJobProtocol):
         if self._job_id <= 0:
             raise RuntimeError(f"Neovim jobstart failed: {self._job_id}")
 
-        # 4. Input Thread
-        snapshot_getter = lambda _: self.snapshot  # noqa
-        self._input_task = _InputSolverTask(self._job_id, self._driver, snapshot_getter)
-        self._input_thread = Thread(target=self._input_task.loop, daemon=True)
-        self._input_thread.start()
+        # 4. Input, serviced by the shared scheduler
+        from pytoy.contexts.pytoy import GlobalPytoyContext
+
+        job_id = self._job_id
+
+        def _write(payload: str) -> None:
+            vim.session.threadsafe_call(lambda: vim.call("chansend", job_id, payload))  # type: ignore
+
+        self._input = GlobalPytoyContext.get().terminal_input_scheduler.open(
+            _write,
+            enter_eol=self._driver.eol or TerminalJobCore.get_default_eol(),
+            snapshot_getter=lambda: self.snapshot,
+            signals=self._core.output_signals,
+        )
 
     def _on_vim_output(self, job_id: int, data: list[str], event: str) -> None:
         # Neovim provides data as a list of lines. Join them with LF for the emulator.
         # Pyte accepts only the stream.
         # print("data", data)
-        n_lines = len(data)
-        for i, line in enumerate(data):
-            if i + 1 == n_lines:
-                if line:
-                    self._stream.feed(line)
-            else:
-                self._stream.feed(line + "\n")
+        # The dirty rows are rendered lazily, at `snapshot` / `take_delta`.
+        text = "\n".join(data)
+        self._tracker.feed(text)
+        self._core.output_signals.feed(text)
         self._core.update_emitter.fire(job_id)
 
     def _on_vim_exit(self, job_id: int, exit_code: int, event: str) -> None:
@@ -137,7 +94,7 @@ class TerminalJobNvim(TerminalJobProtocol):
 
     def send(self, input: str) -> None:
         if self.alive:
-            self._input_task.send(input)
+            self._input.submit(self._driver.make_operations(input))
 
     def interrupt(self) -> None:
         if not self.alive:
@@ -160,9 +117,7 @@ class TerminalJobNvim(TerminalJobProtocol):
 
     def dispose(self) -> None:
         self.terminate()
-        # Cleanup input thread
-        self._input_task.alive = False
-        self._input_task.queue.put(None)
+        self._input.close()
         self._core.dispose()
 
         from pytoy.shared.timertask import TimerTask
@@ -175,15 +130,17 @@ class TerminalJobNvim(TerminalJobProtocol):
 
     @property
     def snapshot(self) -> Snapshot:
-        # pyte.screen.display returns a list of visible lines
-        content = "\n".join(self._screen.display)
-
+        tracker = self._tracker
         return Snapshot(
             timestamp=time.time(),
-            console=ConsoleSnapshot(lines=self._screen.lines, cols=self._screen.columns, content=content),
-            cursor=CursorPosition(line=self._screen.cursor.y, col=self._screen.cursor.x),
+            console=ConsoleSnapshot(lines=tracker.lines, cols=tracker.cols, content=tracker.content),
+            cursor=tracker.cursor,
         )
 
+    def take_delta(self) -> ScreenDelta:
+        """Return the rows changed since the previous call."""
+        return self._tracker.take_delta()
+
     @property
     def alive(self) -> bool:
         if self._job_id is None:
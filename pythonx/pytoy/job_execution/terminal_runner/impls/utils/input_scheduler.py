@@ -0,0 +1,272 @@
+from __future__ import annotations
+
+import math
+import re
+import time
+from collections import deque
+from threading import Condition, Thread
+from typing import Callable, Sequence
+
+from pytoy.job_execution.terminal_runner.impls.core import TerminalJobCore
+from pytoy.job_execution.terminal_runner.impls.utils.output_signals import OutputSignals
+from pytoy.job_execution.terminal_runner.models import (
+    InputOperation,
+    Snapshot,
+    WaitOperation,
+    WaitOutputOperation,
+    WaitUntilOperation,
+)
+from pytoy.shared.lib.event.domain import Disposable
+
+
+class _Sleep:
+    def __init__(self, until: float) -> None:
+        self.due = until
+
+    def ready(self, now: float) -> bool:
+        return now >= self.due
+
+
+class _Poll:
+    """`WaitUntilOperation.wait_until` as a timer: `n_trials` checks, `timeout / n_trials` seconds apart."""
+
+    def __init__(self, predicate: Callable[[], bool], now: float, timeout: float, n_trials: int) -> None:
+        self._predicate = predicate
+        self._interval = float(timeout) / n_trials
+        self._trials = n_trials
+        self.due = now
+
+    def ready(self, now: float) -> bool:
+        if now < self.due:
+            return False
+        if self._predicate():
+            return True
+        self._trials -= 1
+        self.due = now + self._interval
+        return self._trials <= 0
+
+
+class _Signal:
+    def __init__(self, signals: OutputSignals, pattern: str, until: float) -> None:
+        self._signals = signals
+        self._pattern = pattern
+        self.due = until
+
+    def ready(self, now: float) -> bool:
+        return self._signals.satisfied(self._pattern) or now >= self.due
+
+
+type _Wait = _Sleep | _Poll | _Signal
+
+
+class InputSession:
+    """The input of a terminal job, serviced by `InputScheduler`.
+
+    The operations are processed in the order of `submit`, and the consecutive payloads are written at once.
+    """
+
+    def __init__(
+        self,
+        scheduler: InputScheduler,
+        write: Callable[[str], None],
+        *,
+        enter_eol: str,
+        snapshot_getter: Callable[[], Snapshot],
+        signals: OutputSignals | None = None,
+    ) -> None:
+        self._scheduler = scheduler
+        self._write = write
+        self._enter_eol = enter_eol
+        self._snapshot_getter = snapshot_getter
+        self._signals = signals
+        self._ops: deque[InputOperation] = deque()
+        self._wait: _Wait | None = None
+        self._subscription: Disposable | None = None
+        if signals is not None:
+            self._subscription = signals.on_signal.subscribe(lambda _: scheduler.wake())
+        self.n_writes = 0
+
+    def submit(self, ops: Sequence[InputOperation]) -> None:
+        if self._signals is not None:
+            for op in ops:
+                if isinstance(op, WaitOutputOperation):
+                    self._signals.watch(op.pattern)
+        self._ops.extend(ops)
+        self._scheduler.wake()
+
+    @property
+    def idle(self) -> bool:
+        return not self._ops and self._wait is None
+
+    def close(self) -> None:
+        self._ops.clear()
+        self._wait = None
+        if self._subscription is not None:
+            self._subscription.dispose()
+            self._subscription = None
+        self._scheduler.discard(self)
+
+    def _step(self, now: float) -> float | None:
+        """Process the operations until a wait, and return when to be stepped again."""
+        payloads: list[str] = []
+        while True:
+            if self._wait is not None:
+                try:
+                    ready = self._wait.ready(now)
+                except Exception:
+                    ready = True
+                if not ready:
+                    return self._wait.due
+                self._wait = None
+            if not self._ops:
+                break
+            op = self._ops.popleft()
+            payload = TerminalJobCore.to_payload(op, self._enter_eol)
+            if payload is not None:
+                payloads.append(payload)
+                continue
+            # The payloads before the wait must be written before it starts.
+            self._flush(payloads)
+            payloads = []
+            now = self._scheduler.clock()
+            self._wait = self._make_wait(op, now)
+        self._flush(payloads)
+        return None
+
+    def _flush(self, payloads: list[str]) -> None:
+        if not payloads:
+            return
+        if self._signals is not None:
+            self._signals.mark()
+        try:
+            self._write("".join(payloads))
+        except Exception:
+            pass
+        self.n_writes += 1
+
+    def _make_wait(self, op: InputOperation, now: float) -> _Wait:
+        snapshot_getter = self._snapshot_getter
+        if isinstance(op, WaitOperation):
+            return _Sleep(now + op.time)
+        if isinstance(op, WaitUntilOperation):
+            predicate = op.predicate
+            return _Poll(lambda: predicate(snapshot_getter()), now, op.timeout, op.n_trials)
+        if isinstance(op, WaitOutputOperation):
+            if self._signals is not None:
+                return _Signal(self._signals, op.pattern, now + op.timeout)
+            regex = re.compile(op.pattern)
+            return _Poll(lambda: bool(regex.search(snapshot_getter().content)), now, op.timeout, 5)
+        raise TypeError(f"Unknown operation: {op!r}")
+
+
+class InputScheduler:
+    """Service the input of all the terminal jobs in one thread.
+
+    * The waits are timers of the sessions, so a waiting session does not block the others.
+    * The thread is started at the first `open`, and sleeps until the earliest timer or `wake`.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self.clock = clock
+        self._condition = Condition()
+        self._sessions: list[InputSession] = []
+        self._woken = False
+        self._thread: Thread | None = None
+
+    def open(
+        self,
+        write: Callable[[str], None],
+        *,
+        enter_eol: str,
+        snapshot_getter: Callable[[], Snapshot],
+        signals: OutputSignals | None = None,
+    ) -> InputSession:
+        session = InputSession(self, write, enter_eol=enter_eol, snapshot_getter=snapshot_getter, signals=signals)
+        with self._condition:
+            self._sessions.append(session)
+            self._start()
+        return session
+
+    @property
+    def sessions(self) -> list[InputSession]:
+        with self._condition:
+            return list(self._sessions)
+
+    def discard(self, session: InputSession) -> None:
+        with self._condition:
+            if session in self._sessions:
+                self._sessions.remove(session)
+
+    def wake(self) -> None:
+        with self._condition:
+            self._woken = True
+            self._condition.notify()
+
+    def _start(self) -> None:
+        if self._thread is None:
+            self._thread = Thread(target=self._loop, name="pytoy-input-scheduler", daemon=True)
+            self._thread.start()
+
+    def _step_all(self) -> float | None:
+        """Step all the sessions, and return the earliest time when one of them must be stepped again."""
+        due: float | None = None
+        for session in self.sessions:
+            try:
+                session_due = session._step(self.clock())
+            except Exception:
+                session_due = None
+            if session_due is not None:
+                due = session_due if due is None else min(due, session_due)
+        return due
+
+    def _loop(self) -> None:
+        due: float | None = None
+        while True:
+            with self._condition:
+                if not self._woken:
+                    timeout = None if due is None else max(0.0, due - self.clock())
+                    self._condition.wait(timeout)
+                self._woken = False
+            due = self._step_all()
+
+
+def _call_later_with_timer_task(func: Callable[[], None], delay: float) -> None:
+    from pytoy.shared.timertask import TimerTask
+
+    TimerTask.execute_oneshot(func, interval=max(0, math.ceil(delay * 1000)))
+
+
+class MainLoopInputScheduler(InputScheduler):
+    """`InputScheduler` without the thread, stepped by the timers of the editor.
+
+    For the backends whose input and snapshot are accessible only in the main thread (Vim).
+    The sessions are stepped by the timers and `wake`, so the waits never block the main loop,
+    and the output which satisfies a wait is processed while waiting.
+    """
+
+    def __init__(
+        self,
+        clock: Callable[[], float] = time.monotonic,
+        call_later: Callable[[Callable[[], None], float], None] = _call_later_with_timer_task,
+    ) -> None:
+        super().__init__(clock)
+        self._call_later = call_later
+        self._timer_due: float | None = None
+
+    def _start(self) -> None:
+        pass
+
+    def wake(self) -> None:
+        self._request(self.clock())
+
+    def _request(self, due: float) -> None:
+        # A timer which fires earlier steps the sessions anyway.
+        if self._timer_due is not None and self._timer_due <= due:
+            return
+        self._timer_due = due
+        self._call_later(self._on_timer, max(0.0, due - self.clock()))
+
+    def _on_timer(self) -> None:
+        self._timer_due = None
+        if (due := self._step_all()) is not None:
+            self._request(due)
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import re
+from threading import Condition
+
+from pytoy.shared.lib.event.domain import Event, EventEmitter
+
+
+class OutputSignals:
+    """Count the occurrences of the watched patterns in the raw output, and wake the waiters.
+
+    * `feed` is called by the reader of the output, in any thread.
+    * `mark` is called just before an input is sent, and `wait` waits for an occurrence after the latest `mark`.
+    * `on_signal` is fired with the pattern when it appears, for the waiters which must not block.
+    """
+
+    # Kept from the previous chunk, so that a pattern split by the chunks is found.
+    TAIL = 256
+
+    def __init__(self) -> None:
+        self._condition = Condition()
+        self._patterns: dict[str, re.Pattern[str]] = {}
+        self._counts: dict[str, int] = {}
+        self._marks: dict[str, int] = {}
+        self._tail = ""
+        self._signal_emitter = EventEmitter[str]()
+
+    def watch(self, pattern: str) -> None:
+        with self._condition:
+            if pattern not in self._patterns:
+                self._patterns[pattern] = re.compile(pattern)
+                self._counts[pattern] = 0
+                self._marks[pattern] = 0
+
+    @property
+    def on_signal(self) -> Event[str]:
+        return self._signal_emitter.event
+
+    def watching(self, pattern: str) -> bool:
+        return pattern in self._patterns
+
+    def count(self, pattern: str) -> int:
+        with self._condition:
+            return self._counts.get(pattern, 0)
+
+    def feed(self, data: str) -> None:
+        if not self._patterns or not data:
+            return
+        found: list[str] = []
+        with self._condition:
+            text = self._tail + data
+            boundary = len(self._tail)
+            for pattern, regex in self._patterns.items():
+                # The matches which end within the tail were counted at the previous chunk.
+                n_new = sum(1 for match in regex.finditer(text) if match.end() > boundary)
+                if n_new:
+                    self._counts[pattern] += n_new
+                    found.append(pattern)
+            self._tail = text[-self.TAIL :]
+            if found:
+                self._condition.notify_all()
+        # Outside the lock, since the listeners may take their own locks.
+        for pattern in found:
+            self._signal_emitter.fire(pattern)
+
+    def mark(self) -> None:
+        with self._condition:
+            self._marks.update(self._counts)
+
+    def satisfied(self, pattern: str) -> bool:
+        """Return True if `pattern` appeared after the latest `mark`, without waiting."""
+        with self._condition:
+            return pattern in self._counts and self._counts[pattern] > self._marks[pattern]
+
+    def wait(self, pattern: str, timeout: float) -> bool:
+        """Return True if `pattern` appeared after the latest `mark` within `timeout` seconds."""
+        self.watch(pattern)
+        with self._condition:
+            mark = self._marks[pattern]
+            return self._condition.wait_for(lambda: self._counts[pattern] > mark, timeout)
@@ -1,4 +1,6 @@
 from __future__ import annotations
+import codecs
+import select
 import shlex
 from pathlib import Path
 from typing import Protocol, runtime_checkable
@@ -9,6 +11,10 @@ class PtyConsoleProtocol(Protocol):
     """PtyConsoleが提供すべきインターフェースの定義"""
 
     def read(self, size: int = 4096) -> str: ...
+    def wait_readable(self, timeout: float) -> bool:
+        """Wait until `read` returns without blocking (data or EOF), at most `timeout` seconds."""
+        ...
+
     def write(self, data: str) -> None: ...
     def resize(self, lines: int, cols: int) -> None: ...
     def send_ctrl_c(self) -> None: ...
@@ -48,6 +54,14 @@ class WinPtyAdapter(PtyConsoleProtocol):
         except EOFError:
             return ""
 
+    def wait_readable(self, timeout: float) -> bool:
+        # The output of winpty is read from a socket, which `select` accepts on Windows too.
+        try:
+            readable, _, _ = select.select([self._proc.fileobj], [], [], timeout)
+        except (AttributeError, OSError, ValueError):
+            return True  # `read` blocks until the output arrives.
+        return bool(readable)
+
     def write(self, data: str):
         self._proc.write(data)
 
@@ -99,16 +113,25 @@ class PosixPtyAdapter(PtyConsoleProtocol):
         str_cwd = str(cwd) if cwd else None
 
         self._proc = pexpect.spawn(cmd_str, cwd=str_cwd, env=env, dimensions=size)  # type: ignore
+        # マルチバイト文字が読み取りの境界で分割されても壊れないように、逐次デコードする
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
 
     def read(self, size: int = 4096) -> str:
         import pexpect
 
         try:
             # POSIXでは非ブロッキング読み取りとUTF-8変換を適用
-            return self._proc.read_nonblocking(size, timeout=0.1).decode("utf-8", "replace")
+            return self._decoder.decode(self._proc.read_nonblocking(size, timeout=0))
         except (pexpect.TIMEOUT, pexpect.EOF):
             return ""
 
+    def wait_readable(self, timeout: float) -> bool:
+        try:
+            readable, _, _ = select.select([self._proc.child_fd], [], [], timeout)
+        except (OSError, ValueError):
+            return True  # Closed: `read` returns EOF.
+        return bool(readable)
+
     def write(self, data: str):
         self._proc.send(data)
 
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import time
+from threading import Thread
+from typing import Callable
+
+from pytoy.job_execution.terminal_runner.impls.utils.pty_console import PtyConsoleProtocol
+
+
+class RenderScheduler:
+    """Decide when the output is rendered.
+
+    The first output after an idle period is rendered at once, and the following outputs
+    are coalesced so that they are rendered at most once per `frame_budget` seconds.
+    """
+
+    def __init__(
+        self,
+        render: Callable[[], None],
+        *,
+        frame_budget: float = 0.05,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._render = render
+        self._frame_budget = frame_budget
+        self._clock = clock
+        self._last_render = float("-inf")
+        self._pending = False
+        self.n_renders = 0
+
+    @property
+    def pending(self) -> bool:
+        return self._pending
+
+    def notify(self) -> None:
+        """Called when the output arrives."""
+        if self._clock() - self._last_render >= self._frame_budget:
+            self._do_render()
+        else:
+            self._pending = True
+
+    def timeout(self) -> float | None:
+        """Seconds until the pending output must be rendered, or `None` if nothing is pending."""
+        if not self._pending:
+            return None
+        return max(0.0, self._last_render + self._frame_budget - self._clock())
+
+    def flush_due(self) -> None:
+        if self._pending and self._clock() - self._last_render >= self._frame_budget:
+            self._do_render()
+
+    def flush(self) -> None:
+        if self._pending:
+            self._do_render()
+
+    def _do_render(self) -> None:
+        self._pending = False
+        self._last_render = self._clock()
+        self.n_renders += 1
+        self._render()
+
+
+class PtyPump:
+    """Read the pty in a thread, woken by the readiness of the pty instead of polling.
+
+    * The read size grows while the reads fill the buffer (bursts), and shrinks when they do not.
+    * `on_data` is called for every read in the thread, and `on_output` is called via `RenderScheduler`.
+    """
+
+    MIN_READ_SIZE = 1024
+    MAX_READ_SIZE = 64 * 1024
+    # Upper bound of a wait, to notice the end of the process.
+    IDLE_TIMEOUT = 0.5
+
+    def __init__(
+        self,
+        pty: PtyConsoleProtocol,
+        *,
+        on_data: Callable[[str], None],
+        on_output: Callable[[], None] | None = None,
+        on_exit: Callable[[], None] | None = None,
+        frame_budget: float = 0.05,
+    ) -> None:
+        self._pty = pty
+        self._on_data = on_data
+        self._on_exit = on_exit
+        self._scheduler = RenderScheduler(on_output or (lambda: None), frame_budget=frame_budget)
+        self._read_size = 4096
+        self.n_reads = 0
+        self._thread = Thread(target=self._loop, daemon=True)
+
+    @property
+    def scheduler(self) -> RenderScheduler:
+        return self._scheduler
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def join(self, timeout: float | None = None) -> None:
+        self._thread.join(timeout)
+
+    def _loop(self) -> None:
+        pty = self._pty
+        scheduler = self._scheduler
+        try:
+            while pty.alive:
+                timeout = scheduler.timeout()
+                if not pty.wait_readable(self.IDLE_TIMEOUT if timeout is None else timeout):
+                    scheduler.flush_due()
+                    continue
+                data = pty.read(self._read_size)
+                if not data:
+                    scheduler.flush_due()
+                    continue
+                self.n_reads += 1
+                self._adapt(len(data))
+                self._on_data(data)
+                scheduler.notify()
+            # The output written just before the exit.
+            while pty.wait_readable(0) and (data := pty.read(self.MAX_READ_SIZE)):
+                self._on_data(data)
+                scheduler.notify()
+        finally:
+            scheduler.flush()
+            if self._on_exit:
+                self._on_exit()
+
+    def _adapt(self, n_read: int) -> None:
+        # `n_read` is counted in characters, which is not larger than the bytes read.
+        if n_read >= self._read_size:
+            self._read_size = min(self._read_size * 2, self.MAX_READ_SIZE)
+        elif n_read < self._read_size // 4:
+            self._read_size = max(self._read_size // 2, self.MIN_READ_SIZE)
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import time
+from threading import Lock
+
+from pyte import Screen, Stream
+from wcwidth import wcwidth
+
+from pytoy.job_execution.terminal_runner.models import ScreenDelta
+from pytoy.shared.lib.text import CursorPosition
+
+
+class ScreenTracker:
+    """pyte `Screen` whose rows are rendered only when pyte marks them dirty.
+
+    * `rows` / `content` are served from the rendered rows, so a full snapshot costs nothing
+      unless the screen has changed.
+    * `take_delta` returns the rows changed since the previous call, with the movement of the cursor.
+
+    `feed` may be called from a reader thread, while the others are called from any thread.
+    """
+
+    def __init__(self, lines: int, cols: int) -> None:
+        self._screen = Screen(cols, lines)
+        self._stream = Stream(self._screen)
+        self._lock = Lock()
+        self._rows: list[str] = [""] * lines
+        self._screen.dirty.update(range(lines))
+        self._changed: set[int] = set()
+        self._cursor = CursorPosition(0, 0)
+        self._delta_cursor = self._cursor
+        self._version = 0
+        self._content: tuple[int, str] | None = None
+
+    @property
+    def screen(self) -> Screen:
+        return self._screen
+
+    @property
+    def lines(self) -> int:
+        return self._screen.lines
+
+    @property
+    def cols(self) -> int:
+        return self._screen.columns
+
+    @property
+    def version(self) -> int:
+        """Incremented whenever a row of the screen changes."""
+        with self._lock:
+            self._sync()
+            return self._version
+
+    def feed(self, data: str) -> None:
+        with self._lock:
+            self._stream.feed(data)
+
+    def resize(self, lines: int, cols: int) -> None:
+        with self._lock:
+            self._screen.resize(lines, cols)
+
+    @property
+    def rows(self) -> list[str]:
+        with self._lock:
+            self._sync()
+            return list(self._rows)
+
+    @property
+    def content(self) -> str:
+        """Rows joined with LF, same as `"\\n".join(screen.display)`."""
+        with self._lock:
+            self._sync()
+            if self._content is None or self._content[0] != self._version:
+                self._content = (self._version, "\n".join(self._rows))
+            return self._content[1]
+
+    @property
+    def cursor(self) -> CursorPosition:
+        with self._lock:
+            self._sync()
+            return self._cursor
+
+    def take_delta(self) -> ScreenDelta:
+        with self._lock:
+            self._sync()
+            rows = {y: self._rows[y] for y in sorted(self._changed)}
+            self._changed.clear()
+            delta = ScreenDelta(
+                timestamp=time.time(),
+                lines=len(self._rows),
+                cols=self._screen.columns,
+                rows=rows,
+                cursor=self._cursor,
+                previous_cursor=self._delta_cursor,
+            )
+            self._delta_cursor = self._cursor
+            return delta
+
+    def _sync(self) -> None:
+        """Render the dirty rows of pyte, and consume its dirty set."""
+        screen = self._screen
+        cursor = screen.cursor
+        if (cursor.y, cursor.x) != (self._cursor.line, self._cursor.col):
+            self._cursor = CursorPosition(cursor.y, cursor.x)
+
+        dirty = screen.dirty
+        if not dirty:
+            return
+        lines = screen.lines
+        if len(self._rows) != lines:  # Resized.
+            self._rows = [""] * lines
+            self._changed = {y for y in self._changed if y < lines}
+            dirty.update(range(lines))
+
+        buffer = screen.buffer
+        for y in dirty:
+            if y < lines:
+                self._rows[y] = self._render(buffer[y])
+                self._changed.add(y)
+        dirty.clear()
+        self._version += 1
+
+    def _render(self, line) -> str:
+        # Same as `pyte.Screen.display`, for a row.
+        chars: list[str] = []
+        append = chars.append
+        is_wide_char = False
+        for x in range(self._screen.columns):
+            if is_wide_char:  # Skip stub
+                is_wide_char = False
+                continue
+            char = line[x].data
+            is_wide_char = wcwidth(char[0]) == 2
+            append(char)
+        return "".join(chars)
@@ -1,16 +1,14 @@
 from __future__ import annotations
 
-import codecs
 import time
-from threading import Thread
 from pathlib import Path
 from typing import Callable, Optional
 
-from pyte import Screen, Stream
-
-from pytoy.job_execution.terminal_runner.models import Snapshot, ConsoleSnapshot
+from pytoy.job_execution.terminal_runner.models import Snapshot, ConsoleSnapshot, ScreenDelta
 from pytoy.shared.lib.text import CursorPosition
 from pytoy.job_execution.terminal_runner.impls.utils.pty_console import PtyConsole, PtyConsoleProtocol
+from pytoy.job_execution.terminal_runner.impls.utils.screen_tracker import ScreenTracker
+from pytoy.job_execution.terminal_runner.impls.utils.pty_pump import PtyPump
 
 
 class VirtualTTY:
@@ -29,13 +27,15 @@ class VirtualTTY:
         cols: int = 80,
         on_output: Callable[[], None] | None = None,
         on_exit: Callable[[], None] | None = None,
+        on_data: Callable[[str], None] | None = None,
+        frame_budget: float = 0.05,
     ) -> None:
         self._lines: int = lines
         self._cols: int = cols
 
-        self._screen: Screen = Screen(cols, lines)
-        self._stream: Stream = Stream(self._screen)
-        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._tracker = ScreenTracker(lines, cols)
+        # (version of `_tracker`, processed lines) of the latest `snapshot`.
+        self._processed: tuple[int, list[str]] | None = None
 
         if isinstance(cwd, Path):
             cwd = cwd.as_posix()
@@ -47,14 +47,15 @@ class VirtualTTY:
             env=env,
         )
 
-        self._on_output = on_output
-        self._on_exit = on_exit
-
-        self._reader_thread: Thread = Thread(
-            target=self._read_loop,
-            daemon=True,
+        # 出力の到着 (select/poll) で起きる読み取りスレッド。`on_output` は `frame_budget` ごとにまとめて呼ばれる
+        self._pump = PtyPump(
+            self._pty,
+            on_data=self._tracker.feed if on_data is None else self._feed_with(on_data),
+            on_output=on_output,
+            on_exit=on_exit,
+            frame_budget=frame_budget,
         )
-        self._reader_thread.start()
+        self._pump.start()
 
     # -------------------------
     # PTY interaction
@@ -71,7 +72,7 @@ class VirtualTTY:
     def resize(self, *, lines: int, cols: int) -> None:
         self._lines = lines
         self._cols = cols
-        self._screen.resize(lines, cols)
+        self._tracker.resize(lines, cols)
         self._pty.resize(lines, cols)
 
     def interrupt(self) -> None:
@@ -97,21 +98,14 @@ class VirtualTTY:
 
     @property
     def snapshot(self) -> Snapshot:
-        # 1. 各行の右空白削除
-        # display は pyte の内部状態なので、念のためコピーを取るかリストの内包表記で処理
-        display_lines = self._screen.display
-        processed_lines = [line.rstrip() for line in display_lines]
-
-        # 2. 末尾の空行を削除
-        while processed_lines and not processed_lines[-1]:
-            processed_lines.pop()
-
+        processed_lines = self._process_lines()
         content = "\n".join(processed_lines)
 
         # 3. カーソル位置の補正
         # pyte の cursor.y/x は 0-indexed
-        orig_y = self._screen.cursor.y
-        orig_x = self._screen.cursor.x
+        tracker_cursor = self._tracker.cursor
+        orig_y = tracker_cursor.line
+        orig_x = tracker_cursor.col
 
         # コンテンツが存在するならその範囲内に、空なら 0 に固定
         max_y = max(0, len(processed_lines) - 1)
@@ -127,20 +121,36 @@ class VirtualTTY:
 
         return Snapshot(timestamp=time.time(), cursor=cursor, console=console)
 
+    def take_delta(self) -> ScreenDelta:
+        """Return the rows changed since the previous call, without the processing of `snapshot`."""
+        return self._tracker.take_delta()
+
     # -------------------------
     # Internal
     # -------------------------
 
-    def _read_loop(self) -> None:
-        while self._pty.alive:
-            data = self._pty.read(4096)
-            if not data:
-                time.sleep(0.01)
-                continue
-            self._stream.feed(data)
+    def _feed_with(self, on_data: Callable[[str], None]) -> Callable[[str], None]:
+        # 生の出力 (表示されないエスケープシーケンスを含む) も `on_data` に渡す
+        feed = self._tracker.feed
 
-            if self._on_output:
-                self._on_output()
+        def _on_data(data: str) -> None:
+            feed(data)
+            on_data(data)
+
+        return _on_data
+
+    def _process_lines(self) -> list[str]:
+        # 変更された行がなければ、前回の結果を使う (描画は `ScreenTracker` が dirty な行のみ行う)
+        version = self._tracker.version
+        if self._processed is not None and self._processed[0] == version:
+            return self._processed[1]
+
+        # 1. 各行の右空白削除
+        processed_lines = [line.rstrip() for line in self._tracker.rows]
+
+        # 2. 末尾の空行を削除
+        while processed_lines and not processed_lines[-1]:
+            processed_lines.pop()
 
-        if self._on_exit:
-            self._on_exit()
+        self._processed = (version, processed_lines)
+        return processed_lines
@@ -3,7 +3,7 @@ import vim
 import time
 import json
 from pathlib import Path
-from typing import Any, Sequence
+from typing import Any
 
 from pytoy.job_execution.terminal_runner.models import (
     TerminalJobProtocol,
@@ -11,11 +11,6 @@ from pytoy.job_execution.terminal_runner.models import (
     SpawnOption,
     ConsoleSnapshot,
     Snapshot,
-    WaitOperation,
-    WaitUntilOperation,
-    RawStr,
-    LineStr,
-    InputOperation,
     JobEvents,
     JobID,
 )
@@ -68,30 +63,34 @@ class TerminalJobVim(TerminalJobProtocol):
         if self._bufnr <= 0:
             raise RuntimeError(f"Vim term_start failed: {self._bufnr}")
 
+        # 4. Input, stepped by the timers of Vim.
+        # Blocking waits would also block `out_cb`, which brings the output they wait for.
+        from pytoy.contexts.pytoy import GlobalPytoyContext
+
+        self._input = GlobalPytoyContext.get().terminal_main_loop_input_scheduler.open(
+            self._write,
+            enter_eol=self._driver.eol or TerminalJobCore.get_default_eol(),
+            snapshot_getter=lambda: self.snapshot,
+            signals=self._core.output_signals,
+        )
+
     def _on_vim_output(self, channel: Any, data: Any) -> None:
+        if isinstance(data, str):
+            self._core.output_signals.feed(data)
         self._core.update_emitter.fire(self._bufnr)
 
     def _on_vim_exit(self, job: Any, exit_status: int) -> None:
         self._core.exit_emitter.fire(exit_status)
         self.dispose()
 
-    def _send_operations(self, operations: Sequence[InputOperation]) -> None:
-
-        eol = self._driver.eol
-        enter_eol = eol if eol else TerminalJobCore.get_default_eol()
-        snapshot_getter = lambda: self.snapshot  # noqa
-        for op in operations:
-            payload = TerminalJobCore.deal_operation(op, enter_eol, snapshot_getter)
-
-            if payload is not None:
-                input_json = json.dumps(payload)
-                vim.command(f"call term_sendkeys({self._bufnr}, {input_json})")
+    def _write(self, payload: str) -> None:
+        if self._bufnr > 0:
+            vim.command(f"call term_sendkeys({self._bufnr}, {json.dumps(payload)})")
 
     def send(self, input: str) -> None:
         if not self.alive:
             return
-        operations: Sequence[InputOperation] = self._driver.make_operations(input)
-        self._send_operations(operations)
+        self._input.submit(self._driver.make_operations(input))
 
     def interrupt(self) -> None:
         if self.alive:
@@ -100,7 +99,7 @@ class TerminalJobVim(TerminalJobProtocol):
                 return
             match i_code.preference:
                 case "sigint":
-                    self._send_operations([RawStr("\x03")])
+                    self._write("\x03")
                 case "kill_tree":
                     TerminalJobCore.kill_processes(self.children_pids)
 
@@ -120,6 +119,7 @@ class TerminalJobVim(TerminalJobProtocol):
                 vim.command(f"bdelete! {self._bufnr}")
             self._bufnr = -1
 
+        self._input.close()
         self._core.update_emitter.dispose()
         self._core.exit_emitter.dispose()
 
@@ -2,7 +2,7 @@ from dataclasses import dataclass, field
 from pytoy.shared.lib.text import CursorPosition
 from pytoy.shared.lib.event.domain import Event
 
-from typing import Callable, Literal, Sequence, Protocol, Hashable, Any, Self, runtime_checkable
+from typing import Callable, Literal, Mapping, Sequence, Protocol, Hashable, Any, Self, runtime_checkable
 from pytoy.job_execution.environment_manager import CommandWrapperType, ExecutionWrapperType  # noqa
 
 
@@ -30,6 +30,30 @@ class Snapshot:
         return self.console.content
 
 
+@dataclass(frozen=True)
+class ScreenDelta:
+    """Rows of the screen changed since the previous delta.
+
+    `rows` maps 0-based row indices to their new contents.
+    When the screen is resized, all the rows are included.
+    """
+
+    timestamp: float
+    lines: int
+    cols: int
+    rows: Mapping[int, str]
+    cursor: CursorPosition
+    previous_cursor: CursorPosition
+
+    @property
+    def cursor_moved(self) -> bool:
+        return self.cursor != self.previous_cursor
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.rows and not self.cursor_moved
+
+
 @dataclass
 class WaitOperation:
     time: float = 0.5
@@ -65,6 +89,18 @@ class WaitUntilOperation:
         return False
 
 
+@dataclass
+class WaitOutputOperation:
+    """Wait until `pattern` (regex) appears in the raw output after the previous input.
+
+    The raw output includes the escape sequences which are not displayed (e.g. OSC markers).
+    The waiter is woken by the reader of the output, without polling.
+    """
+
+    pattern: str
+    timeout: float = 3.0
+
+
 class LineStr(str): ...
 
 
@@ -72,7 +108,7 @@ class RawStr(str): ...
 
 
 # NOTE:  `str` is regarded as `RawStr`.
-type InputOperation = WaitUntilOperation | WaitOperation | WaitUntilOperation | RawStr | LineStr | str
+type InputOperation = WaitUntilOperation | WaitOperation | WaitOutputOperation | RawStr | LineStr | str
 
 
 @dataclass
@@ -192,3 +228,10 @@ class TerminalJobProtocol(Protocol):
 
     @property
     def events(self) -> JobEvents: ...
+
+
+@runtime_checkable
+class ScreenDeltaSourceProtocol(Protocol):
+    """Terminal jobs which report the changed rows of the screen, besides `snapshot`."""
+
+    def take_delta(self) -> ScreenDelta: ...
@@ -1,7 +1,7 @@
 from pytoy.shared.lib.event.domain import Disposable, Event, EventEmitter
 from typing import Callable, Any, Literal, assert_never, Sequence
 
-ArgumentSpec = Literal["count", "event", "abuf", "afile"]
+ArgumentSpec = Literal["count", "event", "abuf", "afile", "bufnr"]
 
 from dataclasses import dataclass
 
@@ -61,6 +61,9 @@ class VimAutocmd[T: Any]:
                     return "expand('<abuf>')"
                 case "afile":
                     return "expand('<afile>')"
+                case "bufnr":
+                    # For events such as `OptionSet`, `<abuf>` is not set.
+                    return "bufnr('%')"
                 case _:
                     assert_never(argument)
 
@@ -1,7 +1,11 @@
+import itertools
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
 from typing import Protocol, Hashable, Callable
 from weakref import WeakValueDictionary
 
-from pytoy.shared.lib.event.domain import Event
+from pytoy.shared.lib.event.domain import Disposable, Event
 
 
 class MortalEntityProtocol[T](Protocol):
@@ -14,26 +18,118 @@ class MortalEntityProtocol[T](Protocol):
     def entity_id(self) -> T: ...
 
 
+@dataclass(frozen=True)
+class EntityRegistryStats:
+    hits: int
+    misses: int
+    creations: int
+    disposals: int  # Ended by `on_end`.
+    collected: int  # Dropped by the garbage collection without `on_end`.
+    evictions: int  # Dropped from the strong LRU.
+    live: int
+    retained: int  # Held strongly by the LRU.
+
+    def to_line(self) -> str:
+        return (
+            f"hit {self.hits}, miss {self.misses}, created {self.creations}, disposed {self.disposals}, "
+            f"collected {self.collected}, evicted {self.evictions}, live {self.live}, retained {self.retained}"
+        )
+
+
 class EntityRegistry[ID: Hashable, E: MortalEntityProtocol]:
+    """Provide one entity per `ID` until its `on_end`.
+
+    * Entities are kept in a weak map, and the recently used `capacity` entities are also held
+      strongly, so that entities dropped and requested again are not re-created by `factory`.
+    * Each live entity has exactly one subscription to `on_end`.
+      It is disposed at `on_end`, or when the entity is garbage-collected.
+    """
+
     def __init__(
         self,
         entity_cls: type[E],
         *,
         factory: Callable[[ID], E] | None = None,
+        capacity: int = 256,
     ):
         self._entity_cls = entity_cls
         self._factory = factory or self._default_factory
+        self._capacity = capacity
         self._entities: WeakValueDictionary[ID, E] = WeakValueDictionary()
+        self._recent: OrderedDict[ID, E] = OrderedDict()
+        # `ID` -> (generation, subscription to `on_end`). The generation tells the entities of the same `ID` apart.
+        self._subscriptions: dict[ID, tuple[int, Disposable]] = {}
+        self._generations = itertools.count()
+        self._hits = 0
+        self._misses = 0
+        self._creations = 0
+        self._disposals = 0
+        self._collected = 0
+        self._evictions = 0
 
     def _default_factory(self, entity_id: ID) -> E:
         return self._entity_cls(entity_id)  # type: ignore
 
+    @property
+    def stats(self) -> EntityRegistryStats:
+        return EntityRegistryStats(
+            hits=self._hits,
+            misses=self._misses,
+            creations=self._creations,
+            disposals=self._disposals,
+            collected=self._collected,
+            evictions=self._evictions,
+            live=len(self._subscriptions),
+            retained=len(self._recent),
+        )
+
     def get(self, entity_id: ID) -> E:
-        if entity_id not in self._entities:
-            entity = self._factory(entity_id)
-            self._entities[entity_id] = entity
-            entity.on_end.subscribe(lambda id_: self._dispose(id_))
-        return self._entities[entity_id]
+        entity = self._entities.get(entity_id)
+        if entity is None:
+            self._misses += 1
+            entity = self._create(entity_id)
+        else:
+            self._hits += 1
+        self._retain(entity_id, entity)
+        return entity
+
+    def _create(self, entity_id: ID) -> E:
+        entity = self._factory(entity_id)
+        self._creations += 1
+        self._release(entity_id)  # In case that the former one is not finalized yet.
+        generation = next(self._generations)
+        subscription = entity.on_end.subscribe(self._dispose)
+        self._subscriptions[entity_id] = (generation, subscription)
+        self._entities[entity_id] = entity
+        finalizer = weakref.finalize(entity, self._on_collected, entity_id, generation)
+        finalizer.atexit = False
+        return entity
+
+    def _retain(self, entity_id: ID, entity: E) -> None:
+        recent = self._recent
+        if entity_id in recent:
+            recent.move_to_end(entity_id)
+            return
+        recent[entity_id] = entity
+        if len(recent) > self._capacity:
+            recent.popitem(last=False)
+            self._evictions += 1
 
     def _dispose(self, entity_id: ID) -> None:
+        if self._release(entity_id):
+            self._disposals += 1
         self._entities.pop(entity_id, None)
+        self._recent.pop(entity_id, None)
+
+    def _on_collected(self, entity_id: ID, generation: int) -> None:
+        current = self._subscriptions.get(entity_id)
+        if current is not None and current[0] == generation:
+            self._release(entity_id)
+            self._collected += 1
+
+    def _release(self, entity_id: ID) -> bool:
+        current = self._subscriptions.pop(entity_id, None)
+        if current is None:
+            return False
+        current[1].dispose()
+        return True
@@ -1,3 +1,5 @@
+from contextlib import AbstractContextManager
+
 from pytoy.shared.lib.keymap import KeymapManager, KeySequence, KeymapSpec
 from pytoy.shared.lib.event.domain import Event
 
@@ -22,7 +24,13 @@ class KeyActionEvents:
         self._manager.deregister(spec)
         self._events.pop(key, None)
 
+    def batch(self) -> AbstractContextManager[None]:
+        """Register the keys accessed inside of the block with one command."""
+        return self._manager.batch()
+
     def clear(self) -> None:
         keys = list(self._events)
         for key in keys:
             del self._events[key]
+        if self._bufnr is not None:
+            self._manager.forget_buffer(self._bufnr)
@@ -57,6 +57,31 @@ class GlobalBufferEventProvider:
         autocmd = self.manager.register(group, emit_spec, payload_mapper)
         return GlobalEvent(autocmd.event)
 
+    @cached_property
+    def added(self) -> GlobalEvent[int]:
+        """`BufNew` also covers unlisted buffers, which `BufAdd` does not."""
+        group = "PytoyAnyBufferAddedAutocmd"
+        emit_spec = EmitSpec(event="BufAdd,BufNew", pattern="*")
+        payload_mapper = PayloadMapper(arguments=["abuf"], transform=_to_bufnr)
+        autocmd = self.manager.register(group, emit_spec, payload_mapper)
+        return GlobalEvent(autocmd.event)
+
+    @cached_property
+    def renamed(self) -> GlobalEvent[int]:
+        group = "PytoyAnyBufferBufFilePostAutocmd"
+        emit_spec = EmitSpec(event="BufFilePost", pattern="*")
+        payload_mapper = PayloadMapper(arguments=["abuf"], transform=_to_bufnr)
+        autocmd = self.manager.register(group, emit_spec, payload_mapper)
+        return GlobalEvent(autocmd.event)
+
+    @cached_property
+    def buftype_set(self) -> GlobalEvent[int]:
+        group = "PytoyAnyBufferBuftypeSetAutocmd"
+        emit_spec = EmitSpec(event="OptionSet", pattern="buftype")
+        payload_mapper = PayloadMapper(arguments=["bufnr"], transform=_to_bufnr)
+        autocmd = self.manager.register(group, emit_spec, payload_mapper)
+        return GlobalEvent(autocmd.event)
+
 
 class ScopedBufferEventProvider:
     def __init__(self, global_provider: GlobalBufferEventProvider) -> None:
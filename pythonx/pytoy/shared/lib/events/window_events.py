@@ -14,6 +14,10 @@ def _to_winid(args) -> int:
     return int(args[0])
 
 
+def _to_none(args) -> None:
+    return None
+
+
 class GlobalWindowEventProvider:
     """
     NOTE: Since the `transform` of PayaloadMapper is regardes as the value
@@ -35,6 +39,15 @@ class GlobalWindowEventProvider:
         autocmd = self._manager.register(group, emit_spec, payload_mapper)
         return GlobalEvent(autocmd.event)
 
+    @cached_property
+    def layout_changed(self) -> Event[None]:
+        """Fired when windows, their buffers or tabs may change. Used to invalidate the caches of the layout."""
+        group = f"PytoyAnyLayoutChangedGroup_{id(self._manager)}"
+        emit_spec = EmitSpec(event="WinNew,WinClosed,BufWinEnter,TabEnter,TabClosed,BufFilePost")
+        payload_mapper = PayloadMapper(arguments=["abuf"], transform=_to_none)
+        autocmd = self._manager.register(group, emit_spec, payload_mapper)
+        return autocmd.event
+
 
 class ScopedWindowEventProvider:
     def __init__(self, global_provider: GlobalWindowEventProvider) -> None:
@@ -1,95 +1,180 @@
+from __future__ import annotations
+
 import vim
-import re
+import itertools
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Iterator, Sequence, TYPE_CHECKING
 
 from pytoy.shared.lib.function import FunctionRegistry
-from pytoy.shared.lib.function.domain import RegisteredFunction
 from pytoy.shared.lib.keymap.models import Keymap, KeymapSpec
 from pytoy.shared.lib.event import EventEmitter
 
+if TYPE_CHECKING:
+    from pytoy.shared.lib.autocmd.autocmd_manager import AutoCmdManager
 
-class KeymapManager:
-    def __init__(self):
-        self._keymaps: dict[KeymapSpec, Keymap] = {}
-        self._emitters: dict[KeymapSpec, EventEmitter] = {}
 
-    def _generate_name(self, spec: KeymapSpec) -> str:
-        import hashlib
+# NOTE: `PayloadMapper.transform` is used for the identity check, so it must not be a lambda.
+def _to_bufnr(args) -> int:
+    return int(args[0])
 
-        suffix = hashlib.sha1(repr(spec).encode()).hexdigest()[:8]
 
-        key = re.sub(r"[^0-9a-zA-Z_]", "_", str(spec.key))
-        if spec.buffer is not None:
-            return f"KeymapManagerEventBuffer{spec.buffer}_{key}_{suffix}"
-        return f"KeymapManagerEventGlobal_{key}_{suffix}"
+def _to_vim_list(commands: Sequence[str]) -> str:
+    escaped = [command.replace("'", "''") for command in commands]
+    return "[" + ", ".join(f"'{command}'" for command in escaped) + "]"
 
-    def register(self, spec: KeymapSpec) -> Keymap:
-        if spec in self._keymaps:
-            return self._keymaps[spec]
 
-        emitter = EventEmitter()
+class KeymapManager:
+    """Map keys to `Event`s.
 
-        def on_event():
-            emitter.fire(spec.buffer)
+    * Every mapping calls one dispatcher function with the small integer id of the keymap.
+    * Inside `batch`, the commands are accumulated and applied with one command per buffer.
+    * Buffer-local mappings of buffers which are not displayed are applied at their next `BufEnter`.
+    """
 
-        registered_function = FunctionRegistry.register(
-            on_event,
-            name=self._generate_name(spec),
-        )
+    def __init__(self, autocmd_manager: AutoCmdManager | None = None) -> None:
+        self._autocmd_manager = autocmd_manager
+        self._dispatcher_function = FunctionRegistry.register(self._dispatcher, prefix="KeymapManager")
+        self._ids = itertools.count(1)
+        self._keymaps: dict[KeymapSpec, Keymap] = {}
+        self._emitters: dict[KeymapSpec, EventEmitter] = {}
+        self._specs: dict[int, KeymapSpec] = {}
+        self._batch_depth = 0
+        # Commands waiting for `batch` to end, and for the buffer to be displayed.
+        self._queued: defaultdict[int | None, dict[KeymapSpec, str]] = defaultdict(dict)
+        self._pending: dict[int, dict[KeymapSpec, str]] = {}
+
+    @property
+    def autocmd_manager(self) -> AutoCmdManager:
+        if self._autocmd_manager is None:
+            from pytoy.shared.lib.autocmd.autocmd_manager import get_autocmd_manager
+
+            self._autocmd_manager = get_autocmd_manager()
+        return self._autocmd_manager
+
+    def _dispatcher(self, keymap_id: str) -> None:
+        spec = self._specs.get(int(keymap_id))
+        if spec is None or (emitter := self._emitters.get(spec)) is None:
+            return
+        emitter.fire(spec.buffer)
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Apply the registrations inside of the block together."""
+        self._batch_depth += 1
+        try:
+            yield
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self._flush()
 
-        command = self._make_register_command(registered_function, spec)
-        self._execute_command(spec, command)
+    def register(self, spec: KeymapSpec) -> Keymap:
+        if spec in self._keymaps:
+            return self._keymaps[spec]
 
+        keymap_id = next(self._ids)
+        emitter = EventEmitter()
         keymap = Keymap(
             event=emitter.event,
             spec=spec,
-            function=registered_function,
+            function=self._dispatcher_function,
+            keymap_id=keymap_id,
         )
-
         self._keymaps[spec] = keymap
         self._emitters[spec] = emitter
+        self._specs[keymap_id] = spec
+        self._enqueue(spec, self._make_register_command(keymap))
         return keymap
 
+    def register_many(self, specs: Sequence[KeymapSpec]) -> list[Keymap]:
+        with self.batch():
+            return [self.register(spec) for spec in specs]
+
     def deregister(self, spec: KeymapSpec) -> None:
         keymap = self._keymaps.pop(spec, None)
         if keymap is None:
             return
-
-        self._execute_command(spec, self._make_deregister_command(spec))
         self._emitters.pop(spec, None)
-        FunctionRegistry.deregister(keymap.function)
+        self._specs.pop(keymap.keymap_id, None)
 
-    def _execute_command(self, spec: KeymapSpec, command: str) -> None:
-        if spec.buffer is None:
-            vim.command(command)
+        # Not applied yet, so there is nothing to remove from vim.
+        if self._queued.get(spec.buffer, {}).pop(spec, None) is not None:
+            return
+        if spec.buffer is not None and self._pending.get(spec.buffer, {}).pop(spec, None) is not None:
+            return
+        self._enqueue(spec, self._make_deregister_command(spec))
+
+    def forget_buffer(self, bufnr: int) -> None:
+        """Drop the keymaps of the wiped-out buffer. Vim has already removed the mappings."""
+        for spec in [spec for spec in self._keymaps if spec.buffer == bufnr]:
+            keymap = self._keymaps.pop(spec)
+            self._emitters.pop(spec, None)
+            self._specs.pop(keymap.keymap_id, None)
+        self._queued.pop(bufnr, None)
+        if self._pending.pop(bufnr, None) is not None:
+            self.autocmd_manager.deregister(self._pending_group(bufnr))
+
+    def _enqueue(self, spec: KeymapSpec, command: str) -> None:
+        self._queued[spec.buffer][spec] = command
+        if self._batch_depth == 0:
+            self._flush()
+
+    def _flush(self) -> None:
+        queued = {buffer: commands for buffer, commands in self._queued.items() if commands}
+        self._queued.clear()
+
+        if global_commands := queued.pop(None, None):
+            vim.command(f"call execute({_to_vim_list(list(global_commands.values()))})")
+        if not queued:
             return
 
-        winid = int(vim.eval(f"bufwinid({spec.buffer})"))
-        if winid == -1:
-            raise ValueError(
-                f"Buffer {spec.buffer} is not displayed in any window."
-            )
+        # One `vim.eval` for the windows of every buffer.
+        bufnrs = [bufnr for bufnr in queued if bufnr is not None]
+        winids = [int(winid) for winid in vim.eval(f"map({bufnrs}, {{_, b -> bufwinid(b)}})")]
+        for bufnr, winid in zip(bufnrs, winids):
+            if winid == -1:
+                self._defer(bufnr, queued[bufnr])
+            else:
+                vim.command(f"call win_execute({winid}, {_to_vim_list(list(queued[bufnr].values()))})")
+
+    def _defer(self, bufnr: int, commands: dict[KeymapSpec, str]) -> None:
+        """Keep the commands of `bufnr` until the buffer is entered."""
+        if bufnr in self._pending:
+            self._pending[bufnr].update(commands)
+            return
+        self._pending[bufnr] = dict(commands)
+        from pytoy.shared.lib.autocmd.autocmd_manager import EmitSpec, PayloadMapper
+
+        emit_spec = EmitSpec(event="BufEnter", pattern=f"<buffer={bufnr}>", once=True)
+        payload_mapper = PayloadMapper(arguments=["abuf"], transform=_to_bufnr)
+        autocmd = self.autocmd_manager.register(self._pending_group(bufnr), emit_spec, payload_mapper, owner=self)
+        autocmd.event.subscribe(self._apply_pending)
+
+    def _apply_pending(self, bufnr: int) -> None:
+        pending = self._pending.pop(bufnr, None)
+        self.autocmd_manager.deregister(self._pending_group(bufnr))
+        if pending:
+            # At `BufEnter`, the buffer is displayed in the current window.
+            vim.command(f"call execute({_to_vim_list(list(pending.values()))})")
 
-        escaped = command.replace("'", "''")
-        vim.command(f"call win_execute({winid}, '{escaped}')")
+    def _pending_group(self, bufnr: int) -> str:
+        return f"PytoyKeymapPendingBufEnter_{bufnr}_{id(self)}"
 
-    def _make_register_command(
-        self,
-        function: RegisteredFunction,
-        spec: KeymapSpec,
-    ) -> str:
+    def _make_register_command(self, keymap: Keymap) -> str:
         opts = ["<silent>"]
 
-        if spec.buffer is not None:
+        if keymap.buffer is not None:
             opts.append("<buffer>")
 
         return (
             f"nnoremap {' '.join(opts)} "
-            f"{spec.key} "
-            f":call {function.impl_name}()<CR>"
+            f"{keymap.key} "
+            f":call {keymap.function.impl_name}({keymap.keymap_id})<CR>"
         )
 
     def _make_deregister_command(self, spec: KeymapSpec) -> str:
         if spec.buffer is None:
             return f"silent! nunmap {spec.key}"
 
-        return f"silent! nunmap <buffer> {spec.key}"
\ No newline at end of file
+        return f"silent! nunmap <buffer> {spec.key}"
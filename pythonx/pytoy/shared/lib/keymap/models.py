@@ -25,7 +25,8 @@ class KeymapSpec:
 class Keymap:
     spec: KeymapSpec
     event: Event
-    function: RegisteredFunction  # For debug.
+    function: RegisteredFunction  # The shared dispatcher. For debug.
+    keymap_id: int  # The argument passed to `function`.
 
     @property
     def key(self) -> KeySequence:
@@ -1,7 +1,28 @@
+from bisect import bisect_right
 from dataclasses import dataclass
+from itertools import accumulate
+from typing import Iterable, Self, Sequence
 
 
-@dataclass(frozen=True)
+# NOTE: These primitives are created in large numbers (searchers, quickfix, range operators),
+# so they are slotted and the constructors bypass the generic `object.__setattr__` of frozen dataclasses.
+
+
+class _CachedHash:
+    """Keep the hash of the composite value in the slot, computed at the first `hash`."""
+
+    __slots__ = ("_hash",)
+
+
+_set_hash = _CachedHash._hash.__set__  # type: ignore[attr-defined]
+
+
+def line_starts(lines: Sequence[str]) -> list[int]:
+    """Return the offsets of lines in `"\\n".join(lines)`."""
+    return [0, *accumulate(len(line) + 1 for line in lines[:-1])]
+
+
+@dataclass(frozen=True, slots=True, order=True, init=False)
 class CursorPosition:
     """This represents the position of cursor.
     Here, both of `line` and `col` are 0-based.
@@ -14,9 +35,46 @@ class CursorPosition:
     line: int  # 0-based.
     col: int  # 0-based, Unicode codepoint index (Python str index)
 
-
-@dataclass(frozen=True)
-class CharacterRange:
+    def __init__(self, line: int, col: int) -> None:
+        _set_cursor_line(self, line)
+        _set_cursor_col(self, col)
+
+    @classmethod
+    def from_offsets(
+        cls, offsets: Iterable[int], starts: Sequence[int], first_line: int = 0, first_col: int = 0
+    ) -> list[Self]:
+        """Convert offsets in a text into positions at once.
+
+        `starts` is the offsets of lines (see `line_starts`), and the text begins at
+        `(first_line, first_col)` of the document, so `first_col` shifts only the first line.
+        Sorted `offsets` are converted in a single pass.
+        """
+        new = object.__new__
+        results: list[Self] = []
+        append = results.append
+        n_lines = len(starts)
+        line = 0
+        previous = -1
+        for offset in offsets:
+            if offset < previous:
+                line = bisect_right(starts, offset) - 1
+            else:
+                while line + 1 < n_lines and starts[line + 1] <= offset:
+                    line += 1
+            previous = offset
+            position = new(cls)
+            _set_cursor_line(position, line + first_line)
+            _set_cursor_col(position, offset - starts[line] + (first_col if line == 0 else 0))
+            append(position)
+        return results
+
+
+_set_cursor_line = CursorPosition.line.__set__  # type: ignore[attr-defined]
+_set_cursor_col = CursorPosition.col.__set__  # type: ignore[attr-defined]
+
+
+@dataclass(frozen=True, slots=True, order=True, init=False)
+class CharacterRange(_CachedHash):
     """
     Represents a half-open text range [start, end).
 
@@ -27,10 +85,42 @@ class CharacterRange:
     start: CursorPosition
     end: CursorPosition
 
-    def __post_init__(self):
-        if (self.end.line, self.end.col) < (self.start.line, self.start.col):
-            object.__setattr__(self, "start", self.end)
-            object.__setattr__(self, "end", self.start)
+    def __init__(self, start: CursorPosition, end: CursorPosition) -> None:
+        if (end.line, end.col) < (start.line, start.col):
+            start, end = end, start
+        _set_range_start(self, start)
+        _set_range_end(self, end)
+        _set_hash(self, None)
+
+    def __hash__(self) -> int:
+        value = self._hash
+        if value is None:
+            value = hash((self.start, self.end))
+            _set_hash(self, value)
+        return value
+
+    def __reduce__(self):
+        # Rebuild via `__init__`, so that `_hash` is initialized.
+        return (type(self), (self.start, self.end))
+
+    @classmethod
+    def from_offsets(
+        cls, spans: Iterable[tuple[int, int]], starts: Sequence[int], first_line: int = 0, first_col: int = 0
+    ) -> list[Self]:
+        """Convert `(start, end)` offsets into ranges at once. See `CursorPosition.from_offsets`."""
+        spans = list(spans)
+        offsets = [offset for span in spans for offset in sorted(span)]
+        positions = CursorPosition.from_offsets(offsets, starts, first_line=first_line, first_col=first_col)
+        new = object.__new__
+        results: list[Self] = []
+        append = results.append
+        for index in range(0, len(positions), 2):
+            character_range = new(cls)
+            _set_range_start(character_range, positions[index])
+            _set_range_end(character_range, positions[index + 1])
+            _set_hash(character_range, None)
+            append(character_range)
+        return results
 
     @property
     def is_empty(self) -> bool:
@@ -51,7 +141,11 @@ class CharacterRange:
         return LineRange(start, max(start, end))
 
 
-@dataclass(frozen=True)
+_set_range_start = CharacterRange.start.__set__  # type: ignore[attr-defined]
+_set_range_end = CharacterRange.end.__set__  # type: ignore[attr-defined]
+
+
+@dataclass(frozen=True, slots=True, order=True, init=False)
 class LineRange:
     """0-based, exclusive range [start, end)
 
@@ -63,6 +157,14 @@ class LineRange:
     start: int
     end: int
 
+    def __init__(self, start: int, end: int) -> None:
+        _set_line_range_start(self, start)
+        _set_line_range_end(self, end)
+
     @property
     def count(self) -> int:
         return self.end - self.start
+
+
+_set_line_range_start = LineRange.start.__set__  # type: ignore[attr-defined]
+_set_line_range_end = LineRange.end.__set__  # type: ignore[attr-defined]
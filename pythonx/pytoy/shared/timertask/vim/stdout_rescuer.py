@@ -1,27 +1,82 @@
 import vim
 import sys
-from queue import Empty, Full, Queue
+import threading
+from dataclasses import dataclass
 
 from pytoy.shared.timertask.timer import TimerTask
 from pytoy.shared.timertask.domain import BackendThreadUtilProtocol
 from typing import Any, Literal
 
 
+@dataclass
+class CaptureStats:
+    """Counters of a `_CaptureChannel`, in characters.
+
+    * `dropped`: written while the pending text exceeded `capacity`.
+    * `truncated`: discarded since a drain exceeded `budget`.
+    """
+
+    written: int = 0
+    delivered: int = 0
+    dropped: int = 0
+    truncated: int = 0
+    n_drains: int = 0
+
+
+class _CaptureChannel:
+    """Accumulate the texts written from any thread, and drain them in the main thread.
+
+    Writes only append the chunk to a list under a lock, and the chunks are joined once per drain.
+    """
+
+    def __init__(self, capacity: int = 2**20, budget: int = 2**14):
+        self.capacity = capacity
+        self.budget = budget
+        self.stats = CaptureStats()
+        self._lock = threading.Lock()
+        self._chunks: list[str] = []
+        self._size = 0
+
+    def write(self, message: str) -> None:
+        with self._lock:
+            self.stats.written += len(message)
+            if self.capacity < self._size + len(message):
+                self.stats.dropped += len(message)
+                return
+            self._chunks.append(message)
+            self._size += len(message)
+
+    def drain(self) -> str:
+        """Return the pending text up to `budget` characters, and discard the rest."""
+        with self._lock:
+            chunks, self._chunks, self._size = self._chunks, [], 0
+            self.stats.n_drains += 1
+        text = "".join(chunks)
+        n_truncated = max(len(text) - self.budget, 0)
+        with self._lock:
+            self.stats.delivered += len(text) - n_truncated
+            self.stats.truncated += n_truncated
+        if n_truncated:
+            text = text[: self.budget] + f"\n... ({n_truncated} characters are truncated.)\n"
+        return text
+
+    def clear(self) -> None:
+        with self._lock:
+            self._chunks, self._size = [], 0
+
+
 # If you would like to Thread,
 # `sys.stdout`, `sys.stderr` must be protected.
 # so that these functions should be executed.
 class _DummyPipe:
     """This class is used instead of `sys.stdout` /`sys.stderr`."""
 
-    def __init__(self, queue: Queue):
-        self._queue = queue
+    def __init__(self, channel: _CaptureChannel):
+        self._channel = channel
 
     def write(self, message: str) -> int:
         if message:
-            try:
-                self._queue.put_nowait(message)
-            except Full:
-                pass
+            self._channel.write(message)
         return len(message)
 
     def flush(self):
@@ -35,11 +90,13 @@ class StdoutProxy:
     """
 
     _timer_taskname: None | str = None
-    _stdout_queue: None | Queue = None
-    _stderr_queue: None | Queue = None
+    _stdout_channel: None | _CaptureChannel = None
+    _stderr_channel: None | _CaptureChannel = None
     _original_stdout: None | Any = None
     _original_stderr: None | Any = None
     _started: bool = False
+    # If set, the captured texts are appended to this buffer instead of messages.
+    _log_bufnr: None | int = None
 
     @classmethod
     def ensure_activate(cls) -> None:
@@ -64,57 +121,56 @@ class StdoutProxy:
         sys.stdout = cls._original_stdout
         sys.stderr = cls._original_stderr
 
+    @classmethod
+    def set_log_buffer(cls, bufnr: int | None) -> None:
+        """Deliver the captured texts to the buffer of `bufnr`, or to messages if `None`."""
+        cls._log_bufnr = bufnr
+
+    @classmethod
+    def get_log_buffer(cls) -> int | None:
+        return cls._log_bufnr
+
+    @classmethod
+    def stats(cls) -> dict[str, CaptureStats]:
+        stats = {}
+        if cls._stdout_channel:
+            stats["stdout"] = cls._stdout_channel.stats
+        if cls._stderr_channel:
+            stats["stderr"] = cls._stderr_channel.stats
+        return stats
+
     @classmethod
     def _activate(cls):
         cls._original_stdout = sys.stdout
         cls._original_stderr = sys.stderr
 
-        cls._stdout_queue = cls._stdout_queue if cls._stdout_queue else Queue(maxsize=2**20)
-        cls._stderr_queue = cls._stderr_queue if cls._stderr_queue else Queue(maxsize=2**20)
-        cls._assure_empty_queue(cls._stdout_queue)
-        cls._assure_empty_queue(cls._stderr_queue)
+        cls._stdout_channel = cls._stdout_channel if cls._stdout_channel else _CaptureChannel()
+        cls._stderr_channel = cls._stderr_channel if cls._stderr_channel else _CaptureChannel()
+        cls._stdout_channel.clear()
+        cls._stderr_channel.clear()
 
-        sys.stdout = _DummyPipe(cls._stdout_queue)
-        sys.stderr = _DummyPipe(cls._stderr_queue)
+        sys.stdout = _DummyPipe(cls._stdout_channel)
+        sys.stderr = _DummyPipe(cls._stderr_channel)
 
         cls._timer_taskname = TimerTask.register(cls.loop_function, interval=500, repeat=-1)
         cls._started = True
 
-    @classmethod
-    def _assure_empty_queue(cls, queue: Queue):
-        while not queue.empty():
-            try:
-                queue.get_nowait()
-            except Empty:
-                break
-
-    @classmethod
-    def _fetch_text(cls, queue: Queue):
-        text = ""
-        while True:
-            try:
-                part = queue.get_nowait()
-            except Empty:
-                break
-            text += part
-        return text
-
     @classmethod
     def _output_stdout(cls):
         text = ""
         # [NOTE]: I would like to use `Exception`.
         # If we use Exectpion it is almost impossible to check from neovim.
         # So message is used.
-        if cls._stdout_queue is None:
-            text += "Crucial implementaiont Error in StdoutProxy. (StdoutQueue)\n"
+        if cls._stdout_channel is None:
+            text += "Crucial implementaiont Error in StdoutProxy. (StdoutChannel)\n"
         if not cls._original_stdout:
             text += "Crucial implementaiont Error in StdoutProxy. (original_stdout)\n"
-        if cls._stdout_queue:
-            text += cls._fetch_text(cls._stdout_queue)
+        if cls._stdout_channel:
+            text += cls._stdout_channel.drain()
         # If empty, it should not be called.
         # It breaks!
 
-        cls._vim_message(text, level="ErrorMsg", with_echo=True)
+        cls._deliver(text, level="ErrorMsg")
 
         # if text:
         #    print(text, file=cls._original_stdout)
@@ -130,14 +186,14 @@ class StdoutProxy:
         # [NOTE]: I woud like to use `Exception`.
         # However, if we use Exectpion it is almost impossible to check from neovim.
         # So message is used.
-        if cls._stderr_queue is None:
-            text += "Crucial implementaiont Error in StdoutProxy. (StderrQueue)\n"
+        if cls._stderr_channel is None:
+            text += "Crucial implementaiont Error in StdoutProxy. (StderrChannel)\n"
         if not cls._original_stderr:
             text += "Crucial implementaiont Error in StdoutProxy. (original_stderr)\n"
-        if cls._stderr_queue:
-            text += cls._fetch_text(cls._stderr_queue)
+        if cls._stderr_channel:
+            text += cls._stderr_channel.drain()
         # If empty, the below should not be called. It raises Exception!
-        cls._vim_message(text, level=None, with_echo=True)
+        cls._deliver(text, level=None)
         # print(text, file=cls._original_stderr)
         # The below is not appropriate because other library may patch `sys.stdout`.
         # print(text, sys.__stdout__) For the case where other library patch `sys.stdout`
@@ -145,30 +201,67 @@ class StdoutProxy:
         # [ADD]: (2026/01/02): `print` does not seem to work in (VSCode+neovim) well,
         # # So, I introduced `_vim_message`.
 
+    @classmethod
+    def _deliver(cls, text: str, level: Literal["ErrorMsg"] | None = None) -> None:
+        if not text:
+            return
+        if cls._log_bufnr is not None and cls._append_to_log_buffer(cls._log_bufnr, text):
+            return
+        cls._vim_message(text, level=level, with_echo=True)
+
+    @classmethod
+    def _append_to_log_buffer(cls, bufnr: int, text: str) -> bool:
+        """Append `text` to the buffer with one write. Return False if the buffer is not available."""
+        try:
+            buffer = vim.buffers[bufnr]
+        except (KeyError, IndexError):
+            cls._log_bufnr = None
+            return False
+        if not buffer.valid:
+            cls._log_bufnr = None
+            return False
+        buffer.append(text.splitlines())
+        return True
+
     @classmethod
     def _vim_message(cls, text: str, level: Literal["ErrorMsg"] | None = None, with_echo: bool = True) -> None:
+        """Show `text` with a single `vim.command`.
+
+        If it fails, the lines are shown one by one, so that only the failing lines become `UnknownLine`.
+        """
         if not text:
             return
+        quoted = [f"'{line.replace("'", "''")}'" for line in text.splitlines()]
+        if with_echo:
+            echo = f"echo {' . "\\n" . '.join(quoted)}" if quoted else None
+        else:
+            echo = "echo '[echom] is used. See `:messages`. '"
+        commands = [f"echohl {level}"] if level else []
+        commands += [f"echom {line}" for line in quoted]
         if level:
-            vim.command(f"echohl {level}")
+            commands.append("echohl None")
+        if echo:
+            commands.append(echo)
+        try:
+            vim.command(" | ".join(commands))
+            return
+        except Exception:
+            pass
 
-        for line in text.splitlines():
-            safe = line.replace("'", "''")
+        if level:
+            vim.command(f"echohl {level}")
+        for line in quoted:
             try:
-                vim.command(f"echom '{safe}'")
+                vim.command(f"echom {line}")
             except Exception:
                 vim.command("echom 'UnknownLine'")
         if level:
             vim.command("echohl None")
-
-        if with_echo:
-            text = text.replace("'", "''")
+        if echo:
             try:
-                vim.command(f"echo '{text}'")
+                vim.command(echo)
             except Exception:
                 vim.command("echo 'UnknownLine'")
-        else:
-            vim.command("echo '[echom] is used. See `:messages`. '")
 
     @classmethod
     def add_message(cls, message: str) -> None:
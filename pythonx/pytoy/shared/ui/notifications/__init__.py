@@ -1,13 +1,25 @@
+import dataclasses
+import sys
+
 from pytoy.shared.ui.notifications.models import LEVEL, NotificationParam
 from pytoy.shared.ui.notifications.protocol import EphemeralNotificationProtocol
 from pytoy.shared.lib.backend import get_backend_enum, BackendEnum
 
 
 class EphemeralNotification(EphemeralNotificationProtocol):
-    def __init__(self, impl: EphemeralNotificationProtocol | None = None) -> None:
+    """`source` of the notifications without it is the module creating this, unless specified."""
+
+    def __init__(self, impl: EphemeralNotificationProtocol | None = None, *, source: str | None = None) -> None:
         if impl is None:
-            impl = _get_implementation()
+            from pytoy.contexts.core import GlobalCoreContext
+
+            impl = GlobalCoreContext.get().notification_broker
         self._impl = impl
+        self._source = source if source is not None else sys._getframe(1).f_globals.get("__name__")
+
+    @property
+    def source(self) -> str | None:
+        return self._source
 
     @property
     def impl(self) -> EphemeralNotificationProtocol:
@@ -18,10 +30,15 @@ class EphemeralNotification(EphemeralNotificationProtocol):
         message: str,
         param: NotificationParam | LEVEL = "info",
     ) -> None:
+        if not isinstance(param, NotificationParam):
+            param = NotificationParam.from_level(param)
+        if param.source is None:
+            param = dataclasses.replace(param, source=self._source)
         return self._impl.notify(message, param)
 
 
-def _get_implementation() -> EphemeralNotificationProtocol:
+def get_backend_notification() -> EphemeralNotificationProtocol:
+    """Return the implementation of the backend, which issues one UI call per `notify`."""
     backend_enum = get_backend_enum()
     if backend_enum == BackendEnum.VIM:
         from pytoy.shared.ui.notifications.impls.vim import EphemeralNotificationVim
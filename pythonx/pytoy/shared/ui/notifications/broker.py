@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections import deque
+from typing import Callable, Mapping
+
+from pytoy.shared.ui.notifications.models import LEVEL, NotificationParam, NotificationRecord
+from pytoy.shared.ui.notifications.protocol import EphemeralNotificationProtocol
+
+
+PRIORITIES: Mapping[LEVEL, int] = {"info": 0, "warning": 1, "error": 2}
+
+type Schedule = Callable[[Callable[[], None], float], None]
+
+
+def _schedule_with_timer_task(func: Callable[[], None], delay: float) -> None:
+    """Call `func` after `delay` seconds, in the main loop of the editor."""
+    from pytoy.shared.lib.backend import get_backend_enum, BackendEnum
+
+    if get_backend_enum() == BackendEnum.DUMMY:
+        # `TimerTaskImplDummy` executes a oneshot at once, regardless of `interval`.
+        timer = threading.Timer(delay, func)
+        timer.daemon = True
+        timer.start()
+    else:
+        from pytoy.shared.timertask import TimerTask
+
+        TimerTask.execute_oneshot(func, interval=max(1, math.ceil(delay * 1000)))
+
+
+class _Bucket:
+    """Token bucket of a source: `burst` notifications at once, and `rate` per second after that."""
+
+    def __init__(self, burst: int, now: float) -> None:
+        self.tokens = float(burst)
+        self.updated = now
+
+    def take(self, now: float, rate: float, burst: int) -> bool:
+        self.tokens = min(float(burst), self.tokens + (now - self.updated) * rate)
+        self.updated = now
+        if self.tokens < 1.0:
+            return False
+        self.tokens -= 1.0
+        return True
+
+    def wait(self, now: float, rate: float) -> float:
+        """Seconds until the next token."""
+        return max(0.0, (1.0 - self.tokens) / rate - (now - self.updated))
+
+
+class _Pending:
+    def __init__(self, message: str, param: NotificationParam) -> None:
+        self.message = message
+        self.param = param
+        self.count = 1
+        self.timestamp = time.time()
+
+
+class NotificationBroker(EphemeralNotificationProtocol):
+    """Deliver the notifications to `sink`, throttled per `NotificationParam.source`.
+
+    * The notifications of `bypass_level` or higher are delivered at once.
+    * The others exceeding the rate of the source wait for the next token, and
+      the identical ones among them are merged into one with the count.
+      When the token comes, the waiting notification of the highest level is delivered first.
+    * The delivered notifications are kept in `history`.
+    """
+
+    def __init__(
+        self,
+        sink: EphemeralNotificationProtocol,
+        *,
+        rate: float = 1.0,
+        burst: int = 3,
+        bypass_level: LEVEL = "error",
+        history_size: int = 200,
+        clock: Callable[[], float] = time.monotonic,
+        schedule: Schedule | None = None,
+    ) -> None:
+        self._sink = sink
+        self._rate = rate
+        self._burst = burst
+        self._bypass_priority = PRIORITIES[bypass_level]
+        self._clock = clock
+        self._schedule = schedule or _schedule_with_timer_task
+        self._lock = threading.Lock()
+        self._buckets: dict[str | None, _Bucket] = {}
+        # source -> (level, message) -> `_Pending`, in the order of arrival.
+        self._pending: dict[str | None, dict[tuple[LEVEL, str], _Pending]] = {}
+        self._flush_scheduled = False
+        self._history: deque[NotificationRecord] = deque(maxlen=history_size)
+        self.n_received = 0
+        self.n_delivered = 0
+
+    @property
+    def sink(self) -> EphemeralNotificationProtocol:
+        return self._sink
+
+    @property
+    def history(self) -> list[NotificationRecord]:
+        with self._lock:
+            return list(self._history)
+
+    @property
+    def n_pending(self) -> int:
+        with self._lock:
+            return sum(item.count for items in self._pending.values() for item in items.values())
+
+    def notify(
+        self,
+        message: str,
+        param: NotificationParam | LEVEL = "info",
+    ) -> None:
+        if not isinstance(param, NotificationParam):
+            param = NotificationParam.from_level(param)
+        now = self._clock()
+        with self._lock:
+            self.n_received += 1
+            if PRIORITIES[param.level] < self._bypass_priority:
+                pending = self._pending.get(param.source)
+                if pending is not None or not self._bucket(param.source, now).take(now, self._rate, self._burst):
+                    # Behind the waiting ones of the source, to keep the order.
+                    pending = self._pending.setdefault(param.source, {})
+                    if (item := pending.get((param.level, message))) is not None:
+                        item.count += 1
+                        item.timestamp = time.time()
+                    else:
+                        pending[(param.level, message)] = _Pending(message, param)
+                    self._request_flush(now)
+                    return
+        self._deliver([_Pending(message, param)])
+
+    def flush(self) -> None:
+        """Deliver the waiting notifications whose sources have the tokens."""
+        now = self._clock()
+        deliveries: list[_Pending] = []
+        with self._lock:
+            self._flush_scheduled = False
+            for source, pending in list(self._pending.items()):
+                bucket = self._bucket(source, now)
+                while pending and bucket.take(now, self._rate, self._burst):
+                    # `max` returns the first, that is, the oldest of the highest level.
+                    key = max(pending, key=lambda key: PRIORITIES[key[0]])
+                    deliveries.append(pending.pop(key))
+                if not pending:
+                    del self._pending[source]
+            if self._pending:
+                self._request_flush(now)
+        self._deliver(deliveries)
+
+    def _bucket(self, source: str | None, now: float) -> _Bucket:
+        if (bucket := self._buckets.get(source)) is None:
+            bucket = self._buckets[source] = _Bucket(self._burst, now)
+        return bucket
+
+    def _request_flush(self, now: float) -> None:
+        if self._flush_scheduled:
+            return
+        self._flush_scheduled = True
+        delay = min(self._bucket(source, now).wait(now, self._rate) for source in self._pending)
+        self._schedule(self.flush, delay)
+
+    def _deliver(self, items: list[_Pending]) -> None:
+        for item in items:
+            record = NotificationRecord(
+                timestamp=item.timestamp,
+                source=item.param.source,
+                level=item.param.level,
+                message=item.message,
+                count=item.count,
+            )
+            with self._lock:
+                self._history.append(record)
+                self.n_delivered += 1
+            self._sink.notify(record.text, item.param)
@@ -16,6 +16,32 @@ class NotificationParam:
 
     timeout: int | None = None
 
+    # The origin of the notification, which is throttled separately.
+    # `None` is the origin shared by the unspecified notifications.
+    source: str | None = None
+
     @classmethod
     def from_level(cls, level: LEVEL = "info") -> Self:
         return cls(level=level, timeout=None)
+
+
+@dataclass(frozen=True)
+class NotificationRecord:
+    """A notification kept in the history of `NotificationBroker`."""
+
+    timestamp: float  # `time.time()` of the latest occurrence.
+    source: str | None
+    level: LEVEL
+    message: str
+    count: int = 1  # The identical notifications merged into this.
+
+    @property
+    def text(self) -> str:
+        """The displayed message."""
+        return self.message if self.count == 1 else f"{self.message} (x{self.count})"
+
+    def to_line(self) -> str:
+        import time
+
+        clock = time.strftime("%H:%M:%S", time.localtime(self.timestamp))
+        return f"{clock} [{self.level}] {self.source or '-'}: {self.text}"
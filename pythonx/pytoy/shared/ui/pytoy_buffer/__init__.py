@@ -167,17 +167,7 @@ class PytoyBufferProvider(PytoyBufferProviderProtocol):
     def query(self, query: BufferQuery | BufferSource) -> Sequence[PytoyBuffer]:
         if isinstance(query, BufferSource):
             query = BufferQuery.from_source(query)
-        buffers = self.get_buffers(query.is_normal_type)
-        buffer_sources = query.buffer_sources
-        if buffer_sources is None:
-            return buffers
-        else:
-            result = []
-            for source in buffer_sources:
-                # print("buffers-sources", [elem.source for elem in buffers])
-                # print("source", source)
-                result += [elem for elem in buffers if elem.source == source]
-            return result
+        return [PytoyBuffer(elem) for elem in self.impl.query(query)]
 
 
 def make_buffer(source: str | Path | BufferSource, mode: Literal["vertical", "horizontal"] = "vertical") -> PytoyBuffer:
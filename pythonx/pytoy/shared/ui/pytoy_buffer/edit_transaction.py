@@ -0,0 +1,127 @@
+"""Collect several replacements and apply them to the buffer at once.
+
+Example:
+    with buffer.range_operator.transaction() as transaction:
+        transaction.replace_text(selection1, "text")
+        transaction.replace_lines(LineRange(10, 12), ["line"])
+    transaction.results  # Ranges of the replaced regions after all the edits.
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Sequence, Self
+
+from pytoy.shared.lib.text import CharacterRange, CursorPosition, LineRange
+
+
+@dataclass(frozen=True)
+class BufferEdit:
+    """A replacement of `target` by `replacement`.
+
+    * `CharacterRange` target is replaced by `str`, same as `replace_text`.
+    * `LineRange` target is replaced by lines, same as `replace_lines`.
+    """
+
+    target: CharacterRange | LineRange
+    replacement: str | tuple[str, ...]
+
+    @classmethod
+    def text(cls, character_range: CharacterRange, text: str) -> Self:
+        return cls(character_range, text)
+
+    @classmethod
+    def lines(cls, line_range: LineRange, lines: Sequence[str]) -> Self:
+        return cls(line_range, tuple(lines))
+
+    @property
+    def start(self) -> CursorPosition:
+        if isinstance(self.target, LineRange):
+            return CursorPosition(self.target.start, 0)
+        return self.target.start
+
+    @property
+    def end(self) -> CursorPosition:
+        if isinstance(self.target, LineRange):
+            return CursorPosition(self.target.end, 0)
+        return self.target.end
+
+    @property
+    def is_insertion(self) -> bool:
+        return self.start == self.end
+
+
+type EditResult = CharacterRange | LineRange
+
+
+def _key(position: CursorPosition) -> tuple[int, int]:
+    return (position.line, position.col)
+
+
+def order_edits(edits: Sequence[BufferEdit]) -> list[int]:
+    """Return the indices of `edits` in the order of application (bottom-up).
+
+    Raises `ValueError` if regions of `edits` overlap.
+    Insertions at the start of another edit are placed before its replacement.
+    """
+    ascending = sorted(range(len(edits)), key=lambda i: (_key(edits[i].start), not edits[i].is_insertion))
+    prev: BufferEdit | None = None
+    end_so_far: tuple[int, int] | None = None
+    for index in ascending:
+        edit = edits[index]
+        if prev is not None and end_so_far is not None:
+            if _key(edit.start) < end_so_far:
+                raise ValueError(f"Overlapping edits, {prev.target=}, {edit.target=}")
+            if edit.is_insertion and prev.is_insertion and prev.start == edit.start:
+                raise ValueError(f"Ambiguous insertions at the same position, {edit.start=}")
+        prev = edit
+        end_so_far = max(end_so_far, _key(edit.end)) if end_so_far else _key(edit.end)
+    return list(reversed(ascending))
+
+
+class EditTransaction:
+    """Collect edits and apply them by `apply` when committed.
+
+    The coordinates of all the edits refer to the buffer before the transaction.
+    Used as a context manager, it is committed at the exit unless an exception occurs.
+    """
+
+    def __init__(self, apply: Callable[[Sequence[BufferEdit]], list[EditResult]]) -> None:
+        self._apply = apply
+        self._edits: list[BufferEdit] = []
+        self._results: list[EditResult] | None = None
+
+    @property
+    def edits(self) -> Sequence[BufferEdit]:
+        return self._edits
+
+    @property
+    def results(self) -> list[EditResult]:
+        """The replaced regions after commit, in the order the edits were added."""
+        if self._results is None:
+            raise RuntimeError("The transaction is not committed yet.")
+        return self._results
+
+    def add(self, edit: BufferEdit) -> int:
+        if self._results is not None:
+            raise RuntimeError("The transaction is already committed.")
+        self._edits.append(edit)
+        return len(self._edits) - 1
+
+    def replace_text(self, character_range: CharacterRange, text: str) -> int:
+        """Return the index of the edit in `results`."""
+        return self.add(BufferEdit.text(character_range, text))
+
+    def replace_lines(self, line_range: LineRange, lines: Sequence[str]) -> int:
+        """Return the index of the edit in `results`."""
+        return self.add(BufferEdit.lines(line_range, lines))
+
+    def commit(self) -> list[EditResult]:
+        if self._results is None:
+            self._results = self._apply(self._edits) if self._edits else []
+        return self._results
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.commit()
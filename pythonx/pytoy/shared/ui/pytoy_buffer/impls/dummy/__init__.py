@@ -14,6 +14,7 @@ from pytoy.shared.lib.events.action_events import KeyActionEvents
 from pytoy.shared.lib.entity import EntityRegistry
 from pytoy.shared.lib.event.domain import Event, EventEmitter
 from pytoy.shared.lib.text import LineRange, CharacterRange, CursorPosition
+from pytoy.shared.ui.pytoy_buffer.edit_transaction import BufferEdit, EditResult, EditTransaction
 
 if TYPE_CHECKING:
     from pytoy.shared.ui.pytoy_window.protocol import PytoyWindowProtocol
@@ -41,10 +42,19 @@ class RangeOperatorDummy(RangeOperatorProtocol):
         start = self._cursor_to_offset(character_range.start)
         end = self._cursor_to_offset(character_range.end)
         new_text = full_text[:start] + text + full_text[end:]
-        self._lines = new_text.splitlines()
+        # In place, since the list is shared with the buffer.
+        self._lines[:] = new_text.splitlines()
         end_cursor = self._offset_to_cursor(start + len(text))
         return CharacterRange(character_range.start, end_cursor)
 
+    def apply_edits(self, edits: Sequence[BufferEdit]) -> list[EditResult]:
+        from pytoy.shared.ui.pytoy_buffer.impls.vim_buffer_utils import VimBufferRangeHandler
+
+        return VimBufferRangeHandler(self._lines).apply_edits(edits)  # type: ignore[arg-type]
+
+    def transaction(self) -> EditTransaction:
+        return EditTransaction(self.apply_edits)
+
     def find_first(
         self, text: str, target_range: CharacterRange | None = None, reverse: bool = False
     ) -> CharacterRange | None:
@@ -128,12 +138,13 @@ class PytoyBufferDummy(PytoyBufferProtocol):
         return self._buffer_id
 
     def init_buffer(self, content: str = ""):
-        self._lines = content.splitlines()
+        self._lines[:] = content.splitlines()
 
     @property
     def uri(self) -> URI:
         return URI(scheme=self._buffer_source.type, path=self._buffer_source.name)
 
+    @property
     def source(self) -> BufferSource:
         return self._buffer_source
 
@@ -197,3 +208,13 @@ class PytoyBufferProviderDummy(PytoyBufferProviderProtocol):
             return list(self.buffers.values())[0]
         else:
             return self.create_buffer()
+
+    def query(self, query: BufferQuery) -> Sequence[PytoyBufferProtocol]:
+        items = self.get_buffers(query.is_normal_type)
+        buffer_sources = query.buffer_sources
+        if buffer_sources is None:
+            return items
+        result = []
+        for source in buffer_sources:
+            result += [item for item in items if item.source == source]
+        return result
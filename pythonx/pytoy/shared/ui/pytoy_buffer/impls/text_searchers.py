@@ -1,4 +1,4 @@
-from pytoy.shared.lib.text import CursorPosition, CharacterRange
+from pytoy.shared.lib.text import CursorPosition, CharacterRange, line_starts
 from typing import Sequence, Self
 
 
@@ -18,6 +18,7 @@ class TextSearcher:
         cls,
         lines: Sequence[str],
         target_range: CharacterRange | None = None,
+        first_line: int = 0,
     ) -> Self:
         """
         Create a TextSearcher whose internal text is restricted to the given range.
@@ -27,46 +28,39 @@ class TextSearcher:
 
         `line_offset` is propagated the final CharacterRange.
         In all the lines, it assumes that `lines` starts from `line_offset`.
+
+        `first_line` is the line number of `lines[0]`, so that only a window
+        of the buffer covering `target_range` can be passed.
         """
 
         if target_range is None:
-            return cls(lines=lines, line_offset=0, col_offset=0)
+            return cls(lines=lines, line_offset=first_line, col_offset=0)
         if not lines:
-            return cls(lines=lines, line_offset=0, col_offset=0)
+            return cls(lines=lines, line_offset=first_line, col_offset=0)
         start, end = target_range.start, target_range.end
 
+        def _line_at(line: int) -> str:
+            # `end` may point just after the last line, e.g. `entire_character_range`.
+            index = line - first_line
+            return lines[index] if index < len(lines) else ""
+
         if start.line == end.line:
-            target_line = lines[start.line]
+            target_line = _line_at(start.line)
             return cls(lines=[target_line[start.col : end.col]], line_offset=start.line, col_offset=start.col)
         else:
-            first_line = lines[start.line][start.col :]
-            final_line = lines[end.line][: target_range.end.col]
-            target = [first_line, *lines[start.line + 1 : end.line], final_line]
+            first_line_text = _line_at(start.line)[start.col :]
+            final_line_text = _line_at(end.line)[: target_range.end.col]
+            middle = lines[start.line - first_line + 1 : end.line - first_line]
+            target = [first_line_text, *middle, final_line_text]
             return cls(lines=target, line_offset=start.line, col_offset=start.col)
 
     def _build_text_and_offsets(self, lines: Sequence[str]) -> tuple[str, list[int]]:
         """Return the concatenated text and offsets of lines."""
-        text = "\n".join(lines)
-        offsets = []
-        pos = 0
-        for line in lines:
-            offsets.append(pos)
-            pos += len(line) + 1  # +1 for '\n'
-        return text, offsets
+        return "\n".join(lines), line_starts(lines)
 
     def _cursor_to_index(self, pos: CursorPosition) -> int:
         return self._line_offsets[pos.line] + pos.col
 
-    def _index_to_cursor(self, index: int) -> CursorPosition:
-        # find rightmost line whose offset <= index
-        line = 0
-        for i, offset in enumerate(self._line_offsets):
-            if offset > index:
-                break
-            line = i
-        col = index - self._line_offsets[line]
-        return CursorPosition(line=line, col=col)
-
     def find_first(
         self,
         text: str,
@@ -83,36 +77,23 @@ class TextSearcher:
         if idx == -1:
             return None
 
-        start_cursor = self._index_to_cursor(idx)
-        end_cursor = self._index_to_cursor(idx + len(text))
-        return self._solve_offset(start_cursor, end_cursor)
+        return self._to_ranges([(idx, idx + len(text))])[0]
 
     def find_all(self, text: str) -> list[CharacterRange]:
         """return the all matched selections of `text`"""
         if not text:
             return []
-        results: list[CharacterRange] = []
+        spans: list[tuple[int, int]] = []
         start = 0
         while True:
             idx = self._content.find(text, start)
             if idx == -1:
                 break
-            s = self._index_to_cursor(idx)
-            e = self._index_to_cursor(idx + len(text))
-            results.append(self._solve_offset(s, e))
             start = idx + len(text)
-        return results
-
-    def _solve_offset(self, start_cursor: CursorPosition, end_cursor: CursorPosition) -> CharacterRange:
-
-        def _solve(cursor: CursorPosition) -> CursorPosition:
-            line = cursor.line + self.line_offset
-            if cursor.line == 0:
-                col = cursor.col + self.col_offset
-            else:
-                col = cursor.col
-            return CursorPosition(line, col)
+            spans.append((idx, start))
+        return self._to_ranges(spans)
 
-        start = _solve(start_cursor)
-        end = _solve(end_cursor)
-        return CharacterRange(start=start, end=end)
+    def _to_ranges(self, spans: Sequence[tuple[int, int]]) -> list[CharacterRange]:
+        return CharacterRange.from_offsets(
+            spans, self._line_offsets, first_line=self.line_offset, first_col=self.col_offset
+        )
@@ -1,5 +1,6 @@
 from __future__ import annotations
 from pytoy.shared.ui.pytoy_buffer.impls.vim.kernel import VimBufferKernel
+from pytoy.shared.ui.pytoy_buffer.impls.vim.buffer_index import VimBufferIndex, VimBufferRecord
 from pytoy.shared.ui.pytoy_buffer.impls.vim.range_operator import RangeOperatorVim
 from pytoy.shared.ui.pytoy_buffer.models import BufferEvents, BufferQuery, BufferSource, URI
 import vim
@@ -31,6 +32,7 @@ class PytoyBufferVim(PytoyBufferProtocol):
             ctx = GlobalVimContext.get()
         kernel_registry: EntityRegistry[int, VimBufferKernel] = ctx.buffer_kernel_registry
         self._kernel = kernel_registry.get(bufnr)
+        self._ctx = ctx
 
     @property
     def kernel(self) -> VimBufferKernel:
@@ -63,28 +65,24 @@ class PytoyBufferVim(PytoyBufferProtocol):
     def get_current(cls) -> PytoyBufferProtocol:
         return PytoyBufferVim.from_buffer(vim.current.buffer)
 
+    @property
+    def record(self) -> VimBufferRecord:
+        record = self._ctx.buffer_index.get(self.bufnr)
+        if record is None:
+            raise ValueError("Invalid Buffer")
+        return record
+
     @property
     def uri(self) -> URI:
-        buftype = vim.eval(f"getbufvar({self.buffer.number}, '&buftype')")
-        if buftype == "":
-            return URI(scheme="file", path=self.buffer.name)
-        else:
-            return URI(scheme=buftype, path=self.buffer.name)
+        return self.record.uri
 
     @property
     def source(self) -> BufferSource:
-        buftype = vim.eval(f"getbufvar({self.buffer.number}, '&buftype')")
-        if buftype == "":
-            return BufferSource.from_path(Path(self.buffer.name))
-        else:
-            # [NOTE]: For non-file buffer, we use `nofile` as the type and the buffer name as the name.
-            # In some cases, the buffer name includes the current working directory, so we use `Path(self.buffer.name).name` to get the basename.
-            return BufferSource.from_no_file(Path(self.buffer.name).name)
+        return self.record.source
 
     @property
     def is_file(self) -> bool:
-        buftype = vim.eval(f"getbufvar({self.buffer.number}, '&buftype')")
-        return buftype == "" and bool(self.buffer.name)
+        return self.record.is_file
 
     @property
     def is_normal_type(self) -> bool:
@@ -94,8 +92,7 @@ class PytoyBufferVim(PytoyBufferProtocol):
         non-normal.
         """
         try:
-            buftype = vim.eval(f"getbufvar({self.buffer.number}, '&buftype')")
-            return buftype in {"", "nofile"}
+            return self.record.is_normal_type
         except VIM_ERROR:
             return False
         except (AttributeError, TypeError, ValueError):
@@ -184,25 +181,35 @@ class PytoyBufferVim(PytoyBufferProtocol):
 
 
 class PytoyBufferProviderVim(PytoyBufferProviderProtocol):
+    def __init__(self, *, ctx: GlobalVimContext | None = None) -> None:
+        if ctx is None:
+            from pytoy.contexts.vim import GlobalVimContext
+
+            ctx = GlobalVimContext.get()
+        self._ctx = ctx
+
+    @property
+    def buffer_index(self) -> VimBufferIndex:
+        return self._ctx.buffer_index
+
     def get_buffers(self, is_normal_type: bool = True) -> Sequence[PytoyBufferProtocol]:
         return self._get_pytoy_buffer_vim_impls(is_normal_type=is_normal_type)
 
     def _get_pytoy_buffer_vim_impls(self, is_normal_type: bool = True) -> Sequence[PytoyBufferVim]:
-        buffers = [PytoyBufferVim.from_buffer(buf) for buf in vim.buffers if buf.valid]
-        if is_normal_type:
-            buffers = [elem for elem in buffers if elem.is_normal_type]
-        return buffers
+        records = self.buffer_index.records(is_normal_type=is_normal_type)
+        return [PytoyBufferVim(record.bufnr, ctx=self._ctx) for record in records]
 
     def get_current(self) -> PytoyBufferProtocol:
         return PytoyBufferVim.from_buffer(vim.current.buffer)
 
     def query(self, query: BufferQuery) -> Sequence[PytoyBufferProtocol]:
-        buffers = self._get_pytoy_buffer_vim_impls(query.is_normal_type)
         buffer_sources = query.buffer_sources
         if buffer_sources is None:
-            return buffers
-        else:
-            result = []
-            for source in buffer_sources:
-                result += [elem for elem in buffers if elem.is_file and elem.source == source]
-            return result
+            return self._get_pytoy_buffer_vim_impls(query.is_normal_type)
+        result = []
+        for source in buffer_sources:
+            records = self.buffer_index.find(source)
+            if query.is_normal_type:
+                records = [record for record in records if record.is_normal_type]
+            result += [PytoyBufferVim(record.bufnr, ctx=self._ctx) for record in records]
+        return result
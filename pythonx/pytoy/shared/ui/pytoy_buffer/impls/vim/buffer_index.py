@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import vim
+from collections import defaultdict
+from dataclasses import dataclass
+from functools import cached_property
+from pathlib import Path
+from typing import Iterator, TYPE_CHECKING
+
+from pytoy.shared.lib.event.domain import Disposable
+from pytoy.shared.lib.events.buffer_events import GlobalBufferEventProvider
+from pytoy.shared.ui.pytoy_buffer.models import BufferSource, URI
+
+if TYPE_CHECKING:
+    from pytoy.contexts.vim import GlobalVimContext
+
+
+# One round trip for every buffer: `[bufnr, name, buftype]`.
+BUFINFO_EXPR = "map(getbufinfo(), {_, b -> [b.bufnr, b.name, getbufvar(b.bufnr, '&buftype')]})"
+# The largest `bufnr`, which changes when a buffer is created or the last one is wiped.
+LAST_BUFNR_EXPR = "bufnr('$')"
+
+
+@dataclass(frozen=True)
+class VimBufferRecord:
+    """Snapshot of the attributes of a vim buffer which pytoy queries frequently."""
+
+    bufnr: int
+    name: str
+    buftype: str
+
+    @cached_property
+    def uri(self) -> URI:
+        if self.buftype == "":
+            return URI(scheme="file", path=self.name)
+        else:
+            return URI(scheme=self.buftype, path=self.name)
+
+    @cached_property
+    def source(self) -> BufferSource:
+        if self.buftype == "":
+            return BufferSource.from_path(Path(self.name))
+        else:
+            # [NOTE]: For non-file buffer, we use `nofile` as the type and the buffer name as the name.
+            # In some cases, the buffer name includes the current working directory, so we use `Path(self.buffer.name).name` to get the basename.
+            return BufferSource.from_no_file(Path(self.name).name)
+
+    @property
+    def is_file(self) -> bool:
+        return self.buftype == "" and bool(self.name)
+
+    @property
+    def is_normal_type(self) -> bool:
+        return self.buftype in {"", "nofile"}
+
+    @cached_property
+    def file_path(self) -> Path | None:
+        return Path(self.source.name) if self.is_file else None
+
+
+class VimBufferIndex:
+    """Index of buffers maintained from the buffer lifecycle autocmds.
+
+    The whole table is fetched lazily with one `vim.eval`, and after that
+    each entry is refreshed only when `BufAdd/BufNew`, `BufFilePost`,
+    `OptionSet buftype` or `BufWipeout` fires for it.
+
+    NOTE: Autocmds are not nested by default, so changes performed inside other
+    autocmds (or with `noautocmd`) are not observed. Hence,
+    * `get` and `find` fetch from vim again on a miss,
+    * `records` rebuilds the index if the largest `bufnr` differs from the one in vim.
+    Renames which are not observed are fixed by `invalidate`, or `refresh` to rebuild everything.
+    """
+
+    def __init__(self, *, ctx: GlobalVimContext | None = None) -> None:
+        provider = GlobalBufferEventProvider(ctx=ctx)
+        self._records: dict[int, VimBufferRecord] = {}
+        self._source_to_bufnrs: defaultdict[BufferSource, set[int]] = defaultdict(set)
+        self._built = False
+        self._disposables: list[Disposable] = [
+            provider.added.subscribe(self.invalidate),
+            provider.renamed.subscribe(self.invalidate),
+            provider.buftype_set.subscribe(self.invalidate),
+            provider.wipeout.subscribe(self._remove),
+        ]
+
+    def get(self, bufnr: int) -> VimBufferRecord | None:
+        """Return the record of `bufnr`, or None if the buffer does not exist."""
+        self._ensure_built()
+        if (record := self._records.get(bufnr)) is not None:
+            return record
+        # Not observed via autocmds (e.g. `noautocmd`).
+        # The result is not stored, since this may be called while the buffer is being wiped.
+        return self._fetch(bufnr)
+
+    def records(self, is_normal_type: bool = False) -> Iterator[VimBufferRecord]:
+        """Iterate records in the order of `bufnr`, same as `vim.buffers`."""
+        self._ensure_current()
+        for bufnr in sorted(self._records):
+            record = self._records[bufnr]
+            if is_normal_type and not record.is_normal_type:
+                continue
+            yield record
+
+    def find(self, source: BufferSource) -> list[VimBufferRecord]:
+        """Return the records whose `source` is equal to `source`."""
+        if not self._built or source not in self._source_to_bufnrs:
+            # A miss may be a buffer which is created or renamed without the autocmds.
+            self.refresh()
+        bufnrs = self._source_to_bufnrs.get(source)
+        if not bufnrs:
+            return []
+        return [self._records[bufnr] for bufnr in sorted(bufnrs)]
+
+    def invalidate(self, bufnr: int) -> None:
+        """Re-fetch the record of `bufnr` from vim."""
+        if not self._built:
+            return  # The whole table is fetched at the first access.
+        record = self._fetch(bufnr)
+        if record is None:
+            self._remove(bufnr)
+        else:
+            self._store(record)
+
+    def refresh(self) -> None:
+        """Rebuild the whole index from vim."""
+        self._records.clear()
+        self._source_to_bufnrs.clear()
+        for bufnr, name, buftype in vim.eval(BUFINFO_EXPR):
+            self._store(VimBufferRecord(int(bufnr), name, buftype))
+        self._built = True
+
+    def dispose(self) -> None:
+        for disposable in self._disposables:
+            disposable.dispose()
+        self._disposables.clear()
+
+    def _ensure_built(self) -> None:
+        if not self._built:
+            self.refresh()
+
+    def _ensure_current(self) -> None:
+        if not self._built or int(vim.eval(LAST_BUFNR_EXPR)) != max(self._records, default=0):
+            self.refresh()
+
+    def _fetch(self, bufnr: int) -> VimBufferRecord | None:
+        try:
+            buffer = vim.buffers[bufnr]
+        except (KeyError, IndexError):
+            return None
+        if not buffer.valid:
+            return None
+        buftype = vim.eval(f"getbufvar({bufnr}, '&buftype')")
+        return VimBufferRecord(bufnr, buffer.name or "", buftype)
+
+    def _store(self, record: VimBufferRecord) -> None:
+        self._remove(record.bufnr)
+        self._records[record.bufnr] = record
+        self._source_to_bufnrs[record.source].add(record.bufnr)
+
+    def _remove(self, bufnr: int) -> None:
+        record = self._records.pop(bufnr, None)
+        if record is None:
+            return
+        bufnrs = self._source_to_bufnrs.get(record.source)
+        if bufnrs is not None:
+            bufnrs.discard(bufnr)
+            if not bufnrs:
+                del self._source_to_bufnrs[record.source]
@@ -1,18 +1,39 @@
 from __future__ import annotations
 
 import vim
+from dataclasses import dataclass
+from functools import cached_property
 from typing import TYPE_CHECKING
 
 from pytoy.shared.lib.entity import MortalEntityProtocol
 from pytoy.shared.lib.event.domain import Event
 from pytoy.shared.lib.events.buffer_events import ScopedBufferEventProvider
 from pytoy.shared.lib.events.action_events import KeyActionEvents
+from pytoy.shared.lib.text import LineRange
 from pytoy.shared.ui.pytoy_buffer.models import BufferEvents
+from pytoy.shared.ui.pytoy_buffer.impls.vim_buffer_utils import VimBufferRangeHandler
 
 if TYPE_CHECKING:
     from pytoy.contexts.vim import GlobalVimContext
 
 
+@dataclass(frozen=True)
+class _LinesCache:
+    """The last fetched window of lines, valid while `changedtick` is unchanged."""
+
+    changedtick: int
+    line_range: LineRange
+    lines: list[str]
+
+    def get(self, changedtick: int, line_range: LineRange) -> list[str] | None:
+        if changedtick != self.changedtick:
+            return None
+        if not (self.line_range.start <= line_range.start and line_range.end <= self.line_range.end):
+            return None
+        offset = self.line_range.start
+        return self.lines[line_range.start - offset : line_range.end - offset]
+
+
 class VimBufferKernel(MortalEntityProtocol):
     def __init__(self, bufnr: int, *, ctx: GlobalVimContext | None = None) -> None:
         self._bufnr = bufnr
@@ -27,6 +48,9 @@ class VimBufferKernel(MortalEntityProtocol):
         self._key_action_events = KeyActionEvents(ctx.keymap_manager, bufnr)
         self.on_wipeout = self.on_end
 
+        self._lines_cache: _LinesCache | None = None
+        self._content_cache: tuple[int, str] | None = None
+
         self.on_wipeout.subscribe(lambda _: self._key_action_events.clear())
 
     @property
@@ -62,14 +86,54 @@ class VimBufferKernel(MortalEntityProtocol):
         except Exception:
             return None
 
+    @cached_property
+    def range_handler(self) -> VimBufferRangeHandler:
+        """Shared by the `RangeOperatorVim`s of this buffer."""
+        buffer = self.buffer
+        if buffer is None:
+            raise RuntimeError(f"Invalid `buffer`, {self._bufnr}")
+        return VimBufferRangeHandler(buffer)
+
+    @property
+    def changedtick(self) -> int:
+        return int(vim.eval(f"getbufvar({self._bufnr}, 'changedtick')"))
+
     @property
     def content(self) -> str:
         buffer = self.buffer
-        if buffer:
-            return vim.eval("join(getbufline({}, 1, '$'), '\n')".format(buffer.number))
-        return ""
+        if not buffer:
+            return ""
+        changedtick = self.changedtick
+        if self._content_cache and self._content_cache[0] == changedtick:
+            return self._content_cache[1]
+        if self._lines_cache and (lines := self._lines_cache.get(changedtick, LineRange(0, len(buffer)))) is not None:
+            content = "\n".join(lines)
+        else:
+            content = vim.eval("join(getbufline({}, 1, '$'), '\n')".format(buffer.number))
+        self._content_cache = (changedtick, content)
+        return content
 
     @property
     def lines(self) -> list[str]:
         buffer = self.buffer
-        return buffer[:] if buffer else []
+        return self.get_lines(LineRange(0, len(buffer))) if buffer else []
+
+    def get_lines(self, line_range: LineRange) -> list[str]:
+        """Return only the lines within `line_range` (0-based, exclusive end).
+
+        The last fetched window is reused while `b:changedtick` is unchanged.
+        """
+        buffer = self.buffer
+        if not buffer:
+            return []
+        start = max(0, line_range.start)
+        end = min(line_range.end, len(buffer))
+        if end <= start:
+            return []
+        line_range = LineRange(start, end)
+        changedtick = self.changedtick
+        if self._lines_cache and (lines := self._lines_cache.get(changedtick, line_range)) is not None:
+            return lines
+        lines = buffer[start:end]
+        self._lines_cache = _LinesCache(changedtick, line_range, lines)
+        return list(lines)
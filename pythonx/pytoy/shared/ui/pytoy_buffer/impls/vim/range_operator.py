@@ -4,6 +4,7 @@ import vim
 from pytoy.shared.lib.text import CharacterRange, CursorPosition, LineRange
 from pytoy.shared.ui.pytoy_buffer.impls.vim.kernel import VimBufferKernel
 from pytoy.shared.ui.pytoy_buffer.impls.vim_buffer_utils import VimBufferRangeHandler
+from pytoy.shared.ui.pytoy_buffer.edit_transaction import BufferEdit, EditResult, EditTransaction
 from pytoy.shared.ui.pytoy_buffer.protocol import RangeOperatorProtocol
 from pytoy.shared.ui.pytoy_buffer.impls.text_searchers import TextSearcher
 
@@ -26,32 +27,44 @@ class RangeOperatorVim(RangeOperatorProtocol):
             raise RuntimeError(f"Invalid `buffer`, {self._kernel.bufnr}")
         return vim_buffer
 
+    @property
+    def handler(self) -> VimBufferRangeHandler:
+        if self._kernel.buffer is None:
+            raise RuntimeError(f"Invalid `buffer`, {self._kernel.bufnr}")
+        return self._kernel.range_handler
+
     def get_lines(self, line_range: LineRange) -> list[str]:
         """Note that line1 and line2 is 0-based.
         The end is exclusive.
         """
-        handler = VimBufferRangeHandler(self.vim_buffer)
-        return handler.get_lines(line_range)
+        return self._kernel.get_lines(line_range)
 
     def get_text(self, character_range: CharacterRange) -> str:
         """`line` and `pos` are number acquried by `getpos`."""
         # Note that `start.line` and `end.line` is 0-based.
         # Note that `start.col` and `end.col` is 0-based.
         # Note that `end` of selection is exclusive.
-        handler = VimBufferRangeHandler(self.vim_buffer)
-        return handler.get_text(character_range)
+        return self.handler.get_text(character_range)
 
     def replace_text(self, character_range: CharacterRange, text: str) -> CharacterRange:
-        handler = VimBufferRangeHandler(self.vim_buffer)
-        return handler.replace_text(character_range, text)
+        return self.handler.replace_text(character_range, text)
 
     def replace_lines(self, line_range: LineRange, lines: Sequence[str]) -> LineRange:
-        handler = VimBufferRangeHandler(self.vim_buffer)
-        return handler.replace_lines(line_range, self.vim_buffer[:])
+        return self.handler.replace_lines(line_range, lines)
+
+    def apply_edits(self, edits: Sequence[BufferEdit]) -> list[EditResult]:
+        return self.handler.apply_edits(edits)
+
+    def transaction(self) -> EditTransaction:
+        return EditTransaction(self.apply_edits)
 
     def _create_text_searcher(self, target_range: CharacterRange | None = None):
-        # TODO: In order to enhance efficiency, please consider `partial` handling of `lines`.
-        return TextSearcher.create(self.vim_buffer[:], target_range)
+        if target_range is None:
+            return TextSearcher.create(self._kernel.lines)
+        # Only the window covering `target_range` is fetched.
+        line_range = LineRange(target_range.start.line, target_range.end.line + 1)
+        lines = self._kernel.get_lines(line_range)
+        return TextSearcher.create(lines, target_range, first_line=line_range.start)
 
     def find_first(
         self,
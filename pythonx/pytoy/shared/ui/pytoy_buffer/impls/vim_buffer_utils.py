@@ -1,8 +1,42 @@
 from pytoy.shared.lib.text import CursorPosition, LineRange, CharacterRange
+from pytoy.shared.ui.pytoy_buffer.edit_transaction import BufferEdit, EditResult, order_edits
 import vim
 from typing import Sequence
 
 
+class _LineWindow:
+    """Lines `[offset, offset + len(lines))` of a buffer, indexed by the buffer's line numbers.
+
+    Only the slice access which `VimBufferRangeHandler` requires is supported.
+    """
+
+    def __init__(self, lines: list[str], offset: int):
+        self.lines = lines
+        self.offset = offset
+
+    def __len__(self) -> int:
+        return self.offset + len(self.lines)
+
+    def _shift(self, idx: slice) -> slice:
+        start = 0 if idx.start is None else idx.start - self.offset
+        stop = None if idx.stop is None else idx.stop - self.offset
+        assert 0 <= start, "ImplementationError: access outside of the window."
+        return slice(start, stop)
+
+    def __getitem__(self, idx: slice) -> list[str]:
+        return self.lines[self._shift(idx)]
+
+    def __setitem__(self, idx: slice, value: Sequence[str]) -> None:
+        self.lines[self._shift(idx)] = list(value)
+
+
+def _shift_position(position: CursorPosition, old_anchor: CursorPosition, new_anchor: CursorPosition) -> CursorPosition:
+    """Map `position` (after `old_anchor`) to the coordinates after `old_anchor` moved to `new_anchor`."""
+    if position.line == old_anchor.line:
+        return CursorPosition(new_anchor.line, new_anchor.col + position.col - old_anchor.col)
+    return CursorPosition(position.line + new_anchor.line - old_anchor.line, position.col)
+
+
 class VimBufferRangeHandler:
     def __init__(self, buffer: "vim.Buffer | int"):
         if isinstance(buffer, int):
@@ -107,3 +141,61 @@ class VimBufferRangeHandler:
             _resolve_surrounding(target_lines, firstline_prefix, lastline_suffix)
             vim_buffer[start.line : end.line + 1] = target_lines
         return cr
+
+    def apply_edits(self, edits: Sequence[BufferEdit]) -> list[EditResult]:
+        """Apply `edits` in a single modification of the buffer.
+
+        The affected lines are fetched once, the edits are applied bottom-up to the copy,
+        and the copy is written back with one assignment (hence, one undo step).
+        The return values are the replaced regions in the coordinates after all the edits,
+        in the order of `edits`.
+        """
+        if not edits:
+            return []
+        order = order_edits(edits)
+        n_lines = len(self.buffer)
+        first = min(edit.start.line for edit in edits)
+        last = max(edit.end.line + 1 if edit.end.col else edit.end.line for edit in edits)
+        first, last = min(first, n_lines), min(max(first, last), n_lines)
+
+        window = _LineWindow(self.buffer[first:last], first)
+        handler = VimBufferRangeHandler(window)  # type: ignore[arg-type]
+        # (index, result, old_anchor, new_anchor): contents after `old_anchor` are moved to `new_anchor`.
+        applied: list[tuple[int, EditResult, CursorPosition, CursorPosition]] = []
+        for index in order:
+            edit = edits[index]
+            if isinstance(edit.target, LineRange):
+                line_range = handler.replace_lines(edit.target, list(edit.replacement))
+                old_anchor = CursorPosition(min(edit.target.end, len(window)), 0)
+                applied.append((index, line_range, old_anchor, CursorPosition(line_range.end, 0)))
+            else:
+                assert isinstance(edit.replacement, str)
+                cr = handler.replace_text(edit.target, edit.replacement)
+                if edit.target.end.col == 0:
+                    # See `replace_text`; the lines before `end.line` are replaced.
+                    applied.append((index, cr, edit.target.end, CursorPosition(cr.end.line + 1, 0)))
+                else:
+                    applied.append((index, cr, edit.target.end, cr.end))
+        self.buffer[first:last] = window.lines
+
+        # Compose the moves of the edits from the top, so that each result is mapped once.
+        results: list[EditResult | None] = [None] * len(edits)
+        anchor: tuple[CursorPosition, CursorPosition] | None = None  # (old_anchor, final position of it)
+        line_delta = 0
+
+        def _to_final(position: CursorPosition) -> CursorPosition:
+            if anchor is not None and position.line == anchor[0].line:
+                return _shift_position(position, *anchor)
+            return CursorPosition(position.line + line_delta, position.col)
+
+        for index, result, old_anchor, new_anchor in reversed(applied):
+            if isinstance(result, LineRange):
+                start = _to_final(CursorPosition(result.start, 0))
+                end = _to_final(CursorPosition(result.end, 0))
+                results[index] = LineRange(start.line, end.line)
+            else:
+                results[index] = CharacterRange(_to_final(result.start), _to_final(result.end))
+            final_anchor = _to_final(new_anchor)
+            line_delta += new_anchor.line - old_anchor.line
+            anchor = (old_anchor, final_anchor)
+        return [result for result in results if result is not None]
@@ -189,3 +189,13 @@ class PytoyBufferProviderVSCode(PytoyBufferProviderProtocol):
 
     def get_current(self) -> PytoyBufferProtocol:
         return PytoyBufferVSCode.from_document(Document.get_current())
+
+    def query(self, query: BufferQuery) -> Sequence[PytoyBufferVSCode]:
+        buffers = self.get_buffers(query.is_normal_type)
+        buffer_sources = query.buffer_sources
+        if buffer_sources is None:
+            return buffers
+        result = []
+        for source in buffer_sources:
+            result += [elem for elem in buffers if elem.source == source]
+        return result
@@ -6,10 +6,12 @@ from typing import TYPE_CHECKING
 
 from pytoy.shared.lib.entity import MortalEntityProtocol
 from pytoy.shared.lib.events.action_events import KeyActionEvents
+from pytoy.shared.lib.text import LineRange
 from pytoy.shared.ui.pytoy_buffer.impls.vim.kernel import VimBufferKernel
 from pytoy.shared.ui.pytoy_buffer.protocol import Event
 from pytoy.shared.ui.vscode.buffer_uri_solver import BufferURISolver, VSCodeUri
 from pytoy.shared.ui.vscode.document import Document
+from pytoy.shared.ui.vscode.document_sync import DocumentSynchronizer
 
 if TYPE_CHECKING:
     from pytoy.contexts.vscode import GlobalVSCodeContext
@@ -22,6 +24,7 @@ class VSCodeBufferKernel(MortalEntityProtocol):
         if ctx is None:
             ctx = GlobalVSCodeContext.get()
         self._bufnr = bufnr
+        self._synchronizer = ctx.document_synchronizer
         self._vim_kernel = VimBufferKernel(bufnr, ctx=ctx.vim_context)
         self.on_wipeout = self._vim_kernel.on_end
 
@@ -69,6 +72,10 @@ class VSCodeBufferKernel(MortalEntityProtocol):
         vscode_uri = self.vscode_uri
         return Document(uri=vscode_uri) if vscode_uri else None
 
+    @property
+    def synchronizer(self) -> DocumentSynchronizer:
+        return self._synchronizer
+
     @property
     def content(self) -> str:
         return self._vim_kernel.content
@@ -77,6 +84,9 @@ class VSCodeBufferKernel(MortalEntityProtocol):
     def lines(self) -> list[str]:
         return self._vim_kernel.lines
 
+    def get_lines(self, line_range: LineRange) -> list[str]:
+        return self._vim_kernel.get_lines(line_range)
+
 
 def normalize_lf_code(text: str) -> str:
     return text.replace("\r\n", "\n").replace("\r", "\n")
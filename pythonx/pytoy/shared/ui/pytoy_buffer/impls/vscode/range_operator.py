@@ -4,7 +4,7 @@ from pytoy.shared.ui.pytoy_buffer.impls.vscode.kernel import VSCodeBufferKernel,
 from pytoy.shared.ui.pytoy_buffer.protocol import RangeOperatorProtocol
 from pytoy.shared.ui.pytoy_buffer.models import URI
 from pytoy.shared.ui.pytoy_buffer.impls.text_searchers import TextSearcher
-from pytoy.shared.ui.vscode.utils import wait_until_true
+from pytoy.shared.ui.pytoy_buffer.edit_transaction import BufferEdit, EditResult, EditTransaction
 
 
 from typing import Sequence
@@ -53,6 +53,8 @@ class RangeOperatorVSCode(RangeOperatorProtocol):
         # But, currently, it is not checked.
 
         #  TODO: Currently, this is used to
+        document = self.kernel.document
+        version = self.kernel.synchronizer.version(document)
         lr = VimBufferRangeHandler(self.bufnr).replace_lines(line_range, lines)
 
         def _get_doc_lines(lr: LineRange):
@@ -65,7 +67,7 @@ class RangeOperatorVSCode(RangeOperatorProtocol):
             doc_lines = _get_doc_lines(lr)
             return lines == doc_lines
 
-        flag = wait_until_true(_is_document_changed, timeout=0.5)
+        flag = self.kernel.synchronizer.wait_for_change(document, version, _is_document_changed, timeout=0.5)
         if not flag:
             doc_lines = _get_doc_lines(lr)
             print("Debug", "Document and Buffer is not equal", lr, flush=True)
@@ -83,19 +85,21 @@ class RangeOperatorVSCode(RangeOperatorProtocol):
         #                                   end.line,
         #                                   end.col)
 
+        document = self.document
+        version = self.kernel.synchronizer.version(document)
         cr = VimBufferRangeHandler(self.bufnr).replace_text(character_range, text)
         # [TODO]: For synchronaization between `Document` and `vim.buffer`.
 
         def _get_doc_text(cr: CharacterRange):
             start, end = cr.start, cr.end
-            doc_text = self.document.get_range(start.line, start.col, end.line, end.col)
+            doc_text = document.get_range(start.line, start.col, end.line, end.col)
             return normalize_lf_code(doc_text)
 
         def _is_document_changed():
             doc_text = _get_doc_text(cr)
             return doc_text == text
 
-        flag = wait_until_true(_is_document_changed, timeout=1.0)
+        flag = self.kernel.synchronizer.wait_for_change(document, version, _is_document_changed)
         if not flag:
             doc_text = _get_doc_text(cr)
             print("Debug", "Document and Buffer is not equal", cr, flush=True)
@@ -104,8 +108,40 @@ class RangeOperatorVSCode(RangeOperatorProtocol):
 
         return cr
 
+    def apply_edits(self, edits: Sequence[BufferEdit]) -> list[EditResult]:
+        document = self.kernel.document
+        version = self.kernel.synchronizer.version(document)
+        results = VimBufferRangeHandler(self.bufnr).apply_edits(edits)
+        if not results:
+            return results
+
+        # Synchronization is confirmed once for the whole span of the edits.
+        def _to_line_range(result: EditResult) -> LineRange:
+            if isinstance(result, LineRange):
+                return result
+            return LineRange(result.start.line, result.end.line + 1)
+
+        line_ranges = [_to_line_range(result) for result in results]
+        span = LineRange(min(lr.start for lr in line_ranges), max(lr.end for lr in line_ranges))
+
+        def _is_document_changed():
+            if not document:
+                return False
+            return self._kernel.get_lines(span) == document.get_lines(span.start, span.end)
+
+        if not self.kernel.synchronizer.wait_for_change(document, version, _is_document_changed):
+            print("Debug", "Document and Buffer is not equal", span, flush=True)
+        return results
+
+    def transaction(self) -> EditTransaction:
+        return EditTransaction(self.apply_edits)
+
     def _create_text_searcher(self, target_range: CharacterRange | None = None):
-        return TextSearcher.create(self._kernel.lines, target_range)
+        if target_range is None:
+            return TextSearcher.create(self._kernel.lines)
+        line_range = LineRange(target_range.start.line, target_range.end.line + 1)
+        lines = self._kernel.get_lines(line_range)
+        return TextSearcher.create(lines, target_range, first_line=line_range.start)
 
     def find_first(
         self,
@@ -125,9 +161,10 @@ class RangeOperatorVSCode(RangeOperatorProtocol):
     @property
     def entire_character_range(self) -> CharacterRange:
         start = CursorPosition(0, 0)
-        end_line = len(self._kernel.lines)
-        if self._kernel.lines:
-            end_col = len(self._kernel.lines[-1])
+        lines = self._kernel.lines
+        end_line = len(lines)
+        if lines:
+            end_col = len(lines[-1])
         else:
             end_col = 0
         end = CursorPosition(end_line, end_col)
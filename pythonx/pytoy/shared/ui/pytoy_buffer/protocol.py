@@ -5,6 +5,7 @@ from pytoy.shared.lib.text import CharacterRange, LineRange
 from pytoy.shared.lib.event.domain import Event
 from pytoy.shared.lib.events.action_events import KeyActionEvents
 from pytoy.shared.ui.pytoy_buffer.models import BufferEvents, BufferID, BufferQuery, URI, BufferSource
+from pytoy.shared.ui.pytoy_buffer.edit_transaction import BufferEdit, EditResult, EditTransaction
 
 if TYPE_CHECKING:
     from pytoy.shared.ui.pytoy_window.protocol import PytoyWindowProtocol
@@ -89,6 +90,10 @@ class PytoyBufferProviderProtocol(Protocol):
 
     def get_current(self) -> PytoyBufferProtocol: ...
 
+    def query(self, query: BufferQuery) -> Sequence[PytoyBufferProtocol]:
+        """Return the buffers matching `query`, ordered by `query.buffer_sources`."""
+        ...
+
 
 class RangeOperatorProtocol(Protocol):
     def get_lines(self, line_range: LineRange) -> list[str]: ...
@@ -99,6 +104,17 @@ class RangeOperatorProtocol(Protocol):
 
     def replace_lines(self, line_range: LineRange, lines: Sequence[str]) -> LineRange: ...
 
+    def apply_edits(self, edits: Sequence[BufferEdit]) -> list[EditResult]:
+        """Apply non-overlapping `edits` at once.
+        Coordinates of `edits` refer to the buffer before any of them is applied.
+        Return the replaced regions after all the edits, in the order of `edits`.
+        """
+        ...
+
+    def transaction(self) -> EditTransaction:
+        """Return the transaction which calls `apply_edits` on commit."""
+        ...
+
     def find_first(
         self,
         text: str,
@@ -1,5 +1,6 @@
 from pytoy.shared.lib.text import CursorPosition, LineRange, CharacterRange
 from pytoy.shared.ui.pytoy_buffer.protocol import PytoyBufferProtocol, RangeOperatorProtocol
+from pytoy.shared.ui.pytoy_buffer.edit_transaction import BufferEdit, EditResult, EditTransaction
 from typing import Sequence
 
 
@@ -21,6 +22,12 @@ class RangeOperator(RangeOperatorProtocol):
     def replace_text(self, character_range: CharacterRange, text: str) -> CharacterRange:
         return self._impl.replace_text(character_range, text)
 
+    def apply_edits(self, edits: Sequence[BufferEdit]) -> list[EditResult]:
+        return self._impl.apply_edits(edits)
+
+    def transaction(self) -> EditTransaction:
+        return EditTransaction(self.apply_edits)
+
     def find_first(
         self,
         text: str,
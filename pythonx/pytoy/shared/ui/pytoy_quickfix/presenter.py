@@ -88,8 +88,9 @@ class QuickfixPresenter:
         records = self.quickfix.records
         lines = "\n".join([self._line_codec.encode(record, index) for index, record in enumerate(records)])
         q_buffer.init_buffer(lines)
-        q_buffer.actions["<CR>"].subscribe(lambda _: self.jump(with_focus=True))
-        q_buffer.actions["<SPACE>"].subscribe(lambda _: self.jump(with_focus=False))
+        with q_buffer.actions.batch():
+            q_buffer.actions["<CR>"].subscribe(lambda _: self.jump(with_focus=True))
+            q_buffer.actions["<SPACE>"].subscribe(lambda _: self.jump(with_focus=False))
 
     def jump(self, with_focus: bool = True):
         current_window = PytoyWindow.get_current()
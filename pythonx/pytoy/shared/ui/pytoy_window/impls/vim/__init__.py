@@ -3,6 +3,7 @@ from pathlib import Path
 from pytoy.shared.lib.event.domain import Event
 from pytoy.shared.ui.pytoy_buffer.models import BufferSource
 from pytoy.shared.ui.pytoy_window.impls.vim.kernel import VimWindowKernel
+from pytoy.shared.ui.pytoy_window.impls.vim.topology import VimWindowRecord, VimWindowTopology
 import vim
 from typing import Sequence, assert_never, Literal, Self, TYPE_CHECKING, cast
 from pytoy.shared.lib.text import CursorPosition, CharacterRange, LineRange
@@ -124,18 +125,14 @@ class PytoyWindowVim(PytoyWindowProtocol):
         current_winid = int(vim.eval("win_getid()"))
 
         provider = PytoyWindowProviderVim()
-        windows = provider.get_windows(only_normal_buffers=False)
         target_bufnr = vim_window.buffer.number
 
         to_close: list[PytoyWindowVim] = list()
-        for window in windows:
-            if window == self:
+        for record in provider.topology.snapshot.current_tab_records:
+            if record.winid == self.winid or record.bufnr != target_bufnr:
                 continue
-            if not window.valid:
-                continue
-
-            other = cast(PytoyWindowVim, window)
-            if other.window and other.window.buffer.number == target_bufnr:
+            other = PytoyWindowVim(record.winid)
+            if other.valid:
                 to_close.append(other)
 
         focus_will_be_lost = any(w.winid == current_winid for w in to_close)
@@ -193,7 +190,7 @@ class PytoyWindowVim(PytoyWindowProtocol):
         2. handling of bytes.
         """
         n_line = max(0, vim_line - 1)
-        line_content = self.buffer.lines[n_line]
+        line_content = self.buffer.get_lines(LineRange(n_line, n_line + 1))[0]
         line_bytes = line_content.encode("utf-8")
         byte_offset = min(vim_col - 1, len(line_bytes))  # 0-based and to be safe.
         res_col = len(line_bytes[:byte_offset].decode("utf-8", errors="ignore"))
@@ -204,29 +201,41 @@ class PytoyWindowVim(PytoyWindowProtocol):
         1. 0-base -> 1-base.
         2. handling of bytes.
         """
-        lines = self.buffer.lines
-        max_line = len(lines)
+        if not (vim_window := self.window):
+            raise RuntimeError(f"Already Window is dead {self.winid}")
+        max_line = len(vim_window.buffer)
         if not max_line:
             return (1, 1)
         vim_line = min(max(0, cursor.line), max_line - 1) + 1
-        vim_col = len(lines[vim_line - 1][: cursor.col].encode("utf-8")) + 1
+        line_content = self.buffer.get_lines(LineRange(vim_line - 1, vim_line))[0]
+        vim_col = len(line_content[: cursor.col].encode("utf-8")) + 1
         return (vim_line, vim_col)
 
 
 class PytoyWindowProviderVim(PytoyWindowProviderProtocol):
+    def __init__(self, *, ctx: GlobalVimContext | None = None) -> None:
+        if ctx is None:
+            from pytoy.contexts.vim import GlobalVimContext
+
+            ctx = GlobalVimContext.get()
+        self._ctx = ctx
+
+    @property
+    def topology(self) -> VimWindowTopology:
+        return self._ctx.window_topology
+
     def get_current(self) -> PytoyWindowProtocol:
         vim_win = vim.current.window
-        return PytoyWindowVim(VimWinIDConverter.from_vim_window(vim_win))
+        return PytoyWindowVim(VimWinIDConverter.from_vim_window(vim_win), ctx=self._ctx)
 
     def get_windows(self, only_normal_buffers: bool = True) -> Sequence[PytoyWindowProtocol]:
-        windows = vim.current.tabpage.windows  # For consistey with visibleEditors in VSCode.
-        if only_normal_buffers:
-            return [
-                PytoyWindowVim.from_vim_window(elem)
-                for elem in windows
-                if elem.buffer and PytoyBufferVim(elem.buffer.number).is_normal_type
-            ]
-        return [PytoyWindowVim.from_vim_window(elem) for elem in windows if elem.buffer]
+        # Only the current tab, for consistency with visibleEditors in VSCode.
+        records = self.topology.snapshot.current_tab_records
+        return [
+            PytoyWindowVim(record.winid, ctx=self._ctx)
+            for record in records
+            if (not only_normal_buffers) or record.is_normal_type
+        ]
 
     def open_window(
         self,
@@ -249,6 +258,8 @@ class PytoyWindowProviderVim(PytoyWindowProviderProtocol):
 
         stored_winid = int(vim.eval("win_getid()"))
         window = self._create_window(source, param)
+        # `buftype` set via the python API does not always fire `OptionSet`.
+        self.topology.invalidate()
         if stored_winid > 0:
             vim.command(f"call win_gotoid({stored_winid})")
         return PytoyWindowVim.from_vim_window(window)
@@ -288,6 +299,10 @@ class PytoyWindowProviderVim(PytoyWindowProviderProtocol):
             if not is_file:
                 window.buffer.options["buftype"] = "nofile"
                 window.buffer.options["swapfile"] = False
+                # `OptionSet` is not guaranteed for options set via the python API.
+                from pytoy.contexts.vim import GlobalVimContext
+
+                GlobalVimContext.get().buffer_index.invalidate(window.buffer.number)
         else:
             # Switch buffer.
             if vim.current.buffer.number != bufno:
@@ -307,19 +322,20 @@ class PytoyWindowProviderVim(PytoyWindowProviderProtocol):
         """
 
         # [TODO]: This re-use logic is not perfect and based on the observation.
-        def _is_equal(buffer: "vim.Buffer", bufname: str):
-            if type == "nofile":
-                return buffer.name and Path(buffer.name).name == bufname
-            elif type == "file":
-                return buffer.name and Path(buffer.name).resolve() == Path(bufname).resolve()
+        if type == "nofile":
+            def _is_equal(record: VimWindowRecord) -> bool:
+                return bool(record.name) and Path(record.name).name == bufname
+        elif type == "file":
+            target = Path(bufname).resolve()
+
+            def _is_equal(record: VimWindowRecord) -> bool:
+                return record.resolved_path == target
+        else:
             raise RuntimeError("In _get_window_by_buf_name")
 
-        for window in vim.windows:
-            winnr = int(vim.eval(f"bufwinnr({window.buffer.number})"))
-            if winnr <= 0:
-                continue
-            if _is_equal(window.buffer, bufname):
-                return PytoyWindowVim.from_vim_window(window)
+        for record in self.topology.snapshot.current_tab_records:
+            if _is_equal(record):
+                return PytoyWindowVim(record.winid, ctx=self._ctx)
         return None
 
     def retain_unique_window(
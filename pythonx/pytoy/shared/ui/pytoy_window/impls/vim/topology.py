@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import vim
+from dataclasses import dataclass
+from functools import cached_property
+from pathlib import Path
+from typing import Sequence, TYPE_CHECKING
+
+from pytoy.shared.lib.event.domain import Disposable
+from pytoy.shared.lib.events.buffer_events import GlobalBufferEventProvider
+from pytoy.shared.lib.events.window_events import GlobalWindowEventProvider
+
+if TYPE_CHECKING:
+    from pytoy.contexts.vim import GlobalVimContext
+
+
+# One round trip for every window: `[current_tabnr, [[winid, bufnr, tabnr, winnr, name, buftype], ...]]`.
+WININFO_EXPR = (
+    "[tabpagenr(), map(getwininfo(), {_, w -> "
+    "[w.winid, w.bufnr, w.tabnr, w.winnr, getbufinfo(w.bufnr)[0].name, getbufvar(w.bufnr, '&buftype')]})]"
+)
+
+
+@dataclass(frozen=True)
+class VimWindowRecord:
+    """Snapshot of the attributes of a vim window which the provider queries."""
+
+    winid: int
+    bufnr: int
+    tabnr: int
+    winnr: int
+    name: str
+    buftype: str
+
+    @property
+    def is_normal_type(self) -> bool:
+        return self.buftype in {"", "nofile"}
+
+    @cached_property
+    def resolved_path(self) -> Path | None:
+        """`Path.resolve` of the buffer name, computed once per snapshot."""
+        return Path(self.name).resolve() if self.name else None
+
+
+@dataclass(frozen=True)
+class VimWindowTopologySnapshot:
+    current_tabnr: int
+    records: Sequence[VimWindowRecord]  # In the order of `(tabnr, winnr)`.
+
+    @property
+    def current_tab_records(self) -> Sequence[VimWindowRecord]:
+        return [record for record in self.records if record.tabnr == self.current_tabnr]
+
+
+class VimWindowTopology:
+    """Snapshot of windows across tabs, fetched with one `vim.eval` and cached.
+
+    The snapshot is invalidated by `WinNew`, `WinClosed`, `BufWinEnter`, `TabEnter`,
+    `TabClosed`, `BufFilePost` and `OptionSet buftype`.
+
+    NOTE: As `VimBufferIndex`, changes inside other autocmds are not observed.
+    Call `invalidate` after such operations.
+    """
+
+    def __init__(self, *, ctx: GlobalVimContext | None = None) -> None:
+        window_events = GlobalWindowEventProvider(ctx=ctx)
+        buffer_events = GlobalBufferEventProvider(ctx=ctx)
+        self._snapshot: VimWindowTopologySnapshot | None = None
+        self._disposables: list[Disposable] = [
+            window_events.layout_changed.subscribe(lambda _: self.invalidate()),
+            buffer_events.buftype_set.subscribe(lambda _: self.invalidate()),
+        ]
+
+    @property
+    def snapshot(self) -> VimWindowTopologySnapshot:
+        if self._snapshot is None:
+            self._snapshot = self._fetch()
+        return self._snapshot
+
+    def invalidate(self) -> None:
+        self._snapshot = None
+
+    def dispose(self) -> None:
+        for disposable in self._disposables:
+            disposable.dispose()
+        self._disposables.clear()
+
+    def _fetch(self) -> VimWindowTopologySnapshot:
+        current_tabnr, infos = vim.eval(WININFO_EXPR)
+        records = [
+            VimWindowRecord(int(winid), int(bufnr), int(tabnr), int(winnr), name, buftype)
+            for winid, bufnr, tabnr, winnr, name, buftype in infos
+        ]
+        return VimWindowTopologySnapshot(int(current_tabnr), records)
@@ -5,11 +5,15 @@ from typing import List, Sequence
 class StatusLineManagerDummy(StatusLineManagerProtocol):
     _instance: "StatusLineManagerDummy | None" = None
 
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
     def __init__(self):
-        if StatusLineManagerDummy._instance is not None:
+        if hasattr(self, "_items"):
             return
         self._items: List[StatusLineItem] = []
-        StatusLineManagerDummy._instance = self
 
     def register(self, item: StatusLineItem) -> StatusLineItem:
         self._items.append(item)
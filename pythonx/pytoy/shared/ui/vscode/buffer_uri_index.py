@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import vim
+from collections import defaultdict
+from types import MappingProxyType
+from typing import Mapping, TYPE_CHECKING
+
+from pytoy.shared.lib.event.domain import Disposable
+from pytoy.shared.lib.events.buffer_events import GlobalBufferEventProvider
+from pytoy.shared.ui.pytoy_buffer.impls.vim.buffer_index import BUFINFO_EXPR, LAST_BUFNR_EXPR
+from pytoy.shared.ui.vscode.uri import VSCodeUri
+
+if TYPE_CHECKING:
+    from pytoy.contexts.vim import GlobalVimContext
+
+
+class BufferURIIndex:
+    """Bidirectional index between the buffers and `VSCodeUri`, maintained from the buffer autocmds.
+
+    The whole table is fetched lazily with one `vim.eval`, and after that each entry is
+    re-parsed only when `BufAdd/BufNew`, `BufFilePost` or `BufWipeout` fires for it.
+    When several buffers have the same uri, the one with the largest `bufnr` is used,
+    as the former dictionaries over `vim.buffers` did.
+
+    NOTE: As `VimBufferIndex`, changes inside other autocmds are not observed. Hence,
+    * the lookups fetch from vim again on a miss,
+    * the mappings are rebuilt if the largest `bufnr` differs from the one in vim.
+    Call `invalidate` or `refresh` after the other operations, and `verify` to debug the discrepancy.
+    """
+
+    def __init__(self, *, ctx: GlobalVimContext | None = None) -> None:
+        provider = GlobalBufferEventProvider(ctx=ctx)
+        self._names: dict[int, str] = {}
+        self._bufnr_to_uri: dict[int, VSCodeUri] = {}
+        self._uri_to_bufnrs: defaultdict[VSCodeUri, set[int]] = defaultdict(set)
+        self._uri_to_bufnr: dict[VSCodeUri, int] = {}
+        self._uri_to_bufname: dict[VSCodeUri, str] = {}
+        self._built = False
+        self._disposables: list[Disposable] = [
+            provider.added.subscribe(self.invalidate),
+            provider.renamed.subscribe(self.invalidate),
+            provider.wipeout.subscribe(self._remove),
+        ]
+
+    @property
+    def bufnr_to_uri(self) -> Mapping[int, VSCodeUri]:
+        self._ensure_current()
+        return MappingProxyType(self._bufnr_to_uri)
+
+    @property
+    def uri_to_bufnr(self) -> Mapping[VSCodeUri, int]:
+        self._ensure_current()
+        return MappingProxyType(self._uri_to_bufnr)
+
+    @property
+    def uri_to_bufname(self) -> Mapping[VSCodeUri, str]:
+        self._ensure_current()
+        return MappingProxyType(self._uri_to_bufname)
+
+    @property
+    def bufname_to_uri(self) -> Mapping[str, VSCodeUri]:
+        self._ensure_current()
+        return {self._names[bufnr]: uri for bufnr, uri in sorted(self._bufnr_to_uri.items())}
+
+    def get_bufnr(self, uri: VSCodeUri) -> int | None:
+        self._ensure_found(uri)
+        return self._uri_to_bufnr.get(uri)
+
+    def get_bufname(self, uri: VSCodeUri) -> str | None:
+        self._ensure_found(uri)
+        return self._uri_to_bufname.get(uri)
+
+    def get_uri(self, bufnr: int) -> VSCodeUri | None:
+        self._ensure_built()
+        if (uri := self._bufnr_to_uri.get(bufnr)) is not None:
+            return uri
+        # Not observed via autocmds. As `VimBufferIndex.get`, the result is not stored,
+        # since this may be called while the buffer is being wiped.
+        try:
+            buffer = vim.buffers[bufnr]
+        except (KeyError, IndexError):
+            return None
+        return VSCodeUri.from_bufname(buffer.name or "") if buffer.valid else None
+
+    def invalidate(self, bufnr: int) -> None:
+        """Re-fetch the name of `bufnr` from vim."""
+        if not self._built:
+            return  # The whole table is fetched at the first access.
+        try:
+            buffer = vim.buffers[bufnr]
+        except (KeyError, IndexError):
+            buffer = None
+        if buffer is None or not buffer.valid:
+            self._remove(bufnr)
+        else:
+            self._store(bufnr, buffer.name or "")
+
+    def refresh(self) -> None:
+        """Rebuild the whole index from vim."""
+        self._names.clear()
+        self._bufnr_to_uri.clear()
+        self._uri_to_bufnrs.clear()
+        self._uri_to_bufnr.clear()
+        self._uri_to_bufname.clear()
+        for bufnr, name, _ in vim.eval(BUFINFO_EXPR):
+            self._store(int(bufnr), name)
+        self._built = True
+
+    def verify(self) -> list[str]:
+        """Compare the index with the full scan of `vim.buffers`, and return the discrepancies."""
+        self._ensure_built()
+        expected = {buf.number: VSCodeUri.from_bufname(buf.name) for buf in vim.buffers}
+        expected_uri_to_bufnr = {VSCodeUri.from_bufname(buf.name): buf.number for buf in vim.buffers}
+        problems = []
+        for bufnr in sorted(set(expected) | set(self._bufnr_to_uri)):
+            if expected.get(bufnr) != self._bufnr_to_uri.get(bufnr):
+                problems.append(f"bufnr={bufnr}: index={self._bufnr_to_uri.get(bufnr)}, vim={expected.get(bufnr)}")
+        if expected_uri_to_bufnr != self._uri_to_bufnr:
+            problems.append(f"uri_to_bufnr: index={self._uri_to_bufnr}, vim={expected_uri_to_bufnr}")
+        return problems
+
+    def dispose(self) -> None:
+        for disposable in self._disposables:
+            disposable.dispose()
+        self._disposables.clear()
+
+    def _ensure_built(self) -> None:
+        if not self._built:
+            self.refresh()
+
+    def _ensure_current(self) -> None:
+        if not self._built or int(vim.eval(LAST_BUFNR_EXPR)) != max(self._names, default=0):
+            self.refresh()
+
+    def _ensure_found(self, uri: VSCodeUri) -> None:
+        if not self._built or uri not in self._uri_to_bufnr:
+            # A miss may be a buffer which is created or renamed without the autocmds.
+            self.refresh()
+
+    def _store(self, bufnr: int, name: str) -> None:
+        if self._names.get(bufnr) == name and bufnr in self._bufnr_to_uri:
+            return
+        self._remove(bufnr)
+        uri = VSCodeUri.from_bufname(name)
+        self._names[bufnr] = name
+        self._bufnr_to_uri[bufnr] = uri
+        self._uri_to_bufnrs[uri].add(bufnr)
+        self._update_uri(uri)
+
+    def _remove(self, bufnr: int) -> None:
+        uri = self._bufnr_to_uri.pop(bufnr, None)
+        self._names.pop(bufnr, None)
+        if uri is None:
+            return
+        bufnrs = self._uri_to_bufnrs.get(uri)
+        if bufnrs is not None:
+            bufnrs.discard(bufnr)
+            if not bufnrs:
+                del self._uri_to_bufnrs[uri]
+        self._update_uri(uri)
+
+    def _update_uri(self, uri: VSCodeUri) -> None:
+        bufnrs = self._uri_to_bufnrs.get(uri)
+        if not bufnrs:
+            self._uri_to_bufnr.pop(uri, None)
+            self._uri_to_bufname.pop(uri, None)
+            return
+        bufnr = max(bufnrs)
+        self._uri_to_bufnr[uri] = bufnr
+        self._uri_to_bufname[uri] = self._names[bufnr]
@@ -1,10 +1,17 @@
-import vim
-
 from typing import Mapping
+from pytoy.shared.ui.vscode.buffer_uri_index import BufferURIIndex
 from pytoy.shared.ui.vscode.uri import VSCodeUri
 
 
 class BufferURISolver:
+    """Lookups between the buffers and `VSCodeUri`, answered by `BufferURIIndex` in O(1)."""
+
+    @classmethod
+    def _index(cls) -> BufferURIIndex:
+        from pytoy.contexts.vscode import GlobalVSCodeContext
+
+        return GlobalVSCodeContext.get().buffer_uri_index
+
     @classmethod
     def _to_uri(cls, buf_name: str):
         return VSCodeUri.from_bufname(buf_name)
@@ -15,28 +22,28 @@ class BufferURISolver:
 
     @classmethod
     def get_bufnr_to_uris(cls) -> Mapping[int, VSCodeUri]:
-        return {buf.number: cls._to_uri(buf.name) for buf in vim.buffers}
+        return cls._index().bufnr_to_uri
 
     @classmethod
     def get_uri_to_bufnr(cls) -> Mapping[VSCodeUri, int]:
-        return {cls._to_uri(buf.name): buf.number for buf in vim.buffers}
+        return cls._index().uri_to_bufnr
 
     @classmethod
     def get_uri_to_bufnames(cls) -> Mapping[VSCodeUri, str]:
-        return {cls._to_uri(buf.name): buf.name for buf in vim.buffers}
+        return cls._index().uri_to_bufname
 
     @classmethod
     def get_bufname_to_uris(cls) -> Mapping[str, VSCodeUri]:
-        return {buf.name: cls._to_uri(buf.name) for buf in vim.buffers}
+        return cls._index().bufname_to_uri
 
     @classmethod
     def get_bufnr(cls, uri: VSCodeUri) -> int | None:
-        return cls.get_uri_to_bufnr().get(uri)
+        return cls._index().get_bufnr(uri)
 
     @classmethod
     def get_bufname(cls, uri: VSCodeUri) -> str | None:
-        return cls.get_uri_to_bufnames().get(uri)
+        return cls._index().get_bufname(uri)
 
     @classmethod
     def get_uri(cls, bufnr: int) -> VSCodeUri | None:
-        return cls.get_bufnr_to_uris().get(bufnr)
+        return cls._index().get_uri(bufnr)
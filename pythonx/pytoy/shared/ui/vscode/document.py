@@ -182,6 +182,24 @@ class Document(BaseModel):
             opts={"args": {"uriKey": self.uri.to_key_str(), "content": value}},
         )
 
+    @property
+    def version(self) -> int:
+        """Return `TextDocument.version`, which is incremented at every change."""
+        api = Api()
+        js_code = """
+        (async (args) => {
+            const uri = vscode.Uri.parse(args.uriKey);
+            const doc = await vscode.workspace.openTextDocument(uri);
+            return doc.version;
+        })(args)
+        """
+        result = api.eval_with_return(
+            js_code,
+            with_await=True,
+            opts={"args": {"uriKey": self.uri.to_key_str()}},
+        )
+        return int(result)
+
     def show(self, with_focus: bool = False):
         api = Api()
         js_code = """
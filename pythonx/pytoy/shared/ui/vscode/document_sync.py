@@ -0,0 +1,125 @@
+"""Confirm that edits of the vim buffer are propagated to the VSCode `Document`.
+
+`vscode-neovim` sends the changes of buffers to VSCode asynchronously.
+Instead of comparing the contents at fixed intervals, `DocumentSynchronizer`
+watches `TextDocument.version`, which VSCode increments for every change,
+and compares the contents only when the version advances.
+
+Example:
+    version = synchronizer.version(document)
+    ...  # Modify the vim buffer.
+    synchronizer.wait_for_change(document, version, lambda: document.get_lines(0, 3) == expected)
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Protocol
+
+
+class VersionedDocumentProtocol(Protocol):
+    @property
+    def version(self) -> int: ...
+
+
+@dataclass(frozen=True)
+class SyncPolicy:
+    """`timeout` is the limit of waiting in seconds.
+
+    The interval of polling `version` starts at `initial_interval`
+    and doubles up to `max_interval`.
+    """
+
+    timeout: float = 1.0
+    initial_interval: float = 0.001
+    max_interval: float = 0.02
+
+
+@dataclass
+class SyncStats:
+    n_waits: int = 0
+    n_timeouts: int = 0
+    n_polls: int = 0
+    n_verifications: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+    last_failure: str | None = field(default=None)
+
+    @property
+    def mean_wait(self) -> float:
+        return self.total_wait / self.n_waits if self.n_waits else 0.0
+
+
+def _pump_vim_events() -> None:
+    import vim
+
+    # It is required to proceed the RPC messages from VSCode.
+    vim.command("sleep 1m")
+
+
+class DocumentSynchronizer:
+    def __init__(
+        self,
+        policy: SyncPolicy | None = None,
+        *,
+        pump: Callable[[], None] = _pump_vim_events,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.policy = policy or SyncPolicy()
+        self.stats = SyncStats()
+        self._pump = pump
+        self._clock = clock
+        self._sleep = sleep
+
+    def version(self, document: VersionedDocumentProtocol | None) -> int | None:
+        """Return the version to be passed to `wait_for_change`, `None` if it is not available."""
+        if document is None:
+            return None
+        try:
+            return document.version
+        except Exception:
+            return None
+
+    def wait_for_change(
+        self,
+        document: VersionedDocumentProtocol | None,
+        version: int | None,
+        verify: Callable[[], bool],
+        *,
+        timeout: float | None = None,
+    ) -> bool:
+        """Wait until `verify` returns True.
+
+        `verify` is evaluated at first (the edit may not change the document at all),
+        and after that, only when `document.version` differs from `version`.
+        If `version` is not available, `verify` is evaluated at every poll.
+        """
+        timeout = self.policy.timeout if timeout is None else timeout
+        start = self._clock()
+        deadline = start + timeout
+        interval = self.policy.initial_interval
+        last_version = version
+
+        self.stats.n_waits += 1
+        self.stats.n_verifications += 1
+        success = verify()
+        while not success and self._clock() < deadline:
+            self._pump()
+            self._sleep(min(interval, max(deadline - self._clock(), 0)))
+            interval = min(interval * 2, self.policy.max_interval)
+
+            self.stats.n_polls += 1
+            current = self.version(document) if last_version is not None else None
+            if current is not None and current == last_version:
+                continue
+            last_version = current
+            self.stats.n_verifications += 1
+            success = verify()
+
+        elapsed = self._clock() - start
+        self.stats.total_wait += elapsed
+        self.stats.max_wait = max(self.stats.max_wait, elapsed)
+        if not success:
+            self.stats.n_timeouts += 1
+            self.stats.last_failure = f"Not synchronized in {timeout}s, {version=}, {last_version=}"
+        return success
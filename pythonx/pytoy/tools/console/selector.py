@@ -3,7 +3,6 @@ from pytoy.job_execution.terminal_executor.models import DriverKind, TerminalDri
 from pytoy.job_execution.terminal_runner.drivers import TerminalDriverManager
 from pytoy.shared.lib.text import LineRange
 from pytoy.shared.ui.pytoy_window import PytoyWindow
-from pytoy.tools.markdown import MarkdownExtractor
 
 
 from pathlib import Path
@@ -14,6 +13,7 @@ class TerminalSelector:
     def __init__(self, driver_manager: TerminalDriverManager | None = None):
         ctx = GlobalPytoyContext.get()
         self._driver_manager = driver_manager or ctx.terminal_driver_manager
+        self._markdown_index_registry = ctx.markdown_index_registry
 
     def _to_driver_kind(self, driver: DriverKind | TerminalDriverProtocol) -> DriverKind:
         return driver if isinstance(driver, str) else driver.kind
@@ -57,10 +57,9 @@ class TerminalSelector:
                 if self.driver_manager._is_registered("ipython"):
                     return "ipython"
             elif path.suffix == ".md":
-                text = buffer.content
-                structure = MarkdownExtractor(text).structure
+                index = self._markdown_index_registry.get(buffer)
                 cursor = window.cursor
-                block = structure.get_current_code_block(cursor.line)
+                block = index.block_at(cursor.line)
                 if not block:
                     print("For `markdown`, the outside of `code block` is not determined.")
                     return "shell"
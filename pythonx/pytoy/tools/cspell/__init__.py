@@ -7,6 +7,8 @@ import subprocess
 
 from dataclasses import dataclass
 
+from pytoy.tools.cspell.batch import BatchResult, CSpellBatchChecker, SpellCheckCache, SpellFinding  # NOQA
+
 
 class CSpellOneFileChecker:
     """Mainly, motivation of this class is two-fold.
@@ -0,0 +1,359 @@
+"""Spell check of many files with one invocation of `cspell`.
+
+1. Words are extracted from the files in a process pool (`workers/pytoy_cspell_words.py`).
+2. The unique words are sent to `cspell` as one document (one word per line).
+3. The unknown words are mapped back to every occurrence.
+
+The unknown occurrences are cached per content hash of each file and the `cspell` settings
+(`config_fingerprint`), so the unchanged files are neither read by the workers nor sent to `cspell`.
+"""
+
+import functools
+import hashlib
+import importlib.util
+import json
+import os
+import re
+import shutil
+import site
+import subprocess
+import sys
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from types import ModuleType
+from typing import Callable, Sequence
+
+
+_OUTPUT_PATTERN = re.compile(r".*:(?P<line>\d+):(?P<col>\d+).*\((?P<word>.+)\)")
+_STDIN_NAME = "stdin://pytoy-words.txt"
+_WORDS_MODULE = "pytoy_cspell_words"
+# https://cspell.org/docs/Configuration/#configuration-file-locations
+_CONFIG_NAMES = (
+    ".cspell.json",
+    "cspell.json",
+    ".cSpell.json",
+    "cSpell.json",
+    "cspell.config.json",
+    ".cspell.jsonc",
+    "cspell.jsonc",
+    "cspell.config.jsonc",
+    ".cspell.yaml",
+    "cspell.yaml",
+    "cspell.config.yaml",
+    ".cspell.yml",
+    "cspell.yml",
+    "cspell.config.yml",
+    ".cspell.config.js",
+    "cspell.config.js",
+    "cspell.config.cjs",
+    "cspell.config.mjs",
+    ".vscode/cspell.json",
+    ".vscode/cSpell.json",
+    "package.json",
+)
+
+type Occurrence = tuple[str, int, int]  # (word, line, col), both of `line` and `col` are 1-based.
+
+
+@dataclass(frozen=True)
+class SpellFinding:
+    path: Path
+    line: int
+    col: int
+    word: str
+
+    def to_line(self) -> str:
+        """Same format as the output of `cspell`."""
+        return f"{self.path.as_posix()}:{self.line}:{self.col} - Unknown word ({self.word})"
+
+
+@dataclass(frozen=True)
+class BatchStats:
+    n_files: int
+    n_cached: int
+    n_words: int
+    n_unique_words: int
+    elapsed: float
+
+    @property
+    def words_per_second(self) -> float:
+        return self.n_words / self.elapsed if self.elapsed > 0 else 0.0
+
+    def to_line(self) -> str:
+        return (
+            f"cspell: {self.n_files} files ({self.n_cached} cached), {self.n_words} words "
+            f"({self.n_unique_words} unique), {self.words_per_second:,.0f} words/s"
+        )
+
+
+@dataclass(frozen=True)
+class BatchResult:
+    findings: Sequence[SpellFinding]
+    stats: BatchStats
+
+    @property
+    def output(self) -> str:
+        return "\n".join(finding.to_line() for finding in self.findings)
+
+
+@functools.cache
+def _words_module() -> ModuleType:
+    """Load `workers/pytoy_cspell_words.py` by its file, at the first use.
+
+    The workers unpickle `extract_words` by its module name, so it is registered as a top-level module,
+    and the worker folder is added to `sys.path` of the workers only (see `_make_process_pool`).
+    """
+    if (module := sys.modules.get(_WORDS_MODULE)) is not None:
+        return module
+    from pytoy.tools.cspell.workers import WORKER_FOLDER
+
+    spec = importlib.util.spec_from_file_location(_WORDS_MODULE, WORKER_FOLDER / f"{_WORDS_MODULE}.py")
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[_WORDS_MODULE] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def extract_words(path: str | Path) -> list[Occurrence]:
+    return _words_module().extract_words(path)
+
+
+def _python_executable() -> str:
+    """The interpreter running this process.
+
+    Inside `vim`, `sys.executable` may be `vim` itself, so the interpreter of `sys.exec_prefix` is used.
+    """
+    executable = Path(sys.executable)
+    if executable.name.lower().startswith("python"):
+        return str(executable)
+    version = f"{sys.version_info.major}.{sys.version_info.minor}"
+    prefix = Path(sys.exec_prefix)
+    for candidate in (
+        prefix / "python.exe",
+        prefix / "bin" / f"python{version}",
+        prefix / "bin" / f"python{sys.version_info.major}",
+        prefix / "bin" / "python",
+    ):
+        if candidate.is_file():
+            return str(candidate)
+    return str(executable)
+
+
+def _make_process_pool(max_workers: int | None = None) -> Executor:
+    import multiprocessing
+
+    from pytoy.tools.cspell.workers import WORKER_FOLDER
+
+    _words_module()
+    context = multiprocessing.get_context("spawn")
+    context.set_executable(_python_executable())
+    return ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=context,
+        initializer=site.addsitedir,
+        initargs=(str(WORKER_FOLDER),),
+    )
+
+
+def _find_option(command: Sequence[str], names: Sequence[str]) -> str | None:
+    for index, arg in enumerate(command):
+        for name in names:
+            if arg == name and index + 1 < len(command):
+                return command[index + 1]
+            if arg.startswith(f"{name}="):
+                return arg[len(name) + 1 :]
+    return None
+
+
+def _find_configs(command: Sequence[str], cwd: Path) -> list[Path]:
+    if (option := _find_option(command, ("--config", "-c"))) is not None:
+        return [cwd / option]
+    configs = []
+    for folder in (cwd, *cwd.parents):
+        configs += [folder / name for name in _CONFIG_NAMES if (folder / name).is_file()]
+    return configs
+
+
+def _dictionary_paths(config: Path) -> list[Path]:
+    """The files of `dictionaryDefinitions` of a `json` configuration."""
+    try:
+        data = json.loads(config.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return []
+    if config.name == "package.json":
+        data = data.get("cspell", {}) if isinstance(data, dict) else {}
+    definitions = data.get("dictionaryDefinitions", []) if isinstance(data, dict) else []
+    return [
+        config.parent / definition["path"]
+        for definition in definitions
+        if isinstance(definition, dict) and isinstance(definition.get("path"), str)
+    ]
+
+
+def config_fingerprint(command: Sequence[str], cwd: str | Path | None = None) -> str:
+    """Hash of the settings which decide the unknown words, besides the file.
+
+    They are the command, `cwd`, the configuration files of `cspell` and their custom dictionaries.
+    """
+    cwd = Path(cwd or Path.cwd()).absolute()
+    hasher = hashlib.sha1()
+    hasher.update(json.dumps([list(command), cwd.as_posix()]).encode("utf-8"))
+    for config in _find_configs(command, cwd):
+        for path in (config, *_dictionary_paths(config)):
+            try:
+                data = path.read_bytes()
+            except OSError:
+                data = b""
+            hasher.update(path.as_posix().encode("utf-8") + b"\0" + hashlib.sha1(data).digest())
+    return hasher.hexdigest()
+
+
+class SpellCheckCache:
+    """Unknown occurrences per `sha1` of the file contents and the settings, optionally persisted as `json`.
+
+    At most `max_entries` entries are kept, and the least recently used ones are dropped.
+    """
+
+    def __init__(self, path: Path | None = None, max_entries: int = 20_000):
+        self.path = path
+        self.max_entries = max_entries
+        # In the order of use, the oldest first.
+        self._entries: dict[str, list[Occurrence]] = {}
+        if path is not None and path.exists():
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+                self._entries = {key: [tuple(item) for item in value] for key, value in data.items()}  # type: ignore
+            except (OSError, ValueError):
+                self._entries = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, digest: str) -> list[Occurrence] | None:
+        if (unknowns := self._entries.pop(digest, None)) is not None:
+            self._entries[digest] = unknowns
+        return unknowns
+
+    def set(self, digest: str, unknowns: list[Occurrence]) -> None:
+        self._entries.pop(digest, None)
+        self._entries[digest] = unknowns
+
+    def prune(self) -> None:
+        for digest in list(self._entries)[: max(0, len(self._entries) - self.max_entries)]:
+            del self._entries[digest]
+
+    def save(self) -> None:
+        self.prune()
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_text(json.dumps(self._entries), encoding="utf-8")
+
+
+class CSpellBatchChecker:
+    """`command` must read the document from `stdin://`, as `cspell`."""
+
+    def __init__(
+        self,
+        command: Sequence[str] = ("cspell", "--no-progress", "--no-summary", "--no-color"),
+        *,
+        cache: SpellCheckCache | None = None,
+        executor_factory: Callable[[], Executor] | None = _make_process_pool,
+        min_files_for_pool: int = 8,
+    ):
+        self.command = list(command)
+        self.cache = cache if cache is not None else SpellCheckCache()
+        self._executor_factory = executor_factory
+        self._min_files_for_pool = min_files_for_pool
+
+    def check(self, paths: Sequence[str | Path], *, cwd: str | Path | None = None) -> BatchResult:
+        start = time.perf_counter()
+        fingerprint = config_fingerprint(self.command, cwd).encode("utf-8")
+        digests: dict[Path, str] = {}
+        pending: list[Path] = []
+        for path in map(Path, paths):
+            digest = hashlib.sha1(fingerprint + path.read_bytes()).hexdigest()
+            digests[path] = digest
+            if self.cache.get(digest) is None:
+                pending.append(path)
+
+        extracted = dict(zip(pending, self._extract(pending)))
+        unique_words = sorted({word for occurrences in extracted.values() for word, _, _ in occurrences})
+        unknowns = self._check_words(unique_words, cwd=cwd)
+        for path, occurrences in extracted.items():
+            self.cache.set(digests[path], self._map_back(occurrences, unknowns))
+        self.cache.save()
+
+        findings = [
+            SpellFinding(path, line, col, word)
+            for path, digest in digests.items()
+            for word, line, col in self.cache.get(digest) or []
+        ]
+        stats = BatchStats(
+            n_files=len(digests),
+            n_cached=len(digests) - len(pending),
+            n_words=sum(len(occurrences) for occurrences in extracted.values()),
+            n_unique_words=len(unique_words),
+            elapsed=time.perf_counter() - start,
+        )
+        return BatchResult(findings=findings, stats=stats)
+
+    def _extract(self, paths: list[Path]) -> list[list[Occurrence]]:
+        if self._executor_factory is None or len(paths) < self._min_files_for_pool:
+            return [extract_words(path) for path in paths]
+        with self._executor_factory() as executor:
+            # By reference to the worker module, not to this module which imports `pytoy`.
+            function = _words_module().extract_words
+            return list(executor.map(function, paths, chunksize=max(1, len(paths) // 32)))
+
+    def _check_words(self, words: Sequence[str], *, cwd: str | Path | None) -> dict[str, list[tuple[int, str]]]:
+        """Return the unknown parts, (offset, part), of `words`.
+
+        `cspell` may report only a part of a compound word such as `camelCase`.
+        """
+        if not words:
+            return {}
+        executable = shutil.which(self.command[0]) or self.command[0]
+        try:
+            ret = subprocess.run(
+                [executable, *self.command[1:], _STDIN_NAME],
+                input="\n".join(words),
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                encoding="utf-8",
+                cwd=cwd,
+            )
+        except OSError as e:
+            raise ValueError("`cspell` may not be installed?") from e
+        # `cspell` returns 1 if unknown words exist.
+        if ret.returncode not in (0, 1):
+            raise ValueError(f"`cspell` may not be installed?\n{ret.stdout}")
+
+        unknowns: dict[str, list[tuple[int, str]]] = {}
+        for line in ret.stdout.splitlines():
+            if m := _OUTPUT_PATTERN.match(line):
+                index = int(m.group("line")) - 1
+                if 0 <= index < len(words):
+                    unknowns.setdefault(words[index], []).append((int(m.group("col")) - 1, m.group("word")))
+        return unknowns
+
+    def _map_back(self, occurrences: list[Occurrence], unknowns: dict[str, list[tuple[int, str]]]) -> list[Occurrence]:
+        return [
+            (part, line, col + offset)
+            for word, line, col in occurrences
+            for offset, part in unknowns.get(word, ())
+        ]
+
+
+def collect_files(root: str | Path, suffixes: Sequence[str] = (".py", ".md", ".txt", ".rst")) -> list[Path]:
+    root = Path(root)
+    if root.is_file():
+        return [root]
+    result = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [name for name in dirnames if not name.startswith(".") and name not in {"__pycache__", "node_modules"}]
+        result += [Path(dirpath) / name for name in filenames if Path(name).suffix in suffixes]
+    return sorted(result)
@@ -0,0 +1,8 @@
+"""Modules executed in the worker processes of `CSpellBatchChecker`.
+
+The workers are spawned without `vim`, so the modules in this folder must not import `pytoy`.
+This folder is added to `sys.path` of the workers, and the modules are loaded as top-level modules.
+"""
+from pathlib import Path
+
+WORKER_FOLDER = Path(__file__).parent
@@ -0,0 +1,45 @@
+"""Extract the words to be spell-checked from a file.
+
+For `python` files, only `STRING` and `COMMENT` tokens are used as `CSpellOneFileChecker`.
+"""
+
+import re
+import tokenize
+from io import BytesIO
+from pathlib import Path
+from typing import Iterable
+
+_WORD_PATTERN = re.compile(r"[A-Za-z][A-Za-z0-9_']*")
+# Since python 3.12, the literal parts of f-strings are `FSTRING_MIDDLE` tokens.
+_TEXT_TOKENS = {tokenize.STRING, tokenize.COMMENT} | (
+    {tokenize.FSTRING_MIDDLE} if hasattr(tokenize, "FSTRING_MIDDLE") else set()
+)
+
+type Occurrence = tuple[str, int, int]  # (word, line, col), both of `line` and `col` are 1-based.
+
+
+def _iter_segments(path: Path, data: bytes) -> Iterable[tuple[str, int, int]]:
+    """Yield (text, line, col) of the parts to be checked."""
+    if path.suffix == ".py":
+        try:
+            tokens = list(tokenize.tokenize(BytesIO(data).readline))
+        except (tokenize.TokenError, SyntaxError):
+            tokens = None
+        if tokens is not None:
+            for token in tokens:
+                if token.type in _TEXT_TOKENS:
+                    line, col = token.start
+                    yield token.string, line, col
+            return
+    yield data.decode("utf-8", errors="replace"), 1, 0
+
+
+def extract_words(path: str | Path) -> list[Occurrence]:
+    path = Path(path)
+    occurrences: list[Occurrence] = []
+    for text, line, col in _iter_segments(path, path.read_bytes()):
+        for offset, segment in enumerate(text.split("\n")):
+            base_col = col if offset == 0 else 0
+            for m in _WORD_PATTERN.finditer(segment):
+                occurrences.append((m.group(0), line + offset, base_col + m.start() + 1))
+    return occurrences
@@ -27,6 +27,7 @@ from pytoy.tools.llm.kernel import FairyKernel
 from pytoy.tools.llm.models import LLMInteraction
 from pytoy.tools.llm.pytoy_fairy import PytoyFairy
 from pytoy.tools.llm.references import ReferenceHandler
+from pytoy.tools.llm.response_cache import describe_model, make_cache_key
 
 
 def select_language_kind(document: str) -> LanguageKind:
@@ -105,12 +106,13 @@ class ScopedReconstructionContract:
         buffer.range_operator.replace_text(selection, new_text)
 
     def revert_markers(self, buffer: PytoyBuffer) -> None:
-        start_range = buffer.range_operator.find_first(self.query_start)
-        if start_range:
-            buffer.range_operator.replace_text(start_range, "")
-        end_range = buffer.range_operator.find_first(self.query_end)
-        if end_range:
-            buffer.range_operator.replace_text(end_range, "")
+        range_operator = buffer.range_operator
+        start_range = range_operator.find_first(self.query_start)
+        end_range = range_operator.find_first(self.query_end)
+        with range_operator.transaction() as transaction:
+            for marker_range in (start_range, end_range):
+                if marker_range:
+                    transaction.replace_text(marker_range, "")
 
     def override_target(self, buffer: PytoyBuffer, content: str) -> None:
         """Based on the contract with LLM,  `content` should be the text within markers.
@@ -153,6 +155,50 @@ class ScopedReconstructionContract:
         return self._query_end
 
 
+_SCOPED_EDIT_NAME = "Edit or generation of the part of document inside markers"
+
+
+def make_scoped_edit_message(
+    document: str,
+    scoped_edit_contract: ScopedReconstructionContract,
+    reference_handler: ReferenceHandler,
+    language_kind: LanguageKind,
+) -> LLMMessage:
+    name = _SCOPED_EDIT_NAME
+    output_description = "A part of the document, focusing on the specified scope between markers."
+    language = language_kind
+    guidance_role = "An expert writer and editor"
+    intent = "Recontruction of the part of the document while preserving intent, structure, and coherence."
+    language_ruleset = LanguageRuleSet.from_document_kind(language)
+    style_ruleset = StyleRuleSet.from_language_and_uniformity_mode(language, "structure")
+    completion_ruleset = CompletionRuleSet.from_completion_mode(completion_mode="conservative")
+
+    rules = [
+        *language_ruleset.rules,
+        *scoped_edit_contract.rules,
+        *style_ruleset.rules,
+        *completion_ruleset.rules,
+        *scoped_edit_contract.override_directive_rules,
+    ]
+
+    system_prompt = SystemPromptSpec.from_any(
+        name=name,
+        output_spec=OutputSpec(output_type=str, description=output_description),
+        intent=intent,
+        rules=rules,
+        guidance_role=guidance_role,
+    )
+    composer = InvocationComposer(system_prompt)
+    if reference_handler.exist_reference:
+        section_writer = reference_handler.section_writer
+        usage = section_writer.make_material_usage()
+        data = section_writer.make_material_data(query=document)
+        supplementary_sections = [MaterialSection.from_any(name="ReferenceData", usage=usage, data=data)]
+    else:
+        supplementary_sections = None
+    return composer.compose_message(user_prompt=document, supplementary_sections=supplementary_sections)
+
+
 def make_scoped_edit_spec(
     document: str,
     scoped_edit_contract: ScopedReconstructionContract,
@@ -160,46 +206,13 @@ def make_scoped_edit_spec(
 ) -> LLMInvocationSpec:
     """Based on the `DocumentAnalysis`. provide the edit."""
 
-
-    name = "Edit or generation of the part of document inside markers"
-    output_description = "A part of the document, focusing on the specified scope between markers."
-
     def create_message(language_kind: LanguageKind) -> LLMMessage:
-        language = language_kind
-        guidance_role = "An expert writer and editor"
-        intent = "Recontruction of the part of the document while preserving intent, structure, and coherence."
-        language_ruleset = LanguageRuleSet.from_document_kind(language)
-        style_ruleset = StyleRuleSet.from_language_and_uniformity_mode(language, "structure")
-        completion_ruleset = CompletionRuleSet.from_completion_mode(completion_mode="conservative")
-
-        rules = [
-            *language_ruleset.rules,
-            *scoped_edit_contract.rules,
-            *style_ruleset.rules,
-            *completion_ruleset.rules,
-            *scoped_edit_contract.override_directive_rules,
-        ]
-
-        system_prompt = SystemPromptSpec.from_any(
-            name=name,
-            output_spec=OutputSpec(output_type=str, description=output_description),
-            intent=intent,
-            rules=rules,
-            guidance_role=guidance_role,
-        )
-        composer = InvocationComposer(system_prompt)
-        if reference_handler.exist_reference:
-            usage = reference_handler.section_writer.make_material_usage()
-            data = reference_handler.section_writer.make_material_data()
-            supplementary_sections = [MaterialSection.from_any(name="ReferenceData", usage=usage, data=data)]
-        else:
-            supplementary_sections = None
-        return composer.compose_message(user_prompt=document, supplementary_sections=supplementary_sections)
+        return make_scoped_edit_message(document, scoped_edit_contract, reference_handler, language_kind)
 
     return LLMInvocationSpec(
         create_messages=create_message,
         output_type=str,
-        meta=InvocationSpecMeta(name=name, intent="Scoped edit of the document."),
+        meta=InvocationSpecMeta(name=_SCOPED_EDIT_NAME, intent="Scoped edit of the document."),
     )
 
 
@@ -235,12 +248,20 @@ class ScopedEditDocumentRequester:
 
         document = buffer.content
         task_request = self._make_task_request(document, kernel)
+        cache_key = None
+        if kernel.llm_context.response_cache is not None:
+            messages = make_scoped_edit_message(
+                document, self.scoped_edit_contract, kernel.llm_context.reference_handler, select_language_kind(document)
+            )
+            # The markers have the random id, which should not change the key.
+            cache_key = make_cache_key(model=describe_model(), messages=messages, output_type=str, masks=[self._id])
 
         request = InteractionRequest(
             kernel=kernel,
             task_request=task_request,
             on_success=lambda output: self._apply_output(buffer, output),
             on_failure=lambda exc: self._handle_error(buffer, exc),
+            cache_key=cache_key,
         )
         return InteractionProvider().create(request)
 
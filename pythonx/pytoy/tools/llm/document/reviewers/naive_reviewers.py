@@ -1,5 +1,6 @@
 import logging
 from pytoy.tools.llm.interaction_provider import InteractionProvider, InteractionRequest
+from pytoy.tools.llm.response_cache import describe_model, make_cache_key
 from pytoy.tools.llm.models import LLMInteraction
 from pytoy.tools.llm.pytoy_fairy import PytoyFairy, FairyKernel
 from pytoy.shared.ui.notifications import EphemeralNotification
@@ -146,8 +147,7 @@ class ReviewPreparation(BaseModel, frozen=True):
     ]
 
 
-def make_preparation_spec(document: str) -> LLMInvocationSpec:
-    meta = InvocationSpecMeta(name="Preparing", intent="Prepare structured review context from document")
+def make_preparation_message(document: str) -> LLMMessage:
     rules = [
         "Infer DocumentProfile from the document.",
         "Infer ReviewCriteria suitable for submission-level review.",
@@ -165,10 +165,14 @@ def make_preparation_spec(document: str) -> LLMInvocationSpec:
         output_spec=OutputSpec(output_type=ReviewPreparation, description="Review Criterion and DocumentProfile")
     )
 
-    composer = InvocationComposer(prompt_spec)
+    return InvocationComposer(prompt_spec).compose_message(user_prompt=document)
+
+
+def make_preparation_spec(document: str) -> LLMInvocationSpec:
+    meta = InvocationSpecMeta(name="Preparing", intent="Prepare structured review context from document")
 
     def create_message(_: str) -> LLMMessage:
-        return composer.compose_message(user_prompt=document)
+        return make_preparation_message(document)
 
     return LLMInvocationSpec(meta=meta, output_type=ReviewPreparation, create_messages=create_message)
 
@@ -372,12 +376,19 @@ class NaiveReviewDocumentRequester:
         def on_failure(exception):
             EphemeralNotification().notify(str(exception))
 
-        task_request = self._make_task_request(document=self.buffer.content, kernel=self.pytoy_fairy.kernel)
+        document = self.buffer.content
+        task_request = self._make_task_request(document=document, kernel=self.pytoy_fairy.kernel)
+        cache_key = None
+        if self.pytoy_fairy.kernel.llm_context.response_cache is not None:
+            # The review is determined by the first messages, since the later ones are made from its output.
+            messages = make_preparation_message(document)
+            cache_key = make_cache_key(model=describe_model(), messages=messages, output_type=str)
         request = InteractionRequest(
             kernel=self.pytoy_fairy.kernel,
             task_request=task_request,
             on_success=on_success,
             on_failure=on_failure,
+            cache_key=cache_key,
         )
         interaction = InteractionProvider().create(request)
         return interaction
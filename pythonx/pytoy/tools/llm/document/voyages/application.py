@@ -15,6 +15,7 @@ from pytoy_llm import completion
 
 from pytoy.tools.llm.kernel import FairyKernel
 from pytoy.tools.llm.interaction_provider import InteractionProvider, InteractionRequest, LLMInteraction
+from pytoy.tools.llm.response_cache import describe_model, make_cache_key
 
 
 class EvolveRequest(BaseModel, frozen=True):
@@ -222,8 +223,20 @@ class VoyageInteractionCreator:
             llm_param=llm_param,
             connection_name=connection_name,
         )
+        cache_key = None
+        if self.kernel.llm_context.response_cache is not None:
+            cache_key = make_cache_key(
+                model=describe_model(connection_name, llm_param),
+                messages=_evolve_create_message(evolve_request),
+                output_type=EvolveResponse,
+            )
         interaction_request = InteractionRequest(
-            self.kernel, task_request=task_request, on_success=on_success, on_failure=on_failure
+            self.kernel,
+            task_request=task_request,
+            on_success=on_success,
+            on_failure=on_failure,
+            cache_key=cache_key,
+            cache_output_type=EvolveResponse,
         )
         return InteractionProvider().create(interaction_request)
 
@@ -241,7 +254,19 @@ class VoyageInteractionCreator:
             llm_param=llm_param,
             connection_name=connection_name,
         )
+        cache_key = None
+        if self.kernel.llm_context.response_cache is not None:
+            cache_key = make_cache_key(
+                model=describe_model(connection_name, llm_param),
+                messages=_reflect_create_messages(reflect_request),
+                output_type=ReflectResponse,
+            )
         interaction_request = InteractionRequest(
-            self.kernel, task_request=task_request, on_success=on_success, on_failure=on_failure
+            self.kernel,
+            task_request=task_request,
+            on_success=on_success,
+            on_failure=on_failure,
+            cache_key=cache_key,
+            cache_output_type=ReflectResponse,
         )
         return InteractionProvider().create(interaction_request)
@@ -3,6 +3,7 @@ Operator: Do something synchronously with `FairKernel`.
 InteractionRequester : Do something with LLM using `FairyKernel`.
 """
 
+import time
 import uuid
 from pydantic import BaseModel
 from dataclasses import dataclass
@@ -25,6 +26,8 @@ class InteractionRequest:
     on_success: Callable[[Any], None]
     on_failure: Callable[[Exception], None]
     hooks: HooksForInteraction | None = None
+    cache_key: str | None = None  # See `make_cache_key`. The response is cached only if it is given.
+    cache_output_type: Any = str  # The type of the output, which validates the cached one.
 
 
 class InteractionProvider:
@@ -54,8 +57,22 @@ class InteractionProvider:
 
         # 実際のLLM呼び出し処理
         def _main(_) -> Any:
-            event_sink = LoggerEventSink(request.kernel.llm_context.logger)
+            logger = request.kernel.llm_context.logger
+            cache = request.kernel.llm_context.response_cache if request.cache_key else None
+            if cache is not None and request.cache_key:
+                if (cached := cache.get(request.cache_key, request.cache_output_type)) is not None:
+                    logger.info(f"Cache hit `{request.cache_key[:12]}`. {cache.stats.to_line()}")
+                    return cached.output
+
+            event_sink = LoggerEventSink(logger)
+            start = time.perf_counter()
             task_response = TaskExecutor().execute(request=request.task_request, event_sink=event_sink)
+            if cache is not None and request.cache_key:
+                try:
+                    cache.put(request.cache_key, task_response.output, time.perf_counter() - start)
+                except Exception as e:
+                    logger.warning(f"Failed to cache the response: {e}")
+                logger.info(f"Cache miss `{request.cache_key[:12]}`. {cache.stats.to_line()}")
             return task_response.output
 
         # スレッド実行リクエスト作成
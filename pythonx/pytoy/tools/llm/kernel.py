@@ -5,12 +5,14 @@ from pytoy.contexts.pytoy import GlobalPytoyContext
 from pytoy.shared.pytoy_configuration import PytoyConfiguration
 from pytoy.tools.llm.models import LLMInteraction
 from pytoy.tools.llm.references import ReferenceHandler
+from pytoy.tools.llm.response_cache import ResponseCache, ResponseCacheSettings
 from pathlib import Path
 
 
 class PytoyLLMContext:
     LLM_ROOT_KEY: Final[str] = "vim_pytoy_llm"
     REFERENCE_FOLDER_KEY: Final[str] = "references"
+    RESPONSE_CACHE_KEY: Final[str] = "response_cache"
 
     def __init__(self, workspace: Path | str, *, ctx: GlobalPytoyContext | None = None):
         if ctx is None:
@@ -19,6 +21,7 @@ class PytoyLLMContext:
         self._workspace = workspace
         self._configuration = PytoyConfiguration(workspace)
         self._lock = threading.Lock()
+        self._response_cache: ResponseCache | None = None
         self.ctx = ctx
 
     @property
@@ -49,6 +52,26 @@ class PytoyLLMContext:
     def reference_handler(self) -> ReferenceHandler:
         return ReferenceHandler(self.reference_folder)
 
+    @property
+    def response_cache(self) -> ResponseCache | None:
+        """Return the cache of LLM responses, or `None` unless it is enabled by the configuration."""
+        with self._lock:
+            if self._response_cache is None:
+                settings = self._read_response_cache_settings()
+                if not settings.enabled:
+                    return None
+                folder = self.root_folder / self.RESPONSE_CACHE_KEY
+                self._response_cache = ResponseCache.from_settings(folder, settings)
+            return self._response_cache
+
+    def _read_response_cache_settings(self) -> ResponseCacheSettings:
+        path = Path(self.LLM_ROOT_KEY) / f"{self.RESPONSE_CACHE_KEY}.json"
+        try:
+            data = self._configuration.config_reader.read_json_dict(path, encoding="utf8")
+        except ValueError:
+            return ResponseCacheSettings()
+        return ResponseCacheSettings.model_validate(data)
+
     def dispose(self):
         pass
 
@@ -4,6 +4,7 @@ from pathlib import Path
 from pytoy.tools.llm.references.reference_collectors import ReferenceCollector  # noqa:  # type: ignore
 from pytoy.tools.llm.references.section_writer import ReferenceSectionWriter  # noqa:  # type: ignore
 from pytoy.tools.llm.references.models import InfoSource, ReferenceDataset  # noqa: #type: ignore
+from pytoy.tools.llm.references.packer import ReferenceIndex, ReferencePacker  # noqa: # type: ignore
 from pytoy.tools.llm.references.converters import ConverterProtocol, MarkdownConverter, MarkItDownConverter  # noqa: # type: ignore
 
 
@@ -30,7 +31,7 @@ class ReferenceHandler:
     @property
     def section_writer(self) -> ReferenceSectionWriter:
         dataset = ReferenceDataset.load(self.storage_folder)
-        return ReferenceSectionWriter(dataset)
+        return ReferenceSectionWriter(dataset, ReferenceIndex(self.storage_folder / "reference_index.json"))
 
 
 if __name__ == "__main__":
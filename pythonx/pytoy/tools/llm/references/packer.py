@@ -0,0 +1,208 @@
+"""Pack the references into the character budget of the prompt.
+
+* `ReferenceIndex` caches the size, the meta text and the summary terms of each reference.
+  A reference is read only when its markdown or its info is modified (`mtime` and `st_size`),
+  and the entries of the removed references are dropped.
+* `ReferencePacker` selects the references by a greedy knapsack on (relevance / size)
+  and reads only the selected ones. The order is deterministic: ties are broken by `uri`.
+"""
+
+import json
+import os
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Sequence
+
+from pydantic import BaseModel
+
+from pytoy.tools.llm.references.models import ReferenceInfo, ReferencePathPair
+
+_TERM_PATTERN = re.compile(r"[A-Za-z_][A-Za-z0-9_]{2,}")
+_N_TERMS = 32
+
+
+def _to_terms(text: str) -> Counter[str]:
+    return Counter(term.lower() for term in _TERM_PATTERN.findall(text))
+
+
+def render_meta(info: ReferenceInfo) -> str:
+    return (
+        "<reference-meta>\n"
+        f"uri={info.uri}\n"
+        f"timestamp={info.timestamp}\n"
+        f"location={info.location}\n"
+        "</reference-meta>\n"
+    )
+
+
+def render_reference(meta: str, body: str) -> str:
+    return f"<reference>\n{meta}\n<reference-body>\n{body}\n\n</reference-body>\n\n</reference>\n"
+
+
+class IndexedReference(BaseModel):
+    key: str  # `uri.path`, used for the deterministic order.
+    markdown_path: Path
+    mtime: float
+    st_size: int
+    # The stat of `info_path`. The defaults never match, so the entries of the older index are read again.
+    info_mtime: float = -1.0
+    info_st_size: int = -1
+    meta: str
+    size: int  # The number of characters of the rendered reference.
+    terms: Sequence[str]  # The frequent terms in the reference, as the summary.
+
+
+class ReferenceIndex:
+    """`index_path` is a `json` file, and the index is kept only in memory if it is `None`."""
+
+    def __init__(self, index_path: Path | None = None):
+        self.index_path = index_path
+        self._entries: dict[Path, IndexedReference] = {}
+        self.bytes_read = 0
+        self.n_indexed = 0
+        if index_path is not None and index_path.exists():
+            try:
+                data = json.loads(index_path.read_text(encoding="utf8"))
+                entries = [IndexedReference.model_validate(item) for item in data]
+                self._entries = {entry.markdown_path: entry for entry in entries}
+            except (OSError, ValueError):
+                self._entries = {}
+
+    def update(self, path_pairs: Sequence[ReferencePathPair]) -> Sequence[IndexedReference]:
+        """Return the entries of `path_pairs`, reading only the modified references."""
+        entries = []
+        modified = self._prune({pair.markdown_path for pair in path_pairs})
+        for pair in path_pairs:
+            stat, info_stat = pair.markdown_path.stat(), pair.info_path.stat()
+            entry = self._entries.get(pair.markdown_path)
+            if entry is None or (entry.mtime, entry.st_size, entry.info_mtime, entry.info_st_size) != (
+                stat.st_mtime,
+                stat.st_size,
+                info_stat.st_mtime,
+                info_stat.st_size,
+            ):
+                entry = self._make_entry(pair, stat, info_stat)
+                self._entries[pair.markdown_path] = entry
+                modified = True
+            entries.append(entry)
+        if modified:
+            self.save()
+        return entries
+
+    def _prune(self, current: set[Path]) -> bool:
+        """Drop the entries whose markdown no longer exists. Return True if any is dropped."""
+        removed = [path for path in self._entries if path not in current and not path.exists()]
+        for path in removed:
+            del self._entries[path]
+        return bool(removed)
+
+    def _make_entry(self, pair: ReferencePathPair, stat: os.stat_result, info_stat: os.stat_result) -> IndexedReference:
+        info_text = pair.info_path.read_text(encoding="utf8")
+        body = pair.markdown_path.read_text(encoding="utf8")
+        self.bytes_read += len(info_text.encode("utf8")) + stat.st_size
+        self.n_indexed += 1
+        info = ReferenceInfo.model_validate_json(info_text)
+        meta = render_meta(info)
+        terms = _to_terms(f"{info.uri.path}\n{body}")
+        return IndexedReference(
+            key=info.uri.path,
+            markdown_path=pair.markdown_path,
+            mtime=stat.st_mtime,
+            st_size=stat.st_size,
+            info_mtime=info_stat.st_mtime,
+            info_st_size=info_stat.st_size,
+            meta=meta,
+            size=len(render_reference(meta, body)),
+            terms=[term for term, _ in terms.most_common(_N_TERMS)],
+        )
+
+    def save(self) -> None:
+        if self.index_path is None:
+            return
+        data = [entry.model_dump(mode="json") for entry in self._entries.values()]
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        self.index_path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf8")
+
+
+@dataclass(frozen=True)
+class PackingStats:
+    n_references: int
+    n_selected: int
+    n_indexed: int
+    bytes_read: int
+    size: int
+    elapsed: float
+
+    def to_line(self) -> str:
+        return (
+            f"references: {self.n_selected}/{self.n_references} selected, {self.size} chars, "
+            f"{self.n_indexed} indexed, {self.bytes_read} bytes read ({self.elapsed * 1000:.1f}ms)"
+        )
+
+
+@dataclass(frozen=True)
+class PackingResult:
+    text: str
+    selected: Sequence[IndexedReference]
+    stats: PackingStats
+
+
+class ReferencePacker:
+    def __init__(self, index: ReferenceIndex):
+        self.index = index
+
+    def relevance(self, entry: IndexedReference, query_terms: Counter[str]) -> float:
+        """Every reference has the base value 1, and the terms shared with `query` add to it."""
+        if not query_terms:
+            return 1.0
+        shared = sum(1 for term in entry.terms if term in query_terms)
+        return 1.0 + 4.0 * shared / max(len(entry.terms), 1)
+
+    def select(
+        self, entries: Sequence[IndexedReference], budget: int, query: str | None = None
+    ) -> list[IndexedReference]:
+        query_terms = _to_terms(query or "")
+        scored = sorted(
+            ((self.relevance(entry, query_terms), entry) for entry in entries if 0 < entry.size),
+            key=lambda item: (-item[0] / item[1].size, item[1].key),
+        )
+        selected, used = [], 0
+        for value, entry in scored:
+            if used + entry.size <= budget:
+                selected.append((value, entry))
+                used += entry.size + 1  # The separator of `pack`.
+        # The greedy selection may be poor when one valuable reference exceeds the others.
+        best = max(
+            ((value, entry) for value, entry in scored if entry.size <= budget),
+            key=lambda item: (item[0], item[1].key),
+            default=None,
+        )
+        if best is not None and sum(value for value, _ in selected) < best[0]:
+            selected = [best]
+        selected.sort(key=lambda item: (-item[0], item[1].key))
+        return [entry for _, entry in selected]
+
+    def pack(self, path_pairs: Sequence[ReferencePathPair], budget: int, query: str | None = None) -> PackingResult:
+        start = time.perf_counter()
+        bytes_read, n_indexed = self.index.bytes_read, self.index.n_indexed
+        entries = self.index.update(path_pairs)
+        selected = self.select(entries, budget, query)
+
+        parts = []
+        for entry in selected:
+            body = entry.markdown_path.read_text(encoding="utf8")
+            self.index.bytes_read += entry.st_size
+            parts.append(render_reference(entry.meta, body))
+        text = "\n".join(parts)
+        stats = PackingStats(
+            n_references=len(entries),
+            n_selected=len(selected),
+            n_indexed=self.index.n_indexed - n_indexed,
+            bytes_read=self.index.bytes_read - bytes_read,
+            size=len(text),
+            elapsed=time.perf_counter() - start,
+        )
+        return PackingResult(text=text, selected=selected, stats=stats)
@@ -1,56 +1,27 @@
-from pathlib import Path
-from typing import Annotated, Literal, Self, assert_never, Protocol, Final, Sequence, Any
-from textwrap import dedent
-from pytoy.tools.llm.references.models import (
-    ReferencePathPair,
-    ReferenceInfo,
-    ReferenceDataset,
-)
+from pytoy.tools.llm.references.models import ReferenceDataset
+from pytoy.tools.llm.references.packer import PackingStats, ReferenceIndex, ReferencePacker
 
 from pytoy_llm.materials.models import MaterialData, TextMaterialData
 from pytoy_llm.composers.materials import MaterialUsage
 
 
 class ReferenceSectionWriter:
-    def __init__(self, dataset: ReferenceDataset) -> None:
+    def __init__(self, dataset: ReferenceDataset, index: ReferenceIndex | None = None) -> None:
         self.dataset = dataset
         self.path_pairs = dataset.path_pairs
+        self.index = index or ReferenceIndex()
+        self.last_stats: PackingStats | None = None
 
-    def _to_meta(self, info: ReferenceInfo) -> str:
-        return (
-            "<reference-meta>\n"
-            f"uri={info.uri}\n"
-            f"timestamp={info.timestamp}\n"
-            f"location={info.location}\n"
-            "</reference-meta>\n"
-        )
-
-    def _to_body_str(self, path: Path) -> str:
-        return f"<reference-body>\n{path.read_text(encoding='utf8')}\n\n</reference-body>\n"
-
-    def _make_one_reference(self, path_pair: ReferencePathPair) -> str:
-        info = ReferenceInfo.model_validate_json(path_pair.info_path.read_text())
-        meta = self._to_meta(info)
-        body = self._to_body_str(path_pair.markdown_path)
-        return f"<reference>\n{meta}\n{body}\n</reference>\n"
-
-    def make_structured_text(self, maximum_size: int = 10**6) -> str:
-        count = 0
-        import random
-
-        path_pairs = list(self.path_pairs)
-        random.shuffle(path_pairs)
-        parts = []
+    def make_structured_text(self, maximum_size: int = 10**6, query: str | None = None) -> str:
+        """Pack the references relevant to `query` within `maximum_size` characters.
 
-        for pair in path_pairs:
-            if maximum_size < count:
-                break
-            instance = self._make_one_reference(pair)
-            count += len(instance)
-            parts.append(instance)
-        return "\n".join(parts)
+        Only the selected references are read, and the result is deterministic.
+        """
+        result = ReferencePacker(self.index).pack(self.path_pairs, maximum_size, query)
+        self.last_stats = result.stats
+        return result.text
 
-    def make_material_data(self) -> MaterialData:
+    def make_material_data(self, query: str | None = None) -> MaterialData:
         description = (
             "- This SECTION includes the existent documents.\n"
             "The explanation of <tag> is as follows:\n"
@@ -60,7 +31,7 @@ class ReferenceSectionWriter:
             "* Tags inside <reference-body> are NOT structural and must be treated as plain text.\n"
         )
         return TextMaterialData(
-            description=description, content=self.make_structured_text()
+            description=description, content=self.make_structured_text(query=query)
         )
 
     def make_material_usage(self) -> MaterialUsage:
@@ -0,0 +1,204 @@
+"""On-disk cache of the outputs of `TaskRequest`, keyed by the content of the request.
+
+The key is the hash of the model, the messages and the schema of the output (`make_cache_key`),
+so the same review / evolve of the unchanged document is answered without calling the LLM.
+
+* Each entry is one JSON file, written atomically, so concurrent writers (threads or Vim instances) are safe.
+  The folder is in the workspace and may be committed, so nothing but JSON is loaded from it.
+  The output is validated by the type of the output, given at `get`.
+* The entries older than `ttl_seconds` are ignored, and the least recently used ones
+  are evicted when `max_entries` or `max_bytes` is exceeded.
+
+The cache is opt-in: it is enabled by `{"enabled": true}` in `vim_pytoy_llm/response_cache.json`
+of the configuration folder (see `ResponseCacheSettings`).
+"""
+
+import dataclasses
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Mapping, Sequence
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from pydantic_core import to_jsonable_python
+
+_SUFFIX = ".json"
+
+
+def _to_jsonable(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, type):
+        if issubclass(value, BaseModel):
+            return value.model_json_schema()
+        return value.__name__
+    if dataclasses.is_dataclass(value):
+        return _to_jsonable(dataclasses.asdict(value))
+    if isinstance(value, Mapping):
+        return {str(k): _to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_jsonable(item) for item in value]
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return repr(value)
+
+
+def make_cache_key(*, model: Any, messages: Any, output_type: Any, masks: Sequence[str] = ()) -> str:
+    """Return the stable hash of the request.
+
+    `model` is e.g. the connection name and `LLMParam`, `messages` are those sent to the LLM,
+    and `output_type` is the type of the response, whose json schema is used if it is a `BaseModel`.
+    `masks` are removed from the request before hashing, e.g. the random ids of markers.
+    """
+    data = {"model": _to_jsonable(model), "messages": _to_jsonable(messages), "output_type": _to_jsonable(output_type)}
+    text = json.dumps(data, sort_keys=True, ensure_ascii=False)
+    for mask in masks:
+        text = text.replace(mask, "")
+    return hashlib.sha256(text.encode("utf8")).hexdigest()
+
+
+def describe_model(
+    connection: str | None = None, llm_param: Any = None, *, configuration_path: Path | None = None
+) -> dict[str, Any]:
+    """Return the `model` of `make_cache_key`, for the request to `connection` with `llm_param`.
+
+    `connection=None` is the default connection of the configuration of `pytoy_llm`, and the connection
+    names are resolved to the models by it, so the hash of the configuration is included.
+    """
+    if configuration_path is None:
+        from pytoy_llm import get_configuration_path
+
+        configuration_path = Path(get_configuration_path())
+    try:
+        configuration = hashlib.sha256(Path(configuration_path).read_bytes()).hexdigest()
+    except OSError:
+        configuration = None
+    return {"connection": connection, "llm_param": _to_jsonable(llm_param), "configuration": configuration}
+
+
+class ResponseCacheSettings(BaseModel):
+    enabled: bool = False
+    max_entries: int = 256
+    max_bytes: int = 64 * 2**20
+    ttl_seconds: float = 7 * 24 * 60 * 60
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    output: Any
+    created: float
+    elapsed: float  # The latency of the original request.
+
+
+@dataclass
+class ResponseCacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    saved_seconds: float = 0.0
+
+    def to_line(self) -> str:
+        return (
+            f"LLM response cache: {self.hits} hits, {self.misses} misses, "
+            f"{self.evictions} evictions, {self.saved_seconds:.1f}s saved"
+        )
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        folder: Path,
+        max_entries: int = 256,
+        max_bytes: int = 64 * 2**20,
+        ttl_seconds: float = 7 * 24 * 60 * 60,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.folder = Path(folder)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.stats = ResponseCacheStats()
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, folder: Path, settings: ResponseCacheSettings) -> "ResponseCache":
+        return cls(folder, settings.max_entries, settings.max_bytes, settings.ttl_seconds)
+
+    def _path(self, key: str) -> Path:
+        return self.folder / f"{key}{_SUFFIX}"
+
+    def get(self, key: str, output_type: Any = str) -> CachedResponse | None:
+        path = self._path(key)
+        try:
+            data = json.loads(path.read_bytes())
+            response = CachedResponse(
+                output=TypeAdapter(output_type).validate_python(data["output"]),
+                created=float(data["created"]),
+                elapsed=float(data["elapsed"]),
+            )
+        except (OSError, ValueError, TypeError, KeyError, ValidationError):
+            # Missing, being replaced by another writer, or written by an older version.
+            response = None
+        now = self._clock()
+        if response is None or self.ttl_seconds < now - response.created:
+            with self._lock:
+                self.stats.misses += 1
+            return None
+        try:
+            os.utime(path, (now, now))  # `mtime` is the last access, for LRU.
+        except OSError:
+            pass
+        with self._lock:
+            self.stats.hits += 1
+            self.stats.saved_seconds += response.elapsed
+        return response
+
+    def put(self, key: str, output: Any, elapsed: float) -> None:
+        now = self._clock()
+        entry = {"output": to_jsonable_python(output), "created": now, "elapsed": elapsed}
+        data = json.dumps(entry, ensure_ascii=False).encode("utf8")
+        self.folder.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self.folder, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fp:
+                fp.write(data)
+            os.utime(tmp_name, (now, now))
+            os.replace(tmp_name, self._path(key))
+        except OSError:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        self.evict()
+
+    def evict(self) -> int:
+        """Remove the expired entries and the least recently used ones over the limits.
+
+        `mtime` is not older than the creation, so an entry expired here is also expired at `get`.
+        """
+        now = self._clock()
+        entries = []
+        for path in self.folder.glob(f"*{_SUFFIX}"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, path.name, path, stat.st_size))
+        entries.sort(reverse=True)  # The most recent first.
+
+        removed = 0
+        n_entries, n_bytes = 0, 0
+        for mtime, _, path, size in entries:
+            if now - mtime <= self.ttl_seconds and n_entries < self.max_entries and n_bytes + size <= self.max_bytes:
+                n_entries += 1
+                n_bytes += size
+                continue
+            path.unlink(missing_ok=True)
+            removed += 1
+        with self._lock:
+            self.stats.evictions += removed
+        return removed
@@ -0,0 +1,167 @@
+"""Index of the structure of markdown, updated incrementally.
+
+The fences ("```") and the headings are kept as sorted line numbers,
+and a code block is a pair of the consecutive fences, so "block at line" is answered by `bisect`.
+At `update`, only the region between the common prefix and suffix of the old and new lines is scanned.
+
+`MarkdownIndexRegistry` keeps one index per buffer, and skips even the comparison
+while `b:changedtick` of the buffer is unchanged.
+"""
+
+from __future__ import annotations
+
+import re
+from bisect import bisect_left
+from typing import TYPE_CHECKING, Sequence
+
+from pytoy.shared.lib.text import LineRange
+from pytoy.tools.markdown.models import CodeBlock, Heading, MarkdownStructure
+
+if TYPE_CHECKING:
+    from pytoy.shared.ui.pytoy_buffer import PytoyBuffer
+    from pytoy.shared.ui.pytoy_buffer.protocol import BufferID
+
+
+_HEADING_PATTERN = re.compile(r"(#{1,6})\s+(.*)")
+_CHUNK = 1024
+
+
+def _normalize_type(type: str) -> str:
+    maps = {"py": "python", "sh": "bash"}
+    return maps.get(type, type)
+
+
+def _common_prefix(old: Sequence[str], new: Sequence[str]) -> int:
+    n = min(len(old), len(new))
+    start = 0
+    while start < n:
+        end = min(start + _CHUNK, n)
+        if old[start:end] != new[start:end]:
+            return next(i for i in range(start, end) if old[i] != new[i])
+        start = end
+    return n
+
+
+def _common_suffix(old: Sequence[str], new: Sequence[str], limit: int) -> int:
+    """`limit` is the maximum length, so that the suffix does not overlap with the prefix."""
+    n_old, n_new = len(old), len(new)
+    length = 0
+    while length < limit:
+        step = min(_CHUNK, limit - length)
+        if old[n_old - length - step : n_old - length] != new[n_new - length - step : n_new - length]:
+            return length + next(i for i in range(step) if old[n_old - length - 1 - i] != new[n_new - length - 1 - i])
+        length += step
+    return limit
+
+
+class MarkdownIndex:
+    def __init__(self, lines: Sequence[str] = ()):
+        self._lines: list[str] = []
+        self._fences: list[int] = []
+        self._headings: list[int] = []
+        self.update(lines)
+
+    @property
+    def lines(self) -> Sequence[str]:
+        return self._lines
+
+    @property
+    def fences(self) -> Sequence[int]:
+        """The line numbers of "```", both of opening and closing ones."""
+        return self._fences
+
+    def update(self, lines: Sequence[str]) -> LineRange | None:
+        """Re-index only the edited region, and return it in `lines`. `None` if nothing is changed."""
+        lines = list(lines)
+        old = self._lines
+        prefix = _common_prefix(old, lines)
+        if prefix == len(old) == len(lines):
+            return None
+        suffix = _common_suffix(old, lines, min(len(old), len(lines)) - prefix)
+        old_end, new_end = len(old) - suffix, len(lines) - suffix
+        delta = new_end - old_end
+
+        fences, headings = [], []
+        for number in range(prefix, new_end):
+            line = lines[number]
+            if line.startswith("```"):
+                fences.append(number)
+            elif line.startswith("#"):
+                headings.append(number)
+        self._fences = self._splice(self._fences, prefix, old_end, fences, delta)
+        self._headings = self._splice(self._headings, prefix, old_end, headings, delta)
+        self._lines = lines
+        return LineRange(prefix, new_end)
+
+    def _splice(self, numbers: list[int], start: int, end: int, inserted: list[int], delta: int) -> list[int]:
+        i0, i1 = bisect_left(numbers, start), bisect_left(numbers, end)
+        return numbers[:i0] + inserted + [number + delta for number in numbers[i1:]]
+
+    def _block_range(self, line: int) -> tuple[int, int] | None:
+        """Return the indices of the opening and closing fences around `line`."""
+        index = bisect_left(self._fences, line)
+        if index % 2 == 1 and index < len(self._fences) and self._fences[index] != line:
+            return index - 1, index
+        return None
+
+    def _to_block(self, open_index: int) -> CodeBlock:
+        open_line, close_line = self._fences[open_index], self._fences[open_index + 1]
+        type = _normalize_type(self._lines[open_line].strip("`").strip())
+        return CodeBlock(type=type, start=open_line + 1, end=close_line, lines=self._lines[open_line + 1 : close_line])
+
+    def block_at(self, line: int) -> CodeBlock | None:
+        """Return the code block which contains `line` (0-based). The fences are not included."""
+        if (indices := self._block_range(line)) is None:
+            return None
+        return self._to_block(indices[0])
+
+    @property
+    def code_blocks(self) -> Sequence[CodeBlock]:
+        """A fence without the closing one does not make a block."""
+        return [self._to_block(index) for index in range(0, len(self._fences) - 1, 2)]
+
+    @property
+    def headings(self) -> Sequence[Heading]:
+        """The headings outside the code blocks."""
+        result = []
+        for number in self._headings:
+            if (m := _HEADING_PATTERN.match(self._lines[number])) and not self._is_in_fences(number):
+                result.append(Heading(line=number, level=len(m.group(1)), title=m.group(2).strip()))
+        return result
+
+    def _is_in_fences(self, line: int) -> bool:
+        # An unclosed fence also hides the following headings.
+        return bisect_left(self._fences, line) % 2 == 1
+
+    @property
+    def structure(self) -> MarkdownStructure:
+        return MarkdownStructure(code_blocks=self.code_blocks)
+
+
+def _get_changedtick(buffer: PytoyBuffer) -> int | None:
+    # Only `vim` buffers have `changedtick`; for the others, the lines are compared every time.
+    kernel = getattr(buffer.impl, "kernel", None)
+    try:
+        return int(getattr(kernel, "changedtick"))
+    except Exception:
+        return None
+
+
+class MarkdownIndexRegistry:
+    def __init__(self) -> None:
+        self._entries: dict[BufferID, tuple[int | None, MarkdownIndex]] = {}
+
+    def get(self, buffer: PytoyBuffer) -> MarkdownIndex:
+        buffer_id = buffer.buffer_id
+        changedtick = _get_changedtick(buffer)
+        entry = self._entries.get(buffer_id)
+        if entry is None:
+            index = MarkdownIndex(buffer.lines)
+            buffer.on_wiped.subscribe(lambda _: self._entries.pop(buffer_id, None))
+        else:
+            last_tick, index = entry
+            if changedtick is not None and changedtick == last_tick:
+                return index
+            index.update(buffer.lines)
+        self._entries[buffer_id] = (changedtick, index)
+        return index
@@ -0,0 +1,29 @@
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Sequence, Literal
+
+
+@dataclass(frozen=True)
+class CodeBlock:
+    type: Literal["python", "bash"] | str
+    start: int  # 0-index lineno of `markdown`. "```" is not included.
+    end: int  # 0-index lineno of `markdown`. exclusive. "```" is not included.
+    lines: Sequence[str]
+
+
+@dataclass(frozen=True)
+class Heading:
+    line: int  # 0-index lineno of `markdown`.
+    level: int
+    title: str
+
+
+@dataclass(frozen=True)
+class MarkdownStructure:
+    code_blocks: Sequence[CodeBlock]  # Sorted by `start`.
+
+    def get_current_code_block(self, position: int) -> CodeBlock | None:
+        index = bisect_right(self.code_blocks, position, key=lambda block: block.start) - 1
+        if 0 <= index and position < self.code_blocks[index].end:
+            return self.code_blocks[index]
+        return None
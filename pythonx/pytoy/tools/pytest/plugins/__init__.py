@@ -0,0 +1,7 @@
+"""Plugins loaded into the `pytest` processes launched by pytoy.
+
+This folder is added to `PYTHONPATH` of the process, so the plugins must not import `pytoy`.
+"""
+from pathlib import Path
+
+PLUGIN_FOLDER = Path(__file__).parent
@@ -0,0 +1,89 @@
+"""`pytest` plugin which writes one JSON record per test event to `$PYTOY_PYTEST_REPORT`.
+
+Usage: `PYTHONPATH=<this folder> PYTOY_PYTEST_REPORT=<path> pytest -p pytoy_pytest_report`.
+
+Records (one per line):
+    {"event": "start"}
+    {"event": "report", "nodeid": ..., "when": ..., "outcome": ..., "duration": ..., "entries": [...]}
+    {"event": "collect", "nodeid": ..., "outcome": ..., "entries": [...]}
+    {"event": "finish", "exitstatus": ...}
+
+`entries` are the positions of the traceback, `{"path", "lineno", "message"}`.
+If the traceback is not structured, `longrepr` (text) is given instead.
+"""
+
+import json
+import os
+
+ENV_KEY = "PYTOY_PYTEST_REPORT"
+
+_stream = None
+
+
+def _write(record: dict) -> None:
+    if _stream is None:
+        return
+    _stream.write(json.dumps(record) + "\n")
+    _stream.flush()
+
+
+def _to_entries(longrepr) -> list[dict] | None:
+    chain = getattr(longrepr, "chain", None)
+    tracebacks = [element[0] for element in chain] if chain else [getattr(longrepr, "reprtraceback", None)]
+    entries = []
+    for reprtraceback in tracebacks:
+        if reprtraceback is None:
+            return None
+        for entry in reprtraceback.reprentries:
+            fileloc = getattr(entry, "reprfileloc", None)
+            if fileloc is None:
+                continue
+            details = [line[1:].strip() for line in getattr(entry, "lines", []) if line.startswith("E")]
+            message = " ".join(details) if details else fileloc.message
+            entries.append({"path": fileloc.path, "lineno": fileloc.lineno, "message": message})
+    return entries
+
+
+def _to_record(event: str, report) -> dict:
+    record = {"event": event, "nodeid": report.nodeid, "outcome": report.outcome}
+    if report.failed:
+        entries = _to_entries(report.longrepr)
+        if entries:
+            record["entries"] = entries
+        else:
+            record["longrepr"] = str(report.longrepr)
+    return record
+
+
+def pytest_configure(config) -> None:
+    global _stream
+    path = os.environ.get(ENV_KEY)
+    if path and _stream is None and not hasattr(config, "workerinput"):
+        _stream = open(path, "w", encoding="utf-8")
+        _write({"event": "start"})
+
+
+def pytest_collectreport(report) -> None:
+    if report.failed:
+        _write(_to_record("collect", report))
+
+
+def pytest_runtest_logreport(report) -> None:
+    # Passed `setup` / `teardown` are not interesting.
+    if report.when != "call" and report.passed:
+        return
+    record = _to_record("report", report)
+    record["when"] = report.when
+    record["duration"] = report.duration
+    _write(record)
+
+
+def pytest_sessionfinish(session, exitstatus) -> None:
+    _write({"event": "finish", "exitstatus": int(exitstatus)})
+
+
+def pytest_unconfigure(config) -> None:
+    global _stream
+    if _stream is not None:
+        _stream.close()
+        _stream = None
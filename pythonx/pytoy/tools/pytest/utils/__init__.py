@@ -1,6 +1,8 @@
 from pathlib import Path
 from pytoy.tools.pytest.utils.script_decipher import ScriptDecipher  # NOQA
 from pytoy.tools.pytest.utils.pytest_decipher import PytestDecipher  # NOQA
+from pytoy.tools.pytest.utils.report_reader import PytestReportIngestor, PytestReportReader, PytestSummary  # NOQA
+from pytoy.tools.pytest.utils.import_graph import AffectedSelection, AffectedTestSelector, ImportGraph  # NOQA
 
 
 def to_func_command(path: str | Path, line: int, suffix: str = "") -> str:
@@ -0,0 +1,232 @@
+"""Select the test modules affected by the changes via the static import graph.
+
+* `ImportGraph` parses the `import` statements of the workspace with `ast`.
+  Only the files whose `mtime` changed are parsed again at `update`.
+* `AffectedTestSelector` remembers the `mtime`s at the last successful run,
+  and selects the test modules which transitively import the changed files.
+
+The names of modules are derived as `pytest` does with `rootdir`-based import:
+the top-most folder without `__init__.py` is regarded as the source root.
+Dynamic imports (`importlib`, `__import__`) are not tracked.
+"""
+
+import ast
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Mapping, Sequence
+
+
+_EXCLUDED_FOLDERS = {"__pycache__", "node_modules", "build", "dist", "site-packages"}
+
+
+def _iter_python_files(root: Path) -> Iterable[Path]:
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [name for name in dirnames if not name.startswith(".") and name not in _EXCLUDED_FOLDERS]
+        for filename in filenames:
+            if filename.endswith(".py"):
+                yield Path(dirpath) / filename
+
+
+def is_test_module(path: Path) -> bool:
+    """Follow the default `python_files` of `pytest`."""
+    return path.suffix == ".py" and (path.name.startswith("test_") or path.stem.endswith("_test"))
+
+
+def _to_module_name(path: Path) -> str:
+    parts = [] if path.name == "__init__.py" else [path.stem]
+    folder = path.parent
+    while (folder / "__init__.py").exists():
+        parts.append(folder.name)
+        folder = folder.parent
+    return ".".join(reversed(parts))
+
+
+def _with_parents(name: str) -> set[str]:
+    """Importing `a.b.c` executes `a` and `a.b` as well."""
+    parts = name.split(".")
+    return {".".join(parts[: index + 1]) for index in range(len(parts))}
+
+
+def _parse_imports(path: Path, module_name: str) -> frozenset[str]:
+    try:
+        tree = ast.parse(path.read_bytes(), filename=str(path))
+    except (OSError, SyntaxError, ValueError):
+        return frozenset()
+
+    is_package = path.name == "__init__.py"
+    names: set[str] = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                names |= _with_parents(alias.name)
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                package = module_name.split(".") if is_package else module_name.split(".")[:-1]
+                base_parts = package[: len(package) - (node.level - 1)]
+                if node.module:
+                    base_parts = base_parts + [node.module]
+                base = ".".join(base_parts)
+            else:
+                base = node.module or ""
+            if not base:
+                continue
+            names |= _with_parents(base)
+            # `from package import module` imports `package.module` if it is a module.
+            names |= {f"{base}.{alias.name}" for alias in node.names if alias.name != "*"}
+    return frozenset(names)
+
+
+@dataclass
+class _ModuleEntry:
+    name: str
+    mtime: float
+    imports: frozenset[str]
+
+
+@dataclass(frozen=True)
+class GraphUpdateStats:
+    n_modules: int
+    n_parsed: int
+    n_removed: int
+    elapsed: float
+
+
+class ImportGraph:
+    def __init__(self, root: str | Path):
+        self.root = Path(root).resolve()
+        self._entries: dict[Path, _ModuleEntry] = {}
+        self._importers: dict[str, set[Path]] | None = None
+
+    @property
+    def paths(self) -> Sequence[Path]:
+        return list(self._entries)
+
+    def mtimes(self) -> dict[Path, float]:
+        return {path: entry.mtime for path, entry in self._entries.items()}
+
+    def module_name(self, path: Path) -> str | None:
+        entry = self._entries.get(path)
+        return entry.name if entry else None
+
+    def update(self) -> GraphUpdateStats:
+        """Parse the files added or modified after the previous `update`."""
+        start = time.perf_counter()
+        seen: set[Path] = set()
+        n_parsed = 0
+        for path in _iter_python_files(self.root):
+            seen.add(path)
+            try:
+                mtime = path.stat().st_mtime
+            except OSError:
+                continue
+            entry = self._entries.get(path)
+            if entry is not None and entry.mtime == mtime:
+                continue
+            name = _to_module_name(path)
+            self._entries[path] = _ModuleEntry(name=name, mtime=mtime, imports=_parse_imports(path, name))
+            n_parsed += 1
+
+        removed = [path for path in self._entries if path not in seen]
+        for path in removed:
+            del self._entries[path]
+        if n_parsed or removed:
+            self._importers = None
+        return GraphUpdateStats(
+            n_modules=len(self._entries),
+            n_parsed=n_parsed,
+            n_removed=len(removed),
+            elapsed=time.perf_counter() - start,
+        )
+
+    def _get_importers(self) -> dict[str, set[Path]]:
+        if self._importers is None:
+            importers: dict[str, set[Path]] = {}
+            for path, entry in self._entries.items():
+                for name in entry.imports:
+                    importers.setdefault(name, set()).add(path)
+            self._importers = importers
+        return self._importers
+
+    def dependents(self, module_names: Iterable[str]) -> set[Path]:
+        """Return the files which import `module_names` directly or transitively.
+
+        The names of removed modules are also accepted, since the importers still refer to them.
+        """
+        importers = self._get_importers()
+        result: set[Path] = set()
+        stack = list(module_names)
+        visited = set(stack)
+        while stack:
+            name = stack.pop()
+            for path in importers.get(name, ()):
+                if path in result:
+                    continue
+                result.add(path)
+                importer_name = self._entries[path].name
+                if importer_name not in visited:
+                    visited.add(importer_name)
+                    stack.append(importer_name)
+        return result
+
+
+@dataclass(frozen=True)
+class AffectedSelection:
+    """`tests` is None if there is no baseline, that is, all the tests should be run."""
+
+    tests: Sequence[Path] | None
+    changed: Sequence[Path]
+    graph_stats: GraphUpdateStats
+    snapshot: Mapping[Path, float] = field(repr=False)
+
+    def to_lines(self) -> list[str]:
+        graph = self.graph_stats
+        lines = [
+            f"[affected] import graph: {graph.n_modules} modules, "
+            f"{graph.n_parsed} parsed, {graph.n_removed} removed ({graph.elapsed * 1000:.1f}ms)"
+        ]
+        if self.tests is None:
+            lines.append("[affected] no successful run yet: all the tests are selected.")
+        else:
+            lines.append(f"[affected] {len(self.changed)} changed files -> {len(self.tests)} test modules")
+        return lines
+
+
+class AffectedTestSelector:
+    """Keep `ImportGraph` of `root` and the baseline of the last successful run."""
+
+    def __init__(self, root: str | Path):
+        self.graph = ImportGraph(root)
+        self._baseline: dict[Path, float] | None = None
+
+    @property
+    def root(self) -> Path:
+        return self.graph.root
+
+    def select(self) -> AffectedSelection:
+        stats = self.graph.update()
+        snapshot = self.graph.mtimes()
+        if self._baseline is None:
+            return AffectedSelection(tests=None, changed=sorted(snapshot), graph_stats=stats, snapshot=snapshot)
+
+        baseline = self._baseline
+        changed = sorted(path for path, mtime in snapshot.items() if baseline.get(path) != mtime)
+        removed = [path for path in baseline if path not in snapshot]
+
+        names = {name for path in changed if (name := self.graph.module_name(path)) is not None}
+        names |= {_to_module_name(path) for path in removed}
+        affected = self.graph.dependents(names) | set(changed)
+        # `conftest.py` is applied to all the tests under its folder.
+        for conftest in (path for path in [*changed, *removed] if path.name == "conftest.py"):
+            affected |= {path for path in snapshot if path.is_relative_to(conftest.parent)}
+
+        tests = sorted(path for path in affected if path in snapshot and is_test_module(path))
+        return AffectedSelection(tests=tests, changed=[*changed, *removed], graph_stats=stats, snapshot=snapshot)
+
+    def mark_success(self, selection: AffectedSelection) -> None:
+        """The tests which are not selected are not affected, so all the changes at `select` are verified.
+
+        Files modified while the tests are running are regarded as changed at the next `select`.
+        """
+        self._baseline = dict(selection.snapshot)
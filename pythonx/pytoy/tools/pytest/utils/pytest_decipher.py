@@ -34,9 +34,9 @@ class PytestDecipher:
         error_items = self._to_items(sections["ERRORS"])
         failure_items = self._to_items(sections["FAILURES"])
         for item_text in error_items.values():
-            records += self._to_records(item_text)
+            records += self.to_records(item_text)
         for item_text in failure_items.values():
-            records += self._to_records(item_text)
+            records += self.to_records(item_text)
         self.records = records
 
     def _to_sections(self, text: str) -> Dict[str, str]:
@@ -73,7 +73,8 @@ class PytestDecipher:
                 item_to_lines[item].append(line)
         return {item: "\n".join(lines) for item, lines in item_to_lines.items()}
 
-    def _to_records(self, item_text: str) -> List[Dict]:
+    @staticmethod
+    def to_records(item_text: str) -> List[Dict]:
         """Convert text of item to `list` of `dict`.
         Each `dict` of `list` is valid for `vim's `quicklist`.
         """
@@ -0,0 +1,124 @@
+"""Consume the records of `pytoy_pytest_report` plugin incrementally.
+
+Only the lines appended since the previous `poll` are read,
+so the records can be consumed while `pytest` is running.
+"""
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List
+
+from pytoy.tools.pytest.utils.pytest_decipher import PytestDecipher
+
+
+class PytestReportReader:
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._offset = 0
+        self._partial = b""
+
+    def reset(self) -> None:
+        self._offset = 0
+        self._partial = b""
+
+    def read(self) -> list[dict]:
+        """Return the records appended after the previous call."""
+        try:
+            with self.path.open("rb") as fp:
+                if fp.seek(0, 2) < self._offset:
+                    # Rewritten by the next run.
+                    self.reset()
+                fp.seek(self._offset)
+                data = fp.read()
+        except FileNotFoundError:
+            return []
+        if not data:
+            return []
+        self._offset += len(data)
+        *lines, self._partial = (self._partial + data).split(b"\n")
+        records = []
+        for line in lines:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+        return records
+
+
+@dataclass
+class PytestSummary:
+    passed: int = 0
+    failed: int = 0
+    errors: int = 0
+    skipped: int = 0
+    exitstatus: int | None = None
+
+    @property
+    def finished(self) -> bool:
+        return self.exitstatus is not None
+
+    def to_line(self) -> str:
+        state = "finished" if self.finished else "running"
+        return (
+            f"pytest({state}): {self.passed} passed, {self.failed} failed, "
+            f"{self.errors} errors, {self.skipped} skipped"
+        )
+
+
+class PytestReportIngestor:
+    """Accumulate `summary` and quickfix `records` from `PytestReportReader`.
+
+    `records` are the same form as `PytestDecipher.records`.
+    """
+
+    def __init__(self, reader: PytestReportReader):
+        self.reader = reader
+        self.reset()
+
+    def reset(self) -> None:
+        self.reader.reset()
+        self.summary = PytestSummary()
+        self.records: List[Dict] = []
+
+    def poll(self) -> bool:
+        """Consume the appended records. Return True if `records` are changed."""
+        n_records = len(self.records)
+        for record in self.reader.read():
+            self._consume(record)
+        return n_records != len(self.records)
+
+    def _consume(self, record: dict) -> None:
+        match record.get("event"):
+            case "start":
+                self.summary = PytestSummary()
+                self.records = []
+            case "collect":
+                self.summary.errors += 1
+                self.records += self._to_rows(record)
+            case "report":
+                self._count(record)
+                if record["outcome"] == "failed":
+                    self.records += self._to_rows(record)
+            case "finish":
+                self.summary.exitstatus = record["exitstatus"]
+
+    def _count(self, record: dict) -> None:
+        match (record["when"], record["outcome"]):
+            case ("call", "passed"):
+                self.summary.passed += 1
+            case ("call", "failed"):
+                self.summary.failed += 1
+            case (_, "failed"):
+                self.summary.errors += 1
+            case (_, "skipped"):
+                self.summary.skipped += 1
+
+    def _to_rows(self, record: dict) -> List[Dict]:
+        if entries := record.get("entries"):
+            return [
+                {"filename": entry["path"], "lnum": int(entry["lineno"]), "text": entry["message"] or "No Text"}
+                for entry in entries
+            ]
+        # Tracebacks which are not structured, such as errors of collection.
+        return PytestDecipher.to_records(record.get("longrepr", ""))
@@ -33,8 +33,10 @@ class ScriptDecipher:
     @classmethod
     def from_path(cls, path: Path):
         # [NOTE]: import of parso takes some time,
-        # so, we do now want to import it at initialization.
-        import parso
+        # so, we do now want to import it at initialization; it is preloaded while idle.
+        from pytoy.bootstrap.import_resolvers import ensure_module
+
+        parso = ensure_module("parso")
 
         path = Path(path)
         text = path.read_text(encoding="utf8")
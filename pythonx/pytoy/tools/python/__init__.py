@@ -1,16 +1,15 @@
 "Exectuor for `Python`."
 
-import re
-
 from pathlib import Path
 
 from pytoy.job_execution.command_executor.launcher import LaunchProfile, get_default_hooks, ExecutionHooks
-from pytoy.job_execution.command_executor.launcher.quickfix import QuickfixProfile, make_quickfix_hooks
-
-from pytoy.shared.ui import PytoyBuffer, QuickfixRecord
+from pytoy.job_execution.command_executor.models import CommandExecution, ExecutionResult
+from pytoy.shared.lib.text import LineRange
+from pytoy.shared.timertask import TimerTask
+from pytoy.shared.ui import PytoyBuffer, PytoyQuickfix, QuickfixRecord
+from pytoy.tools.python.traceback_recognizer import RecognizedTraceback, TracebackRecognizer
 
 from pytoy.job_execution.command_executor.launcher import CommandLauncher
-from typing import Sequence
 
 
 class PythonExecutor:
@@ -18,31 +17,8 @@ class PythonExecutor:
 
         command_wrapper = "uv" if force_uv else "auto"
 
-        def quickfix_creator(text: str, cwd: Path) -> Sequence[QuickfixRecord]:
-            _pattern = re.compile(r'\s+File "(.+)", line (\d+)')
-            result = list()
-            lines = text.split("\n")
-            index = 0
-            while index < len(lines):
-                infos = _pattern.findall(lines[index])
-                if infos:
-                    filename, lnum = infos[0]
-                    row = dict()
-                    row["filename"] = filename
-                    row["lnum"] = lnum
-                    index += 1
-                    text = lines[index].strip()
-                    row["text"] = text
-                    record = QuickfixRecord.from_dict(row, cwd)
-                    result.append(record)
-                index += 1
-            result = list(reversed(result))
-            return result
-
-        quickfix_profile = QuickfixProfile(quickfix_creator=quickfix_creator)
-        quickfix_hooks = make_quickfix_hooks(quickfix_profile)
         default_hooks = get_default_hooks()
-        hooks = ExecutionHooks.merge(quickfix_hooks, default_hooks)
+        hooks = ExecutionHooks.merge(make_traceback_hooks(), default_hooks)
         command_profile = LaunchProfile(kind="PythonExecutor", command_wrapper=command_wrapper, execution_hooks=hooks)
 
         self.command_launcher = CommandLauncher(launch_profile=command_profile)
@@ -71,3 +47,61 @@ class PythonExecutor:
     @property
     def is_running(self) -> bool:
         return self.command_launcher.is_running
+
+
+class _BufferTail:
+    """Read only the lines appended to `buffer` after the previous `read`."""
+
+    def __init__(self, buffer: PytoyBuffer, chunk: int = 4096):
+        self.buffer = buffer
+        self._chunk = chunk
+        self._consumed = 0
+
+    def read(self) -> list[str]:
+        result: list[str] = []
+        while True:
+            lines = self.buffer.get_lines(LineRange(self._consumed, self._consumed + self._chunk))
+            if self._consumed == 0 and lines == [""]:
+                # The placeholder of an empty buffer, which is overwritten by the first appended line.
+                return result
+            self._consumed += len(lines)
+            result += lines
+            if len(lines) < self._chunk:
+                return result
+
+
+def make_traceback_hooks(interval: int = 200) -> ExecutionHooks:
+    """Update the quickfix list whenever a traceback is completed in the output, while the script runs.
+
+    The latest traceback comes first, and its innermost frame first.
+    """
+    state: dict = {}
+
+    def _update(is_final: bool = False) -> None:
+        tails: list[tuple[_BufferTail, TracebackRecognizer]] = state.get("tails", [])
+        completed: list[RecognizedTraceback] = []
+        for tail, recognizer in tails:
+            completed += recognizer.feed_lines(tail.read())
+            if is_final:
+                completed += recognizer.close()
+        if completed or is_final:
+            tracebacks = [traceback for _, recognizer in tails for traceback in recognizer.tracebacks]
+            rows = [row for traceback in reversed(tracebacks) for row in traceback.to_rows()]
+            records = [QuickfixRecord.from_dict(row, state["cwd"]) for row in rows]
+            PytoyQuickfix().handle_records(records, is_open=False)
+
+    def on_start(execution: CommandExecution) -> None:
+        buffers = [execution.runner.stdout]
+        stderr = execution.runner.stderr
+        if stderr is not None and stderr.buffer_id != execution.runner.stdout.buffer_id:
+            buffers.append(stderr)
+        state["tails"] = [(_BufferTail(buffer), TracebackRecognizer()) for buffer in buffers]
+        state["cwd"] = execution.cwd
+        state["taskname"] = TimerTask.register(lambda: _update(), interval=interval)
+
+    def on_finish(_: ExecutionResult) -> None:
+        if taskname := state.pop("taskname", None):
+            TimerTask.deregister(taskname)
+        _update(is_final=True)
+
+    return ExecutionHooks(on_start=on_start, on_finish=on_finish)
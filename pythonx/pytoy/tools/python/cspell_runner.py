@@ -1,27 +1,60 @@
 from pytoy.shared.ui import PytoyQuickfix
 from pytoy.shared.ui.pytoy_quickfix import to_quickfix_creator
-from pytoy.tools.cspell import CSpellOneFileChecker
+from pytoy.tools.cspell import BatchResult, CSpellBatchChecker, CSpellOneFileChecker, SpellCheckCache
+from pytoy.tools.cspell.batch import collect_files
 
 
+import tempfile
 from pathlib import Path
+from typing import Literal
+
+_REGEX = r"(?P<filename>.+):(?P<lnum>\d+):(?P<col>\d+).*\((?P<text>(.+))\)"
 
 
 class CSpellRunner:
     def __init__(self):
         pass
 
-    def run(self) -> None:
-        from pytoy import TERM_STDOUT
+    def run(self, target: Literal["current", "workspace"] | str | None = None) -> None:
+        """`current` checks the current buffer synchronously.
+        Otherwise, the files under `target` are checked by `CSpellBatchChecker` in a thread.
+        """
         from pytoy.shared.ui import PytoyBuffer
 
         path = PytoyBuffer.get_current().file_path
+        if target in {None, "current"}:
+            self._run_one_file(path)
+        else:
+            from pytoy.tools.python.path_resolver import PathResolver
+
+            self._run_batch(PathResolver().resolve(target, current_path=path))
 
+    def _run_one_file(self, path: Path) -> None:
         if Path(path).suffix == ".py":
             checker = CSpellOneFileChecker(only_python_string=True)
         else:
             checker = CSpellOneFileChecker(only_python_string=False)
         output = checker(path)
-        regex = r"(?P<filename>.+):(?P<lnum>\d+):(?P<col>\d+).*\((?P<text>(.+))\)"
-        maker = to_quickfix_creator(regex)
+        maker = to_quickfix_creator(_REGEX)
         records = maker(output, path.parent)
         PytoyQuickfix().handle_records(records)
+
+    def _run_batch(self, root: Path) -> None:
+        from pytoy.shared.timertask.thread_executor import ThreadExecutionRequest, ThreadExecutor
+        from pytoy.shared.ui.notifications import EphemeralNotification
+
+        cwd = root if root.is_dir() else root.parent
+        cache = SpellCheckCache(Path(tempfile.gettempdir()) / "pytoy-cspell-cache.json")
+
+        def _main(_) -> BatchResult:
+            return CSpellBatchChecker(cache=cache).check(collect_files(root), cwd=cwd)
+
+        def _on_finish(result: BatchResult) -> None:
+            records = to_quickfix_creator(_REGEX)(result.output, cwd)
+            PytoyQuickfix().handle_records(records)
+            EphemeralNotification().notify(result.stats.to_line())
+
+        def _on_error(exception: Exception) -> None:
+            EphemeralNotification().notify(f"CSpell failed: {exception}", "error")
+
+        ThreadExecutor().execute(ThreadExecutionRequest(main_func=_main, on_finish=_on_finish, on_error=_on_error))
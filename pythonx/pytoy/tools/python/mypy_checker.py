@@ -5,9 +5,11 @@ from pytoy.job_execution.command_executor.launcher import (
     get_default_hooks,
     ExecutionHooks,
 )
+from pytoy.job_execution.environment_manager import ExecutionWrapperType
 from pytoy.job_execution.command_executor.launcher.quickfix import QuickfixProfile, make_quickfix_hooks
 from pytoy.shared.ui import PytoyBuffer
 from pytoy.shared.ui.pytoy_buffer import make_buffer
+from pytoy.tools.python.mypy_daemon import MYPY_FLAGS, MypyDaemonManager
 from pytoy.tools.python.path_resolver import PathResolver
 
 
@@ -15,8 +17,10 @@ from typing import Literal
 
 
 class MypyChecker:
-    def __init__(self) -> None:
-        pass
+    def __init__(self, *, daemon: bool = False, daemon_manager: MypyDaemonManager | None = None) -> None:
+        """If `daemon` is True, checks go through a `dmypy` server kept alive per workspace."""
+        self._daemon = daemon
+        self._daemon_manager = daemon_manager
 
     @property
     def kind(self):
@@ -26,19 +30,38 @@ class MypyChecker:
     def buffer(self) -> PytoyBuffer:
         return make_buffer(TERM_STDOUT, "vertical")
 
+    @property
+    def daemon_manager(self) -> MypyDaemonManager:
+        if self._daemon_manager is None:
+            from pytoy.contexts.pytoy import GlobalPytoyContext
+
+            self._daemon_manager = GlobalPytoyContext.get().mypy_daemon_manager
+        return self._daemon_manager
+
     def check(self, target: Literal["workspace", "current"] | str | None = None):
-        path = PathResolver().resolve(target)
+        resolver = PathResolver()
+        path = resolver.resolve(target)
+        workspace = resolver.to_workspace(None) if self._daemon else None
 
-        command = f'mypy --show-traceback --show-column-numbers "{path}"'
+        if workspace is None:
+            command = f'mypy {" ".join(MYPY_FLAGS)} "{path}"'
+            command_wrapper: ExecutionWrapperType = "auto"
+            cwd = None
+        else:
+            # The output has the same format as `mypy`, and the filenames are solved from `cwd`.
+            daemon = self.daemon_manager.acquire(workspace)
+            command = daemon.make_run_command(path, self.daemon_manager.idle_timeout)
+            command_wrapper = daemon.command_wrapper
+            cwd = daemon.workspace
 
         quickfix_regex = r"(?P<filename>.+):(?P<lnum>\d+):(?P<col>\d+):(?P<_type>(.+)):(?P<text>(.+))"
         profile = QuickfixProfile(quickfix_creator=quickfix_regex)
         hooks = get_default_hooks()
         hooks = ExecutionHooks.merge(hooks, make_quickfix_hooks(profile))
 
-        profile = LaunchProfile(kind=self.kind, execution_hooks=hooks)
+        profile = LaunchProfile(kind=self.kind, execution_hooks=hooks, command_wrapper=command_wrapper)
         launcher = CommandLauncher(profile)
-        launcher.run(command, stdout=self.buffer)
+        launcher.run(command, stdout=self.buffer, cwd=cwd)
 
     def rerun(self) -> None:
         launcher = CommandLauncher(self.kind)
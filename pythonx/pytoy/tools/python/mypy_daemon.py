@@ -0,0 +1,125 @@
+"""Keep `dmypy` servers alive per workspace and environment for `MypyChecker`.
+
+* A server is identified by its status file, which is derived from the workspace and the environment.
+* The environment is identified by the `dmypy` which its command wrapper resolves to, not only by its kind:
+  `system` follows `PATH` (e.g. an activated virtualenv), and `uv` follows the `.venv` of the workspace.
+* If the environment of a workspace changes, the previous server is stopped.
+* The server stops itself after `idle_timeout` seconds (`dmypy run --timeout`),
+  and all the servers are stopped at the exit of the plugin.
+"""
+
+import atexit
+import hashlib
+import json
+import shutil
+import subprocess
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Sequence
+
+from pytoy.job_execution.environment_manager import EnvironmentManager, ResolvedExecutionEnvironment
+from pytoy.job_execution.environment_manager.models import CommandWrapperType, EnvironmentKind
+
+
+MYPY_FLAGS = ("--show-traceback", "--show-column-numbers")
+
+
+@dataclass(frozen=True)
+class MypyDaemon:
+    workspace: Path
+    environment_kind: EnvironmentKind
+    environment_key: str
+    status_file: Path
+    command_wrapper: CommandWrapperType
+
+    @property
+    def pid(self) -> int | None:
+        try:
+            return int(json.loads(self.status_file.read_text())["pid"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    @property
+    def alive(self) -> bool:
+        from pytoy.bootstrap.import_resolvers import ensure_module
+
+        psutil = ensure_module("psutil")  # `import psutil` may take time, so it is preloaded.
+
+        pid = self.pid
+        return pid is not None and psutil.pid_exists(pid)
+
+    def make_run_command(self, path: Path, idle_timeout: int, flags: Sequence[str] = MYPY_FLAGS) -> str:
+        """`dmypy run` starts the server if necessary, and restarts it if `flags` are changed."""
+        flag_str = " ".join(flags)
+        return f'dmypy --status-file "{self.status_file}" run --timeout {idle_timeout} -- {flag_str} "{path}"'
+
+    def make_stop_command(self) -> list[str]:
+        return self.command_wrapper(["dmypy", "--status-file", str(self.status_file), "stop"])
+
+
+def _environment_key(execution_env: ResolvedExecutionEnvironment) -> str:
+    command = execution_env.command_wrapper(["dmypy"])
+    executable = shutil.which(command[0]) or command[0]
+    return "|".join([execution_env.kind, executable, *command[1:], str(execution_env.workspace)])
+
+
+def _spawn_detached(command: list[str], cwd: Path) -> None:
+    subprocess.Popen(command, cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+class MypyDaemonManager:
+    def __init__(
+        self,
+        environment_manager: EnvironmentManager | None = None,
+        *,
+        idle_timeout: int = 1800,
+        status_dir: Path | None = None,
+        spawn: Callable[[list[str], Path], None] = _spawn_detached,
+    ):
+        if environment_manager is None:
+            from pytoy.contexts.core import GlobalCoreContext
+
+            environment_manager = GlobalCoreContext.get().environment_manager
+        self._environment_manager = environment_manager
+        self.idle_timeout = idle_timeout
+        self._status_dir = status_dir or Path(tempfile.gettempdir()) / "pytoy-dmypy"
+        self._spawn = spawn
+        self._daemons: dict[Path, MypyDaemon] = {}
+        atexit.register(self.stop_all)
+
+    @property
+    def daemons(self) -> Sequence[MypyDaemon]:
+        return list(self._daemons.values())
+
+    def acquire(self, workspace: Path) -> MypyDaemon:
+        """Return the daemon for `workspace`, stopping the previous one if the environment is changed."""
+        workspace = workspace.resolve()
+        execution_env = self._environment_manager.solve_preference(workspace)
+        environment_key = _environment_key(execution_env)
+        daemon = self._daemons.get(workspace)
+        if daemon is not None and daemon.environment_key == environment_key:
+            return daemon
+        if daemon is not None:
+            self.stop(workspace)
+
+        digest = hashlib.sha1(f"{workspace}|{environment_key}".encode()).hexdigest()[:16]
+        self._status_dir.mkdir(parents=True, exist_ok=True)
+        daemon = MypyDaemon(
+            workspace=workspace,
+            environment_kind=execution_env.kind,
+            environment_key=environment_key,
+            status_file=self._status_dir / f"{digest}.json",
+            command_wrapper=execution_env.command_wrapper,
+        )
+        self._daemons[workspace] = daemon
+        return daemon
+
+    def stop(self, workspace: Path) -> None:
+        daemon = self._daemons.pop(workspace.resolve(), None)
+        if daemon is not None and daemon.status_file.exists():
+            self._spawn(daemon.make_stop_command(), daemon.workspace)
+
+    def stop_all(self) -> None:
+        for workspace in list(self._daemons):
+            self.stop(workspace)
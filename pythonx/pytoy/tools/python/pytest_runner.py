@@ -1,11 +1,25 @@
+import os
+import tempfile
 from configparser import ConfigParser
 from pytoy import TERM_STDOUT
 from pytoy.job_execution.command_executor.launcher import CommandLauncher, LaunchProfile, get_default_hooks
 from pytoy.job_execution.command_executor import ExecutionHooks
+from pytoy.job_execution.command_executor.models import CommandExecution, ExecutionResult
 from pytoy.job_execution.command_executor.launcher.quickfix import QuickfixProfile
 from pytoy.shared.ui import PytoyBuffer, PytoyWindow, QuickfixRecord
+from pytoy.shared.timertask import TimerTask
+from pytoy.shared.ui.notifications import EphemeralNotification
 from pytoy.shared.ui.pytoy_buffer import make_buffer
-from pytoy.tools.pytest.utils import PytestDecipher, to_func_command
+from pytoy.shared.ui.pytoy_quickfix import PytoyQuickfix
+from pytoy.shared.ui.status_line.models import FunctionStatusLineItem
+from pytoy.tools.pytest.utils import (
+    AffectedSelection,
+    AffectedTestSelector,
+    PytestDecipher,
+    PytestReportIngestor,
+    PytestReportReader,
+    to_func_command,
+)
 from pytoy.tools.python.path_resolver import PathResolver
 
 
@@ -14,8 +28,11 @@ from typing import Literal, Sequence
 
 
 class PytestRunner:
-    def __init__(self) -> None:
-        pass
+    def __init__(self, *, structured: bool = False) -> None:
+        """If `structured` is True, `pytoy_pytest_report` plugin is loaded to `pytest`,
+        and its records are consumed while `pytest` is running.
+        """
+        self._structured = structured
 
     @property
     def kind(self):
@@ -27,7 +44,7 @@ class PytestRunner:
 
     def run(
         self,
-        scope: Literal["func", "file", "folder", "workspace"],
+        scope: Literal["func", "file", "folder", "workspace", "affected"],
         current_window: PytoyWindow | None = None,
         cwd: str | Path | None = None,
     ):
@@ -38,6 +55,7 @@ class PytestRunner:
         line = current_window.cursor.line + 1
 
         suffix = "--capture=no --quiet"
+        affected_hooks: ExecutionHooks | None = None
         match scope:
             case "func":
                 command = to_func_command(path, line, suffix)
@@ -54,15 +72,55 @@ class PytestRunner:
                     raise ValueError(f"`{path=}` is not included in workspace.")
                 command = f'pytest "{workspace}" {suffix}'
                 cwd = self._decide_pytest_cwd(workspace, cwd=cwd)
-
-        def make_qf_records(content: str, cwd: Path) -> Sequence[QuickfixRecord]:
-            rows = PytestDecipher(content).records
-            return [QuickfixRecord.from_dict(row, cwd) for row in rows]
+            case "affected":
+                workspace = PathResolver().to_workspace(path)
+                if workspace is None:
+                    raise ValueError(f"`{path=}` is not included in workspace.")
+                selection, affected_hooks = self._select_affected(workspace)
+                if selection.tests is not None and not selection.tests:
+                    self.stdout.init_buffer("\n".join([*selection.to_lines(), "No affected tests."]))
+                    EphemeralNotification().notify("No affected tests.")
+                    return
+                targets = [workspace] if selection.tests is None else selection.tests
+                command = " ".join(["pytest", *(f'"{target}"' for target in targets), suffix])
+                cwd = self._decide_pytest_cwd(workspace, cwd=cwd)
 
         hooks = get_default_hooks()
-        hooks = ExecutionHooks.merge(hooks, QuickfixProfile(quickfix_creator=make_qf_records).execution_hooks)
+        if affected_hooks is not None:
+            hooks = ExecutionHooks.merge(hooks, affected_hooks)
+        env = None
+        if self._structured:
+            report_path = _new_report_path()
+            ingestor = PytestReportIngestor(PytestReportReader(report_path))
+            hooks = ExecutionHooks.merge(hooks, make_structured_report_hooks(ingestor, cwd))
+            command = f"{command} -p {REPORT_PLUGIN}"
+            env = _make_plugin_env(report_path)
+        else:
+
+            def make_qf_records(content: str, cwd: Path) -> Sequence[QuickfixRecord]:
+                rows = PytestDecipher(content).records
+                return [QuickfixRecord.from_dict(row, cwd) for row in rows]
+
+            hooks = ExecutionHooks.merge(hooks, QuickfixProfile(quickfix_creator=make_qf_records).execution_hooks)
         launch_profile = LaunchProfile(kind=self.kind, execution_hooks=hooks)
-        CommandLauncher(launch_profile).run(command, stdout=self.stdout, stderr=self.stdout, cwd=cwd)
+        CommandLauncher(launch_profile).run(command, stdout=self.stdout, stderr=self.stdout, cwd=cwd, env=env)
+
+    def _select_affected(self, workspace: Path) -> tuple[AffectedSelection, ExecutionHooks]:
+        from pytoy.contexts.pytoy import GlobalPytoyContext
+
+        selectors = GlobalPytoyContext.get().affected_test_selectors
+        selector = selectors.setdefault(workspace.resolve(), AffectedTestSelector(workspace))
+        selection = selector.select()
+
+        def on_start(execution: CommandExecution) -> None:
+            for line in selection.to_lines():
+                execution.stdout.append(line)
+
+        def on_finish(result: ExecutionResult) -> None:
+            if result.success:
+                selector.mark_success(selection)
+
+        return selection, ExecutionHooks(on_start=on_start, on_finish=on_finish)
 
     def rerun(self) -> None:
         launcher = CommandLauncher(self.kind)
@@ -82,6 +140,57 @@ class PytestRunner:
         return target_path if target_path.is_dir() else target_path.parent
 
 
+REPORT_PLUGIN = "pytoy_pytest_report"
+
+
+def _new_report_path() -> Path:
+    """A fresh file per run, so that the records of the previous run are never read."""
+    fd, name = tempfile.mkstemp(prefix="pytoy-pytest-report-", suffix=".jsonl")
+    os.close(fd)
+    return Path(name)
+
+
+def _make_plugin_env(report_path: Path) -> dict[str, str]:
+    from pytoy.tools.pytest.plugins import PLUGIN_FOLDER
+
+    python_paths = [str(PLUGIN_FOLDER)]
+    if current := os.environ.get("PYTHONPATH"):
+        python_paths.append(current)
+    return {"PYTHONPATH": os.pathsep.join(python_paths), "PYTOY_PYTEST_REPORT": str(report_path)}
+
+
+def make_structured_report_hooks(ingestor: PytestReportIngestor, cwd: Path, interval: int = 200) -> ExecutionHooks:
+    """Poll `ingestor` while `pytest` runs, updating the quickfix list and the summary in the status line."""
+    state: dict = {}
+
+    def _update(is_final: bool = False) -> None:
+        if ingestor.poll() or is_final:
+            records = [QuickfixRecord.from_dict(row, cwd) for row in ingestor.records]
+            PytoyQuickfix().handle_records(records, is_open=False)
+
+    def on_start(execution: CommandExecution) -> None:
+        ingestor.reset()
+        state["taskname"] = TimerTask.register(lambda: _update(), interval=interval)
+        window = execution.stdout.window
+        if window is not None:
+            item = FunctionStatusLineItem(value=lambda: ingestor.summary.to_line())
+            state["status_line"] = (window.status_line_manager, window.status_line_manager.register(item))
+
+    def on_finish(_: ExecutionResult) -> None:
+        if taskname := state.pop("taskname", None):
+            TimerTask.deregister(taskname)
+        if status_line := state.pop("status_line", None):
+            manager, item = status_line
+            manager.deregister(item)
+        _update(is_final=True)
+        # `rerun` writes the same path again, from the beginning.
+        ingestor.reader.path.unlink(missing_ok=True)
+        summary = ingestor.summary
+        EphemeralNotification().notify(summary.to_line(), "info" if summary.exitstatus == 0 else "warning")
+
+    return ExecutionHooks(on_start=on_start, on_finish=on_finish)
+
+
 def _has_pytest_config(folder: Path) -> bool:
     for name in ["pytest.toml", "pytest.ini"]:
         if (folder / name).exists():
@@ -1,4 +1,3 @@
-from dataclasses import dataclass
 from pathlib import Path
 
 from pytoy import TERM_STDOUT
@@ -9,6 +8,7 @@ from pytoy.job_execution.command_executor.launcher import (
     ExecutionHooks,
     get_default_hooks,
 )
+from pytoy.job_execution.command_executor.pipeline import PipelineStep
 from pytoy.job_execution.command_executor.launcher.quickfix import QuickfixProfile, make_quickfix_hooks
 from pytoy.job_execution.environment_manager import EnvironmentManager
 from pytoy.shared.ui import PytoyBuffer
@@ -17,12 +17,6 @@ from pytoy.tools.python.path_resolver import PathResolver
 from typing import Literal
 
 
-@dataclass(frozen=True)
-class RuffFormatHistory:
-    path: Path
-    cwd: Path
-
-
 class RuffChecker:
     def __init__(self, environment_manager: EnvironmentManager | None = None):
         self._environment_manager = environment_manager or GlobalCoreContext.get().environment_manager
@@ -47,6 +41,9 @@ class RuffChecker:
     def buffer(self) -> PytoyBuffer:
         return make_buffer(TERM_STDOUT, "vertical")
 
+    def make_format_command(self, path: Path) -> str:
+        return f'ruff format "{path}"'
+
     def check(
         self, target: Literal["workspace", "current"] | str | None, fix: bool, format: bool, unsafe: bool
     ) -> None:
@@ -54,16 +51,18 @@ class RuffChecker:
         cwd = current_path.parent
 
         path = PathResolver(self.environment_manager, cwd=cwd).resolve(target, current_path)
+        self._launch(self.make_command(path, fix, unsafe), path, cwd, format=format)
 
-        pytoy_buffer = self.buffer
+    def rerun(self) -> None:
+        # The pipeline of `format` and `check` is rerun as a whole by `CommandLauncher`.
+        profile = LaunchProfile(kind=self.kind)
+        CommandLauncher(profile).rerun(self.buffer, self.buffer)
 
-        if format:
-            self._format(path, cwd, self.buffer)
-            meta = {"format": RuffFormatHistory(path=path, cwd=cwd)}
-        else:
-            self.buffer.init_buffer()
-            meta = {}
+    def stop(self) -> None:
+        profile = LaunchProfile(kind=self.kind)
+        CommandLauncher(profile).stop()
 
+    def _launch(self, command: str, path: Path, cwd: Path, *, format: bool) -> None:
         qf_creator = r"(?P<filename>.+):(?P<lnum>\d+):(?P<col>\d+):(?P<text>(.+))"
         quickfix_profile = QuickfixProfile(quickfix_creator=qf_creator, quickfix_source="stdout")
         quickfix_hooks = make_quickfix_hooks(quickfix_profile)
@@ -73,34 +72,15 @@ class RuffChecker:
 
         profile = LaunchProfile(kind=self.kind, execution_hooks=hooks)
         launcher = CommandLauncher(profile)
-        command = self.make_command(path, fix, unsafe)
-        launcher.run(command, stdout=pytoy_buffer, stderr=pytoy_buffer, cwd=cwd, meta=meta)
-
-    def rerun(self) -> None:
-        profile = LaunchProfile(kind=self.kind)
-        launcher = CommandLauncher(profile)
-        if last_context := launcher.last_context:
-            if format := last_context.meta.get("format"):
-                self._format(format.path, format.cwd, self.buffer)
-        launcher.rerun(self.buffer)
-
-    def stop(self) -> None:
-        profile = LaunchProfile(kind=self.kind)
-        CommandLauncher(profile).stop()
-
-    def _format(self, path: Path, cwd: Path, buffer: PytoyBuffer):
-        import subprocess
-
-        execution_env = self.environment_manager.solve_preference(cwd, preference=None)
-
-        command = f'ruff format "{path}"'
-        command = execution_env.command_wrapper(command)
-
-        result = subprocess.run(
-            command,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            cwd=cwd,
-            text=True,
-        )
-        buffer.init_buffer(result.stdout)
+        pytoy_buffer = self.buffer
+        if not format:
+            launcher.run(command, stdout=pytoy_buffer, stderr=pytoy_buffer, cwd=cwd)
+            return
+
+        # `ruff format` and `ruff check` run as a pipeline of asynchronous jobs.
+        # The diagnostics of `check` should be reported even if `format` fails.
+        steps = [
+            PipelineStep("format", self.make_format_command(path), hooks=default_hooks, continue_on_failure=True),
+            PipelineStep("check", command, hooks=hooks),
+        ]
+        launcher.run_pipeline(steps, stdout=pytoy_buffer, stderr=pytoy_buffer, cwd=cwd)
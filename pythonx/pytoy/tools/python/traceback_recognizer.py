@@ -0,0 +1,139 @@
+"""Recognize python tracebacks in the output line by line.
+
+A small state machine tracks the open "Traceback (most recent call last):" block,
+and the frames are emitted as soon as the exception line closes the block.
+Chained exceptions ("The above exception was the direct cause..." / "During handling...")
+and the sub-exceptions of `ExceptionGroup` (prefixed by "|") are separate tracebacks.
+
+Example:
+    recognizer = TracebackRecognizer()
+    for line in lines:
+        for traceback in recognizer.feed(line):
+            ...
+    recognizer.close()
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Iterable, Sequence
+
+
+_HEADER_PATTERN = re.compile(r"^\s*(?:\+\s*)?(?:Exception Group )?Traceback \(most recent call last\):\s*$")
+_FRAME_PATTERN = re.compile(r'^\s+File "(?P<filename>.+)", line (?P<lnum>\d+)')
+_GROUP_PREFIX_PATTERN = re.compile(r"^(?:\s*\|)+ ?")
+_GROUP_SEPARATOR_PATTERN = re.compile(r"^\s*\+[-+]")
+_MARKER_PATTERN = re.compile(r"^\s*[\^~]+\s*$")
+_CHAIN_MESSAGES = (
+    "The above exception was the direct cause of the following exception:",
+    "During handling of the above exception, another exception occurred:",
+)
+
+
+@dataclass(frozen=True)
+class TracebackFrame:
+    filename: str
+    lnum: int
+    text: str = ""  # The source line, if it is printed.
+
+
+@dataclass(frozen=True)
+class RecognizedTraceback:
+    """`chain` is shared by the tracebacks connected by the chaining messages."""
+
+    frames: Sequence[TracebackFrame]
+    exception: str
+    chain: int
+
+    def to_rows(self) -> list[dict]:
+        """Rows of `QuickfixRecord.from_dict`, the innermost frame first."""
+        return [{"filename": frame.filename, "lnum": frame.lnum, "text": frame.text} for frame in reversed(self.frames)]
+
+
+@dataclass
+class _OpenTraceback:
+    frames: list[TracebackFrame] = field(default_factory=list)
+    expect_source: bool = False
+
+
+class TracebackRecognizer:
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self._open: _OpenTraceback | None = None
+        self._chain = 0
+        self._chained = False
+        self._tracebacks: list[RecognizedTraceback] = []
+
+    @property
+    def tracebacks(self) -> Sequence[RecognizedTraceback]:
+        return self._tracebacks
+
+    @property
+    def in_traceback(self) -> bool:
+        return self._open is not None
+
+    def feed_lines(self, lines: Iterable[str]) -> list[RecognizedTraceback]:
+        result = []
+        for line in lines:
+            result += self.feed(line)
+        return result
+
+    def feed(self, line: str) -> list[RecognizedTraceback]:
+        """Consume one line, and return the tracebacks completed by it."""
+        line = line.rstrip("\r\n")
+        if self._open is None and "Traceback" not in line and 'File "' not in line:
+            # Fast path for the ordinary output.
+            self._track_chain(line)
+            return []
+        if _GROUP_SEPARATOR_PATTERN.match(line):
+            return []
+        line = _GROUP_PREFIX_PATTERN.sub("", line)
+        if _HEADER_PATTERN.match(line):
+            # A header inside an open block means the previous one was interrupted.
+            completed = self._complete("") if self._open and self._open.frames else []
+            self._open = _OpenTraceback()
+            return completed
+
+        if self._open is None and _FRAME_PATTERN.match(line):
+            # `SyntaxError` of the script itself is printed without the header.
+            self._open = _OpenTraceback()
+        if self._open is None:
+            self._track_chain(line)
+            return []
+
+        if m := _FRAME_PATTERN.match(line):
+            self._open.frames.append(TracebackFrame(m.group("filename"), int(m.group("lnum"))))
+            self._open.expect_source = True
+            return []
+        if not line.strip() or _MARKER_PATTERN.match(line) or line.lstrip().startswith("[Previous line repeated"):
+            return []
+        if line[:1].isspace():
+            if self._open.expect_source and self._open.frames:
+                frame = self._open.frames[-1]
+                self._open.frames[-1] = TracebackFrame(frame.filename, frame.lnum, line.strip())
+                self._open.expect_source = False
+            return []
+        # The line without indentation is the exception, e.g. "ValueError: message".
+        return self._complete(line.strip())
+
+    def _track_chain(self, line: str) -> None:
+        if stripped := line.strip().lstrip("| "):
+            self._chained = stripped in _CHAIN_MESSAGES
+
+    def close(self) -> list[RecognizedTraceback]:
+        """Complete the open traceback at the end of the output, e.g. the process is killed."""
+        if self._open is not None and self._open.frames:
+            return self._complete("")
+        self._open = None
+        return []
+
+    def _complete(self, exception: str) -> list[RecognizedTraceback]:
+        assert self._open is not None
+        if not self._chained:
+            self._chain += 1
+        traceback = RecognizedTraceback(frames=tuple(self._open.frames), exception=exception, chain=self._chain)
+        self._open = None
+        self._chained = False
+        self._tracebacks.append(traceback)
+        return [traceback]
@@ -0,0 +1,13 @@
+"""Opt-in timings of the benchmark tests.
+
+The benchmarks assert on deterministic counters (evaluations, renders, writes), so that they do not
+depend on the load of the machine. Set `PYTOY_BENCH=1` to also print and compare the timings.
+"""
+import os
+
+ENABLED = os.environ.get("PYTOY_BENCH", "") not in ("", "0")
+
+
+def report(line: str) -> None:
+    if ENABLED:
+        print(line)
@@ -1,4 +1,5 @@
 """Test configuration and shared fixtures for vim-pytoy tests."""
+import gc
 import sys
 from typing import Generator
 import pytest
@@ -41,3 +42,12 @@ def vim_env() -> Generator[MockVim, None, None]:
     sys.modules['vim'] = old_vim
 
 
+@pytest.fixture
+def no_gc() -> Generator[None, None, None]:
+    """Keep the timings of benchmarks independent of the garbage left by the other tests."""
+    gc.collect()
+    gc.disable()
+    try:
+        yield
+    finally:
+        gc.enable()
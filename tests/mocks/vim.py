@@ -39,6 +39,7 @@ class MockVim(MockVimModule):
         self.windows = []
         self.buffers = BufferDict()  # Changed to BufferDict
         self.tab_pages = []
+        self.current_tabnr = 1
         self._eval_results = {}
         self._commands = []
         self.current = self.Current()
@@ -53,10 +54,14 @@ class MockVim(MockVimModule):
         self.buffers.append(buf)
         return buf
     
-    def create_window(self, number: int, buffer: MockVimModule.Buffer) -> MockVimModule.Window:
+    def create_window(
+        self, number: int, buffer: MockVimModule.Buffer, *, winid: Optional[int] = None, tabnr: int = 1
+    ) -> MockVimModule.Window:
         """Create a new window for testing."""
         win = self.Window()
         win.number = number
+        win.winid = 1000 + number if winid is None else winid
+        win.tabnr = tabnr
         win._buffer = buffer
         self.windows.append(win)
         if not self.current.window:
@@ -68,6 +73,35 @@ class MockVim(MockVimModule):
         if window in self.windows:
             self.current._window = window
     
+    def eval(self, expr: str) -> Any:
+        """Mock vim.eval with the buffer-related expressions."""
+        if expr.startswith("[tabpagenr(), map(getwininfo(),"):
+            windows = sorted((win for win in self.windows if win.valid), key=lambda win: (win.tabnr, win.number))
+            infos = [
+                [str(win.winid), str(win.buffer.number), str(win.tabnr), str(win.number), win.buffer.name,
+                 win.buffer.options["buftype"]]
+                for win in windows
+            ]
+            return [str(self.current_tabnr), infos]
+        if expr.startswith("map([") and expr.endswith("bufwinid(b)})"):
+            bufnrs = [int(bufnr) for bufnr in expr[len("map([") : expr.index("]")].split(",") if bufnr.strip()]
+            winids = {win.buffer.number: win.winid for win in reversed(self.windows) if win.valid}
+            return [str(winids.get(bufnr, -1)) for bufnr in bufnrs]
+        if expr == "bufnr('$')":
+            return str(max((buf.number for buf in self.buffers if buf.valid), default=0))
+        if expr.startswith("map(getbufinfo(),"):
+            return [[str(buf.number), buf.name, buf.options["buftype"]] for buf in self.buffers if buf.valid]
+        if expr.startswith("getbufvar(") and expr.endswith("'&buftype')"):
+            bufnr = int(expr[len("getbufvar(") :].split(",")[0])
+            return self.buffers[bufnr].options["buftype"] if bufnr in self.buffers else ""
+        if expr.startswith("getbufvar(") and expr.endswith("'changedtick')"):
+            bufnr = int(expr[len("getbufvar(") :].split(",")[0])
+            return str(self.buffers[bufnr].changedtick) if bufnr in self.buffers else ""
+        if expr.startswith("join(getbufline("):
+            bufnr = int(expr[len("join(getbufline(") :].split(",")[0])
+            return "\n".join(self.buffers[bufnr]._content) if bufnr in self.buffers else ""
+        return super().eval(expr)
+
     def set_eval_result(self, expr: str, result: Any):
         """Set a result for vim.eval()."""
         self._eval_results[expr] = result
@@ -29,24 +29,33 @@ class MockVimModule:
                 "buftype": "",
                 "swapfile": True
             }
+            self.changedtick = 1
+        
+        def __len__(self):
+            return len(self._content)
         
         def __getitem__(self, idx):
             return self._content[idx]
         
         def __setitem__(self, idx, value):
+            self.changedtick += 1
             if isinstance(idx, slice):
                 if isinstance(value, str):
-                    self._content[:] = [value]
+                    self._content[idx] = [value]
                 else:
-                    self._content[:] = value
+                    self._content[idx] = list(value)
             else:
                 if isinstance(value, str):
                     self._content[idx] = value
                 else:
                     raise TypeError("Cannot assign list to single index")
         
-        def append(self, line: str):
-            self._content.append(line)
+        def append(self, line):
+            self.changedtick += 1
+            if isinstance(line, str):
+                self._content.append(line)
+            else:
+                self._content.extend(line)
 
     class TabPage:
         def __init__(self):
@@ -0,0 +1,163 @@
+"""Tests of `CommandPipeline` with stand-in scripts for `ruff format` / `ruff check`."""
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from pytoy.job_execution.command_executor import CommandExecutor, CommandPipeline, PipelineResult, PipelineStep
+from pytoy.job_execution.command_executor.launcher import CommandLauncher, LaunchProfile
+from pytoy.job_execution.command_executor.pipeline import PIPELINE_META_KEY
+
+# The optional second argument is a gate file: `format` does not end until it exists.
+FORMAT_SCRIPT = """
+import os, sys, time
+while len(sys.argv) > 2 and not os.path.exists(sys.argv[2]):
+    time.sleep(0.01)
+time.sleep(0.2)
+print("1 file reformatted")
+sys.exit(int(sys.argv[1]))
+"""
+
+CHECK_SCRIPT = """
+import time
+time.sleep(0.05)
+print("src/module.py:3:1: F401 `os` imported but unused")
+print("src/module.py:7:5: E711 Comparison to `None`")
+raise SystemExit(1)
+"""
+
+
+@pytest.fixture
+def scripts(tmp_path: Path) -> Path:
+    (tmp_path / "fake_format.py").write_text(FORMAT_SCRIPT)
+    (tmp_path / "fake_check.py").write_text(CHECK_SCRIPT)
+    return tmp_path
+
+
+def _wait(results: list[PipelineResult], timeout: float = 5.0) -> PipelineResult:
+    deadline = time.monotonic() + timeout
+    while not results and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert results, "Pipeline did not finish."
+    return results[0]
+
+
+def _steps(
+    scripts: Path, format_status: int, continue_on_failure: bool = False, gate: Path | None = None
+) -> list[PipelineStep]:
+    gate_args = [str(gate)] if gate else []
+    return [
+        PipelineStep(
+            "format",
+            [sys.executable, str(scripts / "fake_format.py"), str(format_status), *gate_args],
+            continue_on_failure=continue_on_failure,
+        ),
+        PipelineStep("check", [sys.executable, str(scripts / "fake_check.py")]),
+    ]
+
+
+def test_steps_run_in_order_without_blocking(scripts: Path, monkeypatch):
+    executor = CommandExecutor("PIPELINE_STDOUT")
+    n_solved = []
+    original = executor.environment_manager.solve_preference
+
+    def _solve_preference(*args, **kwargs):
+        n_solved.append(args)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(executor.environment_manager, "solve_preference", _solve_preference)
+    results: list[PipelineResult] = []
+    pipeline = CommandPipeline(executor, on_finish=results.append)
+
+    gate = scripts / "gate"
+    pipeline.run(_steps(scripts, 0, gate=gate), cwd=scripts, command_wrapper="system")
+    # `run` returns before `format` ends.
+    assert pipeline.current is not None and pipeline.reports == ()
+    gate.touch()
+
+    result = _wait(results)
+    assert [report.name for report in result.reports] == ["format", "check"]
+    assert [report.status for report in result.reports] == [0, 1]
+    assert result.reports[0].elapsed >= 0.2
+    assert not result.success
+    # The environment is solved once for all the steps.
+    assert len(n_solved) == 1
+
+    # Both steps share the output buffer, with a report line per step.
+    lines = executor.stdout.content.splitlines()
+    assert "1 file reformatted" in lines
+    assert "src/module.py:3:1: F401 `os` imported but unused" in lines
+    assert [line.split(" (")[0] for line in lines if line.startswith("[")] == ["[format] exit=0", "[check] exit=1"]
+
+
+def test_failure_skips_the_rest(scripts: Path):
+    executor = CommandExecutor("PIPELINE_STDOUT")
+    results: list[PipelineResult] = []
+    CommandPipeline(executor, on_finish=results.append).run(
+        _steps(scripts, 2), cwd=scripts, command_wrapper=lambda command: command
+    )
+
+    result = _wait(results)
+    assert [(report.status, report.skipped) for report in result.reports] == [(2, False), (None, True)]
+    assert "[check] skipped" in executor.stdout.content.splitlines()
+
+
+def test_continue_on_failure(scripts: Path):
+    executor = CommandExecutor("PIPELINE_STDOUT")
+    results: list[PipelineResult] = []
+    CommandPipeline(executor, on_finish=results.append, report_steps=False).run(
+        _steps(scripts, 2, continue_on_failure=True), cwd=scripts, command_wrapper=lambda command: command
+    )
+
+    result = _wait(results)
+    assert [report.status for report in result.reports] == [2, 1]
+    assert not any(line.startswith("[") for line in executor.stdout.content.splitlines())
+
+
+def _wait_started(pipeline: CommandPipeline, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while pipeline.current is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert pipeline.current is not None, "Pipeline did not start."
+
+
+def test_terminate_skips_the_rest_even_with_continue_on_failure(scripts: Path):
+    executor = CommandExecutor("PIPELINE_STDOUT")
+    results: list[PipelineResult] = []
+    pipeline = CommandPipeline(executor, on_finish=results.append)
+    steps = _steps(scripts, 0, continue_on_failure=True, gate=scripts / "gate")
+    pipeline.run(steps, cwd=scripts, command_wrapper=lambda command: command)
+    _wait_started(pipeline)
+    pipeline.terminate()
+
+    result = _wait(results)
+    assert [report.name for report in result.reports] == ["format", "check"]
+    assert not result.reports[0].success
+    assert result.reports[1].skipped
+    assert "src/module.py:3:1: F401 `os` imported but unused" not in executor.stdout.content.splitlines()
+
+
+def test_launcher_stops_and_reruns_the_whole_pipeline(scripts: Path):
+    launcher = CommandLauncher(LaunchProfile(kind="PipelineTest", command_wrapper=lambda command: command))
+    gate = scripts / "gate"
+    steps = _steps(scripts, 0, continue_on_failure=True, gate=gate)
+    pipeline = launcher.run_pipeline(steps, "PIPELINE_STDOUT", cwd=scripts)
+    _wait_started(pipeline)
+    launcher.stop()
+
+    deadline = time.monotonic() + 5.0
+    while launcher.is_running and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert pipeline.reports[1].skipped
+
+    # `rerun` starts from `format`, not from the interrupted step.
+    gate.touch()
+    launcher.rerun("PIPELINE_STDOUT")
+    assert launcher.last_context
+    rerun = launcher.last_context.meta[PIPELINE_META_KEY]
+    assert rerun is not pipeline
+    deadline = time.monotonic() + 5.0
+    while len(rerun.reports) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert [(report.name, report.status) for report in rerun.reports] == [("format", 0), ("check", 1)]
@@ -0,0 +1,161 @@
+"""`CSpellBatchChecker` against a fake `cspell` which knows a small dictionary."""
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from pytoy.tools.cspell import CSpellBatchChecker, SpellCheckCache
+from pytoy.tools.cspell.batch import collect_files, extract_words
+from pytoy.tools.cspell.workers import WORKER_FOLDER
+
+FAKE_CSPELL = f"""#!{sys.executable}
+import re
+import sys
+from pathlib import Path
+
+KNOWN = {{"hello", "world", "value", "return", "def", "the", "camel", "case", "and"}}
+with Path(__file__).with_suffix(".log").open("a") as fp:
+    fp.write(" ".join(sys.argv[1:]) + "\\n")
+name = sys.argv[-1]
+found = False
+for index, line in enumerate(sys.stdin.read().split("\\n"), start=1):
+    for m in re.finditer(r"[A-Z]?[a-z0-9']+|[A-Z]+(?![a-z])", line):
+        if m.group(0).lower() not in KNOWN:
+            found = True
+            print(f"{{name}}:{{index}}:{{m.start() + 1}} - Unknown word ({{m.group(0)}})")
+sys.exit(1 if found else 0)
+"""
+
+SOURCE = '''
+def hello(value):
+    """Hello wrold."""
+    # camelCase and camelCaes
+    return f"{value} wrold"
+'''
+
+
+@pytest.fixture
+def fake_cspell(tmp_path: Path) -> Path:
+    path = tmp_path / "bin" / "fake_cspell"
+    path.parent.mkdir()
+    path.write_text(FAKE_CSPELL)
+    path.chmod(0o755)
+    return path
+
+
+def _n_invocations(fake_cspell: Path) -> int:
+    log = fake_cspell.with_suffix(".log")
+    return len(log.read_text().splitlines()) if log.exists() else 0
+
+
+def test_findings_are_mapped_to_every_occurrence(tmp_path: Path, fake_cspell: Path):
+    source = tmp_path / "src"
+    source.mkdir()
+    for i in range(3):
+        (source / f"module_{i}.py").write_text(SOURCE)
+    (source / "notes.md").write_text("Hello wrold\n")
+
+    checker = CSpellBatchChecker([str(fake_cspell)], executor_factory=None)
+    result = checker.check(collect_files(source), cwd=source)
+
+    assert _n_invocations(fake_cspell) == 1
+    lines = {finding.to_line() for finding in result.findings}
+    for i in range(3):
+        path = (source / f"module_{i}.py").as_posix()
+        assert f"{path}:3:14 - Unknown word (wrold)" in lines
+        assert f"{path}:5:22 - Unknown word (wrold)" in lines
+        # Only the unknown part of the compound word.
+        assert f"{path}:4:26 - Unknown word (Caes)" in lines
+    assert f"{(source / 'notes.md').as_posix()}:1:7 - Unknown word (wrold)" in lines
+    assert len(result.findings) == 3 * 3 + 1
+    # `def` and `hello` of the code are not checked.
+    assert result.stats.n_unique_words < result.stats.n_words
+
+
+def test_cache_skips_unchanged_files(tmp_path: Path, fake_cspell: Path):
+    paths = []
+    for i in range(3):
+        paths.append(tmp_path / f"module_{i}.py")
+        paths[-1].write_text(SOURCE)
+    cache_path = tmp_path / "cache.json"
+
+    first = CSpellBatchChecker([str(fake_cspell)], cache=SpellCheckCache(cache_path), executor_factory=None)
+    expected = first.check(paths).findings
+
+    # The cache is persisted, and no invocation is required for the unchanged files.
+    second = CSpellBatchChecker([str(fake_cspell)], cache=SpellCheckCache(cache_path), executor_factory=None)
+    result = second.check(paths)
+    assert result.findings == expected
+    assert result.stats.n_cached == 3
+    assert _n_invocations(fake_cspell) == 1
+
+    paths[0].write_text(SOURCE + "# tpyo\n")
+    result = second.check(paths)
+    assert result.stats.n_cached == 2
+    assert _n_invocations(fake_cspell) == 2
+    assert any(finding.word == "tpyo" and finding.line == 6 for finding in result.findings)
+
+
+def test_cache_follows_the_configuration(tmp_path: Path, fake_cspell: Path):
+    project = tmp_path / "project"
+    project.mkdir()
+    path = project / "module.py"
+    path.write_text(SOURCE)
+    (project / "words.txt").write_text("wrold\n")
+    config = project / "cspell.json"
+    config.write_text('{"dictionaryDefinitions": [{"name": "project", "path": "./words.txt"}]}')
+
+    checker = CSpellBatchChecker([str(fake_cspell)], cache=SpellCheckCache(tmp_path / "cache.json"), executor_factory=None)
+    assert checker.check([path], cwd=project).stats.n_cached == 0
+    assert checker.check([path], cwd=project).stats.n_cached == 1
+
+    # The custom dictionary, the configuration and `cwd` change the unknown words.
+    (project / "words.txt").write_text("wrold\ncaes\n")
+    assert checker.check([path], cwd=project).stats.n_cached == 0
+    config.write_text('{"words": ["wrold"], "dictionaryDefinitions": [{"name": "project", "path": "./words.txt"}]}')
+    assert checker.check([path], cwd=project).stats.n_cached == 0
+    assert checker.check([path], cwd=tmp_path).stats.n_cached == 0
+    assert checker.check([path], cwd=project).stats.n_cached == 1
+    assert _n_invocations(fake_cspell) == 4
+
+
+def test_cache_keeps_the_recently_used_entries(tmp_path: Path, fake_cspell: Path):
+    paths = []
+    for i in range(3):
+        paths.append(tmp_path / f"module_{i}.py")
+        paths[-1].write_text(SOURCE + f"# unique{i}\n")
+    cache_path = tmp_path / "cache.json"
+
+    checker = CSpellBatchChecker([str(fake_cspell)], cache=SpellCheckCache(cache_path, max_entries=2), executor_factory=None)
+    checker.check(paths[:2])
+    checker.check(paths[:1])
+    checker.check(paths[2:])
+    cache = SpellCheckCache(cache_path, max_entries=2)
+    assert len(cache) == 2
+
+    # `module_1` is the least recently used.
+    result = CSpellBatchChecker([str(fake_cspell)], cache=cache, executor_factory=None).check(paths)
+    assert result.stats.n_cached == 2
+
+
+def test_throughput(tmp_path: Path, fake_cspell: Path):
+    n_files = 200
+    paths = []
+    for i in range(n_files):
+        paths.append(tmp_path / f"module_{i}.py")
+        paths[-1].write_text(SOURCE * 20 + f"# unique{i}\n")
+
+    # The default process pool: the workers do not import `pytoy`.
+    checker = CSpellBatchChecker([str(fake_cspell)])
+    start = time.perf_counter()
+    result = checker.check(paths)
+    elapsed = time.perf_counter() - start
+    print(f"\n{result.stats.to_line()} ({elapsed:.2f}s)")
+
+    assert _n_invocations(fake_cspell) == 1
+    assert result.stats.n_unique_words == n_files + 5
+    assert len(result.findings) == n_files * (20 * 3 + 1)
+    assert [extract_words(path) for path in paths[:3]] == checker._extract(paths[:3])
+    # The worker folder is added to `sys.path` of the workers only.
+    assert str(WORKER_FOLDER) not in sys.path
@@ -0,0 +1,132 @@
+"""Tests of `EntityRegistry`: the strong LRU, subscriptions to `on_end` and leaks."""
+import gc
+import time
+import tracemalloc
+import weakref
+
+import pytest
+
+from pytoy.shared.lib import entity
+from pytoy.shared.lib.entity import EntityRegistry
+from pytoy.shared.lib.event import domain, global_event
+from pytoy.shared.lib.event.domain import Event, EventEmitter
+from pytoy.shared.lib.event.global_event import GlobalEvent
+
+
+N_CYCLES = 100_000
+
+
+class _Entity:
+    """Routes `on_end` through `GlobalEvent.at`, as the buffer and window kernels do."""
+
+    def __init__(self, entity_id: int, ended: GlobalEvent[int]) -> None:
+        self._entity_id = entity_id
+        self._on_end = ended.at(entity_id)
+        self.payload = [0] * 8
+
+    @property
+    def entity_id(self) -> int:
+        return self._entity_id
+
+    @property
+    def on_end(self) -> Event[int]:
+        return self._on_end
+
+
+@pytest.fixture
+def emitter() -> EventEmitter[int]:
+    return EventEmitter[int]()
+
+
+@pytest.fixture
+def ended(emitter: EventEmitter[int]) -> GlobalEvent[int]:
+    return GlobalEvent(emitter.event)
+
+
+def _make_registry(ended: GlobalEvent[int], capacity: int) -> EntityRegistry[int, _Entity]:
+    return EntityRegistry(_Entity, factory=lambda entity_id: _Entity(entity_id, ended), capacity=capacity)
+
+
+def test_recently_used_entities_are_not_recreated(ended: GlobalEvent[int]):
+    registry = _make_registry(ended, capacity=2)
+    first = registry.get(1)
+    first_id = id(first)
+    del first
+    gc.collect()
+    # Held by the LRU, so the factory is not called again.
+    assert id(registry.get(1)) == first_id
+    assert (registry.stats.hits, registry.stats.misses, registry.stats.creations) == (1, 1, 1)
+
+    registry.get(2)
+    registry.get(3)  # `1` is evicted, and collected as nobody holds it.
+    gc.collect()
+    stats = registry.stats
+    assert (stats.evictions, stats.collected, stats.live, stats.retained) == (1, 1, 2, 2)
+    assert set(ended._cached) == {2, 3}
+
+    registry.get(1)
+    assert registry.stats.creations == 4
+
+
+def test_exactly_one_subscription_per_live_entity(emitter: EventEmitter[int], ended: GlobalEvent[int]):
+    registry = _make_registry(ended, capacity=4)
+    current = registry.get(5)
+    for _ in range(10):
+        assert registry.get(5) is current
+    assert len(ended._cached[5]) == 1
+
+    emitter.fire(5)
+    assert 5 not in ended._cached
+    assert registry.stats.disposals == 1
+    # A new entity is created after `on_end`, even though the old one is still referenced.
+    assert registry.get(5) is not current
+    assert len(ended._cached[5]) == 1
+    # The end of the old entity does not affect the new one.
+    del current
+    gc.collect()
+    assert len(ended._cached[5]) == 1 and registry.stats.live == 1
+
+
+def test_100k_create_destroy_cycles_do_not_leak(emitter: EventEmitter[int], ended: GlobalEvent[int], no_gc):
+    registry = _make_registry(ended, capacity=64)
+
+    def _cycle(start: int, stop: int) -> None:
+        for index in range(start, stop):
+            entity_id = index % 5000
+            registry.get(entity_id)
+            if index % 3 == 0:
+                emitter.fire(entity_id)  # Ended explicitly; the others are evicted and collected.
+
+    # Only the allocations by the registry and the entities, not by other threads (e.g. the module preloader).
+    by_cycles = [
+        tracemalloc.Filter(True, entity.__file__),
+        tracemalloc.Filter(True, domain.__file__),
+        tracemalloc.Filter(True, global_event.__file__),
+        tracemalloc.Filter(True, weakref.__file__),
+        tracemalloc.Filter(True, __file__),
+    ]
+    tracemalloc.start()
+    try:
+        # Warm up, so that the live entities and the tables are traced in both of the snapshots.
+        _cycle(0, 10_000)
+        gc.collect()
+        before = tracemalloc.take_snapshot().filter_traces(by_cycles)
+        start = time.perf_counter()
+        _cycle(10_000, 10_000 + N_CYCLES)
+        elapsed = time.perf_counter() - start
+        gc.collect()
+        after = tracemalloc.take_snapshot().filter_traces(by_cycles)
+    finally:
+        tracemalloc.stop()
+    growth = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+
+    stats = registry.stats
+    print(f"\n{N_CYCLES} cycles in {elapsed:.2f}s (traced), growth {growth} bytes")
+    print(stats.to_line())
+    assert stats.hits + stats.misses == N_CYCLES + 10_000
+    assert stats.creations == stats.misses
+    assert stats.live == stats.creations - stats.disposals - stats.collected
+    assert stats.live <= 64 + 1
+    assert sum(len(listeners) for listeners in ended._cached.values()) == stats.live
+    assert len(emitter._listeners) == 1
+    assert growth < 16 * 1024
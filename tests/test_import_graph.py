@@ -0,0 +1,137 @@
+"""Selection of `AffectedTestSelector` on synthetic packages with known dependencies."""
+import os
+import random
+import time
+from pathlib import Path
+
+import pytest
+
+from pytoy.tools.pytest.utils import AffectedTestSelector, ImportGraph
+
+FILES = {
+    "pkg/__init__.py": "",
+    "pkg/core.py": "VALUE = 1\n",
+    "pkg/util.py": "def u():\n    return 0\n",
+    "pkg/api.py": "from . import core\n",
+    "pkg/sub/__init__.py": "",
+    "pkg/sub/deep.py": "from ..api import core as api_core\n",
+    "other.py": "import json\n",
+    "tests/conftest.py": "",
+    "tests/test_core.py": "from pkg import core\n",
+    "tests/test_api.py": "import pkg.api\n",
+    "tests/test_deep.py": "def test():\n    from pkg.sub.deep import api_core\n",
+    "tests/test_util.py": "from pkg.util import u\n",
+    "tests/test_other.py": "import other\n",
+}
+
+
+def _touch(path: Path) -> None:
+    mtime = path.stat().st_mtime + 10
+    os.utime(path, (mtime, mtime))
+
+
+@pytest.fixture
+def selector(tmp_path: Path) -> AffectedTestSelector:
+    for name, content in FILES.items():
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    selector = AffectedTestSelector(tmp_path)
+    selection = selector.select()
+    assert selection.tests is None
+    selector.mark_success(selection)
+    return selector
+
+
+def _select(selector: AffectedTestSelector) -> set[str]:
+    selection = selector.select()
+    assert selection.tests is not None
+    return {path.name for path in selection.tests}
+
+
+def test_known_structure(selector: AffectedTestSelector):
+    root = selector.root
+    assert _select(selector) == set()
+
+    _touch(root / "pkg/core.py")
+    selection = selector.select()
+    assert selection.graph_stats.n_parsed == 1
+    assert {path.name for path in selection.tests or []} == {"test_core.py", "test_api.py", "test_deep.py"}
+    selector.mark_success(selection)
+
+    _touch(root / "pkg/util.py")
+    assert _select(selector) == {"test_util.py"}
+
+    # Without a successful run, the changes are accumulated.
+    _touch(root / "other.py")
+    assert _select(selector) == {"test_util.py", "test_other.py"}
+    selector.mark_success(selector.select())
+
+    _touch(root / "pkg/__init__.py")
+    assert _select(selector) == {"test_core.py", "test_api.py", "test_deep.py", "test_util.py"}
+    selector.mark_success(selector.select())
+
+    _touch(root / "tests/test_other.py")
+    assert _select(selector) == {"test_other.py"}
+    selector.mark_success(selector.select())
+
+    _touch(root / "tests/conftest.py")
+    assert len(_select(selector)) == 5
+    selector.mark_success(selector.select())
+
+    (root / "pkg/util.py").unlink()
+    selection = selector.select()
+    assert selection.graph_stats.n_removed == 1
+    assert {path.name for path in selection.tests or []} == {"test_util.py"}
+
+
+def test_random_graph_matches_transitive_closure(tmp_path: Path):
+    rng = random.Random(0)
+    n_modules, n_tests = 300, 200
+    (tmp_path / "lib").mkdir()
+    (tmp_path / "lib/__init__.py").write_text("")
+    deps: dict[str, list[str]] = {}
+    for i in range(n_modules):
+        deps[f"m{i}"] = [f"m{j}" for j in rng.sample(range(i), min(i, rng.randint(0, 3)))]
+        lines = [f"from lib import {dep}" if k % 2 else f"import lib.{dep}" for k, dep in enumerate(deps[f"m{i}"])]
+        (tmp_path / f"lib/m{i}.py").write_text("\n".join(lines) + "\n")
+    for i in range(n_tests):
+        deps[f"test_{i}"] = [f"m{j}" for j in rng.sample(range(n_modules), 2)]
+        lines = [f"from lib.{dep} import *" for dep in deps[f"test_{i}"]]
+        (tmp_path / f"test_{i}.py").write_text("\n".join(lines) + "\n")
+
+    def _closure(name: str) -> set[str]:
+        result, stack = set(), [name]
+        while stack:
+            for dep in deps[stack.pop()]:
+                if dep not in result:
+                    result.add(dep)
+                    stack.append(dep)
+        return result
+
+    selector = AffectedTestSelector(tmp_path)
+    start = time.perf_counter()
+    selector.mark_success(selector.select())
+    build_time = time.perf_counter() - start
+
+    for changed in rng.sample(range(n_modules), 10):
+        _touch(tmp_path / f"lib/m{changed}.py")
+        expected = {f"test_{i}.py" for i in range(n_tests) if f"m{changed}" in _closure(f"test_{i}")}
+        start = time.perf_counter()
+        assert _select(selector) == expected
+        update_time = time.perf_counter() - start
+        selector.mark_success(selector.select())
+    print(f"\nbuild: {build_time * 1000:.1f}ms, incremental: {update_time * 1000:.1f}ms")
+
+
+def test_relative_imports(tmp_path: Path):
+    (tmp_path / "a/b").mkdir(parents=True)
+    for name in ["a/__init__.py", "a/b/__init__.py", "a/x.py"]:
+        (tmp_path / name).write_text("")
+    (tmp_path / "a/b/y.py").write_text("from .. import x\nfrom . import z\n")
+    (tmp_path / "a/b/z.py").write_text("from ..x import *\n")
+
+    graph = ImportGraph(tmp_path)
+    graph.update()
+    assert {path.name for path in graph.dependents(["a.x"])} == {"y.py", "z.py"}
+    assert {path.name for path in graph.dependents(["a.b.z"])} == {"y.py"}
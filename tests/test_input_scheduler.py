@@ -0,0 +1,159 @@
+"""Tests of `InputScheduler`, the shared input thread of the terminal jobs."""
+import re
+import threading
+import time
+from threading import Lock
+
+from pytoy.job_execution.terminal_runner.impls.utils.input_scheduler import InputScheduler
+from pytoy.job_execution.terminal_runner.impls.utils.output_signals import OutputSignals
+from pytoy.job_execution.terminal_runner.models import (
+    ConsoleSnapshot,
+    LineStr,
+    RawStr,
+    Snapshot,
+    WaitOperation,
+    WaitOutputOperation,
+    WaitUntilOperation,
+)
+from pytoy.shared.lib.text import CursorPosition
+
+
+N_SESSIONS = 200
+N_SENDS = 20
+
+
+def _snapshot(content: str) -> Snapshot:
+    return Snapshot(timestamp=0.0, console=ConsoleSnapshot(24, 80, content), cursor=CursorPosition(0, 0))
+
+
+class _FakeSession:
+    """Record the writes of a session, as the pty of a terminal job."""
+
+    def __init__(self) -> None:
+        self.writes: list[tuple[float, str]] = []
+        self.content = ""
+        self._lock = Lock()
+
+    def write(self, payload: str) -> None:
+        with self._lock:
+            self.writes.append((time.monotonic(), payload))
+            self.content += payload
+
+    @property
+    def text(self) -> str:
+        with self._lock:
+            return "".join(payload for _, payload in self.writes)
+
+
+def _n_threads() -> int:
+    # The preloader may finish at any time.
+    return sum(1 for thread in threading.enumerate() if not thread.name.startswith("pytoy-preloader"))
+
+
+def _wait_until(predicate, timeout: float = 10.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.005)
+    return predicate()
+
+
+def test_many_sessions_keep_their_order_with_one_thread():
+    scheduler = InputScheduler()
+    fakes = [_FakeSession() for _ in range(N_SESSIONS)]
+    n_threads = _n_threads()
+    sessions = [
+        scheduler.open(fake.write, enter_eol="\n", snapshot_getter=lambda: _snapshot("")) for fake in fakes
+    ]
+    assert _n_threads() == n_threads + 1
+
+    def _submit(index: int) -> None:
+        for send in range(N_SENDS):
+            ops = [RawStr(f"<{index}:{send}"), LineStr(">")]
+            if send % 5 == 0:
+                ops.append(WaitOperation(0.001 * (index % 7)))
+            sessions[index].submit(ops)
+
+    submitters = [threading.Thread(target=_submit, args=(index,)) for index in range(N_SESSIONS)]
+    for thread in submitters:
+        thread.start()
+    for thread in submitters:
+        thread.join()
+
+    expected = ["".join(f"<{index}:{send}>\n" for send in range(N_SENDS)) for index in range(N_SESSIONS)]
+    assert _wait_until(lambda: all(fake.text == text for fake, text in zip(fakes, expected)))
+    assert all(session.idle for session in sessions)
+    assert _n_threads() == n_threads + 1
+
+    # The raw strings of a send are written at once.
+    assert all(session.n_writes <= N_SENDS * 2 for session in sessions)
+    for session in sessions:
+        session.close()
+    assert scheduler.sessions == []
+
+
+def test_consecutive_payloads_are_coalesced_until_a_wait():
+    scheduler = InputScheduler()
+    fake = _FakeSession()
+    session = scheduler.open(fake.write, enter_eol="\r", snapshot_getter=lambda: _snapshot(""))
+    session.submit([RawStr("a"), RawStr("b"), LineStr("c\n"), WaitOperation(0.05), RawStr("d"), "e"])
+    assert _wait_until(lambda: len(fake.writes) == 2)
+    (first_at, first), (second_at, second) = fake.writes
+    assert (first, second) == ("abc\r", "de\r")
+    assert second_at - first_at >= 0.05
+    assert session.n_writes == 2
+
+
+def test_a_waiting_session_does_not_block_the_others():
+    scheduler = InputScheduler()
+    slow, fast = _FakeSession(), _FakeSession()
+    slow_session = scheduler.open(slow.write, enter_eol="\n", snapshot_getter=lambda: _snapshot(slow.content))
+    fast_session = scheduler.open(fast.write, enter_eol="\n", snapshot_getter=lambda: _snapshot(""))
+
+    ready = re.compile("ready")
+    slow_session.submit(
+        [
+            RawStr("start"),
+            WaitUntilOperation(lambda snapshot: bool(ready.search(snapshot.content)), timeout=1.0),
+            RawStr("after"),
+        ]
+    )
+    assert _wait_until(lambda: slow.text == "start")
+    start = time.monotonic()
+    fast_session.submit([RawStr("x"), WaitOperation(0.01), RawStr("y")])
+    assert _wait_until(lambda: fast.text == "xy", timeout=0.5)
+    assert time.monotonic() - start < 0.2
+    assert slow.text == "start"
+
+    # The predicate is polled as `WaitUntilOperation.wait_until`, and gives up after `timeout`.
+    assert _wait_until(lambda: slow.text == "startafter", timeout=3.0)
+    assert slow.writes[1][0] - slow.writes[0][0] >= 0.8
+
+
+def test_wait_output_is_woken_by_the_signals():
+    scheduler = InputScheduler()
+    fake = _FakeSession()
+    signals = OutputSignals()
+
+    def _unused() -> Snapshot:
+        raise AssertionError("The snapshot is not polled.")
+
+    session = scheduler.open(fake.write, enter_eol="\n", snapshot_getter=_unused, signals=signals)
+    banner = re.escape("Pasting code; enter")
+    # The banner before the payload is the output of the previous input.
+    signals.watch(banner)
+    signals.feed("Pasting code; enter")
+
+    session.submit([RawStr("%cpaste\n"), WaitOutputOperation(banner, timeout=5.0), RawStr("body")])
+    assert _wait_until(lambda: fake.text == "%cpaste\n")
+    time.sleep(0.05)
+    assert fake.text == "%cpaste\n"
+
+    fed = time.monotonic()
+    signals.feed("Pasting code; enter '--' alone on the line to stop or use Ctrl-D.\r\n:")
+    assert _wait_until(lambda: fake.text == "%cpaste\nbody", timeout=1.0)
+    assert fake.writes[-1][0] - fed < 0.1
+
+    session.close()
+    assert scheduler.sessions == []
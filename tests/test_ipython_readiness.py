@@ -0,0 +1,197 @@
+"""Tests of the readiness detection by `OutputSignals`, and the round trips of `IPythonDriver`."""
+import re
+import shlex
+import sys
+import time
+from threading import Thread
+
+import pytest
+
+from pytoy.job_execution.terminal_runner.drivers import IPythonDriver
+from pytoy.job_execution.terminal_runner.impls.utils.input_scheduler import InputScheduler, MainLoopInputScheduler
+from pytoy.job_execution.terminal_runner.impls.utils.output_signals import OutputSignals
+from pytoy.job_execution.terminal_runner.models import (
+    ConsoleSnapshot,
+    RawStr,
+    Snapshot,
+    WaitOperation,
+    WaitOutputOperation,
+    WaitUntilOperation,
+)
+from pytoy.shared.lib.text import CursorPosition
+
+from tests import bench
+
+
+READY = re.escape(IPythonDriver.READY_MARKER)
+N_SENDS = 100
+
+
+def _snapshot(content: str) -> Snapshot:
+    return Snapshot(timestamp=0.0, console=ConsoleSnapshot(24, 80, content), cursor=CursorPosition(0, 0))
+
+
+def _feed_later(signals: OutputSignals, data: str, delay: float) -> Thread:
+    def _feed():
+        time.sleep(delay)
+        signals.feed(data)
+
+    thread = Thread(target=_feed, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_markers_split_by_chunks_are_counted_once():
+    signals = OutputSignals()
+    signals.watch(READY)
+    marker = IPythonDriver.READY_MARKER
+    signals.feed("In [1]: x = 1\r\n" + marker[:3])
+    signals.feed(marker[3:] + "\r\nIn [2]: ")
+    assert signals.count(READY) == 1
+    # The marker in the tail is not counted again.
+    signals.feed("y")
+    signals.feed(marker + marker)
+    assert signals.count(READY) == 3
+
+
+def test_wait_is_woken_by_the_reader_after_mark():
+    signals = OutputSignals()
+    signals.watch(READY)
+    signals.feed(IPythonDriver.READY_MARKER)
+    signals.mark()
+    # The marker before `mark` is the output of the previous input.
+    assert not signals.wait(READY, timeout=0.01)
+
+    _feed_later(signals, "out\r\n" + IPythonDriver.READY_MARKER, delay=0.05)
+    start = time.perf_counter()
+    assert signals.wait(READY, timeout=3.0)
+    assert signals.satisfied(READY)
+    if bench.ENABLED:
+        assert time.perf_counter() - start < 0.05 + 0.02
+
+
+def test_wait_output_polls_the_snapshot_without_signals():
+    timers: list[tuple[float, object]] = []
+    now = [0.0]
+    scheduler = MainLoopInputScheduler(clock=lambda: now[0], call_later=lambda func, delay: timers.append((delay, func)))
+    snapshots = iter([_snapshot("In [1]: %cpaste"), _snapshot("Pasting code; enter '--'")])
+    written: list[str] = []
+    session = scheduler.open(written.append, enter_eol="\n", snapshot_getter=lambda: next(snapshots))
+
+    op = WaitOutputOperation(re.escape(IPythonDriver.PASTE_BANNER), timeout=3.0)
+    session.submit([RawStr("%cpaste\n"), op, RawStr("body")])
+    while timers:
+        delay, func = timers.pop(0)
+        now[0] += delay
+        func()  # type: ignore[operator]
+    # The banner is found at the second poll, `timeout / 5` seconds later.
+    assert written == ["%cpaste\n", "body"]
+    assert now[0] == pytest.approx(0.6)
+    session.close()
+
+
+def test_ipython_operations_do_not_sleep():
+    driver = IPythonDriver()
+    first = driver.make_operations("a = 1\nb = 2")
+    second = driver.make_operations("c = 3")
+    assert not any(isinstance(op, WaitOperation) for op in [*first, *second])
+
+    assert isinstance(first[0], WaitUntilOperation)
+    paste = [RawStr("%cpaste\n"), WaitOutputOperation(re.escape(IPythonDriver.PASTE_BANNER))]
+    assert first[1:3] == second[1:3] == paste
+    assert isinstance(second[0], WaitOutputOperation) and second[0].pattern == READY
+    assert second[-2:] == [RawStr("c = 3"), RawStr("\r--\r")]
+
+    assert not driver.is_busy([], _snapshot("Out[1]: 3\n\nIn [2]:  \n\n"))
+    assert driver.is_busy([], _snapshot("In [2]: %cpaste\nPasting code; enter '--'\n:"))
+
+
+def test_ready_hook_is_installed_by_the_command_line():
+    driver = IPythonDriver()
+    # The hook is not sent as an input cell, which would be echoed.
+    assert all(IPythonDriver.READY_HOOK not in str(op) for op in driver.make_operations("x = 1"))
+    args = shlex.split(driver.command)
+    assert args[-3:] == ["-i", "-c", IPythonDriver.READY_HOOK]
+    assert "\\" not in IPythonDriver.READY_HOOK
+    compile(IPythonDriver.READY_HOOK, "<hook>", "eval")
+
+
+def test_main_loop_input_does_not_block_the_output():
+    # As `TerminalJobVim`: the output arrives in the main thread, which steps the input by the timers.
+    timers: list[tuple[float, object]] = []
+    now = [0.0]
+    scheduler = MainLoopInputScheduler(clock=lambda: now[0], call_later=lambda func, delay: timers.append((delay, func)))
+    signals = OutputSignals()
+    written: list[str] = []
+    session = scheduler.open(written.append, enter_eol="\n", snapshot_getter=lambda: _snapshot(""), signals=signals)
+
+    def _run_timers() -> None:
+        while due := [timer for timer in timers if timer[0] <= 0.0]:
+            timers.remove(due[0])
+            due[0][1]()
+
+    driver = IPythonDriver()
+    driver.make_operations("x = 0")
+    session.submit(driver.make_operations("y = 1"))
+    _run_timers()
+    # The ready wait of the previous cell, which is a timer instead of a blocking wait.
+    assert written == [] and timers and timers[0][0] == pytest.approx(3.0)
+
+    signals.feed("Out[1]: 0\r\n" + IPythonDriver.READY_MARKER)
+    _run_timers()
+    assert written == ["%cpaste\n"]
+    signals.feed("Pasting code; enter '--' alone on the line to stop or use Ctrl-D.\r\n:")
+    _run_timers()
+    assert written == ["%cpaste\n", "y = 1\r--\r"]
+    # Each wait was a timer on the virtual clock, and the payloads were written at once.
+    assert now[0] == 0.0 and session.n_writes == 2
+    session.close()
+
+
+def test_benchmark_round_trips_with_ipython():
+    pytest.importorskip("IPython")
+    if sys.platform == "win32":
+        pytest.skip("`os.openpty` is POSIX only.")
+    from tests.test_pty_pump import _LocalPty
+    from pytoy.job_execution.terminal_runner.impls.utils.pty_pump import PtyPump
+    from pytoy.job_execution.terminal_runner.impls.utils.screen_tracker import ScreenTracker
+
+    driver = IPythonDriver(f"{sys.executable} -m IPython --colors=NoColor --no-banner --no-confirm-exit")
+    pty = _LocalPty(shlex.split(driver.command))
+    signals = OutputSignals()
+    tracker = ScreenTracker(24, 80)
+
+    def _on_data(data: str) -> None:
+        tracker.feed(data)
+        signals.feed(data)
+
+    pump = PtyPump(pty, on_data=_on_data)
+    pump.start()
+    session = InputScheduler().open(
+        pty.write, enter_eol="\n", snapshot_getter=lambda: _snapshot(tracker.content), signals=signals
+    )
+
+    def _send(code: str) -> bool:
+        session.submit(driver.make_operations(code))
+        # The ready marker is waited for after the last payload is written.
+        deadline = time.monotonic() + 10.0
+        while not session.idle and time.monotonic() < deadline:
+            time.sleep(0.001)
+        return signals.wait(READY, timeout=10.0)
+
+    try:
+        assert _send("x = 0")
+        start = time.perf_counter()
+        for index in range(N_SENDS):
+            assert _send(f"x += {index}")
+        elapsed = time.perf_counter() - start
+    finally:
+        session.close()
+        pty.write("exit\r")
+        pump.join(5)
+        pty.terminate()
+
+    # The former operations slept 1.0s per send (`WaitOperation(0.5)` twice).
+    bench.report(f"\n{N_SENDS} sends: {elapsed / N_SENDS * 1e3:.1f}ms per round trip (former: >= 1000ms)")
+    if bench.ENABLED:
+        assert elapsed / N_SENDS < 0.5
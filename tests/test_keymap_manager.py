@@ -0,0 +1,149 @@
+"""Tests and benchmark of `KeymapManager`."""
+import hashlib
+import time
+
+import pytest
+
+from pytoy.contexts.vim import GlobalVimContext
+from pytoy.shared.lib.keymap import KeymapManager, KeymapSpec, KeySequence
+
+from tests.mocks.vim import MockVim
+
+
+N_BUFFERS = 20
+N_KEYS = 30
+# `vim.command` / `vim.eval` cross the python/vim bridge, which `MockVim` does not cost.
+ROUND_TRIP = 20e-6
+
+
+@pytest.fixture
+def ctx(vim_env: MockVim) -> GlobalVimContext:
+    return GlobalVimContext()
+
+
+@pytest.fixture
+def calls(vim_env: MockVim, monkeypatch) -> list[str]:
+    recorded: list[str] = []
+
+    def _wrap(function):
+        def _inner(expr: str):
+            recorded.append(expr)
+            deadline = time.perf_counter() + ROUND_TRIP
+            while time.perf_counter() < deadline:
+                pass
+            return function(expr)
+
+        return _inner
+
+    monkeypatch.setattr(vim_env, "eval", _wrap(vim_env.eval))
+    monkeypatch.setattr(vim_env, "command", _wrap(vim_env.command))
+    return recorded
+
+
+def _display(vim_env: MockVim, bufnr: int) -> None:
+    buffer = vim_env.create_buffer(bufnr, f"/work/result_{bufnr}")
+    vim_env.create_window(bufnr, buffer, winid=1000 + bufnr)
+
+
+def _keys(n: int) -> list[KeySequence]:
+    return [KeySequence(f"<leader>{i}") for i in range(n)]
+
+
+def test_mappings_route_through_dispatcher(vim_env: MockVim, ctx: GlobalVimContext):
+    _display(vim_env, 3)
+    manager = KeymapManager(autocmd_manager=ctx.autocmd_manager)
+    global_keymap = manager.register(KeymapSpec(KeySequence("<F5>")))
+    local_keymap = manager.register(KeymapSpec(KeySequence("<CR>"), buffer=3))
+    assert manager.register(KeymapSpec(KeySequence("<CR>"), buffer=3)) is local_keymap
+
+    dispatcher = manager._dispatcher_function.impl_name
+    assert f":call {dispatcher}({global_keymap.keymap_id})<CR>" in vim_env._commands[-2]
+    assert vim_env.last_command.startswith("call win_execute(1003, ['nnoremap <silent> <buffer> <CR>")
+
+    fired: list[int | None] = []
+    global_keymap.event.subscribe(fired.append)
+    local_keymap.event.subscribe(fired.append)
+    manager._dispatcher(str(global_keymap.keymap_id))
+    manager._dispatcher(str(local_keymap.keymap_id))
+    assert fired == [None, 3]
+
+    manager.deregister(local_keymap.spec)
+    manager._dispatcher(str(local_keymap.keymap_id))
+    assert fired == [None, 3]
+    assert "silent! nunmap <buffer> <CR>" in vim_env.last_command
+
+
+def test_batch_applies_one_command_per_buffer(vim_env: MockVim, ctx: GlobalVimContext, calls):
+    for bufnr in (1, 2):
+        _display(vim_env, bufnr)
+    manager = KeymapManager(autocmd_manager=ctx.autocmd_manager)
+    calls.clear()
+
+    specs = [KeymapSpec(key, buffer=bufnr) for bufnr in (1, 2) for key in _keys(N_KEYS)]
+    keymaps = manager.register_many(specs + [KeymapSpec(KeySequence("<F6>"))])
+    assert len({keymap.keymap_id for keymap in keymaps}) == len(specs) + 1
+    # `bufwinid` of both buffers, and `execute` / `win_execute` for each.
+    assert len(calls) == 4
+    assert sum(command.count("nnoremap") for command in calls) == len(specs) + 1
+
+
+def test_hidden_buffer_is_applied_at_bufenter(vim_env: MockVim, ctx: GlobalVimContext):
+    vim_env.create_buffer(7, "/work/hidden")
+    manager = KeymapManager(autocmd_manager=ctx.autocmd_manager)
+    with manager.batch():
+        keymap = manager.register(KeymapSpec(KeySequence("q"), buffer=7))
+        removed = manager.register(KeymapSpec(KeySequence("x"), buffer=7))
+    assert "autocmd BufEnter <buffer=7> ++once" in vim_env.last_command
+
+    # Not applied yet, so removing it does not touch vim.
+    manager.deregister(removed.spec)
+    n_commands = len(vim_env._commands)
+
+    ctx.autocmd_manager._dispatcher(manager._pending_group(7), "7")
+    applied = [command for command in vim_env._commands[n_commands:] if "nnoremap" in command]
+    assert len(applied) == 1
+    assert applied[0].startswith("call execute(['nnoremap <silent> <buffer> q ")
+    assert f"({keymap.keymap_id})<CR>" in applied[0] and " x " not in applied[0]
+
+    # Wiped out: keymaps of the buffer are forgotten.
+    manager.forget_buffer(7)
+    assert manager.register(KeymapSpec(KeySequence("q"), buffer=7)) is not keymap
+
+
+def _register_one_by_one(vim_env: MockVim, specs: list[KeymapSpec]) -> None:
+    """The former cost per key: a VimL function, `bufwinid` and `win_execute`."""
+    for spec in specs:
+        suffix = hashlib.sha1(repr(spec).encode()).hexdigest()[:8]
+        name = f"KeymapManagerEventBuffer{spec.buffer}_{suffix}"
+        vim_env.command(f"function! {name}(...)\n  python3 pass\nendfunction")
+        winid = int(vim_env.eval(f"map([{spec.buffer}], {{_, b -> bufwinid(b)}})")[0])
+        vim_env.command(f"call win_execute({winid}, 'nnoremap <silent> <buffer> {spec.key} :call {name}()<CR>')")
+
+
+def test_benchmark_registration_throughput(vim_env: MockVim, ctx: GlobalVimContext, calls):
+    for bufnr in range(1, N_BUFFERS + 1):
+        _display(vim_env, bufnr)
+    specs = [KeymapSpec(key, buffer=bufnr) for bufnr in range(1, N_BUFFERS + 1) for key in _keys(N_KEYS)]
+    per_buffer = [[spec for spec in specs if spec.buffer == bufnr] for bufnr in range(1, N_BUFFERS + 1)]
+
+    manager = KeymapManager(autocmd_manager=ctx.autocmd_manager)
+    calls.clear()
+    start = time.perf_counter()
+    for buffer_specs in per_buffer:
+        manager.register_many(buffer_specs)
+    batched = time.perf_counter() - start
+    n_batched_calls = len(calls)
+
+    calls.clear()
+    start = time.perf_counter()
+    _register_one_by_one(vim_env, specs)
+    former = time.perf_counter() - start
+    n_former_calls = len(calls)
+
+    print(
+        f"\n{len(specs)} buffer-local keymaps: batched {len(specs) / batched:,.0f}/s ({n_batched_calls} vim calls), "
+        f"one by one {len(specs) / former:,.0f}/s ({n_former_calls} vim calls)"
+    )
+    assert n_batched_calls == 2 * N_BUFFERS
+    assert n_former_calls == 3 * len(specs)
+    assert batched < former
@@ -0,0 +1,172 @@
+"""`ResponseCache` under `InteractionProvider`, with a fake local completion function."""
+import json
+import logging
+import pickle
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from pydantic import BaseModel
+
+pytest.importorskip("pytoy_llm")
+
+from pytoy.tools.llm import interaction_provider  # noqa: E402
+from pytoy.tools.llm.interaction_provider import InteractionProvider, InteractionRequest  # noqa: E402
+from pytoy.tools.llm.response_cache import ResponseCache, describe_model, make_cache_key  # noqa: E402
+
+
+class Answer(BaseModel):
+    text: str
+
+
+class OtherAnswer(BaseModel):
+    value: int
+
+
+class _FakeCompletion:
+    def __init__(self, latency: float = 0.05):
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, messages: str) -> Answer:
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.latency)
+        return Answer(text=messages.upper())
+
+
+@pytest.fixture
+def provider_env(monkeypatch, tmp_path: Path):
+    completion = _FakeCompletion()
+
+    class FakeTaskExecutor:
+        def execute(self, request, event_sink):
+            return SimpleNamespace(output=completion(request.input))
+
+    class SyncThreadExecutor:
+        def execute(self, request):
+            try:
+                request.on_finish(request.main_func(None))
+            except Exception as e:
+                request.on_error(e)
+            return SimpleNamespace()
+
+    monkeypatch.setattr(interaction_provider, "TaskExecutor", FakeTaskExecutor)
+    monkeypatch.setattr(interaction_provider, "ThreadExecutor", SyncThreadExecutor)
+    monkeypatch.setattr(interaction_provider, "LoggerEventSink", lambda logger: None)
+
+    cache = ResponseCache(tmp_path / "cache")
+    llm_context = SimpleNamespace(logger=logging.getLogger("test_llm_response_cache"), response_cache=cache)
+    kernel = SimpleNamespace(llm_context=llm_context, register_interaction=lambda interaction: None)
+    return completion, cache, kernel
+
+
+def _interact(kernel, document: str, cached: bool = True) -> Answer:
+    outputs = []
+    key = make_cache_key(model="fake", messages=document, output_type=Answer) if cached else None
+    request = InteractionRequest(
+        kernel=kernel,
+        task_request=SimpleNamespace(input=document),  # type: ignore[arg-type]
+        on_success=outputs.append,
+        on_failure=lambda e: pytest.fail(str(e)),
+        cache_key=key,
+        cache_output_type=Answer,
+    )
+    InteractionProvider().create(request)
+    return outputs[0]
+
+
+def test_cache_key_is_stable_and_sensitive():
+    base = make_cache_key(model=("default", {"temperature": 0}), messages=[{"user": "doc"}], output_type=Answer)
+    assert base == make_cache_key(model=("default", {"temperature": 0}), messages=[{"user": "doc"}], output_type=Answer)
+    assert base != make_cache_key(model=("default", {"temperature": 1}), messages=[{"user": "doc"}], output_type=Answer)
+    assert base != make_cache_key(model=("default", {"temperature": 0}), messages=[{"user": "doc!"}], output_type=Answer)
+    assert base != make_cache_key(model=("default", {"temperature": 0}), messages=[{"user": "doc"}], output_type=OtherAnswer)
+    masked = make_cache_key(model=None, messages="marker-1234 doc", output_type=str, masks=["1234"])
+    assert masked == make_cache_key(model=None, messages="marker-abcd doc", output_type=str, masks=["abcd"])
+
+
+def test_model_description_follows_the_configuration(tmp_path: Path):
+    configuration = tmp_path / "llm_config.json"
+    configuration.write_text('{"default": "small-model"}')
+    model = describe_model(None, {"temperature": 0}, configuration_path=configuration)
+    assert model == describe_model(None, {"temperature": 0}, configuration_path=configuration)
+    assert model != describe_model("other", {"temperature": 0}, configuration_path=configuration)
+    assert model != describe_model(None, {"temperature": 1}, configuration_path=configuration)
+
+    # The default connection is resolved by the configuration.
+    configuration.write_text('{"default": "large-model"}')
+    assert model != describe_model(None, {"temperature": 0}, configuration_path=configuration)
+
+
+def test_entries_are_json_validated_by_the_output_type(tmp_path: Path):
+    cache = ResponseCache(tmp_path)
+    cache.put("key", Answer(text="hello"), elapsed=1.0)
+    (path,) = tmp_path.iterdir()
+    assert json.loads(path.read_text())["output"] == {"text": "hello"}
+    assert cache.get("key", Answer).output == Answer(text="hello")
+    assert cache.get("key", OtherAnswer) is None
+
+    # Nothing but JSON is loaded from the folder.
+    path.write_bytes(pickle.dumps({"output": "x", "created": time.time(), "elapsed": 0.0}))
+    assert cache.get("key") is None
+
+
+def test_provider_hits_cache(provider_env):
+    completion, cache, kernel = provider_env
+    assert _interact(kernel, "manuscript").text == "MANUSCRIPT"
+    assert _interact(kernel, "manuscript").text == "MANUSCRIPT"
+    assert completion.calls == 1
+    assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+    assert cache.stats.saved_seconds >= completion.latency
+
+    # Without the key, the request is not cached.
+    _interact(kernel, "manuscript", cached=False)
+    assert completion.calls == 2
+
+
+def test_ttl_and_lru_eviction(tmp_path: Path):
+    now = [1000.0]
+    cache = ResponseCache(tmp_path, max_entries=3, ttl_seconds=100, clock=lambda: now[0])
+    for i in range(3):
+        cache.put(f"key{i}", i, elapsed=1.0)
+        now[0] += 1
+    assert cache.get("key0", int).output == 0  # `key0` becomes the most recent.
+    now[0] += 1
+    cache.put("key3", 3, elapsed=1.0)
+    assert cache.get("key1", int) is None
+    assert [cache.get(f"key{i}", int) is not None for i in (0, 2, 3)] == [True, True, True]
+    assert cache.stats.evictions == 1
+
+    now[0] += 101
+    assert cache.get("key3", int) is None
+    assert cache.evict() == 3
+
+    small = ResponseCache(tmp_path / "small", max_bytes=400)
+    for i in range(10):
+        small.put(f"key{i}", "x" * 100, elapsed=0.0)
+    assert sum(path.stat().st_size for path in small.folder.iterdir()) <= 400
+
+
+def test_concurrent_writers_and_readers(tmp_path: Path):
+    cache = ResponseCache(tmp_path, max_entries=20)
+    completion = _FakeCompletion(latency=0.0)
+
+    def _work(i: int) -> str:
+        key = make_cache_key(model="fake", messages=f"doc{i % 10}", output_type=Answer)
+        if (cached := cache.get(key, Answer)) is not None:
+            return cached.output.text
+        output = completion(f"doc{i % 10}")
+        cache.put(key, output, elapsed=0.0)
+        return output.text
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        results = list(pool.map(_work, range(400)))
+    assert results == [f"DOC{i % 10}" for i in range(400)]
+    assert cache.stats.hits + cache.stats.misses == 400
+    assert completion.calls == cache.stats.misses
+    assert not list(tmp_path.glob("*.tmp"))
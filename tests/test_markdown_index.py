@@ -0,0 +1,141 @@
+"""Correctness of incremental `MarkdownIndex`, and benchmark on a large document."""
+import random
+import time
+
+from pytoy.contexts.vim import GlobalVimContext
+from pytoy.shared.ui.pytoy_buffer import PytoyBuffer
+from pytoy.shared.ui.pytoy_buffer.impls.vim import PytoyBufferVim, VimBufferKernel
+from pytoy.tools.markdown import MarkdownIndex, MarkdownIndexRegistry
+
+from tests.mocks.vim import MockVim
+
+
+def _reference_blocks(lines: list[str]) -> list[tuple[str, int, int]]:
+    """The original scanning of `MarkdownExtractor`."""
+    blocks = []
+    index = 0
+    while index < len(lines):
+        if lines[index].startswith("```"):
+            type = {"py": "python", "sh": "bash"}.get(lines[index].strip("`").strip(), lines[index].strip("`").strip())
+            index += 1
+            start = index
+            while index < len(lines):
+                if lines[index].startswith("```"):
+                    blocks.append((type, start, index))
+                    break
+                index += 1
+        index += 1
+    return blocks
+
+
+def _generate(n_lines: int, rng: random.Random) -> list[str]:
+    lines: list[str] = []
+    while len(lines) < n_lines:
+        lines.append(f"# Section {len(lines)}")
+        lines += [f"text {len(lines)}" for _ in range(rng.randint(2, 20))]
+        lines.append(rng.choice(["```python", "```py", "```sh", "```"]))
+        lines += [f"code {len(lines)}" for _ in range(rng.randint(1, 10))]
+        lines.append("```")
+    return lines
+
+
+def _as_tuples(index: MarkdownIndex) -> list[tuple[str, int, int]]:
+    return [(block.type, block.start, block.end) for block in index.code_blocks]
+
+
+def test_random_edits_match_full_scan():
+    rng = random.Random(0)
+    lines = _generate(500, rng)
+    index = MarkdownIndex(lines)
+    candidates = ["```", "```python", "# Heading", "plain", "## Sub"]
+    for _ in range(300):
+        start = rng.randrange(len(lines) + 1)
+        end = min(len(lines), start + rng.randint(0, 5))
+        lines = lines[:start] + [rng.choice(candidates) for _ in range(rng.randint(0, 5))] + lines[end:]
+
+        index.update(lines)
+        assert _as_tuples(index) == _reference_blocks(lines)
+        fresh = MarkdownIndex(lines)
+        assert index.fences == fresh.fences
+        assert index.headings == fresh.headings
+        for line in rng.sample(range(len(lines)), min(20, len(lines))):
+            expected = next((b for b in _reference_blocks(lines) if b[1] <= line < b[2]), None)
+            block = index.block_at(line)
+            assert (block and (block.type, block.start, block.end)) == expected
+
+
+def test_update_range_and_headings():
+    lines = ["# Title", "```python", "# comment", "x = 1", "```", "## Next", "```sh"]
+    index = MarkdownIndex(lines)
+    assert [(h.line, h.level, h.title) for h in index.headings] == [(0, 1, "Title"), (5, 2, "Next")]
+    assert index.block_at(2) and index.block_at(2).lines == ["# comment", "x = 1"]  # type: ignore
+    assert index.block_at(1) is None
+    # An unclosed fence is not a block.
+    assert index.block_at(7) is None
+    assert len(index.code_blocks) == 1
+
+    assert index.update(lines) is None
+    updated = lines[:3] + ["y = 2"] + lines[3:]
+    changed = index.update(updated)
+    assert changed is not None and (changed.start, changed.end) == (3, 4)
+    assert index.block_at(4).end == 5  # type: ignore
+
+
+def test_registry_is_keyed_by_changedtick(vim_env: MockVim):
+    buf = vim_env.create_buffer(1, "/work/doc.md", ["```python", "x", "```"])
+    kernel = VimBufferKernel(1, ctx=GlobalVimContext())
+
+    class _Ctx:
+        buffer_kernel_registry = {1: kernel}
+
+    buffer = PytoyBuffer(PytoyBufferVim(1, ctx=_Ctx()))  # type: ignore[arg-type]
+    registry = MarkdownIndexRegistry()
+    index = registry.get(buffer)
+    assert index.block_at(1) is not None
+
+    reads = []
+    original = vim_env.Buffer.__getitem__
+    vim_env.Buffer.__getitem__ = lambda self, key: (reads.append(key), original(self, key))[1]  # type: ignore
+    try:
+        assert registry.get(buffer) is index
+        assert reads == []
+        buf[1:2] = ["y", "z"]
+        assert registry.get(buffer).block_at(2).lines == ["y", "z"]  # type: ignore
+    finally:
+        vim_env.Buffer.__getitem__ = original  # type: ignore
+
+
+def test_benchmark_large_document():
+    rng = random.Random(1)
+    lines = _generate(100_000, rng)
+    n_blocks = len(_reference_blocks(lines))
+
+    start = time.perf_counter()
+    index = MarkdownIndex(lines)
+    build = time.perf_counter() - start
+    assert len(index.code_blocks) == n_blocks > 1000
+
+    positions = [rng.randrange(len(lines)) for _ in range(1000)]
+    start = time.perf_counter()
+    for position in positions:
+        index.block_at(position)
+    lookup = (time.perf_counter() - start) / len(positions)
+
+    # Edit one line and re-index, as `:Console` after typing in a block.
+    edited = list(lines)
+    edited[50_000] = edited[50_000] + " edited"
+    start = time.perf_counter()
+    changed = index.update(edited)
+    incremental = time.perf_counter() - start
+    assert changed is not None and changed.end - changed.start == 1
+
+    start = time.perf_counter()
+    _reference_blocks(edited)
+    full_scan = time.perf_counter() - start
+
+    print(
+        f"\n{len(lines)} lines, {n_blocks} blocks: build {build * 1000:.1f}ms, "
+        f"lookup {lookup * 1e6:.1f}us, incremental update {incremental * 1000:.1f}ms, "
+        f"full scan {full_scan * 1000:.1f}ms"
+    )
+    assert incremental < full_scan
@@ -0,0 +1,111 @@
+"""`ModulePreloader` with stub modules which sleep on import."""
+import sys
+import threading
+import time
+import uuid
+from pathlib import Path
+
+import pytest
+
+from pytoy.bootstrap.import_resolvers import LLMImportResolver, ModulePreloader
+
+IMPORT_TIME = 0.2
+
+
+@pytest.fixture
+def make_stub(tmp_path: Path, monkeypatch):
+    monkeypatch.syspath_prepend(str(tmp_path))
+    names = []
+
+    def _make(delay: float = IMPORT_TIME, body: str = "") -> str:
+        name = f"pytoy_stub_{uuid.uuid4().hex[:8]}"
+        (tmp_path / f"{name}.py").write_text(f"import time\ntime.sleep({delay})\n{body}\nVALUE = {name!r}\n")
+        names.append(name)
+        return name
+
+    yield _make
+    for name in names:
+        sys.modules.pop(name, None)
+
+
+def _first_command(preloader: ModulePreloader, names: list[str]) -> float:
+    start = time.perf_counter()
+    for name in names:
+        assert preloader.ensure(name).VALUE == name
+    return time.perf_counter() - start
+
+
+def test_first_command_latency_drops(make_stub):
+    cold = ModulePreloader(moratorium_time=10)
+    cold_names = [make_stub(), make_stub()]
+    cold.declare(*cold_names)
+    # Without `start`, the first command imports them synchronously.
+    cold_latency = _first_command(cold, cold_names)
+
+    warm = ModulePreloader(moratorium_time=10)
+    warm_names = [make_stub(), make_stub()]
+    warm.declare(*warm_names)
+    warm.start()
+    warm.notify_capacity()
+    assert warm.wait(timeout=5)
+    warm_latency = _first_command(warm, warm_names)
+
+    assert cold_latency >= 2 * IMPORT_TIME
+    assert warm_latency < IMPORT_TIME / 4
+    assert [record.loaded_by for record in warm.ledger.records] == ["background", "background"]
+    assert [record.loaded_by for record in cold.ledger.records] == ["foreground", "foreground"]
+    assert cold.ledger.total_stall >= 2 * IMPORT_TIME > 10 * warm.ledger.total_stall
+    print(f"\nfirst command: cold {cold_latency * 1000:.0f}ms, preloaded {warm_latency * 1000:.1f}ms")
+    print("\n".join(warm.report()))
+
+
+def test_priority_order_and_moratorium(make_stub):
+    order: list[str] = []
+    preloader = ModulePreloader(moratorium_time=0.1, importer=lambda name: (order.append(name), sys)[1])
+    preloader.declare("low", priority=0)
+    preloader.declare("high", priority=10)
+    preloader.declare("middle", "middle2", priority=5)
+    preloader.start()
+    assert preloader.wait(timeout=5)
+    assert order == ["high", "middle", "middle2", "low"]
+
+    # A module declared later is also preloaded.
+    preloader.declare("late")
+    assert preloader.wait(timeout=5)
+    assert order[-1] == "late"
+
+
+def test_ensure_waits_for_running_import(make_stub):
+    name = make_stub(delay=0.5)
+    preloader = ModulePreloader(moratorium_time=0)
+    preloader.declare(name)
+    preloader.start()
+    time.sleep(0.1)  # The background import is running.
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(preloader.ensure(name))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    record = preloader.ledger.get(name)
+    assert record is not None and record.loaded_by == "background"
+    assert len({id(module) for module in results}) == 1
+    assert 0 < record.stall < 0.5  # type: ignore[operator]
+
+
+def test_failures_are_recorded(make_stub):
+    broken = make_stub(delay=0, body="raise RuntimeError('broken')")
+    preloader = ModulePreloader(moratorium_time=0)
+    preloader.declare("pytoy_stub_missing_module", broken)
+    preloader.start()
+    assert preloader.wait(timeout=5)
+    with pytest.raises(ImportError):
+        preloader.ensure("pytoy_stub_missing_module")
+    with pytest.raises(ImportError, match="broken"):
+        preloader.ensure(broken)
+    assert all(record.state == "failed" for record in preloader.ledger.records)
+
+    resolver = LLMImportResolver(preloader=ModulePreloader(importer=lambda name: sys))
+    resolver.ensure_import()
+    assert resolver.import_error is None
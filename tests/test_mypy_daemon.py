@@ -0,0 +1,146 @@
+"""Tests and benchmark of `MypyDaemonManager`."""
+import json
+import os
+import shutil
+import subprocess
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import pytest
+
+from pytoy.tools.python.mypy_daemon import MYPY_FLAGS, MypyDaemonManager
+
+
+@dataclass
+class _ResolvedEnvironment:
+    kind: str
+    workspace: Path | None = None
+
+    def command_wrapper(self, command):
+        if self.kind == "uv":
+            return ["uv", "run", *command] if isinstance(command, list) else f"uv run {command}"
+        return command
+
+
+class _EnvironmentManager:
+    def __init__(self) -> None:
+        self.kind = "system"
+
+    def solve_preference(self, path, preference=None):
+        return _ResolvedEnvironment(self.kind)
+
+
+@pytest.fixture
+def manager(tmp_path: Path):
+    environment_manager = _EnvironmentManager()
+    spawned: list[list[str]] = []
+    manager = MypyDaemonManager(
+        environment_manager,  # type: ignore[arg-type]
+        status_dir=tmp_path / "status",
+        spawn=lambda command, cwd: spawned.append(command),
+    )
+    yield manager, environment_manager, spawned
+    manager._daemons.clear()
+
+
+def test_acquire_and_restart_on_environment_change(tmp_path: Path, manager):
+    manager, environment_manager, spawned = manager
+    workspace = tmp_path / "ws"
+    workspace.mkdir()
+
+    daemon = manager.acquire(workspace)
+    assert manager.acquire(workspace) is daemon
+    command = daemon.make_run_command(workspace / "pkg", manager.idle_timeout)
+    assert command.startswith(f'dmypy --status-file "{daemon.status_file}" run --timeout 1800 -- ')
+    assert command.endswith(f'{" ".join(MYPY_FLAGS)} "{workspace / "pkg"}"')
+
+    # Not started yet, so nothing to stop.
+    environment_manager.kind = "uv"
+    uv_daemon = manager.acquire(workspace)
+    assert spawned == []
+    assert uv_daemon.status_file != daemon.status_file
+
+    # Started server is stopped when the environment changes.
+    uv_daemon.status_file.write_text(json.dumps({"pid": os.getpid(), "connection_name": "x"}))
+    assert uv_daemon.alive
+    environment_manager.kind = "system"
+    assert manager.acquire(workspace).environment_kind == "system"
+    assert spawned == [["uv", "run", "dmypy", "--status-file", str(uv_daemon.status_file), "stop"]]
+
+
+def test_restart_when_dmypy_is_resolved_elsewhere(tmp_path: Path, manager, monkeypatch):
+    """The same `system` kind, but another virtualenv is activated."""
+    manager, _, spawned = manager
+    workspace = tmp_path / "ws"
+    workspace.mkdir()
+    for name in ["venv1", "venv2"]:
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "dmypy").write_text("")
+        (tmp_path / name / "dmypy").chmod(0o755)
+
+    monkeypatch.setenv("PATH", str(tmp_path / "venv1"))
+    daemon = manager.acquire(workspace)
+    assert manager.acquire(workspace) is daemon
+    daemon.status_file.write_text("{}")
+
+    monkeypatch.setenv("PATH", str(tmp_path / "venv2"))
+    other = manager.acquire(workspace)
+    assert other.environment_kind == daemon.environment_kind == "system"
+    assert other.status_file != daemon.status_file
+    assert spawned == [["dmypy", "--status-file", str(daemon.status_file), "stop"]]
+
+
+def test_stop_all(tmp_path: Path, manager):
+    manager, _, spawned = manager
+    for name in ["a", "b"]:
+        (tmp_path / name).mkdir()
+        manager.acquire(tmp_path / name).status_file.write_text("{}")
+    assert not manager.daemons[0].alive
+
+    manager.stop_all()
+    assert len(spawned) == 2
+    assert manager.daemons == []
+
+
+def _generate_package(root: Path, n_modules: int) -> Path:
+    package = root / "generated"
+    package.mkdir()
+    (package / "__init__.py").write_text("")
+    for i in range(n_modules):
+        previous = f"from generated.module_{i - 1} import func_{i - 1}\n" if i else ""
+        call = f"func_{i - 1}(x)" if i else "x"
+        (package / f"module_{i}.py").write_text(
+            f"{previous}\n\ndef func_{i}(x: int) -> int:\n    return {call} + {i}\n\n\nwrong_{i}: str = func_{i}(1)\n"
+        )
+    return package
+
+
+@pytest.mark.skipif(shutil.which("dmypy") is None, reason="`mypy` is not installed.")
+def test_benchmark_repeated_checks(tmp_path: Path, manager):
+    manager, _, _ = manager
+    package = _generate_package(tmp_path, 40)
+    daemon = manager.acquire(tmp_path)
+
+    def _run(command: str) -> tuple[float, list[str]]:
+        start = time.perf_counter()
+        proc = subprocess.run(command, shell=True, cwd=tmp_path, capture_output=True, text=True)
+        lines = [line for line in proc.stdout.splitlines() if ":" in line and not line.startswith("Daemon")]
+        return time.perf_counter() - start, lines
+
+    cold_command = f'mypy {" ".join(MYPY_FLAGS)} --no-incremental "{package}"'
+    daemon_command = daemon.make_run_command(package, idle_timeout=60)
+    try:
+        cold = [_run(cold_command) for _ in range(2)]
+        warm = [_run(daemon_command) for _ in range(3)]
+    finally:
+        subprocess.run(daemon.make_stop_command(), cwd=tmp_path, capture_output=True)
+
+    print(
+        f"\ncold: {', '.join(f'{t:.2f}s' for t, _ in cold)}, "
+        f"daemon (first start, then warm): {', '.join(f'{t:.2f}s' for t, _ in warm)}"
+    )
+    # The quickfix source is identical to the cold path.
+    assert len(cold[0][1]) == 40
+    assert all(lines == cold[0][1] for _, lines in warm)
+    assert warm[-1][0] < cold[-1][0]
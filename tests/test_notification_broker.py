@@ -0,0 +1,180 @@
+"""Tests of `NotificationBroker`, the throttling and merging of the notifications."""
+import threading
+import time
+
+from pytoy.shared.lib.backend import BackendEnum, get_backend_enum
+from pytoy.shared.ui.notifications import EphemeralNotification
+from pytoy.shared.ui.notifications.broker import NotificationBroker
+from pytoy.shared.ui.notifications.impls.dummy import EphemeralNotificationDummy
+from pytoy.shared.ui.notifications.models import LEVEL, NotificationParam
+
+
+N_WORKERS = 8
+N_BURST = 500
+
+
+class _RecordingDummy(EphemeralNotificationDummy):
+    """`EphemeralNotificationDummy` which records the deliveries instead of printing them."""
+
+    def __init__(self) -> None:
+        self.delivered: list[tuple[float, str, LEVEL]] = []
+        self._lock = threading.Lock()
+
+    def notify(self, message: str, param: NotificationParam | LEVEL = "info") -> None:
+        level = param.level if isinstance(param, NotificationParam) else param
+        with self._lock:
+            self.delivered.append((time.perf_counter(), message, level))
+
+    def delivered_at(self, message: str) -> float:
+        with self._lock:
+            return next(at for at, delivered, _ in reversed(self.delivered) if delivered == message)
+
+    @property
+    def messages(self) -> list[str]:
+        with self._lock:
+            return [message for _, message, _ in self.delivered]
+
+
+class _ManualTimer:
+    """A clock and a schedule which advance only by `advance`."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.scheduled: list[tuple[float, object]] = []
+
+    def clock(self) -> float:
+        return self.now
+
+    def schedule(self, func, delay: float) -> None:
+        self.scheduled.append((self.now + delay, func))
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+        due = [func for at, func in self.scheduled if at <= self.now]
+        self.scheduled = [(at, func) for at, func in self.scheduled if at > self.now]
+        for func in due:
+            func()
+
+
+def _param(level: LEVEL, source: str | None = "tool") -> NotificationParam:
+    return NotificationParam(level=level, source=source)
+
+
+def test_repeated_messages_are_merged_and_delivered_by_the_rate():
+    sink, timer = _RecordingDummy(), _ManualTimer()
+    broker = NotificationBroker(sink, rate=1.0, burst=3, clock=timer.clock, schedule=timer.schedule)
+    for index in range(100):
+        broker.notify("progress", _param("info"))
+        if index % 2:
+            broker.notify("step done", _param("info"))
+    assert sink.messages == ["progress", "progress", "step done"]
+    assert broker.n_pending == 98 + 49
+
+    # The warning is waiting behind the merged ones, but it is delivered first.
+    broker.notify("disk is almost full", _param("warning"))
+    # The other sources have their own rates.
+    broker.notify("saved", _param("info", source=None))
+    assert sink.messages[-1] == "saved"
+
+    timer.advance(1.0)
+    assert sink.messages[-1] == "disk is almost full"
+    timer.advance(1.0)
+    assert sink.messages[-1] == "progress (x98)"
+    timer.advance(1.0)
+    assert sink.messages[-1] == "step done (x49)"
+    assert broker.n_pending == 0 and timer.scheduled == []
+    assert broker.n_received == 152 and broker.n_delivered == len(sink.delivered) == 7
+
+    # After the idle period, the burst is allowed again.
+    timer.advance(10.0)
+    broker.notify("progress", _param("info"))
+    assert sink.messages[-1] == "progress"
+
+
+def test_errors_bypass_the_throttling():
+    sink, timer = _RecordingDummy(), _ManualTimer()
+    broker = NotificationBroker(sink, rate=1.0, burst=1, clock=timer.clock, schedule=timer.schedule)
+    broker.notify("first", _param("info"))
+    broker.notify("second", _param("info"))
+    for _ in range(3):
+        broker.notify("failed", _param("error"))
+    assert sink.messages == ["first", "failed", "failed", "failed"]
+    assert broker.n_pending == 1
+
+    # Neither merged nor delayed behind the waiting ones, and the tokens are kept for the others.
+    broker.notify("failed", _param("error"))
+    assert sink.messages[-1] == "failed" and broker.n_pending == 1
+    assert [record.count for record in broker.history if record.level == "error"] == [1, 1, 1, 1]
+    timer.advance(1.0)
+    assert sink.messages[-1] == "second" and broker.n_pending == 0
+
+
+def test_source_defaults_to_the_calling_module():
+    sink, timer = _RecordingDummy(), _ManualTimer()
+    broker = NotificationBroker(sink, rate=1.0, burst=1, clock=timer.clock, schedule=timer.schedule)
+    EphemeralNotification(broker).notify("from the test")
+    EphemeralNotification(broker, source="cspell").notify("from cspell")
+    EphemeralNotification(broker).notify("explicit", _param("info", source="other"))
+    # Each source has its own burst.
+    assert sink.messages == ["from the test", "from cspell", "explicit"]
+    assert [record.source for record in broker.history] == [__name__, "cspell", "other"]
+
+
+def test_history_is_bounded_and_keeps_the_counts():
+    sink, timer = _RecordingDummy(), _ManualTimer()
+    broker = NotificationBroker(sink, rate=1.0, burst=1, history_size=3, clock=timer.clock, schedule=timer.schedule)
+    for message in ["a", "b", "b", "c"]:
+        broker.notify(message, "info")
+    for _ in range(3):
+        timer.advance(1.0)
+    assert [record.text for record in broker.history] == ["a", "b (x2)", "c"]
+    broker.notify("boom", "error")
+    history = broker.history
+    assert len(history) == 3
+    assert [record.text for record in history] == ["b (x2)", "c", "boom"]
+    assert history[0].to_line().endswith("[info] -: b (x2)")
+
+
+def test_burst_with_dummy_backend():
+    assert get_backend_enum() == BackendEnum.DUMMY
+    sink = _RecordingDummy()
+    broker = NotificationBroker(sink, rate=20.0, burst=5)
+    error_latencies: list[float] = []
+
+    def _worker(index: int) -> None:
+        for count in range(N_BURST):
+            broker.notify(f"worker {index}: {count % 10}", _param("info", source=f"worker {index}"))
+            if count % 100 == 0:
+                message = f"worker {index}: failed at {count}"
+                sent = time.perf_counter()
+                broker.notify(message, _param("error", source=f"worker {index}"))
+                error_latencies.append(sink.delivered_at(message) - sent)
+
+    workers = [threading.Thread(target=_worker, args=(index,)) for index in range(N_WORKERS)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    n_errors = N_WORKERS * (N_BURST // 100)
+
+    # Each source waits for 10 distinct messages, delivered by the rate.
+    deadline = time.monotonic() + 5.0
+    while broker.n_pending and time.monotonic() < deadline:
+        time.sleep(0.01)
+    elapsed = time.perf_counter() - start
+    assert broker.n_pending == 0
+
+    n_received = N_WORKERS * N_BURST + n_errors
+    n_delivered = len(sink.delivered)
+    print(
+        f"\n{n_received} notifications from {N_WORKERS} sources: {n_delivered} UI calls in {elapsed:.2f}s, "
+        f"error latency max {max(error_latencies) * 1e3:.2f}ms"
+    )
+    assert broker.n_received == n_received
+    # At most the burst and 10 merged messages per source, besides the errors.
+    assert n_delivered <= n_errors + N_WORKERS * (5 + 10)
+    assert sum(message.startswith("worker 0: 3") for message in sink.messages) >= 1
+    assert len(error_latencies) == n_errors
+    # The errors do not wait for the interval of the rate.
+    assert max(error_latencies) < 1 / 20.0
@@ -0,0 +1,217 @@
+"""Tests and benchmark of `PtyPump` / `RenderScheduler`, with a local process on a pty."""
+import codecs
+import os
+import select
+import subprocess
+import sys
+import time
+from threading import Event, Thread
+
+import pytest
+
+from pytoy.job_execution.terminal_runner.impls.utils.pty_pump import PtyPump, RenderScheduler
+
+from tests import bench
+
+
+BURST_BYTES = 4 * 1024 * 1024
+# A buffer update of the editor, per `on_output`.
+RENDER_COST = 1e-3
+PROMPT = "prompt> "
+CHILD = f"""
+import sys
+def prompt():
+    sys.stdout.write({PROMPT!r})
+    sys.stdout.flush()
+    sys.stdin.readline()
+prompt()
+line = "x" * 99 + "\\n"
+sys.stdout.write(line * ({BURST_BYTES} // 100))
+prompt()
+"""
+
+
+class _LocalPty:
+    """`PtyConsoleProtocol` on `os.openpty`, for a process without `pexpect` / `winpty`."""
+
+    def __init__(self, cmd: list[str]) -> None:
+        import fcntl
+        import struct
+        import termios
+
+        self._master, slave = os.openpty()
+        fcntl.ioctl(slave, termios.TIOCSWINSZ, struct.pack("HHHH", 24, 80, 0, 0))
+        self._proc = subprocess.Popen(cmd, stdin=slave, stdout=slave, stderr=slave, start_new_session=True)
+        os.close(slave)
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    def read(self, size: int = 4096) -> str:
+        try:
+            return self._decoder.decode(os.read(self._master, size))
+        except OSError:  # EIO after the exit.
+            return ""
+
+    def wait_readable(self, timeout: float) -> bool:
+        readable, _, _ = select.select([self._master], [], [], timeout)
+        return bool(readable)
+
+    def write(self, data: str) -> None:
+        os.write(self._master, data.encode())
+
+    def resize(self, lines: int, cols: int) -> None: ...
+
+    def send_ctrl_c(self) -> None: ...
+
+    def terminate(self) -> None:
+        self._proc.kill()
+        self._proc.wait()
+        os.close(self._master)
+
+    @property
+    def alive(self) -> bool:
+        return self._proc.poll() is None
+
+    @property
+    def pid(self) -> int | None:
+        return self._proc.pid
+
+    @property
+    def size(self) -> tuple[int, int]:
+        return (24, 80)
+
+
+def test_scheduler_renders_first_output_at_once_and_coalesces_bursts():
+    now = [100.0]
+    rendered: list[float] = []
+    scheduler = RenderScheduler(lambda: rendered.append(now[0]), frame_budget=0.05, clock=lambda: now[0])
+
+    scheduler.notify()
+    assert rendered == [100.0] and scheduler.timeout() is None
+    for _ in range(10):
+        now[0] += 0.001
+        scheduler.notify()
+    assert rendered == [100.0] and scheduler.pending
+    assert scheduler.timeout() == pytest.approx(0.04)
+
+    scheduler.flush_due()
+    assert len(rendered) == 1
+    now[0] = 100.06
+    scheduler.flush_due()
+    assert rendered == [100.0, 100.06] and not scheduler.pending
+
+    # After an idle period, the next output is rendered at once.
+    now[0] = 101.0
+    scheduler.notify()
+    assert rendered[-1] == 101.0
+
+
+def _busy(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+class _Session:
+    """Answer the prompts of `CHILD`, and measure the renders."""
+
+    def __init__(self) -> None:
+        self.received: list[str] = []
+        self.renders: list[tuple[float, str]] = []  # (time, tail of the output)
+        self.n_reads = 0
+        self._prompted = Event()
+
+    def on_data(self, data: str) -> None:
+        self.n_reads += 1
+        self.received.append(data)
+
+    def on_output(self) -> None:
+        _busy(RENDER_COST)
+        tail = "".join(self.received[-2:])[-len(PROMPT) :]
+        self.renders.append((time.perf_counter(), tail))
+        if tail == PROMPT:
+            self._prompted.set()
+
+    def run(self, start_reader) -> dict[str, float]:
+        pty = _LocalPty([sys.executable, "-u", "-c", CHILD])
+        reader = None
+        try:
+            reader = start_reader(pty, self)
+            assert self._prompted.wait(10)
+            self._prompted.clear()
+            n_renders = len(self.renders)
+
+            time.sleep(0.2)  # Reading the prompt.
+            cpu = time.process_time()
+            sent = time.perf_counter()
+            pty.write("go\n")
+            assert self._prompted.wait(60), "The prompt after the burst is not rendered."
+            elapsed = time.perf_counter() - sent
+            cpu = time.process_time() - cpu
+            first_render = next(at for at, _ in self.renders[n_renders:]) - sent
+            burst_renders = len(self.renders) - n_renders
+            pty.write("q\n")
+        finally:
+            deadline = time.monotonic() + 5
+            while pty.alive and time.monotonic() < deadline:
+                time.sleep(0.01)
+            if reader is not None:
+                # Before closing the pty, whose descriptor may be reused by the next session.
+                reader.join(5)
+            pty.terminate()
+        return {"first": first_render, "elapsed": elapsed, "cpu": cpu, "renders": burst_renders}
+
+
+def _start_pump(pty, session: _Session) -> PtyPump:
+    pump = PtyPump(pty, on_data=session.on_data, on_output=session.on_output, frame_budget=0.05)
+    pump.start()
+    return pump
+
+
+def _former_read_loop(pty, session: _Session) -> Thread:
+    """The former loop of `VirtualTTY`: `read_nonblocking(4096, timeout=0.1)`, a sleep, and a render per read."""
+
+    def _loop():
+        while pty.alive:
+            data = pty.read(4096) if pty.wait_readable(0.1) else ""
+            if not data:
+                time.sleep(0.01)
+                continue
+            session.on_data(data)
+            session.on_output()
+
+    thread = Thread(target=_loop, daemon=True)
+    thread.start()
+    return thread
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="`os.openpty` is POSIX only.")
+def test_benchmark_prompt_latency_and_burst_cpu():
+    pumped = _Session()
+    pump_result = pumped.run(_start_pump)
+
+    # The whole burst arrives, and every render follows a read which is not rendered yet.
+    output = "".join(pumped.received)
+    assert output.count(PROMPT) == 2
+    assert output.count("x" * 99 + "\r\n") == BURST_BYTES // 100
+    assert len(pumped.renders) <= pumped.n_reads
+    if not bench.ENABLED:
+        return
+
+    former = _Session()
+    former_result = former.run(_former_read_loop)
+
+    def _line(label: str, result: dict[str, float], session: _Session) -> str:
+        return (
+            f"{label}: first output {result['first'] * 1e3:.1f}ms, burst {result['elapsed']:.2f}s "
+            f"(cpu {result['cpu']:.2f}s), {session.n_reads} reads, {result['renders']:.0f} renders"
+        )
+
+    bench.report(f"\n{BURST_BYTES / 2**20:.0f} MB burst between prompts")
+    bench.report(_line("pump", pump_result, pumped))
+    bench.report(_line("former", former_result, former))
+
+    # The output after the input is rendered at once, and the burst is coalesced into frames.
+    assert pump_result["first"] < 0.05
+    assert pump_result["renders"] <= pump_result["elapsed"] / 0.05 + 3
+    assert pump_result["renders"] < former_result["renders"]
+    assert pump_result["cpu"] < former_result["cpu"]
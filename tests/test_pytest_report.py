@@ -0,0 +1,185 @@
+"""Parity with `PytestDecipher` and ingestion overhead of `pytoy_pytest_report` plugin."""
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from pytoy.shared.ui.pytoy_buffer import make_buffer
+from pytoy.shared.ui.pytoy_quickfix import PytoyQuickfix
+from pytoy.tools.pytest.utils import PytestDecipher, PytestReportIngestor, PytestReportReader
+from pytoy.tools.python.pytest_runner import (
+    REPORT_PLUGIN,
+    _make_plugin_env,
+    _new_report_path,
+    make_structured_report_hooks,
+)
+
+N_FILES, N_TESTS_PER_FILE = 20, 100
+
+TEST_TEMPLATE = """
+import pytest
+
+
+def helper(value):
+    assert value % 7 != 3, f"helper failed: {{value}}"
+    return value
+
+
+@pytest.fixture
+def broken():
+    raise RuntimeError("broken fixture")
+
+
+@pytest.mark.parametrize("value", range({n_tests}))
+def test_value(value):
+    if value % 50 == 49:
+        pytest.skip("skipped")
+    helper(value)
+    assert value % 11 != 5
+
+
+def test_error(broken):
+    pass
+
+
+def test_chained():
+    try:
+        {{}}["missing"]
+    except KeyError as e:
+        raise ValueError("chained") from e
+"""
+
+
+@pytest.fixture(scope="module")
+def suite(tmp_path_factory) -> Path:
+    root = tmp_path_factory.mktemp("generated_suite")
+    for i in range(N_FILES):
+        (root / f"test_generated_{i}.py").write_text(TEST_TEMPLATE.format(n_tests=N_TESTS_PER_FILE))
+    (root / "test_collection_error.py").write_text("import not_existent_module_for_pytoy\n")
+    return root
+
+
+def _run(
+    suite: Path, with_plugin: bool, on_poll=None, report_path: Path | None = None, targets: list[str] | None = None
+) -> tuple[float, str]:
+    command = [sys.executable, "-m", "pytest", *(targets or [str(suite)]), "--capture=no", "--quiet"]
+    command += ["-p", "no:cacheprovider", "--continue-on-collection-errors"]
+    env = dict(os.environ)
+    if with_plugin:
+        command += ["-p", REPORT_PLUGIN]
+        env.update(_make_plugin_env(report_path or suite / "report.jsonl"))
+    output = suite / "output.txt"
+    start = time.perf_counter()
+    with output.open("w") as fp:
+        proc = subprocess.Popen(command, cwd=suite, env=env, stdout=fp, stderr=subprocess.STDOUT)
+        while proc.poll() is None:
+            if on_poll:
+                on_poll()
+            time.sleep(0.05)
+    return time.perf_counter() - start, output.read_text()
+
+
+def test_parity_and_overhead(suite: Path):
+    ingestor = PytestReportIngestor(PytestReportReader(suite / "report.jsonl"))
+    progress: list[int] = []
+
+    def _on_poll():
+        ingestor.poll()
+        progress.append(ingestor.summary.passed)
+
+    plain_elapsed, plain_stdout = _run(suite, with_plugin=False)
+    plugin_elapsed, plugin_stdout = _run(suite, with_plugin=True, on_poll=_on_poll)
+    ingestor.poll()
+
+    start = time.perf_counter()
+    deciphered = PytestDecipher(plugin_stdout).records
+    decipher_elapsed = time.perf_counter() - start
+
+    summary = ingestor.summary
+    print(
+        f"\n{summary.to_line()}\nwithout plugin: {plain_elapsed:.2f}s, with plugin: {plugin_elapsed:.2f}s, "
+        f"decipher of the output: {decipher_elapsed * 1000:.1f}ms"
+    )
+
+    assert summary.finished
+    n_values = N_FILES * N_TESTS_PER_FILE
+    n_skipped = N_FILES * (N_TESTS_PER_FILE // 50)
+    n_failed = sum(1 for v in range(N_TESTS_PER_FILE) if v % 50 != 49 and (v % 7 == 3 or v % 11 == 5))
+    assert summary.skipped == n_skipped
+    assert summary.failed == N_FILES * (n_failed + 1)
+    assert summary.errors == N_FILES + 1
+    assert summary.passed == n_values - n_skipped - N_FILES * n_failed
+    # Records are consumed while `pytest` is running.
+    assert any(0 < passed < summary.passed for passed in progress)
+
+    def _positions(rows) -> list[tuple[str, int]]:
+        return sorted((Path(row["filename"]).name, int(row["lnum"])) for row in rows)
+
+    assert _positions(ingestor.records) == _positions(deciphered)
+
+
+def test_second_run_shows_its_own_summary(suite: Path):
+    # As `PytestRunner.run`: a reader per run, while the first report may still exist.
+    summaries = []
+    paths = []
+    for targets in [[str(suite)], [str(suite / "test_generated_0.py")]]:
+        path = _new_report_path()
+        paths.append(path)
+        ingestor = PytestReportIngestor(PytestReportReader(path))
+        _run(suite, with_plugin=True, on_poll=ingestor.poll, report_path=path, targets=targets)
+        ingestor.poll()
+        summaries.append(ingestor.summary)
+    for path in paths:
+        path.unlink(missing_ok=True)
+
+    assert paths[0] != paths[1]
+    first, second = summaries
+    n_failed = sum(1 for v in range(N_TESTS_PER_FILE) if v % 50 != 49 and (v % 7 == 3 or v % 11 == 5))
+    assert second.finished
+    assert (second.failed, second.errors, second.skipped) == (n_failed + 1, 1, N_TESTS_PER_FILE // 50)
+    assert second.passed == N_TESTS_PER_FILE - N_TESTS_PER_FILE // 50 - n_failed
+    assert first.passed == N_FILES * second.passed
+
+
+def test_reader_restarts_when_the_report_is_rewritten(tmp_path: Path):
+    path = tmp_path / "report.jsonl"
+    ingestor = PytestReportIngestor(PytestReportReader(path))
+    path.write_text(
+        '{"event": "start"}\n'
+        + '{"event": "report", "nodeid": "a", "when": "call", "outcome": "passed"}\n' * 5
+        + '{"event": "finish", "exitstatus": 0}\n'
+    )
+    ingestor.poll()
+    assert (ingestor.summary.passed, ingestor.summary.exitstatus) == (5, 0)
+
+    # The next run truncates the file without `reset`.
+    path.write_text('{"event": "start"}\n{"event": "report", "nodeid": "b", "when": "call", "outcome": "passed"}\n')
+    ingestor.poll()
+    assert (ingestor.summary.passed, ingestor.summary.exitstatus) == (1, None)
+
+
+def test_structured_report_hooks(tmp_path: Path):
+    """`on_start` registers the polling as a timer task, and `on_finish` sets the final records."""
+    path = tmp_path / "report.jsonl"
+    path.write_text("")
+    ingestor = PytestReportIngestor(PytestReportReader(path))
+    hooks = make_structured_report_hooks(ingestor, tmp_path, interval=10)
+    assert hooks.on_start and hooks.on_finish
+
+    hooks.on_start(SimpleNamespace(stdout=make_buffer("PYTEST_REPORT_STDOUT")))  # type: ignore[arg-type]
+    path.write_text(
+        '{"event": "start"}\n'
+        '{"event": "report", "nodeid": "a", "when": "call", "outcome": "passed"}\n'
+        '{"event": "report", "nodeid": "b", "when": "call", "outcome": "failed",'
+        ' "entries": [{"path": "test_b.py", "lineno": 4, "message": "assert 1 == 2"}]}\n'
+        '{"event": "finish", "exitstatus": 1}\n'
+    )
+    hooks.on_finish(None)  # type: ignore[arg-type]
+
+    assert (ingestor.summary.passed, ingestor.summary.failed, ingestor.summary.exitstatus) == (1, 1, 1)
+    assert [(Path(record.filename), record.lnum) for record in PytoyQuickfix().records] == [(tmp_path / "test_b.py", 4)]
+    assert not path.exists()
@@ -0,0 +1,149 @@
+"""Tests and benchmark of the edit transactions of `RangeOperatorVim`."""
+import random
+import time
+
+import pytest
+
+from pytoy.contexts.vim import GlobalVimContext
+from pytoy.shared.lib.text import CharacterRange, CursorPosition, LineRange
+from pytoy.shared.ui.pytoy_buffer.edit_transaction import BufferEdit, order_edits
+from pytoy.shared.ui.pytoy_buffer.impls.vim.kernel import VimBufferKernel
+from pytoy.shared.ui.pytoy_buffer.impls.vim.range_operator import RangeOperatorVim
+from pytoy.shared.ui.pytoy_buffer.impls.vim_buffer_utils import VimBufferRangeHandler
+
+from tests.mocks.vim import MockVim
+
+
+@pytest.fixture
+def buffer_writes(vim_env: MockVim, monkeypatch) -> list:
+    writes: list = []
+    original = vim_env.Buffer.__setitem__
+
+    def _setitem(self, idx, value):
+        writes.append(idx)
+        return original(self, idx, value)
+
+    monkeypatch.setattr(vim_env.Buffer, "__setitem__", _setitem)
+    return writes
+
+
+def _make_operator(vim_env: MockVim, lines: list[str]) -> RangeOperatorVim:
+    vim_env.create_buffer(1, "/work/doc.md", lines)
+    return RangeOperatorVim(VimBufferKernel(1, ctx=GlobalVimContext()))
+
+
+def _random_edit(rng: random.Random, lines: list[str]) -> BufferEdit:
+    def _position() -> CursorPosition:
+        line = rng.randrange(len(lines) + 1)
+        col = rng.randrange(len(lines[line]) + 1) if line < len(lines) and rng.random() < 0.7 else 0
+        return CursorPosition(line, col)
+
+    def _text() -> str:
+        return "\n".join(rng.choice(["", "x", "yy", "zzz"]) for _ in range(rng.randint(1, 3)))
+
+    if rng.random() < 0.3:
+        start = rng.randrange(len(lines) + 1)
+        end = min(len(lines), start + rng.randint(0, 3))
+        return BufferEdit.lines(LineRange(start, end), [_text().replace("\n", "") for _ in range(rng.randint(0, 3))])
+    return BufferEdit.text(CharacterRange(_position(), _position()), _text())
+
+
+def _random_edits(rng: random.Random, lines: list[str], n: int) -> list[BufferEdit]:
+    edits: list[BufferEdit] = []
+    for _ in range(n * 3):
+        candidate = _random_edit(rng, lines)
+        try:
+            order_edits([*edits, candidate])
+        except ValueError:
+            continue
+        edits.append(candidate)
+        if len(edits) == n:
+            break
+    return edits
+
+
+def _apply_one_by_one(lines: list[str], edits: list[BufferEdit]) -> list[str]:
+    """Reference: individual `replace_*` calls, bottom-up."""
+    lines = list(lines)
+    handler = VimBufferRangeHandler(lines)  # type: ignore[arg-type]
+    for index in order_edits(edits):
+        edit = edits[index]
+        if isinstance(edit.target, LineRange):
+            handler.replace_lines(edit.target, list(edit.replacement))
+        else:
+            handler.replace_text(edit.target, str(edit.replacement))
+    return lines
+
+
+def test_transaction_basic(vim_env: MockVim, buffer_writes: list):
+    operator = _make_operator(vim_env, ["# title", "alpha beta", "gamma", "delta"])
+    buffer_writes.clear()
+
+    with operator.transaction() as transaction:
+        first = transaction.replace_text(CharacterRange(CursorPosition(1, 0), CursorPosition(1, 5)), "ALPHA\nA")
+        second = transaction.replace_text(CharacterRange(CursorPosition(1, 6), CursorPosition(1, 10)), "B")
+        third = transaction.replace_lines(LineRange(3, 4), ["D1", "D2"])
+
+    assert vim_env.buffers[1]._content == ["# title", "ALPHA", "A B", "gamma", "D1", "D2"]
+    assert len(buffer_writes) == 1
+
+    results = transaction.results
+    assert results[first] == CharacterRange(CursorPosition(1, 0), CursorPosition(2, 1))
+    assert results[second] == CharacterRange(CursorPosition(2, 2), CursorPosition(2, 3))
+    assert results[third] == LineRange(4, 6)
+
+
+def test_transaction_rejects_overlap(vim_env: MockVim, buffer_writes: list):
+    operator = _make_operator(vim_env, ["abcdef"])
+    buffer_writes.clear()
+    transaction = operator.transaction()
+    transaction.replace_text(CharacterRange(CursorPosition(0, 0), CursorPosition(0, 3)), "x")
+    transaction.replace_text(CharacterRange(CursorPosition(0, 2), CursorPosition(0, 4)), "y")
+    with pytest.raises(ValueError):
+        transaction.commit()
+    assert buffer_writes == []
+    assert vim_env.buffers[1]._content == ["abcdef"]
+
+
+def test_transaction_discarded_on_exception(vim_env: MockVim):
+    operator = _make_operator(vim_env, ["abc"])
+    with pytest.raises(KeyError):
+        with operator.transaction() as transaction:
+            transaction.replace_lines(LineRange(0, 1), ["changed"])
+            raise KeyError
+    assert vim_env.buffers[1]._content == ["abc"]
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_randomized_edits(vim_env: MockVim, seed: int):
+    rng = random.Random(seed)
+    lines = [f"line{i}-" + "w" * rng.randint(0, 6) for i in range(rng.randint(1, 12))]
+    edits = _random_edits(rng, lines, rng.randint(1, 6))
+    operator = _make_operator(vim_env, list(lines))
+
+    results = operator.apply_edits(edits)
+
+    assert vim_env.buffers[1]._content == _apply_one_by_one(lines, edits)
+    for edit, result in zip(edits, results, strict=True):
+        if isinstance(result, LineRange):
+            assert operator.get_lines(result) == list(edit.replacement)
+        else:
+            assert operator.get_text(result) == edit.replacement
+
+
+def test_benchmark_throughput(vim_env: MockVim, buffer_writes: list):
+    n_lines, n_edits = 20_000, 2_000
+    operator = _make_operator(vim_env, [f"value = {i}" for i in range(n_lines)])
+    edits = [
+        BufferEdit.text(CharacterRange(CursorPosition(line, 8), CursorPosition(line, 9)), "VALUE")
+        for line in range(0, n_lines, n_lines // n_edits)
+    ]
+    buffer_writes.clear()
+
+    start = time.perf_counter()
+    operator.apply_edits(edits)
+    elapsed = time.perf_counter() - start
+
+    print(f"\n{len(edits)} edits in {elapsed * 1000:.1f}ms ({len(edits) / elapsed:.0f} edits/s), 1 buffer write")
+    assert len(buffer_writes) == 1
+    assert vim_env.buffers[1][n_lines - 10] == "value = VALUE9990"
@@ -0,0 +1,119 @@
+"""`ReferencePacker` on thousands of references: budget, determinism, and the bytes read."""
+import os
+import random
+import time
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("pytoy_llm")
+
+from pytoy.tools.llm.references.models import ReferenceInfo, ReferencePathPair  # noqa: E402
+from pytoy.tools.llm.references.packer import ReferenceIndex, ReferencePacker  # noqa: E402
+
+N_REFERENCES = 3000
+TOPICS = ["parser", "renderer", "scheduler", "terminal", "quickfix", "buffer", "window", "keymap"]
+
+
+def _make_references(folder: Path, rng: random.Random) -> list[ReferencePathPair]:
+    pairs = []
+    for i in range(N_REFERENCES):
+        topic = TOPICS[i % len(TOPICS)]
+        words = [topic] * rng.randint(5, 50) + rng.choices(["alpha", "beta", "gamma", "delta"], k=rng.randint(10, 2000))
+        markdown_path = folder / f"{i:05d}.md"
+        markdown_path.write_text(f"# {topic} {i}\n" + " ".join(words), encoding="utf8")
+        info = ReferenceInfo(uri=Path(f"docs/{topic}/{i:05d}.md"), timestamp=0.0)  # type: ignore[arg-type]
+        info_path = folder / f"{i:05d}.json"
+        info_path.write_text(info.model_dump_json(), encoding="utf8")
+        pairs.append(ReferencePathPair(info_path=info_path, markdown_path=markdown_path))
+    return pairs
+
+
+def test_packing_is_deterministic_within_budget(tmp_path: Path):
+    pairs = _make_references(tmp_path, random.Random(0))
+    total = sum(pair.markdown_path.stat().st_size for pair in pairs)
+    budget = 200_000
+    index_path = tmp_path / "index" / "reference_index.json"
+
+    start = time.perf_counter()
+    cold = ReferencePacker(ReferenceIndex(index_path)).pack(pairs, budget, query="the scheduler of the terminal")
+    cold_elapsed = time.perf_counter() - start
+    assert len(cold.text) <= budget
+    assert cold.stats.n_indexed == N_REFERENCES
+    assert cold.stats.bytes_read > total
+
+    # The order of `path_pairs` and a fresh process do not change the result.
+    shuffled = list(pairs)
+    random.Random(1).shuffle(shuffled)
+    start = time.perf_counter()
+    warm = ReferencePacker(ReferenceIndex(index_path)).pack(shuffled, budget, query="the scheduler of the terminal")
+    warm_elapsed = time.perf_counter() - start
+    assert warm.text == cold.text
+    assert warm.stats.n_indexed == 0
+    assert warm.stats.bytes_read == sum(entry.st_size for entry in warm.selected) < total / 10
+
+    # The references relevant to the query come first.
+    relevant = [entry.key.split("/")[1] in {"scheduler", "terminal"} for entry in warm.selected]
+    assert relevant == sorted(relevant, reverse=True)
+    assert sum(relevant) / len(relevant) > 2 / len(TOPICS)
+
+    # Only the modified reference is read again.
+    modified = pairs[0].markdown_path
+    modified.write_text(modified.read_text(encoding="utf8") + " scheduler", encoding="utf8")
+    os.utime(modified, (time.time() + 10, time.time() + 10))
+    again = ReferencePacker(ReferenceIndex(index_path)).pack(pairs, budget, query="the scheduler of the terminal")
+    assert again.stats.n_indexed == 1
+
+    print(
+        f"\n{N_REFERENCES} references, {total / 2**20:.1f}MB: "
+        f"cold {cold_elapsed * 1000:.0f}ms ({cold.stats.bytes_read / 2**20:.1f}MB read), "
+        f"warm {warm_elapsed * 1000:.0f}ms ({warm.stats.bytes_read / 2**10:.0f}KB read), {warm.stats.to_line()}"
+    )
+
+
+def test_valuable_reference_beats_many_small_ones(tmp_path: Path):
+    index = ReferenceIndex()
+    packer = ReferencePacker(index)
+    pairs = []
+    for name, text in [("big", "terminal " * 400), ("small_a", "alpha " * 10), ("small_b", "beta " * 10)]:
+        markdown_path = tmp_path / f"{name}.md"
+        markdown_path.write_text(text, encoding="utf8")
+        info_path = tmp_path / f"{name}.json"
+        info_path.write_text(ReferenceInfo(uri=Path(name), timestamp=0.0).model_dump_json(), encoding="utf8")  # type: ignore[arg-type]
+        pairs.append(ReferencePathPair(info_path=info_path, markdown_path=markdown_path))
+    entries = index.update(pairs)
+    big = next(entry for entry in entries if entry.key == "big")
+
+    assert packer.select(entries, budget=big.size, query="terminal") == [big]
+    assert [entry.key for entry in packer.select(entries, budget=big.size, query=None)] == ["small_a", "small_b"]
+    assert packer.select(entries, budget=10) == []
+
+
+def test_index_follows_the_info_and_the_removal(tmp_path: Path):
+    pairs = []
+    for name in ["kept", "renamed", "removed"]:
+        markdown_path = tmp_path / f"{name}.md"
+        markdown_path.write_text(f"# {name}\n" + "terminal " * 20, encoding="utf8")
+        info_path = tmp_path / f"{name}.json"
+        info = ReferenceInfo(uri=Path(f"docs/{name}.md"), timestamp=0.0)  # type: ignore[arg-type]
+        info_path.write_text(info.model_dump_json(), encoding="utf8")
+        pairs.append(ReferencePathPair(info_path=info_path, markdown_path=markdown_path))
+    index_path = tmp_path / "index" / "reference_index.json"
+    assert ReferenceIndex(index_path).update(pairs)
+
+    # The info alone is modified: the meta follows it.
+    renamed = ReferenceInfo(uri=Path("docs/moved/renamed.md"), timestamp=1.0)  # type: ignore[arg-type]
+    pairs[1].info_path.write_text(renamed.model_dump_json(), encoding="utf8")
+    os.utime(pairs[1].info_path, (time.time() + 10, time.time() + 10))
+    index = ReferenceIndex(index_path)
+    entries = index.update(pairs)
+    assert index.n_indexed == 1
+    assert entries[1].key == "docs/moved/renamed.md" and "moved" in entries[1].meta
+
+    # The removed reference is dropped from the index file.
+    pairs[2].markdown_path.unlink()
+    pairs[2].info_path.unlink()
+    index = ReferenceIndex(index_path)
+    assert [entry.key for entry in index.update(pairs[:2])] == ["docs/kept.md", "docs/moved/renamed.md"]
+    assert index.n_indexed == 0
+    assert "removed" not in index_path.read_text(encoding="utf8")
@@ -0,0 +1,194 @@
+"""Tests and benchmark of `ScreenTracker`, the dirty-line tracking of the pyte screen."""
+import os
+import random
+import time
+from types import SimpleNamespace
+
+from pytoy.job_execution.terminal_runner import TerminalJobRunner
+from pytoy.job_execution.terminal_runner.impls.utils.screen_tracker import ScreenTracker
+from pytoy.job_execution.terminal_runner.models import ConsoleSnapshot, JobEvents, ScreenDelta, Snapshot
+from pytoy.shared.lib.event.domain import EventEmitter
+from pytoy.shared.lib.text import CursorPosition
+from pytoy.shared.ui.pytoy_buffer import make_buffer
+from pytoy.shared.ui.pytoy_buffer.impls.dummy import RangeOperatorDummy
+
+
+# Set `PYTOY_BENCH_TTY_BYTES=10485760` for the 10 MB stream.
+N_BYTES = int(os.environ.get("PYTOY_BENCH_TTY_BYTES", 1 << 20))
+CHUNK = 1024
+LINES, COLS = 40, 120
+
+
+def _scripted_stream(n_bytes: int, seed: int = 0) -> str:
+    """Typical output of the terminal jobs: logs, progress bars and redraws of a status area."""
+    rng = random.Random(seed)
+    parts: list[str] = []
+    size = 0
+    while size < n_bytes:
+        kind = rng.random()
+        if kind < 0.05:
+            part = "".join(
+                f"\x1b[3{rng.randint(1, 7)}mINFO\x1b[0m step {rng.randint(0, 10**6)}: {'x' * rng.randint(0, 60)}\r\n"
+                for _ in range(rng.randint(1, 3))
+            )
+        elif kind < 0.7:
+            done = rng.randint(0, 50)
+            part = f"\r[{'#' * done}{' ' * (50 - done)}] {done * 2:3d}% eta {rng.randint(0, 99)}s"
+        else:
+            row = rng.randint(1, 3)
+            part = f"\x1b7\x1b[{row};1H\x1b[1mstatus {row}\x1b[0m {rng.random():.6f}\x1b[K\x1b8"
+        parts.append(part)
+        size += len(part)
+    return "".join(parts)
+
+
+def _chunks(stream: str) -> list[str]:
+    return [stream[index : index + CHUNK] for index in range(0, len(stream), CHUNK)]
+
+
+def test_rows_and_deltas_follow_the_screen():
+    tracker = ScreenTracker(LINES, COLS)
+    shadow = [""] * LINES
+    for chunk in _chunks(_scripted_stream(200_000, seed=1))[:40]:
+        for piece in (chunk[: len(chunk) // 2], chunk[len(chunk) // 2 :]):
+            tracker.feed(piece)
+            delta = tracker.take_delta()
+            for y, row in delta.rows.items():
+                shadow[y] = row
+            screen = tracker.screen
+            assert shadow == screen.display
+            assert tracker.content == "\n".join(screen.display)
+            assert delta.cursor == tracker.cursor == CursorPosition(screen.cursor.y, screen.cursor.x)
+
+
+def test_progress_bar_changes_only_its_row():
+    tracker = ScreenTracker(LINES, COLS)
+    tracker.feed("header\r\n")
+    tracker.take_delta()
+    version = tracker.version
+
+    tracker.feed("\r[###   ] 50%")
+    delta = tracker.take_delta()
+    assert list(delta.rows) == [1]
+    assert delta.rows[1].rstrip() == "[###   ] 50%"
+    assert (delta.previous_cursor, delta.cursor) == (CursorPosition(1, 0), CursorPosition(1, 12))
+    assert tracker.version == version + 1
+
+    assert tracker.take_delta().is_empty
+    assert tracker.version == version + 1
+
+
+def test_resize_reports_all_rows():
+    tracker = ScreenTracker(LINES, COLS)
+    tracker.feed("hello")
+    tracker.take_delta()
+    tracker.resize(10, 20)
+    delta = tracker.take_delta()
+    assert (delta.lines, delta.cols) == (10, 20)
+    assert sorted(delta.rows) == list(range(10))
+    assert tracker.rows == tracker.screen.display
+
+
+def test_benchmark_snapshot_cpu_time():
+    chunks = _chunks(_scripted_stream(N_BYTES))
+    tracker = ScreenTracker(LINES, COLS)
+    screen = tracker.screen
+    former = current = delta = 0.0
+    n_delta_rows = 0
+    start = time.process_time()
+    for chunk in chunks:
+        tracker.feed(chunk)
+        # As `TerminalJobRunner` takes a snapshot at every update.
+        t0 = time.process_time()
+        expected = "\n".join(screen.display)
+        t1 = time.process_time()
+        content = tracker.content
+        t2 = time.process_time()
+        n_delta_rows += len(tracker.take_delta().rows)
+        t3 = time.process_time()
+        former += t1 - t0
+        current += t2 - t1
+        delta += t3 - t2
+        assert content == expected
+    total = time.process_time() - start
+
+    print(
+        f"\n{N_BYTES / 2**20:.1f} MB in {len(chunks)} chunks ({total:.2f}s in total): "
+        f"full display {former * 1e3:.0f}ms, tracked snapshot {current * 1e3:.0f}ms, "
+        f"delta {delta * 1e3:.0f}ms ({n_delta_rows / len(chunks):.1f} rows per chunk)"
+    )
+    assert current < former
+
+
+class _TrackedJob:
+    """A terminal job whose screen is `ScreenTracker`, fed by the test."""
+
+    def __init__(self, lines: int, cols: int) -> None:
+        self.tracker = ScreenTracker(lines, cols)
+        self._on_update = EventEmitter[int]()
+        self.events = JobEvents(on_job_exit=EventEmitter[object]().event, on_update=self._on_update.event)
+
+    def feed(self, data: str) -> None:
+        self.tracker.feed(data)
+        self._on_update.fire(0)
+
+    @property
+    def snapshot(self) -> Snapshot:
+        tracker = self.tracker
+        console = ConsoleSnapshot(lines=tracker.lines, cols=tracker.cols, content=tracker.content)
+        return Snapshot(timestamp=time.time(), console=console, cursor=tracker.cursor)
+
+    def take_delta(self) -> ScreenDelta:
+        return self.tracker.take_delta()
+
+    def terminate(self) -> None:
+        pass
+
+
+def test_runner_replaces_only_the_changed_rows(monkeypatch):
+    calls: list[str] = []
+    replace_text, apply_edits = RangeOperatorDummy.replace_text, RangeOperatorDummy.apply_edits
+
+    def _spy(name, method):
+        def _inner(self, *args):
+            calls.append(name)
+            return method(self, *args)
+
+        return _inner
+
+    monkeypatch.setattr(RangeOperatorDummy, "replace_text", _spy("text", replace_text))
+    monkeypatch.setattr(RangeOperatorDummy, "apply_edits", _spy("edits", apply_edits))
+
+    job = _TrackedJob(10, 40)
+    runner = TerminalJobRunner(make_buffer("__pytoy_screen_mirror__"), terminal_job_factory=lambda *_: job)
+    runner.run(SimpleNamespace(on_exit=None))  # type: ignore[arg-type]
+
+    def _expected() -> str:
+        rows = [row.rstrip() for row in job.tracker.rows]
+        while rows and not rows[-1]:
+            rows.pop()
+        return "\n".join(rows)
+
+    job.feed("$ make\r\nstep 1\r\n[#    ] 20%")
+    assert runner.buffer.content == _expected()
+    assert calls == ["text"]
+
+    # A progress bar and a status row: the rows are replaced, not the whole buffer.
+    calls.clear()
+    for done in range(2, 6):
+        job.feed(f"\r[{'#' * done}{' ' * (5 - done)}] {done * 20}%")
+        job.feed(f"\x1b7\x1b[1;20Hstatus {done}\x1b8")
+        assert runner.buffer.content == _expected()
+    job.feed("\r\ndone\r\n$ ")
+    assert runner.buffer.content == _expected()
+    assert "text" not in calls and calls
+
+    # Scrolling marks all the rows, so the whole buffer is replaced.
+    calls.clear()
+    job.feed("".join(f"line {index}\r\n" for index in range(12)))
+    assert runner.buffer.content == _expected()
+    assert calls == ["text"]
+
+    job.tracker.resize(6, 40)
+    job.feed("after resize")
+    assert runner.buffer.content == _expected()
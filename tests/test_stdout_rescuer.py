@@ -0,0 +1,123 @@
+"""Tests and stress test of the capture channel of `StdoutProxy`."""
+import threading
+import time
+
+import pytest
+
+from pytoy.shared.timertask.vim.stdout_rescuer import StdoutProxy, _CaptureChannel, _DummyPipe
+
+from tests.mocks.vim import MockVim
+
+
+@pytest.fixture
+def proxy(monkeypatch) -> StdoutProxy:
+    monkeypatch.setattr(StdoutProxy, "_stdout_channel", _CaptureChannel(capacity=2**16, budget=2**10))
+    monkeypatch.setattr(StdoutProxy, "_stderr_channel", _CaptureChannel())
+    monkeypatch.setattr(StdoutProxy, "_original_stdout", object())
+    monkeypatch.setattr(StdoutProxy, "_original_stderr", object())
+    monkeypatch.setattr(StdoutProxy, "_log_bufnr", None)
+    return StdoutProxy
+
+
+def test_drain_with_budget():
+    channel = _CaptureChannel(capacity=100, budget=10)
+    channel.write("0123456789abc")
+    assert channel.drain().startswith("0123456789\n... (3 characters are truncated.)")
+    assert channel.drain() == ""
+
+    channel.write("x" * 90)
+    channel.write("y" * 20)  # Exceeds `capacity`.
+    channel.write("z" * 5)
+    assert channel.drain().startswith("x" * 10)
+
+    stats = channel.stats
+    assert (stats.written, stats.dropped) == (128, 20)
+    assert (stats.delivered, stats.truncated) == (20, 88)
+    assert stats.n_drains == 3
+
+
+def test_single_command_per_drain(vim_env: MockVim, proxy):
+    pipe = _DummyPipe(proxy._stdout_channel)
+    for i in range(100):
+        pipe.write(f"line '{i}'\n")
+
+    proxy.loop_function()
+    (command,) = vim_env.get_commands()
+    assert command.startswith("echohl ErrorMsg | echom 'line ''0''' | ")
+    assert "echohl None | echo 'line ''0''' . \"\\n\" . 'line ''1''' . " in command
+    assert command.endswith("'line ''99'''")
+
+    # Nothing is written, nothing is output.
+    proxy.loop_function()
+    assert len(vim_env.get_commands()) == 1
+
+
+def test_log_buffer(vim_env: MockVim, proxy):
+    buffer = vim_env.create_buffer(3, "pytoy-log", [""])
+    proxy.set_log_buffer(3)
+    _DummyPipe(proxy._stderr_channel).write("first\nsecond\n")
+
+    proxy.loop_function()
+    assert buffer._content == ["", "first", "second"]
+    assert vim_env.get_commands() == []
+
+    # Falls back to messages once the buffer is wiped.
+    vim_env.buffers._buffers.pop(3)
+    _DummyPipe(proxy._stderr_channel).write("third\n")
+    proxy.loop_function()
+    assert vim_env.get_commands() == ["echom 'third' | echo 'third'"]
+
+
+def test_failing_line_falls_back_per_line(vim_env: MockVim, proxy, monkeypatch):
+    command = vim_env.command
+
+    def _command(cmd: str) -> None:
+        if "broken" in cmd:
+            raise RuntimeError(cmd)
+        command(cmd)
+
+    monkeypatch.setattr(vim_env, "command", _command)
+    _DummyPipe(proxy._stderr_channel).write("first\nbroken\nthird\n")
+    proxy.loop_function()
+    assert vim_env.get_commands() == ["echom 'first'", "echom 'UnknownLine'", "echom 'third'", "echo 'UnknownLine'"]
+
+    proxy.add_message("added")
+    assert vim_env.get_commands()[-1] == "echom 'added' | echo '[echom] is used. See `:messages`. '"
+
+
+def test_stress_concurrent_writers(vim_env: MockVim, proxy):
+    n_threads, n_writes = 16, 2000
+    pipe = _DummyPipe(proxy._stdout_channel)
+    stop = threading.Event()
+
+    def _writer(index: int):
+        for i in range(n_writes):
+            pipe.write(f"thread {index}: {i}\n")
+
+    def _drainer():
+        while not stop.is_set():
+            proxy.loop_function()
+            time.sleep(0.001)
+
+    drainer = threading.Thread(target=_drainer)
+    drainer.start()
+    start = time.perf_counter()
+    writers = [threading.Thread(target=_writer, args=(index,)) for index in range(n_threads)]
+    for writer in writers:
+        writer.start()
+    for writer in writers:
+        writer.join()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    drainer.join()
+    proxy.loop_function()
+
+    stats = proxy.stats()["stdout"]
+    print(
+        f"\n{n_threads * n_writes} writes in {elapsed * 1000:.1f}ms, "
+        f"{stats.n_drains} drains, {len(vim_env.get_commands())} commands, "
+        f"dropped: {stats.dropped}, truncated: {stats.truncated}"
+    )
+    # Every character is accounted, and one command is issued at most per drain.
+    assert stats.written == stats.delivered + stats.dropped + stats.truncated
+    assert len(vim_env.get_commands()) <= stats.n_drains
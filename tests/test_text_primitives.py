@@ -0,0 +1,178 @@
+"""Regression tests and benchmark of the text geometry primitives."""
+import copy
+import dataclasses
+import pickle
+import random
+import sys
+import time
+from dataclasses import dataclass
+
+import pytest
+
+from pytoy.shared.lib.text import CharacterRange, CursorPosition, LineRange, line_starts
+
+from tests import bench
+
+
+N_INSTANCES = 1_000_000
+
+
+@dataclass(frozen=True)
+class _FormerCursorPosition:
+    """The former definitions, as the references of the benchmark."""
+
+    line: int
+    col: int
+
+
+@dataclass(frozen=True)
+class _FormerCharacterRange:
+    start: _FormerCursorPosition
+    end: _FormerCursorPosition
+
+    def __post_init__(self):
+        if (self.end.line, self.end.col) < (self.start.line, self.start.col):
+            object.__setattr__(self, "start", self.end)
+            object.__setattr__(self, "end", self.start)
+
+
+class _CountingPosition:
+    """A position which counts the computations of the hashes of the ranges."""
+
+    n_hashes = 0
+
+    def __init__(self, line: int, col: int) -> None:
+        self.line = line
+        self.col = col
+
+    def __hash__(self) -> int:
+        type(self).n_hashes += 1
+        return hash((self.line, self.col))
+
+
+def _deep_size(obj: object) -> int:
+    size = sys.getsizeof(obj)
+    if hasattr(obj, "__dict__"):
+        size += sys.getsizeof(obj.__dict__)
+    return size
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        CursorPosition(3, 4),
+        LineRange(2, 5),
+        CharacterRange(CursorPosition(1, 2), CursorPosition(4, 0)),
+    ],
+)
+def test_pickle_copy_and_hash(value):
+    expected = hash(value)
+    for restored in (pickle.loads(pickle.dumps(value)), copy.copy(value), copy.deepcopy(value)):
+        assert restored == value
+        assert type(restored) is type(value)
+        assert hash(restored) == expected
+    assert hash(value) == expected  # The cached value.
+    assert {value: 1}[pickle.loads(pickle.dumps(value))] == 1
+
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        setattr(value, dataclasses.fields(value)[0].name, 0)
+    assert not hasattr(value, "__dict__")
+    assert "_hash" not in repr(value) and "_hash" not in dataclasses.asdict(value)
+
+
+def test_equality_and_ordering():
+    assert CursorPosition(1, 2) == CursorPosition(line=1, col=2)
+    assert CursorPosition(1, 2) != LineRange(1, 2)
+    assert CursorPosition(1, 2) != (1, 2)
+    assert hash(CursorPosition(1, 2)) == hash(CursorPosition(1, 2))
+    assert sorted([CursorPosition(2, 0), CursorPosition(1, 5), CursorPosition(1, 2)]) == [
+        CursorPosition(1, 2),
+        CursorPosition(1, 5),
+        CursorPosition(2, 0),
+    ]
+    assert LineRange(0, 3) < LineRange(1, 1)
+    # The reversed range is normalized.
+    reversed_range = CharacterRange(CursorPosition(3, 0), CursorPosition(1, 1))
+    assert reversed_range.start == CursorPosition(1, 1)
+    assert dataclasses.replace(CursorPosition(1, 2), col=5) == CursorPosition(1, 5)
+
+
+def test_from_offsets_matches_per_offset_conversion():
+    rng = random.Random(0)
+    lines = ["".join(rng.choice("ab") for _ in range(rng.randint(0, 8))) for _ in range(50)]
+    text = "\n".join(lines)
+    starts = line_starts(lines)
+
+    def _naive(offset: int, first_line: int, first_col: int) -> CursorPosition:
+        line = text.count("\n", 0, offset)
+        col = offset - (text.rfind("\n", 0, offset) + 1)
+        return CursorPosition(line + first_line, col + (first_col if line == 0 else 0))
+
+    sorted_offsets = list(range(len(text) + 1))
+    shuffled = rng.sample(sorted_offsets, len(sorted_offsets))
+    for offsets in (sorted_offsets, shuffled):
+        assert CursorPosition.from_offsets(offsets, starts, first_line=7, first_col=3) == [
+            _naive(offset, 7, 3) for offset in offsets
+        ]
+
+    spans = [(5, 2), (10, 30)]
+    assert CharacterRange.from_offsets(spans, starts) == [
+        CharacterRange(_naive(start, 0, 0), _naive(end, 0, 0)) for start, end in spans
+    ]
+
+
+def _throughput(label: str, position_cls, range_cls, n: int) -> dict[str, float]:
+    lines = [index % 1000 for index in range(n)]
+    start = time.perf_counter()
+    positions = [position_cls(line, 7) for line in lines]
+    created = n / (time.perf_counter() - start)
+
+    others = [position_cls(line, 7) for line in lines[:100_000]]
+    start = time.perf_counter()
+    n_equal = sum(1 for a, b in zip(positions, others) if a == b)
+    compared = len(others) / (time.perf_counter() - start)
+    assert n_equal == len(others)
+
+    # Ranges used as dictionary keys are hashed repeatedly.
+    ranges = [range_cls(a, b) for a, b in zip(positions[:100_000], positions[1:100_001])]
+    set(ranges)
+    start = time.perf_counter()
+    for _ in range(3):
+        for character_range in ranges:
+            hash(character_range)
+    hashed = 3 * len(ranges) / (time.perf_counter() - start)
+
+    size = _deep_size(positions[0])
+    bench.report(
+        f"\n{label}: position {size} bytes, create {created / 1e6:.2f}M/s, "
+        f"compare {compared / 1e6:.2f}M/s, range hash {hashed / 1e6:.2f}M/s"
+    )
+    return {"size": size, "create": created, "compare": compared, "hash": hashed}
+
+
+def test_benchmark_one_million_positions():
+    # The layout and the hashing are compared by the counters, and the throughputs only with `PYTOY_BENCH=1`.
+    assert not hasattr(CursorPosition(0, 7), "__dict__")
+    assert _deep_size(CursorPosition(0, 7)) < _deep_size(_FormerCursorPosition(0, 7))
+    for range_cls, n_expected in [(CharacterRange, 2), (_FormerCharacterRange, 6)]:
+        _CountingPosition.n_hashes = 0
+        character_range = range_cls(_CountingPosition(0, 1), _CountingPosition(2, 3))  # type: ignore[arg-type]
+        for _ in range(3):
+            hash(character_range)
+        assert _CountingPosition.n_hashes == n_expected
+    if not bench.ENABLED:
+        return
+
+    current = _throughput("current", CursorPosition, CharacterRange, N_INSTANCES)
+    former = _throughput("former frozen dataclass", _FormerCursorPosition, _FormerCharacterRange, N_INSTANCES)
+
+    starts = line_starts(["x" * 79] * (N_INSTANCES // 80))
+    offsets = list(range(0, len(starts) * 80, 80 * len(starts) // N_INSTANCES or 1))
+    start = time.perf_counter()
+    CursorPosition.from_offsets(offsets, starts)
+    bulk = len(offsets) / (time.perf_counter() - start)
+    bench.report(f"from_offsets: {bulk / 1e6:.2f}M/s")
+
+    assert current["size"] < former["size"]
+    assert current["create"] > former["create"]
+    assert current["hash"] > former["hash"]
@@ -0,0 +1,258 @@
+"""`TracebackRecognizer` on tracebacks printed by the real interpreter, and on a large noisy log."""
+import random
+import re
+import subprocess
+import sys
+import textwrap
+import time
+from pathlib import Path
+
+import pytest
+
+from pytoy.contexts.vim import GlobalVimContext
+from pytoy.job_execution.command_executor import CommandExecutor
+from pytoy.job_execution.command_executor.models import BufferRequest, ExecutionHooks, ExecutionRequest, ExecutionResult
+from pytoy.shared.ui import PytoyQuickfix
+from pytoy.shared.ui.pytoy_buffer import BufferSource, PytoyBuffer
+from pytoy.shared.ui.pytoy_buffer.impls.vim import PytoyBufferVim, VimBufferKernel
+from pytoy.tools.python import _BufferTail, make_traceback_hooks
+from pytoy.tools.python.traceback_recognizer import TracebackRecognizer
+
+from tests.mocks.vim import MockVim
+
+_OLD_PATTERN = re.compile(r'\s+File "(.+)", line (\d+)')
+
+CORPUS = {
+    "plain": (
+        """
+        def inner():
+            raise ValueError("plain")
+
+        def outer():
+            inner()
+
+        outer()
+        """,
+        ["ValueError: plain"],
+    ),
+    "cause": (
+        """
+        def load():
+            return {}["key"]
+
+        try:
+            load()
+        except KeyError as e:
+            raise RuntimeError("wrapped") from e
+        """,
+        ["KeyError: 'key'", "RuntimeError: wrapped"],
+    ),
+    "context": (
+        """
+        try:
+            1 / 0
+        except ZeroDivisionError:
+            int("x")
+        """,
+        ["ZeroDivisionError: division by zero", "ValueError: invalid literal for int() with base 10: 'x'"],
+    ),
+    "multiline_message": (
+        """
+        print("log before")
+        raise AssertionError("first line\\nsecond line\\n  indented")
+        """,
+        ["AssertionError: first line"],
+    ),
+    "recursion": (
+        """
+        def f(n):
+            return f(n + 1)
+
+        f(0)
+        """,
+        ["RecursionError: maximum recursion depth exceeded"],
+    ),
+    "syntax_in_import": (
+        """
+        import sys
+        from pathlib import Path
+        Path(__file__).with_name("broken_module.py").write_text("x = (\\n")
+        sys.path.insert(0, str(Path(__file__).parent))
+        import broken_module
+        """,
+        ["SyntaxError: '(' was never closed"],
+    ),
+    "syntax_in_script": ("x = (\n", ["SyntaxError: '(' was never closed"]),
+    "logging": (
+        """
+        import logging
+        logging.basicConfig(format="%(levelname)s %(message)s")
+        try:
+            [][1]
+        except IndexError:
+            logging.exception("failed to index")
+        print("continue")
+        raise SystemExit(1)
+        """,
+        ["IndexError: list index out of range"],
+    ),
+}
+
+if sys.version_info >= (3, 11):
+    CORPUS["exception_group"] = (
+        """
+        def a():
+            raise ValueError("a")
+
+        def b():
+            raise TypeError("b")
+
+        errors = []
+        for func in (a, b):
+            try:
+                func()
+            except Exception as e:
+                errors.append(e)
+        raise ExceptionGroup("many", errors)
+        """,
+        ["ExceptionGroup: many (2 sub-exceptions)", "ValueError: a", "TypeError: b"],
+    )
+
+
+def _run(tmp_path: Path, name: str, source: str) -> str:
+    script = tmp_path / f"case_{name}.py"
+    script.write_text(textwrap.dedent(source))
+    ret = subprocess.run([sys.executable, str(script)], cwd=tmp_path, capture_output=True, text=True)
+    assert ret.returncode != 0
+    return ret.stdout + ret.stderr
+
+
+@pytest.mark.parametrize("name", list(CORPUS))
+def test_corpus(tmp_path: Path, name: str):
+    source, exceptions = CORPUS[name]
+    text = _run(tmp_path, name, source)
+    recognizer = TracebackRecognizer()
+    completed = []
+    for line in text.split("\n"):
+        completed += recognizer.feed(line)
+    completed += recognizer.close()
+
+    assert [traceback.exception for traceback in completed] == exceptions
+    # Every frame which the former regex found is recognized.
+    expected = [(filename, int(lnum)) for filename, lnum in _OLD_PATTERN.findall(text)]
+    assert sorted((f.filename, f.lnum) for t in completed for f in t.frames) == sorted(expected)
+    if name in {"cause", "context"}:
+        assert completed[0].chain == completed[1].chain
+    if name == "plain":
+        assert [frame.text for frame in completed[0].frames[-2:]] == ["inner()", 'raise ValueError("plain")']
+
+
+def test_streaming_emits_each_traceback_on_completion():
+    lines = [
+        "Traceback (most recent call last):",
+        '  File "/a.py", line 1, in <module>',
+        "    f()",
+        "KeyError: 'x'",
+        "",
+        "The above exception was the direct cause of the following exception:",
+        "",
+        "Traceback (most recent call last):",
+        '  File "/a.py", line 3, in <module>',
+        "    g()",
+    ]
+    recognizer = TracebackRecognizer()
+    emitted = [len(recognizer.feed(line)) for line in lines]
+    assert emitted == [0, 0, 0, 1, 0, 0, 0, 0, 0, 0]
+    assert recognizer.in_traceback
+    [last] = recognizer.feed("RuntimeError: y")
+    assert last.chain == recognizer.tracebacks[0].chain
+    # An unrelated traceback starts a new chain.
+    recognizer.feed_lines(["noise", "Traceback (most recent call last):", '  File "/b.py", line 9', "E: z"])
+    assert recognizer.tracebacks[-1].chain != last.chain
+    assert recognizer.tracebacks[-1].to_rows() == [{"filename": "/b.py", "lnum": 9, "text": ""}]
+
+
+def test_noisy_log_50mb():
+    rng = random.Random(0)
+    traceback_lines = [
+        "Traceback (most recent call last):",
+        '  File "/srv/app/main.py", line 42, in handle',
+        "    process(request)",
+        '  File "/srv/app/worker.py", line 7, in process',
+        "    raise ValueError(request)",
+        "ValueError: bad request",
+    ]
+    noise = [f"2024-01-01 00:00:{i % 60:02d} INFO worker-{i % 8} processed item {i} in {i % 97} ms" for i in range(1000)]
+    lines: list[str] = []
+    size = 0
+    n_tracebacks = 0
+    while size < 50 * 2**20:
+        chunk = rng.choices(noise, k=500)
+        lines += chunk
+        size += sum(len(line) + 1 for line in chunk)
+        if rng.random() < 0.5:
+            lines += traceback_lines
+            n_tracebacks += 1
+
+    recognizer = TracebackRecognizer()
+    start = time.perf_counter()
+    for line in lines:
+        recognizer.feed(line)
+    streaming = time.perf_counter() - start
+
+    text = "\n".join(lines)
+    start = time.perf_counter()
+    n_frames = len(_OLD_PATTERN.findall(text))
+    rescan = time.perf_counter() - start
+
+    assert len(recognizer.tracebacks) == n_tracebacks
+    assert sum(len(t.frames) for t in recognizer.tracebacks) == n_frames
+    print(
+        f"\n{size / 2**20:.0f}MB, {len(lines)} lines: streaming {size / 2**20 / streaming:.0f}MB/s "
+        f"({streaming:.2f}s in total, spread over the run), rescan after exit {rescan:.2f}s"
+    )
+
+
+def test_tail_of_a_buffer_which_starts_empty(vim_env: MockVim):
+    vim_env.create_buffer(2, "__pystderr__", [""])
+    kernel = VimBufferKernel(2, ctx=GlobalVimContext())
+
+    class _Ctx:
+        buffer_kernel_registry = {2: kernel}
+
+    buffer = PytoyBuffer(PytoyBufferVim(2, ctx=_Ctx()))  # type: ignore[arg-type]
+    tail, recognizer = _BufferTail(buffer), TracebackRecognizer()
+    # The empty line of an empty buffer is not the output.
+    assert tail.read() == []
+
+    # The first line overwrites the empty line.
+    buffer.append('Traceback (most recent call last):\n  File "/work/main.py", line 3, in <module>')
+    assert recognizer.feed_lines(tail.read()) == []
+    buffer.append("ValueError: empty stderr")
+    (traceback,) = recognizer.feed_lines(tail.read())
+    assert traceback.exception == "ValueError: empty stderr"
+    assert [(frame.filename, frame.lnum) for frame in traceback.frames] == [("/work/main.py", 3)]
+
+
+def test_traceback_hooks_through_executor(tmp_path: Path):
+    """The hooks register their timer task on start, and fill the quickfix list on finish."""
+    script = tmp_path / "main.py"
+    script.write_text(textwrap.dedent(CORPUS["plain"][0]))
+    results: list[ExecutionResult] = []
+    hooks = ExecutionHooks.merge(make_traceback_hooks(interval=10), ExecutionHooks(on_finish=results.append))
+    command = [sys.executable, "-u", str(script)]
+    request = ExecutionRequest(command=command, cwd=tmp_path, command_wrapper=lambda command: command)
+    buffers = BufferRequest(stdout=BufferSource.from_str("TRACEBACK_STDOUT"), stderr=BufferSource.from_str("TRACEBACK_STDERR"))
+    CommandExecutor(buffers).execute(request, hooks)
+
+    deadline = time.monotonic() + 5.0
+    while not results and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert results and not results[0].success
+
+    records = PytoyQuickfix().records
+    assert [(Path(record.filename).name, record.lnum) for record in records] == [
+        ("main.py", 3),
+        ("main.py", 6),
+        ("main.py", 8),
+    ]
@@ -0,0 +1,153 @@
+"""Tests and benchmark of `VimBufferIndex`."""
+import time
+from pathlib import Path
+
+import pytest
+
+from pytoy.contexts.vim import GlobalVimContext
+from pytoy.shared.ui.pytoy_buffer.impls.vim import PytoyBufferProviderVim
+from pytoy.shared.ui.pytoy_buffer.models import BufferQuery, BufferSource
+
+from tests import bench
+from tests.mocks.vim import MockVim
+
+
+N_BUFFERS = 2000
+
+
+def _fire(ctx: GlobalVimContext, group: str, bufnr: int) -> None:
+    # Emulate the call from the autocmd: arguments are passed as `str`.
+    ctx.autocmd_manager._dispatcher(group, str(bufnr))
+
+
+@pytest.fixture
+def counted_evals(vim_env: MockVim, monkeypatch):
+    calls: list[str] = []
+    original = vim_env.eval
+
+    def _eval(expr: str):
+        calls.append(expr)
+        return original(expr)
+
+    monkeypatch.setattr(vim_env, "eval", _eval)
+    return calls
+
+
+def _populate(vim_env: MockVim, n: int) -> None:
+    for bufnr in range(1, n + 1):
+        if bufnr % 10 == 0:
+            buf = vim_env.create_buffer(bufnr, f"/work/__scratch_{bufnr}__")
+            buf.options["buftype"] = "nofile"
+        elif bufnr % 10 == 1:
+            buf = vim_env.create_buffer(bufnr, f"/work/term_{bufnr}")
+            buf.options["buftype"] = "terminal"
+        else:
+            vim_env.create_buffer(bufnr, f"/work/src/module_{bufnr}.py")
+
+
+def test_query_by_source(vim_env: MockVim):
+    _populate(vim_env, 30)
+    provider = PytoyBufferProviderVim(ctx=GlobalVimContext())
+
+    source = BufferSource.from_path(Path("/work/src/module_5.py"))
+    (buffer,) = provider.query(BufferQuery.from_source(source))
+    assert buffer.buffer_id == 5
+    assert buffer.is_file
+
+    scratch = BufferSource.from_no_file("__scratch_20__")
+    (buffer,) = provider.query(BufferQuery.from_source(scratch))
+    assert buffer.buffer_id == 20
+    assert not buffer.is_file
+
+    # `terminal` is not a normal type.
+    terminal = BufferSource.from_no_file("term_11")
+    assert provider.query(BufferQuery.from_source(terminal)) == []
+    assert len(provider.query(BufferQuery.from_source(terminal, is_normal_type=False))) == 1
+
+    assert [elem.buffer_id for elem in provider.get_buffers()] == [
+        bufnr for bufnr in range(1, 31) if bufnr % 10 != 1
+    ]
+
+
+def test_lifecycle_events(vim_env: MockVim):
+    _populate(vim_env, 5)
+    ctx = GlobalVimContext()
+    index = ctx.buffer_index
+    assert index.get(3).name == "/work/src/module_3.py"
+
+    # BufAdd
+    vim_env.create_buffer(6, "/work/new.py")
+    _fire(ctx, "PytoyAnyBufferAddedAutocmd", 6)
+    assert index.find(BufferSource.from_path(Path("/work/new.py")))[0].bufnr == 6
+
+    # BufFilePost
+    vim_env.buffers[6].name = "/work/renamed.py"
+    _fire(ctx, "PytoyAnyBufferBufFilePostAutocmd", 6)
+    assert index.find(BufferSource.from_path(Path("/work/new.py"))) == []
+    assert index.get(6).uri.path == "/work/renamed.py"
+
+    # OptionSet buftype
+    vim_env.buffers[6].options["buftype"] = "nofile"
+    _fire(ctx, "PytoyAnyBufferBuftypeSetAutocmd", 6)
+    assert index.get(6).source == BufferSource.from_no_file("renamed.py")
+    assert not index.get(6).is_file
+
+    # BufWipeout
+    _fire(ctx, "PytoyAnyBufferClosedGroupAutocmd", 6)
+    vim_env.buffers._buffers.pop(6)
+    assert index.get(6) is None
+    assert index.find(BufferSource.from_no_file("renamed.py")) == []
+    assert [record.bufnr for record in index.records()] == [1, 2, 3, 4, 5]
+
+
+def test_changes_without_autocmds(vim_env: MockVim, counted_evals: list[str]):
+    """E.g. buffers created inside other autocmds, or with `noautocmd`."""
+    _populate(vim_env, 5)
+    index = GlobalVimContext().buffer_index
+    assert [record.bufnr for record in index.records()] == [1, 2, 3, 4, 5]
+    n_evals = len(counted_evals)
+
+    # A hit is answered from the index.
+    assert index.find(BufferSource.from_path(Path("/work/src/module_3.py")))[0].bufnr == 3
+    assert len(counted_evals) == n_evals
+
+    # A miss fetches from vim again.
+    vim_env.create_buffer(6, "/work/silent.py")
+    assert index.find(BufferSource.from_path(Path("/work/silent.py")))[0].bufnr == 6
+    vim_env.buffers[6].name = "/work/renamed.py"
+    assert index.find(BufferSource.from_path(Path("/work/renamed.py")))[0].bufnr == 6
+
+    # `records` is rebuilt when the largest `bufnr` differs.
+    vim_env.create_buffer(7, "/work/another.py")
+    assert [record.bufnr for record in index.records()] == [1, 2, 3, 4, 5, 6, 7]
+    vim_env.buffers._buffers.pop(7)
+    assert [record.bufnr for record in index.records()] == [1, 2, 3, 4, 5, 6]
+
+
+def test_benchmark_2000_buffers(vim_env: MockVim, counted_evals: list[str]):
+    _populate(vim_env, N_BUFFERS)
+    provider = PytoyBufferProviderVim(ctx=GlobalVimContext())
+    sources = [BufferSource.from_path(Path(f"/work/src/module_{n}.py")) for n in range(2, N_BUFFERS, 10)]
+
+    # The first query builds the index with a single `vim.eval`.
+    provider.query(BufferQuery(buffer_sources=sources[:1]))
+    assert len(counted_evals) == 1
+
+    start = time.perf_counter()
+    buffers = provider.query(BufferQuery(buffer_sources=sources))
+    elapsed = time.perf_counter() - start
+    assert [elem.buffer_id for elem in buffers] == list(range(2, N_BUFFERS, 10))
+    assert len(counted_evals) == 1
+
+    # Reference: the previous linear scan evaluated `buftype` per buffer and per property.
+    counted_evals.clear()
+    start = time.perf_counter()
+    for source in sources:
+        for buf in vim_env.buffers:
+            vim_env.eval(f"getbufvar({buf.number}, '&buftype')")
+    linear_elapsed = time.perf_counter() - start
+    assert len(counted_evals) == len(sources) * N_BUFFERS
+
+    bench.report(f"indexed: {elapsed * 1000:.2f}ms, linear scan: {linear_elapsed * 1000:.2f}ms for {N_BUFFERS} buffers")
+    if bench.ENABLED:
+        assert elapsed < linear_elapsed
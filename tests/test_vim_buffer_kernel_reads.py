@@ -0,0 +1,110 @@
+"""Tests and benchmark of windowed, `changedtick`-aware reads of `VimBufferKernel`."""
+import time
+import tracemalloc
+
+import pytest
+
+from pytoy.contexts.vim import GlobalVimContext
+from pytoy.shared.lib.text import CharacterRange, CursorPosition, LineRange
+from pytoy.shared.ui.pytoy_buffer.impls.vim.kernel import VimBufferKernel
+from pytoy.shared.ui.pytoy_buffer.impls.vim.range_operator import RangeOperatorVim
+
+from tests.mocks.vim import MockVim
+
+
+N_LINES = 200_000
+
+
+@pytest.fixture
+def buffer_reads(vim_env: MockVim, monkeypatch) -> list:
+    """Record the slices requested to the vim buffers."""
+    reads: list = []
+    original = vim_env.Buffer.__getitem__
+
+    def _getitem(self, idx):
+        reads.append(idx)
+        return original(self, idx)
+
+    monkeypatch.setattr(vim_env.Buffer, "__getitem__", _getitem)
+    return reads
+
+
+def _make_kernel(vim_env: MockVim, lines: list[str]) -> VimBufferKernel:
+    vim_env.create_buffer(1, "/work/big.py", lines)
+    return VimBufferKernel(1, ctx=GlobalVimContext())
+
+
+def test_get_lines_window(vim_env: MockVim, buffer_reads: list):
+    kernel = _make_kernel(vim_env, [f"line {i}" for i in range(100)])
+
+    assert kernel.get_lines(LineRange(10, 13)) == ["line 10", "line 11", "line 12"]
+    assert buffer_reads == [slice(10, 13)]
+
+    # Sub-windows of the cached window are served without reading the buffer.
+    assert kernel.get_lines(LineRange(11, 12)) == ["line 11"]
+    assert len(buffer_reads) == 1
+
+    # Out of bounds requests are clipped.
+    assert kernel.get_lines(LineRange(98, 200)) == ["line 98", "line 99"]
+    assert kernel.get_lines(LineRange(100, 120)) == []
+
+
+def test_cache_invalidated_by_changedtick(vim_env: MockVim, buffer_reads: list):
+    kernel = _make_kernel(vim_env, ["a", "b", "c"])
+
+    assert kernel.content == "a\nb\nc"
+    assert kernel.lines == ["a", "b", "c"]
+    n_reads = len(buffer_reads)
+    assert kernel.lines == ["a", "b", "c"]
+    assert len(buffer_reads) == n_reads
+
+    # Returned lists are copies, so the cache is not corrupted by callers.
+    kernel.lines.append("x")
+    assert kernel.lines == ["a", "b", "c"]
+
+    vim_env.buffers[1][1:2] = ["B"]
+    assert kernel.lines == ["a", "B", "c"]
+    assert kernel.content == "a\nB\nc"
+
+
+def test_text_searcher_on_window(vim_env: MockVim, buffer_reads: list):
+    kernel = _make_kernel(vim_env, [f"{i} target" for i in range(1000)])
+    operator = RangeOperatorVim(kernel)
+
+    target_range = CharacterRange(CursorPosition(500, 2), CursorPosition(502, 3))
+    found = operator.find_all("target", target_range)
+    assert found == [
+        CharacterRange(CursorPosition(500, 4), CursorPosition(500, 10)),
+        CharacterRange(CursorPosition(501, 4), CursorPosition(501, 10)),
+    ]
+    assert buffer_reads == [slice(500, 503)]
+
+    entire = operator.entire_character_range
+    assert operator.find_first("999 target", entire) == CharacterRange(
+        CursorPosition(999, 0), CursorPosition(999, 10)
+    )
+
+
+def test_benchmark_200k_lines(vim_env: MockVim):
+    kernel = _make_kernel(vim_env, [f"def function_{i}(): return {i}  # padding" for i in range(N_LINES)])
+    window = LineRange(N_LINES // 2, N_LINES // 2 + 50)
+
+    def _measure(func) -> tuple[float, int]:
+        tracemalloc.start()
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return elapsed, peak
+
+    full_time, full_peak = _measure(lambda: vim_env.buffers[1][:][window.start : window.end])
+    window_time, window_peak = _measure(lambda: kernel.get_lines(window))
+    cached_time, _ = _measure(lambda: kernel.get_lines(window))
+
+    print(
+        f"\nfull copy: {full_time * 1000:.2f}ms / {full_peak // 1024}KiB, "
+        f"window: {window_time * 1000:.3f}ms / {window_peak // 1024}KiB, "
+        f"cached: {cached_time * 1000:.3f}ms"
+    )
+    assert window_peak * 10 < full_peak
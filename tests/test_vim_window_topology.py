@@ -0,0 +1,141 @@
+"""Tests and benchmark of `VimWindowTopology`."""
+import time
+from pathlib import Path
+
+import pytest
+
+from pytoy.contexts.vim import GlobalVimContext
+from pytoy.shared.ui.pytoy_window.impls.vim import PytoyWindowProviderVim, PytoyWindowVim
+
+from tests import bench
+from tests.mocks.vim import MockVim
+
+
+N_TABS = 20
+N_WINDOWS_PER_TAB = 5
+N_QUERIES = 200
+# `vim.eval` crosses the python/vim bridge, which `MockVim` does not cost.
+ROUND_TRIP = 20e-6
+
+
+def _populate(vim_env: MockVim, n_tabs: int = N_TABS, current_tabnr: int = 3) -> None:
+    number = 0
+    for tabnr in range(1, n_tabs + 1):
+        for winnr in range(1, N_WINDOWS_PER_TAB + 1):
+            number += 1
+            buftype = "help" if winnr == N_WINDOWS_PER_TAB else ("nofile" if winnr == 4 else "")
+            name = f"/work/tab{tabnr}/pane{winnr}.py" if buftype != "nofile" else f"/work/__pytoy_output_{tabnr}__"
+            buffer = vim_env.create_buffer(number, name)
+            buffer.options["buftype"] = buftype
+            vim_env.create_window(winnr, buffer, winid=1000 + number, tabnr=tabnr)
+    vim_env.current_tabnr = current_tabnr
+
+
+@pytest.fixture
+def ctx(vim_env: MockVim) -> GlobalVimContext:
+    return GlobalVimContext()
+
+
+@pytest.fixture
+def eval_count(vim_env: MockVim, monkeypatch) -> list[str]:
+    calls: list[str] = []
+    original = vim_env.eval
+
+    def _eval(expr: str):
+        calls.append(expr)
+        if bench.ENABLED:
+            deadline = time.perf_counter() + ROUND_TRIP
+            while time.perf_counter() < deadline:
+                pass
+        return original(expr)
+
+    monkeypatch.setattr(vim_env, "eval", _eval)
+    return calls
+
+
+def _fire_layout_changed(ctx: GlobalVimContext) -> None:
+    group = f"PytoyAnyLayoutChangedGroup_{id(ctx.autocmd_manager)}"
+    ctx.autocmd_manager._dispatcher(group, "1")
+
+
+def test_queries_use_current_tab(vim_env: MockVim, ctx: GlobalVimContext):
+    _populate(vim_env)
+    provider = PytoyWindowProviderVim(ctx=ctx)
+
+    assert [window.winid for window in provider.get_windows()] == [1011, 1012, 1013, 1014]
+    assert len(provider.get_windows(only_normal_buffers=False)) == N_WINDOWS_PER_TAB
+
+    window = provider._get_window_by_bufname("/work/tab3/sub/../pane2.py", type="file")
+    assert window is not None and window.winid == 1012
+    window = provider._get_window_by_bufname("__pytoy_output_3__", type="nofile")
+    assert window is not None and window.winid == 1014
+    # Windows of other tabs are not reused.
+    assert provider._get_window_by_bufname("/work/tab4/pane2.py", type="file") is None
+
+
+def test_snapshot_is_invalidated_by_layout_events(vim_env: MockVim, ctx: GlobalVimContext, eval_count):
+    _populate(vim_env, n_tabs=2, current_tabnr=1)
+    provider = PytoyWindowProviderVim(ctx=ctx)
+    provider.get_windows()
+    provider._get_window_by_bufname("/work/tab1/pane1.py")
+    assert len(eval_count) == 1
+
+    # TabEnter
+    vim_env.current_tabnr = 2
+    _fire_layout_changed(ctx)
+    assert [window.winid for window in provider.get_windows()] == [1006, 1007, 1008, 1009]
+    assert len(eval_count) == 2
+
+    # BufWinEnter: another buffer is displayed in the window.
+    buffer = vim_env.create_buffer(100, "/work/other.py")
+    vim_env.windows[5]._buffer = buffer
+    _fire_layout_changed(ctx)
+    window = provider._get_window_by_bufname("/work/other.py")
+    assert window is not None and window.winid == 1006
+
+    # OptionSet buftype
+    buffer.options["buftype"] = "terminal"
+    ctx.autocmd_manager._dispatcher("PytoyAnyBufferBuftypeSetAutocmd", "100")
+    assert 1006 not in [window.winid for window in provider.get_windows()]
+
+
+def test_benchmark_100_windows_20_tabs(vim_env: MockVim, ctx: GlobalVimContext, eval_count):
+    _populate(vim_env)
+    provider = PytoyWindowProviderVim(ctx=ctx)
+    targets = [f"/work/tab3/pane{winnr}.py" for winnr in (1, 2, 3)] + ["/work/missing.py"]
+
+    start = time.perf_counter()
+    for i in range(N_QUERIES):
+        provider._get_window_by_bufname(targets[i % len(targets)])
+        provider.get_windows()
+    cached = time.perf_counter() - start
+    n_cached_evals = len(eval_count)
+
+    # Reference: the former implementation evaluated `bufwinnr`, `buftype` and resolved the name per window.
+    current_windows = [window for window in vim_env.windows if window.tabnr == vim_env.current_tabnr]
+    eval_count.clear()
+    start = time.perf_counter()
+    for i in range(N_QUERIES):
+        target = Path(targets[i % len(targets)]).resolve()
+        for window in current_windows:
+            if int(vim_env.eval(f"bufwinnr({window.buffer.number})")) <= 0:
+                continue
+            if window.buffer.name and Path(window.buffer.name).resolve() == target:
+                PytoyWindowVim.from_vim_window(window)
+                break
+        [
+            PytoyWindowVim.from_vim_window(window)
+            for window in current_windows
+            if vim_env.eval(f"getbufvar({window.buffer.number}, '&buftype')") in {"", "nofile"}
+        ]
+    scan = time.perf_counter() - start
+    n_scan_evals = len(eval_count)
+
+    bench.report(
+        f"\n{N_TABS * N_WINDOWS_PER_TAB} windows / {N_TABS} tabs, {N_QUERIES} queries: "
+        f"snapshot {cached * 1000:.1f}ms ({n_cached_evals} evals), "
+        f"per-window scan {scan * 1000:.1f}ms ({n_scan_evals} evals)"
+    )
+    assert n_cached_evals == 1
+    assert n_scan_evals > 100 * n_cached_evals
+    assert cached < scan
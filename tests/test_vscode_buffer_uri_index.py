@@ -0,0 +1,130 @@
+"""Tests and benchmark of `BufferURIIndex`."""
+import time
+
+import pytest
+
+from pytoy.contexts.vim import GlobalVimContext
+from pytoy.shared.ui.vscode.buffer_uri_index import BufferURIIndex
+from pytoy.shared.ui.vscode.uri import VSCodeUri
+
+from tests.mocks.vim import MockVim
+
+
+N_BUFFERS = 5000
+
+
+def _fire(ctx: GlobalVimContext, group: str, bufnr: int) -> None:
+    # Emulate the call from the autocmd: arguments are passed as `str`.
+    ctx.autocmd_manager._dispatcher(group, str(bufnr))
+
+
+def _bufname(bufnr: int) -> str:
+    match bufnr % 3:
+        case 0:
+            return f"/work/src/module_{bufnr}.py"
+        case 1:
+            return f"vscode-remote://wsl+ubuntu/home/user/src/module_{bufnr}.py"
+        case _:
+            return f"untitled:Untitled-{bufnr}"
+
+
+def _populate(vim_env: MockVim, n: int) -> None:
+    for bufnr in range(1, n + 1):
+        vim_env.create_buffer(bufnr, _bufname(bufnr))
+
+
+@pytest.fixture
+def ctx(vim_env: MockVim) -> GlobalVimContext:
+    return GlobalVimContext()
+
+
+def test_lookups_and_lifecycle_events(vim_env: MockVim, ctx: GlobalVimContext):
+    _populate(vim_env, 6)
+    index = BufferURIIndex(ctx=ctx)
+    remote = VSCodeUri.from_bufname(_bufname(4))
+    assert remote.scheme == "vscode-remote" and remote.authority == "wsl+ubuntu"
+    assert index.get_bufnr(remote) == 4
+    assert index.get_uri(2) == VSCodeUri.from_untitled_name("Untitled-2")
+    assert index.get_bufname(remote) == _bufname(4)
+    assert index.verify() == []
+
+    # BufAdd
+    vim_env.create_buffer(7, "untitled:Untitled-7")
+    _fire(ctx, "PytoyAnyBufferAddedAutocmd", 7)
+    assert index.get_bufnr(VSCodeUri.from_untitled_name("Untitled-7")) == 7
+
+    # BufFilePost
+    vim_env.buffers[7].name = "untitled:Renamed"
+    _fire(ctx, "PytoyAnyBufferBufFilePostAutocmd", 7)
+    assert index.get_bufnr(VSCodeUri.from_untitled_name("Untitled-7")) is None
+    assert index.get_bufnr(VSCodeUri.from_untitled_name("Renamed")) == 7
+    assert index.bufname_to_uri["untitled:Renamed"] == VSCodeUri.from_untitled_name("Renamed")
+
+    # The same uri: the largest `bufnr` is used, and the other remains after wiping it.
+    vim_env.create_buffer(8, "untitled:Renamed")
+    _fire(ctx, "PytoyAnyBufferAddedAutocmd", 8)
+    assert index.get_bufnr(VSCodeUri.from_untitled_name("Renamed")) == 8
+    assert index.verify() == []
+
+    # BufWipeout
+    _fire(ctx, "PytoyAnyBufferClosedGroupAutocmd", 8)
+    vim_env.buffers._buffers.pop(8)
+    assert index.get_bufnr(VSCodeUri.from_untitled_name("Renamed")) == 7
+    assert index.get_uri(8) is None
+    assert index.verify() == []
+
+    # A change which is not observed is reported by `verify`, and fixed by `refresh`.
+    vim_env.buffers[7].name = "untitled:Silent"
+    assert index.verify()
+    index.refresh()
+    assert index.verify() == []
+
+
+def test_changes_without_autocmds(vim_env: MockVim, ctx: GlobalVimContext):
+    """E.g. buffers created inside other autocmds, or with `noautocmd`."""
+    _populate(vim_env, 3)
+    index = BufferURIIndex(ctx=ctx)
+    assert index.get_bufnr(VSCodeUri.from_bufname(_bufname(3))) == 3
+
+    # The lookups fetch from vim again on a miss.
+    vim_env.create_buffer(4, "untitled:Silent")
+    assert index.get_bufnr(VSCodeUri.from_untitled_name("Silent")) == 4
+    vim_env.buffers[4].name = "untitled:Renamed"
+    assert index.get_bufname(VSCodeUri.from_untitled_name("Renamed")) == "untitled:Renamed"
+    vim_env.create_buffer(5, "untitled:Other")
+    assert index.get_uri(5) == VSCodeUri.from_untitled_name("Other")
+
+    # The mappings are rebuilt when the largest `bufnr` differs.
+    vim_env.create_buffer(6, "untitled:Last")
+    assert index.bufnr_to_uri[6] == VSCodeUri.from_untitled_name("Last")
+    vim_env.buffers._buffers.pop(6)
+    assert 6 not in index.bufnr_to_uri
+    assert index.verify() == []
+
+
+def test_benchmark_5000_buffers(vim_env: MockVim, ctx: GlobalVimContext):
+    _populate(vim_env, N_BUFFERS)
+    index = BufferURIIndex(ctx=ctx)
+    targets = [VSCodeUri.from_bufname(_bufname(bufnr)) for bufnr in range(1, N_BUFFERS + 1, 50)]
+
+    start = time.perf_counter()
+    index.get_bufnr(targets[0])
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    found = [index.get_bufnr(uri) for uri in targets]
+    indexed = (time.perf_counter() - start) / len(targets)
+    assert found == list(range(1, N_BUFFERS + 1, 50))
+
+    # Reference: the former `BufferURISolver.get_bufnr` rebuilt the dictionary for every lookup.
+    n_linear = 5
+    start = time.perf_counter()
+    for uri in targets[:n_linear]:
+        assert {VSCodeUri.from_bufname(buf.name): buf.number for buf in vim_env.buffers}.get(uri) is not None
+    linear = (time.perf_counter() - start) / n_linear
+
+    print(
+        f"\n{N_BUFFERS} buffers: build {build * 1000:.1f}ms, "
+        f"indexed lookup {indexed * 1e6:.1f}us, full rebuild lookup {linear * 1000:.1f}ms"
+    )
+    assert indexed * 100 < linear
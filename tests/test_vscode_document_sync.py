@@ -0,0 +1,151 @@
+"""Tests of `DocumentSynchronizer` against a document which receives the edits with delay."""
+from types import SimpleNamespace
+from typing import Callable
+
+from pytoy.shared.ui.vscode import utils
+from pytoy.shared.ui.vscode.document_sync import DocumentSynchronizer, SyncPolicy
+from pytoy.shared.ui.vscode.utils import wait_until_true
+
+from tests import bench
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+class _DelayedDocument:
+    """Emulate `vscode-neovim`: edits of the buffer reach the document after `delay`."""
+
+    def __init__(self, clock: Callable[[], float], lines: list[str], delay: float) -> None:
+        self._clock = clock
+        self._lines = list(lines)
+        self._version = 1
+        self._pending: list[tuple[float, list[str]]] = []
+        self.delay = delay
+        self.n_version_calls = 0
+        self.n_content_calls = 0
+
+    def edit(self, lines: list[str]) -> None:
+        self._pending.append((self._clock() + self.delay, list(lines)))
+
+    def _propagate(self) -> None:
+        while self._pending and self._pending[0][0] <= self._clock():
+            _, self._lines = self._pending.pop(0)
+            self._version += 1
+
+    @property
+    def version(self) -> int:
+        self.n_version_calls += 1
+        self._propagate()
+        return self._version
+
+    def get_lines(self) -> list[str]:
+        self.n_content_calls += 1
+        self._propagate()
+        return list(self._lines)
+
+
+def _make_synchronizer(clock: _Clock, **kwargs) -> DocumentSynchronizer:
+    return DocumentSynchronizer(SyncPolicy(**kwargs), pump=lambda: None, clock=clock, sleep=clock.sleep)
+
+
+def test_resolves_when_version_advances():
+    clock = _Clock()
+    document = _DelayedDocument(clock, ["a"], delay=0.05)
+    synchronizer = _make_synchronizer(clock)
+
+    version = synchronizer.version(document)
+    document.edit(["b"])
+    assert synchronizer.wait_for_change(document, version, lambda: document.get_lines() == ["b"])
+
+    # Resolved within one polling interval after the propagation.
+    assert 0.05 <= clock.now < 0.05 + synchronizer.policy.max_interval
+    # The contents are compared only at first and when the version advanced.
+    assert document.n_content_calls == 2
+    assert synchronizer.stats.n_waits == 1
+    assert synchronizer.stats.n_timeouts == 0
+
+
+def test_noop_edit_resolves_immediately():
+    clock = _Clock()
+    document = _DelayedDocument(clock, ["a"], delay=0.05)
+    synchronizer = _make_synchronizer(clock)
+
+    version = synchronizer.version(document)
+    assert synchronizer.wait_for_change(document, version, lambda: document.get_lines() == ["a"])
+    assert clock.now == 0.0
+    assert synchronizer.stats.n_polls == 0
+
+
+def test_intermediate_versions():
+    clock = _Clock()
+    document = _DelayedDocument(clock, ["a"], delay=0.01)
+    synchronizer = _make_synchronizer(clock)
+
+    version = synchronizer.version(document)
+    document.edit(["partial"])
+    document.delay = 0.03
+    document.edit(["b"])
+    assert synchronizer.wait_for_change(document, version, lambda: document.get_lines() == ["b"])
+    assert clock.now >= 0.03
+
+
+def test_timeout_and_metrics():
+    clock = _Clock()
+    document = _DelayedDocument(clock, ["a"], delay=10.0)
+    synchronizer = _make_synchronizer(clock, timeout=0.2)
+
+    version = synchronizer.version(document)
+    document.edit(["b"])
+    assert not synchronizer.wait_for_change(document, version, lambda: document.get_lines() == ["b"])
+    assert synchronizer.wait_for_change(document, version, lambda: True, timeout=0.5)
+
+    stats = synchronizer.stats
+    assert (stats.n_waits, stats.n_timeouts) == (2, 1)
+    assert 0.2 <= stats.max_wait < 0.2 + synchronizer.policy.max_interval
+    assert stats.last_failure is not None
+    # Only `version` is polled while it is unchanged.
+    assert document.n_content_calls == 1
+
+
+def test_version_unavailable_falls_back_to_polling():
+    clock = _Clock()
+    document = _DelayedDocument(clock, ["a"], delay=0.05)
+    synchronizer = _make_synchronizer(clock)
+
+    document.edit(["b"])
+    assert synchronizer.wait_for_change(None, synchronizer.version(None), lambda: document.get_lines() == ["b"])
+    assert clock.now >= 0.05
+
+
+def test_benchmark_against_fixed_polling(vim_env, monkeypatch):
+    """Both waits run on the virtual clock, so the latencies do not depend on the load of the machine."""
+    clock = _Clock()
+    delay = 0.005
+    document = _DelayedDocument(clock, ["a"], delay=delay)
+    synchronizer = _make_synchronizer(clock)
+
+    version = synchronizer.version(document)
+    document.edit(["b"])
+    assert synchronizer.wait_for_change(document, version, lambda: document.get_lines() == ["b"])
+    versioned_elapsed = clock.now
+    n_versioned_contents = document.n_content_calls
+
+    # `wait_until_true` compares the contents every `timeout / n_trials` seconds.
+    monkeypatch.setattr(utils, "time", SimpleNamespace(sleep=clock.sleep))
+    document.n_content_calls = 0
+    document.edit(["c"])
+    start = clock.now
+    assert wait_until_true(lambda: document.get_lines() == ["c"], timeout=1.0)
+    polling_elapsed = clock.now - start
+
+    bench.report(f"\nversion-driven: {versioned_elapsed * 1000:.1f}ms, fixed polling: {polling_elapsed * 1000:.1f}ms")
+    assert delay <= versioned_elapsed < polling_elapsed
+    assert n_versioned_contents == 2